@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+数字化转型分析阶段依赖图
+四个解构阶段相互独立，可以并发调用LLM；创新利基识别依赖解构结果，
+商业模式重构依赖创新利基，业务创新路径规划依赖创新利基和商业模式。
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认同时执行的阶段数
+DEFAULT_MAX_WORKERS = 4
+
+DECONSTRUCTION_STAGES = [
+    "business_scene_deconstruction",
+    "digitization_deconstruction",
+    "online_transformation_deconstruction",
+    "intelligent_transformation_deconstruction"
+]
+
+# 阶段依赖图（按拓扑顺序排列）
+# method: 分析器方法名；depends_on: 依赖的阶段；
+# require_all: 是否要求全部依赖成功（否则至少一个成功即可执行）；
+# context_key: 作为下游阶段上下文时使用的键名
+ANALYSIS_STAGES = {
+    "business_scene_deconstruction": {
+        "method": "deconstruct_business_scene",
+        "depends_on": []
+    },
+    "digitization_deconstruction": {
+        "method": "deconstruct_digitization",
+        "depends_on": []
+    },
+    "online_transformation_deconstruction": {
+        "method": "deconstruct_online_transformation",
+        "depends_on": []
+    },
+    "intelligent_transformation_deconstruction": {
+        "method": "deconstruct_intelligent_transformation",
+        "depends_on": []
+    },
+    "innovation_niche_identification": {
+        "method": "identify_innovation_niche",
+        "depends_on": DECONSTRUCTION_STAGES,
+        "require_all": False,
+        "context_key": "innovation_niche"
+    },
+    "business_model_reconstruction": {
+        "method": "reconstruct_business_model",
+        "depends_on": ["innovation_niche_identification"],
+        "context_key": "business_model"
+    },
+    "business_innovation_pathway_planning": {
+        "method": "plan_business_innovation_pathway",
+        "depends_on": ["innovation_niche_identification", "business_model_reconstruction"]
+    }
+}
+
+
+def select_stages(targets: Optional[List[str]] = None) -> List[str]:
+    """
+    选出目标阶段及其全部上游阶段
+
+    Args:
+        targets: 目标阶段名称列表（缺省为全部阶段）
+
+    Returns:
+        按拓扑顺序排列的阶段名称列表
+    """
+    if not targets:
+        return list(ANALYSIS_STAGES)
+
+    selected = set()
+    stack = list(targets)
+    while stack:
+        stage = stack.pop()
+        if stage not in ANALYSIS_STAGES:
+            raise ValueError(f"不支持的分析阶段: {stage}")
+        if stage not in selected:
+            selected.add(stage)
+            stack.extend(ANALYSIS_STAGES[stage]["depends_on"])
+    return [stage for stage in ANALYSIS_STAGES if stage in selected]
+
+
+def build_stage_input(stage: str, context: Dict[str, Any], results: Dict[str, Any]) -> Any:
+    """
+    根据上游结果构造阶段输入
+
+    解构阶段直接使用原始上下文；创新利基识别接收成功的解构结果列表；
+    其余阶段在原始上下文上附加上游结果。
+    """
+    dependencies = ANALYSIS_STAGES[stage]["depends_on"]
+    if not dependencies:
+        return context
+    if stage == "innovation_niche_identification":
+        return [results[dependency] for dependency in dependencies if dependency in results]
+
+    stage_input = dict(context)
+    for dependency in dependencies:
+        stage_input[ANALYSIS_STAGES[dependency]["context_key"]] = results[dependency]
+    return stage_input
+
+
+def run_analysis_pipeline(
+    analyzer: Any,
+    context: Dict[str, Any],
+    stages: Optional[List[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    stage_timeout: Optional[float] = None,
+    stage_timeouts: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    按依赖图执行分析阶段
+
+    依赖已满足的阶段立即提交，最多 max_workers 个阶段同时执行。阶段失败或超时
+    不会中断整个流程：已完成的结果照常返回，依赖它的阶段被跳过。超时的阶段
+    无法强制终止，其线程在后台结束后结果被丢弃。
+
+    Args:
+        analyzer: 提供各阶段方法的分析器
+        context: 分析上下文
+        stages: 目标阶段（缺省为全部阶段，会自动包含上游阶段）
+        max_workers: 同时执行的最大阶段数
+        stage_timeout: 每个阶段的默认超时时间（秒），None 表示不限
+        stage_timeouts: 按阶段指定的超时时间（秒），优先于 stage_timeout
+
+    Returns:
+        包含 results、errors、skipped、stage_timings 和 completed 的结果字典
+
+    Raises:
+        ValueError: max_workers 小于1或阶段名称不支持
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers 必须至少为1: {max_workers}")
+    stage_timeouts = stage_timeouts or {}
+    pending = select_stages(stages)
+    results = {}
+    errors = {}
+    skipped = {}
+    timings = {}
+    running = {}
+    started_at = {}
+    start = time.perf_counter()
+
+    def timeout_of(stage):
+        return stage_timeouts.get(stage, stage_timeout)
+
+    # 线程数等于阶段数，提交即开始执行；并发数由下面的调度控制
+    executor = ThreadPoolExecutor(max_workers=len(pending))
+    try:
+        while pending or running:
+            for stage in list(pending):
+                spec = ANALYSIS_STAGES[stage]
+                dependencies = spec["depends_on"]
+                if any(d in pending or d in running.values() for d in dependencies):
+                    continue
+
+                succeeded = [d for d in dependencies if d in results]
+                if spec.get("require_all", True):
+                    blocked = len(succeeded) < len(dependencies)
+                else:
+                    blocked = bool(dependencies) and not succeeded
+                if blocked:
+                    pending.remove(stage)
+                    failed = [d for d in dependencies if d not in results]
+                    skipped[stage] = f"上游阶段未完成: {', '.join(failed)}"
+                    continue
+
+                if len(running) >= max_workers:
+                    break
+                pending.remove(stage)
+                method = getattr(analyzer, spec["method"])
+                future = executor.submit(method, build_stage_input(stage, context, results))
+                running[future] = stage
+                started_at[stage] = time.perf_counter()
+
+            if not running:
+                continue
+
+            deadlines = [
+                started_at[stage] + timeout_of(stage)
+                for stage in running.values() if timeout_of(stage) is not None
+            ]
+            wait_timeout = max(min(deadlines) - time.perf_counter(), 0) if deadlines else None
+            done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage = running.pop(future)
+                timings[stage] = round(time.perf_counter() - started_at[stage], 3)
+                try:
+                    results[stage] = future.result()
+                except Exception as e:
+                    logger.error(f"分析阶段 {stage} 失败: {e}")
+                    errors[stage] = str(e)
+
+            now = time.perf_counter()
+            for future, stage in list(running.items()):
+                limit = timeout_of(stage)
+                if limit is not None and now - started_at[stage] >= limit:
+                    running.pop(future)
+                    timings[stage] = round(now - started_at[stage], 3)
+                    logger.error(f"分析阶段 {stage} 超时（{limit}秒）")
+                    errors[stage] = f"阶段超时（{limit}秒）"
+    finally:
+        # 不等待已超时的阶段
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "skipped": skipped,
+        "stage_timings": timings,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "completed": not errors and not skipped
+    }
+
+
+class AnalysisPipelineMixin:
+    """为提供各阶段方法的分析器添加按依赖图执行的完整分析"""
+
+    def run_full_analysis(
+        self,
+        context: Dict[str, Any],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stage_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        按阶段依赖图执行完整分析
+
+        四个解构阶段并发执行，创新利基识别、商业模式重构和业务创新路径规划
+        在上游完成后依次执行；某个阶段失败时返回其余阶段的结果。
+
+        Args:
+            context: 分析上下文
+            max_workers: 同时执行的最大阶段数
+            stage_timeout: 每个阶段的超时时间（秒）
+
+        Returns:
+            各阶段结果、错误、跳过的阶段和耗时
+        """
+        return run_analysis_pipeline(
+            self, context, max_workers=max_workers, stage_timeout=stage_timeout
+        )
@@ -6,8 +6,12 @@
 
 import json
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Hashable
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import random
+import threading
 import time
 import logging
 from pathlib import Path
@@ -17,9 +21,75 @@ import csv
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 并发采集的线程数
+COLLECT_MAX_WORKERS = 8
+# 同一主机同时进行的请求数上限
+PER_HOST_CONCURRENCY = 4
+# 单个采集任务的截止时间（秒，含重试）与一次采集的整体截止时间（秒）
+SOURCE_DEADLINE = 15.0
+OVERALL_DEADLINE = 120.0
+# 最大尝试次数与指数退避参数（秒）
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 8.0
+# 可重试的HTTP状态码
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 每个数据源会话的连接池大小
+SESSION_POOL_SIZE = 16
+
+# 采集任务状态
+STATUS_OK = "ok"
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+_session_lock = threading.Lock()
+
 
 class DataSource(ABC):
-    """数据源抽象基类"""
+    """
+    数据源抽象基类
+
+    发起HTTP请求的数据源应通过 get_session() 共享同一个会话以复用连接，
+    并把 params 中的 timeout（并发采集器按剩余时间设置）传给请求。
+    """
+
+    # 数据源地址，用于确定请求主机；不发起网络请求的数据源留空
+    base_url: str = ""
+
+    def get_session(self) -> requests.Session:
+        """获取该数据源共享的HTTP会话（首次调用时创建）"""
+        session = getattr(self, "session", None)
+        if session is None:
+            with _session_lock:
+                session = getattr(self, "session", None)
+                if session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_maxsize=SESSION_POOL_SIZE)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self.session = session
+        return session
+
+    def get_host(self, params: Dict[str, Any]) -> str:
+        """请求的目标主机，用于按主机限制并发；无网络请求时返回空字符串"""
+        return urlparse(params.get("url") or self.base_url).netloc
+
+    def request_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        通过共享会话发送GET请求并解析JSON
+
+        Raises:
+            requests.RequestException: 网络错误、超时或HTTP错误状态码
+        """
+        response = self.get_session().get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
 
     @abstractmethod
     def fetch_data(self, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -380,11 +450,214 @@ class IndustryReportDataSource(DataSource):
         return "market_size" in data and "market_structure" in data
 
 
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_BACKOFF_BASE,
+    maximum: float = RETRY_BACKOFF_MAX
+) -> float:
+    """
+    带完全抖动的指数退避时间，避免同时失败的请求同时重试
+
+    Args:
+        attempt: 已失败的尝试次数（从1开始）
+        base: 退避基数（秒）
+        maximum: 退避上限（秒）
+
+    Returns:
+        0 到 min(maximum, base * 2^(attempt-1)) 之间的随机秒数
+    """
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """判断错误是否可重试：连接错误、超时和部分服务端错误状态码"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+class ConcurrentCollector:
+    """
+    并发数据采集器
+
+    用线程池并发执行采集任务。同一主机的并发请求数受限；可重试的错误按带抖动
+    的指数退避重试；单个任务（从开始执行算起，含重试）和整体各有截止时间。
+    超时的任务无法强制终止，其线程在后台结束后结果被丢弃，其余结果照常返回。
+
+    Args:
+        max_workers: 线程数
+        per_host_limit: 同一主机同时进行的请求数上限
+        source_deadline: 单个任务的截止时间（秒）
+        overall_deadline: 一次采集的整体截止时间（秒）
+        retry_attempts: 最大尝试次数
+        backoff_base: 退避基数（秒）
+        backoff_max: 退避上限（秒）
+    """
+
+    def __init__(
+        self,
+        max_workers: int = COLLECT_MAX_WORKERS,
+        per_host_limit: int = PER_HOST_CONCURRENCY,
+        source_deadline: float = SOURCE_DEADLINE,
+        overall_deadline: float = OVERALL_DEADLINE,
+        retry_attempts: int = RETRY_ATTEMPTS,
+        backoff_base: float = RETRY_BACKOFF_BASE,
+        backoff_max: float = RETRY_BACKOFF_MAX
+    ):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.source_deadline = source_deadline
+        self.overall_deadline = overall_deadline
+        self.retry_attempts = retry_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, host: str) -> Optional[threading.BoundedSemaphore]:
+        """获取主机对应的信号量；无主机的数据源不受限制"""
+        if not host:
+            return None
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _run_task(
+        self,
+        source: DataSource,
+        params: Dict[str, Any],
+        overall_end: float,
+        started: Dict[Hashable, float],
+        key: Hashable
+    ) -> Dict[str, Any]:
+        """在工作线程中执行单个任务（含限流和重试），返回任务报告"""
+        start = time.monotonic()
+        with self._lock:
+            started[key] = start
+        deadline = min(start + self.source_deadline, overall_end)
+        semaphore = self._host_semaphore(source.get_host(params))
+        entry = {"status": STATUS_TIMEOUT, "attempts": 0}
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if semaphore is not None and not semaphore.acquire(timeout=remaining):
+                break
+
+            entry["attempts"] += 1
+            try:
+                data = source.fetch_data(dict(params, timeout=remaining))
+            except Exception as e:
+                error = e
+            else:
+                if source.validate_data(data):
+                    entry.update(status=STATUS_OK, data=data)
+                else:
+                    entry.update(status=STATUS_INVALID, error=str(data.get("error", "数据校验失败")))
+                break
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+            entry.update(status=STATUS_ERROR, error=str(error))
+            if not is_retryable_error(error) or entry["attempts"] >= self.retry_attempts:
+                break
+            delay = backoff_delay(entry["attempts"], self.backoff_base, self.backoff_max)
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+        entry["elapsed_seconds"] = round(time.monotonic() - start, 3)
+        return entry
+
+    def collect(
+        self,
+        tasks: List[Tuple[Hashable, DataSource, Dict[str, Any]]],
+        overall_deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        并发执行采集任务
+
+        Args:
+            tasks: (任务键, 数据源, 参数) 列表
+            overall_deadline: 本次采集的整体截止时间（秒），缺省使用初始化参数
+
+        Returns:
+            包含 results（成功任务的数据）、report（每个任务的状态、尝试次数、
+            耗时和错误）、completed 和 elapsed_seconds 的结果字典
+        """
+        start = time.monotonic()
+        overall_end = start + (overall_deadline if overall_deadline is not None else self.overall_deadline)
+        results = {}
+        report = {}
+        started = {}
+        running = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for key, source, params in tasks:
+                future = executor.submit(self._run_task, source, params, overall_end, started, key)
+                running[future] = key
+
+            while running:
+                # 等到下一个完成的任务，或最早到期的截止时间
+                with self._lock:
+                    deadlines = [started[key] + self.source_deadline
+                                 for key in running.values() if key in started]
+                wait_timeout = max(min(deadlines + [overall_end]) - time.monotonic(), 0)
+                done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key = running.pop(future)
+                    entry = future.result()
+                    data = entry.pop("data", None)
+                    if entry["status"] == STATUS_OK:
+                        results[key] = data
+                    report[key] = entry
+
+                now = time.monotonic()
+                for future, key in list(running.items()):
+                    with self._lock:
+                        task_start = started.get(key)
+                    source_expired = task_start is not None and now - task_start >= self.source_deadline
+                    if source_expired or now >= overall_end:
+                        running.pop(future)
+                        future.cancel()
+                        report[key] = {
+                            "status": STATUS_TIMEOUT,
+                            "attempts": None,
+                            "elapsed_seconds": round(now - task_start, 3) if task_start else 0.0
+                        }
+        finally:
+            # 不等待已超时的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {
+            "results": results,
+            "report": report,
+            "completed": len(results) == len(report),
+            "elapsed_seconds": round(time.monotonic() - start, 3)
+        }
+
+
 class DataIntegrator:
-    """数据集成器 - 整合多个数据源"""
+    """
+    数据集成器 - 整合多个数据源
 
-    def __init__(self):
-        """初始化数据集成器"""
+    各数据源的请求通过 ConcurrentCollector 并发执行，采集参数见其说明。
+    """
+
+    def __init__(self, **collector_options):
+        """
+        初始化数据集成器
+
+        Args:
+            **collector_options: 传给 ConcurrentCollector 的并发、截止时间和重试参数
+        """
         self.data_sources = {
             "baidu_search": BaiduSearchDataSource(),
             "company_website": CompanyWebsiteDataSource(),
@@ -392,91 +665,128 @@ class DataIntegrator:
             "government_info": GovernmentInfoDataSource(),
             "industry_report": IndustryReportDataSource()
         }
+        self.collector = ConcurrentCollector(**collector_options)
+
+    def _company_tasks(self, company_name: str) -> List[Tuple[Hashable, DataSource, Dict[str, Any]]]:
+        """企业数据的采集任务：百度搜索（基本信息）、新闻媒体（关系信息）、政府信息（注册信息）"""
+        params = {
+            "baidu_search": {"keyword": company_name},
+            "news_media": {"company_name": company_name},
+            "government_info": {"company_name": company_name}
+        }
+        return [((company_name, name), self.data_sources[name], source_params)
+                for name, source_params in params.items()]
+
+    def _industry_task(self, industry_name: str, year: int) -> Tuple[Hashable, DataSource, Dict[str, Any]]:
+        """行业数据的采集任务"""
+        return ((industry_name, "industry_report"), self.data_sources["industry_report"],
+                {"industry_name": industry_name, "year": year})
+
+    @staticmethod
+    def _source_report(outcome: Dict[str, Any], target: str) -> Dict[str, Any]:
+        """提取某个采集对象的各数据源报告"""
+        return {source: entry for (name, source), entry in outcome["report"].items() if name == target}
+
+    @staticmethod
+    def _collection_failures(outcome: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """列出未成功的采集任务"""
+        return [
+            dict(entry, target=target, source=source)
+            for (target, source), entry in outcome["report"].items()
+            if entry["status"] != STATUS_OK
+        ]
 
-    def collect_company_data(self, company_name: str) -> Dict[str, Any]:
+    def _build_company_data(self, company_name: str, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """根据采集结果构造企业数据"""
+        integrated_data = {
+            "company_name": company_name,
+            "collection_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "data_sources": {}
+        }
+        for key, _, _ in self._company_tasks(company_name):
+            if key in outcome["results"]:
+                integrated_data["data_sources"][key[1]] = outcome["results"][key]
+        integrated_data["collection_report"] = self._source_report(outcome, company_name)
+        return integrated_data
+
+    def collect_company_data(
+        self,
+        company_name: str,
+        overall_deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         收集企业数据
 
         Args:
             company_name: 企业名称
+            overall_deadline: 整体截止时间（秒），缺省使用采集器的设置
 
         Returns:
-            整合后的企业数据
+            整合后的企业数据，collection_report 记录每个数据源的采集状态
         """
         logger.info(f"开始收集企业数据: {company_name}")
 
-        integrated_data = {
-            "company_name": company_name,
-            "collection_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "data_sources": {}
-        }
-
-        # 1. 从百度搜索获取基本信息
-        baidu_data = self.data_sources["baidu_search"].fetch_data({
-            "keyword": company_name
-        })
-        if self.data_sources["baidu_search"].validate_data(baidu_data):
-            integrated_data["data_sources"]["baidu_search"] = baidu_data
-
-        # 2. 从新闻媒体获取关系信息
-        news_data = self.data_sources["news_media"].fetch_data({
-            "company_name": company_name
-        })
-        if self.data_sources["news_media"].validate_data(news_data):
-            integrated_data["data_sources"]["news_media"] = news_data
-
-        # 3. 从政府信息获取注册信息
-        gov_data = self.data_sources["government_info"].fetch_data({
-            "company_name": company_name
-        })
-        if self.data_sources["government_info"].validate_data(gov_data):
-            integrated_data["data_sources"]["government_info"] = gov_data
+        outcome = self.collector.collect(self._company_tasks(company_name), overall_deadline)
+        integrated_data = self._build_company_data(company_name, outcome)
 
         logger.info(f"企业数据收集完成: {company_name}")
         return integrated_data
 
-    def collect_industry_data(self, industry_name: str, year: int = 2024) -> Dict[str, Any]:
+    def collect_industry_data(
+        self,
+        industry_name: str,
+        year: int = 2024,
+        overall_deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         收集行业数据
 
         Args:
             industry_name: 行业名称
             year: 年份
+            overall_deadline: 整体截止时间（秒），缺省使用采集器的设置
 
         Returns:
             整合后的行业数据
         """
         logger.info(f"开始收集行业数据: {industry_name} {year}")
 
+        outcome = self.collector.collect([self._industry_task(industry_name, year)], overall_deadline)
+        integrated_data = self._build_industry_data(industry_name, year, outcome)
+
+        logger.info(f"行业数据收集完成: {industry_name}")
+        return integrated_data
+
+    def _build_industry_data(self, industry_name: str, year: int, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """根据采集结果构造行业数据"""
         integrated_data = {
             "industry_name": industry_name,
             "year": year,
             "collection_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "data_sources": {}
         }
-
-        # 1. 从行业报告获取市场数据
-        report_data = self.data_sources["industry_report"].fetch_data({
-            "industry_name": industry_name,
-            "year": year
-        })
-        if self.data_sources["industry_report"].validate_data(report_data):
-            integrated_data["data_sources"]["industry_report"] = report_data
-
-        logger.info(f"行业数据收集完成: {industry_name}")
+        key = (industry_name, "industry_report")
+        if key in outcome["results"]:
+            integrated_data["data_sources"]["industry_report"] = outcome["results"][key]
+        integrated_data["collection_report"] = self._source_report(outcome, industry_name)
         return integrated_data
 
     def collect_ecosystem_data(
         self,
         industry_name: str,
-        company_list: List[str]
+        company_list: List[str],
+        overall_deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         收集生态系统数据
 
+        行业数据和所有企业的全部数据源在同一个线程池中并发采集。部分数据源失败
+        或超时时，其余数据照常整合，失败情况记录在 collection_report 中。
+
         Args:
             industry_name: 行业名称
             company_list: 企业列表
+            overall_deadline: 整体截止时间（秒），缺省使用采集器的设置
 
         Returns:
             整合后的生态系统数据
@@ -497,13 +807,18 @@ class DataIntegrator:
             }
         }
 
-        # 1. 收集行业数据
-        industry_data = self.collect_industry_data(industry_name)
-        integrated_data["industry_data"] = industry_data
+        # 1. 并发采集行业数据和每个企业的数据
+        year = 2024
+        tasks = [self._industry_task(industry_name, year)]
+        for company_name in company_list:
+            tasks.extend(self._company_tasks(company_name))
+        outcome = self.collector.collect(tasks, overall_deadline)
+
+        integrated_data["industry_data"] = self._build_industry_data(industry_name, year, outcome)
 
-        # 2. 收集每个企业的数据
+        # 2. 按企业列表顺序整合每个企业的数据
         for company_name in company_list:
-            company_data = self.collect_company_data(company_name)
+            company_data = self._build_company_data(company_name, outcome)
 
             # 提取实体信息
             entity = {
@@ -539,6 +854,15 @@ class DataIntegrator:
             integrated_data
         )
 
+        # 4. 记录采集情况，便于识别缺失的数据
+        integrated_data["collection_report"] = {
+            "completed": outcome["completed"],
+            "elapsed_seconds": outcome["elapsed_seconds"],
+            "total_tasks": len(outcome["report"]),
+            "succeeded_tasks": len(outcome["results"]),
+            "failures": self._collection_failures(outcome)
+        }
+
         logger.info(f"生态系统数据收集完成: {industry_name}")
         return integrated_data
 
@@ -9,6 +9,11 @@ import json
 import argparse
 from typing import Dict, Any, List
 from enum import Enum
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent))
+from analysis_pipeline import AnalysisPipelineMixin
 
 
 class AnalysisType(Enum):
@@ -22,7 +27,7 @@ class AnalysisType(Enum):
     BUSINESS_INNOVATION_PATHWAY_PLANNING = "business-innovation-pathway-planning"
 
 
-class DigitalTransformationAnalyzer:
+class DigitalTransformationAnalyzer(AnalysisPipelineMixin):
     """数字化转型分析器"""
     
     def __init__(self):
@@ -455,7 +455,7 @@ class DigitalTransformationAnalyzerAgentskillsIO:
 {self._format_list(context.get('customer_touchpoints', ['官方网站', '电商平台', "社交媒体", "移动App"]))}
 
 ### 数据采集点
-{self._format_list(context.get('data_collection_points', ['用户行为数据', "设备传感器数据', "交易数据', "反馈数据"]))}
+{self._format_list(context.get('data_collection_points', ['用户行为数据', '设备传感器数据', '交易数据', '反馈数据']))}
 
 ### 在线化服务
 {self._format_list(context.get('online_services', ['在线客服', "在线支付", "远程服务", "个性化推荐"]))}
@@ -798,7 +798,7 @@ class DigitalTransformationAnalyzerAgentskillsIO:
         "market_demand_intensity": {{"score": "4.5", "weight": "0.25", "assessment": "市场需求强劲，增长迅速"}},
         "technical_feasibility": {{"score": "3.5", "weight": "0.20", "assessment": "技术成熟，实施难度中等"}},
         "competitive_environment": {{"score": "3.0", "weight": "0.16", "assessment": "竞争激烈，需差异化竞争策略"}},
-        "commercial_value": {{"score": "4.0", "weight": "0.16", "assessment": "商业价值高，ROI可期"},
+        "commercial_value": {{"score": "4.0", "weight": "0.16", "assessment": "商业价值高，ROI可期"}},
         "implementation_difficulty": {{"score": "2.5", "weight": "0.13", "assessment": "需要一定技术积累和组织准备"}}
     }},
     "top_niches": [
@@ -10,12 +10,15 @@ import subprocess
 import logging
 from typing import Dict, Any, List, Optional
 
+from analysis_pipeline import AnalysisPipelineMixin
+from digital_transformation_analyzer import AnalysisType
+
 # 配置日志（仅错误级别）
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
 
-class DigitalTransformationAnalyzerHostCLI:
+class DigitalTransformationAnalyzerHostCLI(AnalysisPipelineMixin):
     """数字化转型分析器 - 直接使用宿主CLI的LLM能力"""
 
     def __init__(self):
@@ -8,6 +8,8 @@ import logging
 from typing import Dict, Any, List, Optional
 import json
 
+from analysis_pipeline import AnalysisPipelineMixin
+
 # 配置日志（只记录错误，不输出额外文本）
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
@@ -218,7 +220,7 @@ class HostLLMIntegration:
             yield f"错误: {str(e)}"
 
 
-class DigitalTransformationAnalyzerHostLLM:
+class DigitalTransformationAnalyzerHostLLM(AnalysisPipelineMixin):
     """基于宿主LLM的数字化转型分析器"""
 
     def __init__(self):
@@ -11,6 +11,7 @@ from enum import Enum
 import logging
 
 from llm_client import LLMClientFactory, chat_with_llm
+from analysis_pipeline import AnalysisPipelineMixin
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +29,7 @@ class AnalysisType(Enum):
     BUSINESS_INNOVATION_PATHWAY_PLANNING = "business-innovation-pathway-planning"
 
 
-class DigitalTransformationAnalyzerLLM:
+class DigitalTransformationAnalyzerLLM(AnalysisPipelineMixin):
     """基于LLM的数字化转型分析器"""
 
     def __init__(
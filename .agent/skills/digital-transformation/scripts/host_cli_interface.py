@@ -7,7 +7,13 @@
 import os
 import sys
 import json
+import time
+import codecs
+import queue
+import asyncio
 import logging
+import tempfile
+import threading
 import subprocess
 from typing import Dict, Any, List, Optional
 
@@ -15,6 +21,13 @@ from typing import Dict, Any, List, Optional
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CLI调用超时（秒）
+CLI_TIMEOUT = 300
+# 每次从子进程标准输出读取的最大字节数（有数据即返回，不等待读满）
+CLI_READ_SIZE = 4096
+# 用于识别 SSE 事件流的字段前缀
+SSE_PREFIXES = ("data:", "event:")
+
 
 class HostCLIInterface:
     """
@@ -56,7 +69,7 @@ class HostCLIInterface:
         try:
             if sys.platform == "win32":
                 result = subprocess.run(['cmd', '/c', 'echo', 'test'], capture_output=True, text=True, timeout=2)
-            return result.returncode == 0
+                return result.returncode == 0
             else:
                 result = subprocess.run(['echo', 'test'], capture_output=True, text=True, timeout=2)
                 return result.returncode == 0
@@ -116,7 +129,7 @@ class HostCLIInterface:
                                      os.environ.get('LLM_API_ENDPOINT',
                                      os.environ.get('API_ENDPOINT',
                                      os.environ.get('OPENAI_API_BASE',
-                                     'https://api.openai.com/v1')))
+                                     'https://api.openai.com/v1'))))
         
         # 2. 检查Stigmergy特定的API端点配置
         if self.is_stigmergy:
@@ -136,7 +149,7 @@ class HostCLIInterface:
                            os.environ.get('LLM_MODEL',
                            os.environ.get('MODEL',
                            os.environ.get('OPENAI_MODEL',
-                           'gpt-4'))
+                           'gpt-4'))))
         
         # 2. 检查Stigmergy特定的模型配置
         if self.is_stigmergy:
@@ -182,7 +195,7 @@ class HostCLIInterface:
                 return
         
         # 3. 如果没有找到API密钥，但检测到Stigmergy环境，可能使用内置的LLM服务
-        if self.is_stigmergy and not self.api_key:
+        if self.is_stigmergy:
             logger.info("Stigmergy环境未配置API密钥，可能使用内置LLM服务")
             self.api_key = None
         else:
@@ -242,11 +255,8 @@ class HostCLIInterface:
                 "error_type": "host_cli_call_failed"
             }
     
-    def _call_via_cli(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
-        """通过CLI调用LLM"""
-        logger.info(f"使用CLI命令调用LLM: {self.host_cli_command}")
-        
-        # 构建CLI调用
+    def _build_cli_command(self, messages: List[Dict[str, str]], stream: bool = False) -> List[str]:
+        """构建CLI调用命令"""
         cli_command = []
         cli_command.append(self.host_cli_command)
         
@@ -264,34 +274,32 @@ class HostCLIInterface:
         if self.api_key:
             cli_command.extend(['--api-key', self.api_key])
         
-        # 添加输出格式
-        cli_command.extend(['--format', 'json'])
+        # 添加输出格式：流式调用逐段输出，普通调用输出完整JSON
+        if stream:
+            cli_command.append('--stream')
+        else:
+            cli_command.extend(['--format', 'json'])
         
         # 添加提示词（将messages转换为CLI格式）
         user_message = self._messages_to_cli_prompt(messages)
         cli_command.extend(['--prompt', user_message])
         
-        # 执行CLI命令
+        return cli_command
+    
+    def _call_via_cli(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """通过CLI调用LLM（与流式调用共用子进程读取，收集完整输出后解析）"""
+        logger.info(f"使用CLI命令调用LLM: {self.host_cli_command}")
+        
+        cli_command = self._build_cli_command(messages)
         try:
-            logger.info(f"执行CLI命令: {' '.join(cli_command)}")
-            result = subprocess.run(
-                cli_command,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                check=True
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"CLI命令执行失败，返回码: {result.returncode}, 错误: {result.stderr}")
-            
-            # 解析CLI输出
-            return self._parse_cli_response(result.stdout)
-            
+            output = ''.join(iter_process_output(cli_command, kwargs.get('timeout', CLI_TIMEOUT)))
         except subprocess.TimeoutExpired:
             raise Exception("CLI命令执行超时")
         except Exception as e:
             raise Exception(f"CLI调用失败: {e}")
+        
+        # 解析CLI输出
+        return self._parse_cli_response(output)
     
     def _call_via_python(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """通过Python环境调用LLM"""
@@ -388,33 +396,72 @@ class HostCLIInterface:
         """
         流式聊天完成 - 通过宿主CLI
         
+        CLI输出一到达就解析产出；提前关闭生成器会终止CLI子进程。
+        
         Args:
             messages: 消息列表
-            **kwargs: 额外参数
+            **kwargs: 额外参数（timeout: 超时秒数）
             
         Yields:
             生成的内容片段
         """
         logger.info("开始流式聊天完成")
         
-        # 流式实现
-        for chunk in self._stream_via_cli(messages, **kwargs):
-            yield chunk
+        try:
+            yield from self._stream_via_cli(messages, **kwargs)
+        except Exception as e:
+            logger.error(f"流式调用失败: {e}")
+            yield f"错误: {str(e)}"
+    
+    async def astream_complete(self, messages: List[Dict[str, str]], **kwargs):
+        """
+        异步流式聊天完成 - 通过宿主CLI
+        
+        任务被取消或生成器被关闭时终止CLI子进程。
+        
+        Args:
+            messages: 消息列表
+            **kwargs: 额外参数（timeout: 超时秒数）
+            
+        Yields:
+            生成的内容片段
+        """
+        logger.info("开始异步流式聊天完成")
+        
+        try:
+            if not self.host_cli_command:
+                # 没有CLI命令时退回一次性调用
+                result = await asyncio.to_thread(self.complete, messages, **kwargs)
+                content = _response_content(result)
+                if content:
+                    yield content
+                return
+            
+            parser = CLIStreamParser()
+            cli_command = self._build_cli_command(messages, stream=True)
+            async for text in aiter_process_output(cli_command, kwargs.get('timeout', CLI_TIMEOUT)):
+                for chunk in parser.feed(text):
+                    yield chunk
+            for chunk in parser.close():
+                yield chunk
+        except Exception as e:
+            logger.error(f"异步流式调用失败: {e}")
+            yield f"错误: {str(e)}"
     
     def _stream_via_cli(self, messages: List[Dict[str, str]], **kwargs):
         """通过CLI流式调用LLM"""
-        # 简化实现：先完成然后流式输出
-        result = self.complete(messages, **kwargs)
-        
-        # 流式输出（简化版）
-        if 'choices' in result and len(result['choices']) > 0:
-            content = result['choices'][0]['message']['content']
-            # 分批流式输出
-            chunk_size = 100
-            for i in range(0, len(content), chunk_size):
-                yield content[i:i+chunk_size]
-                import time
-                time.sleep(0.05)  # 模拟流式输出
+        if not self.host_cli_command:
+            # 没有CLI命令时退回一次性调用
+            content = _response_content(self.complete(messages, **kwargs))
+            if content:
+                yield content
+            return
+        
+        parser = CLIStreamParser()
+        cli_command = self._build_cli_command(messages, stream=True)
+        for text in iter_process_output(cli_command, kwargs.get('timeout', CLI_TIMEOUT)):
+            yield from parser.feed(text)
+        yield from parser.close()
     
     def _messages_to_cli_prompt(self, messages: List[Dict[str, str]]) -> str:
         """将消息列表转换为CLI提示词格式"""
@@ -478,6 +525,214 @@ class HostCLIInterface:
         return info
 
 
+
+class CLIStreamParser:
+    """
+    CLI流式输出的增量解析器
+
+    根据输出开头判断格式：以 "{"、":" 或 SSE 字段开头时按行解析 JSON 事件
+    （OpenAI/Anthropic 的 SSE 事件、Ollama 的 JSON 行），否则视为纯文本原样产出。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.mode = None
+        self.done = False
+
+    def feed(self, text: str) -> List[str]:
+        """输入一段输出，返回其中已完整的内容片段"""
+        if self.done:
+            return []
+        if self.mode is None:
+            self.buffer += text
+            head = self.buffer.lstrip()
+            if not head or any(
+                len(head) < len(prefix) and prefix.startswith(head) for prefix in SSE_PREFIXES
+            ):
+                return []
+            self.mode = "events" if head.startswith(("{", ":") + SSE_PREFIXES) else "text"
+            text, self.buffer = self.buffer, ""
+
+        if self.mode == "text":
+            return [text] if text else []
+
+        self.buffer += text
+        lines = self.buffer.split("\n")
+        self.buffer = lines.pop()
+        return self._parse_lines(lines)
+
+    def close(self) -> List[str]:
+        """输出结束，返回缓冲区中剩余的内容"""
+        buffer, self.buffer = self.buffer, ""
+        if self.done or not buffer:
+            return []
+        if self.mode == "events":
+            return self._parse_lines([buffer])
+        return [buffer] if buffer.strip() else []
+
+    def _parse_lines(self, lines: List[str]) -> List[str]:
+        chunks = []
+        for line in lines:
+            line = line.strip()
+            if self.done or not line or line.startswith((":", "event:")):
+                continue
+            if line.startswith("data:"):
+                line = line[5:].strip()
+                if line == "[DONE]":
+                    self.done = True
+                    continue
+            try:
+                content = _event_content(json.loads(line))
+            except json.JSONDecodeError:
+                content = line
+            if content:
+                chunks.append(content)
+        return chunks
+
+
+def _event_content(event: Any) -> str:
+    """从一个流式事件中提取文本内容"""
+    if not isinstance(event, dict):
+        return ""
+    choices = event.get("choices")
+    if choices:
+        choice = choices[0]
+        message = choice.get("delta") or choice.get("message") or {}
+        return message.get("content") or choice.get("text") or ""
+    delta = event.get("delta")
+    if isinstance(delta, dict):
+        return delta.get("text") or ""
+    for key in ("content", "response", "text"):
+        if isinstance(event.get(key), str):
+            return event[key]
+    return ""
+
+
+def _response_content(result: Dict[str, Any]) -> str:
+    """从完整响应中提取文本内容"""
+    if result.get("choices"):
+        return result["choices"][0].get("message", {}).get("content") or ""
+    return result.get("content") or result.get("raw_response") or ""
+
+
+def _process_error(returncode: int, stderr_file) -> Exception:
+    stderr_file.seek(0)
+    stderr = stderr_file.read().decode("utf-8", errors="replace")
+    return Exception(f"CLI命令执行失败，返回码: {returncode}, 错误: {stderr}")
+
+
+def iter_process_output(command: List[str], timeout: float = CLI_TIMEOUT):
+    """
+    运行子进程，标准输出一有数据就产出解码后的文本
+
+    后台线程按块读取标准输出，不等待换行或读满缓冲区。生成器被提前关闭
+    （取消）或超时时终止子进程。
+
+    Args:
+        command: 命令及参数
+        timeout: 整体超时时间（秒）
+
+    Yields:
+        标准输出的文本片段
+
+    Raises:
+        subprocess.TimeoutExpired: 超时
+        Exception: 子进程返回码非零
+    """
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file
+    )
+    pieces = queue.Queue()
+
+    def pump():
+        try:
+            while True:
+                data = process.stdout.read1(CLI_READ_SIZE)
+                if not data:
+                    break
+                pieces.put(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            pieces.put(None)
+
+    threading.Thread(target=pump, daemon=True).start()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                data = pieces.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if data is None:
+                break
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+        returncode = process.wait(timeout=max(deadline - time.monotonic(), 1))
+        if returncode != 0:
+            raise _process_error(returncode, stderr_file)
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        stderr_file.close()
+
+
+async def aiter_process_output(command: List[str], timeout: float = CLI_TIMEOUT):
+    """
+    iter_process_output 的异步版本
+
+    基于 asyncio 子进程；任务被取消或生成器被关闭时终止子进程。
+
+    Args:
+        command: 命令及参数
+        timeout: 整体超时时间（秒）
+
+    Yields:
+        标准输出的文本片段
+    """
+    stderr_file = tempfile.TemporaryFile()
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file
+    )
+    loop = asyncio.get_running_loop()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    process.stdout.read(CLI_READ_SIZE), max(deadline - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+        returncode = await process.wait()
+        if returncode != 0:
+            raise _process_error(returncode, stderr_file)
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_file.close()
+
+
 # 便捷函数
 def get_host_cli_interface() -> HostCLIInterface:
     """获取宿主CLI LLM接口"""
@@ -6,7 +6,13 @@ LLM客户端适配器
 
 import os
 import json
+import hashlib
 import logging
+import sqlite3
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 from abc import ABC, abstractmethod
 import time
@@ -15,6 +21,44 @@ import time
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 响应缓存：设置该环境变量（sqlite 文件路径）即为 chat_with_llm 开启缓存
+RESPONSE_CACHE_ENV = "LLM_RESPONSE_CACHE"
+# 响应缓存默认有效期（秒）与最大条目数
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_ENTRIES = 10000
+
+# 自动检测：提供商优先级、默认模型、API密钥环境变量与健康检查地址
+PROVIDER_PRIORITY = ("openai", "anthropic", "qwen", "ollama")
+PROVIDER_DEFAULT_MODELS = {
+    "openai": "gpt-4",
+    "anthropic": "claude-3-opus-20240229",
+    "qwen": "qwen-turbo",
+    "ollama": "llama2"
+}
+PROVIDER_API_KEY_ENV = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "qwen": "DASHSCOPE_API_KEY"
+}
+PROVIDER_DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com",
+    "qwen": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    "ollama": "http://localhost:11434"
+}
+# 健康检查超时（秒）
+PROVIDER_PROBE_TIMEOUT = 3.0
+# 检测结果缓存：文件路径可由环境变量覆盖，有效期（秒）
+DETECTION_CACHE_ENV = "LLM_DETECTION_CACHE"
+DETECTION_CACHE_PATH = Path.home() / ".cache" / "digital-transformation" / "llm_provider.json"
+DETECTION_CACHE_TTL = 3600
+
+# 进程内客户端池，键为 (提供商, 模型, 服务地址, API密钥)
+_client_pool: Dict[tuple, "LLMClient"] = {}
+_client_pool_lock = threading.Lock()
+# 每个键一把创建锁：构造客户端（Ollama 会请求服务检查模型）时不阻塞其他键
+_client_build_locks: Dict[tuple, threading.Lock] = {}
+
 
 class LLMClient(ABC):
     """LLM客户端抽象基类"""
@@ -161,7 +205,8 @@ class AnthropicClient(LLMClient):
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "claude-3-opus-20240229"
+        model: str = "claude-3-opus-20240229",
+        base_url: Optional[str] = None
     ):
         """
         初始化Anthropic客户端
@@ -169,6 +214,7 @@ class AnthropicClient(LLMClient):
         Args:
             api_key: Anthropic API密钥
             model: 模型名称
+            base_url: 自定义API地址（可选）
         """
         try:
             import anthropic
@@ -182,9 +228,10 @@ class AnthropicClient(LLMClient):
             raise ValueError("请提供Anthropic API密钥")
 
         self.model = model
+        self.base_url = base_url
 
         # 初始化Anthropic客户端
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url)
 
         logger.info(f"Anthropic客户端初始化完成，模型: {model}")
 
@@ -287,10 +334,12 @@ class OllamaClient(LLMClient):
 
         self.model = model
         self.base_url = base_url.rstrip('/')
+        # 复用同一会话，保持 HTTP keep-alive 连接
+        self.session = requests.Session()
 
         # 测试连接
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 logger.warning(f"无法连接到Ollama服务: {self.base_url}")
         except Exception as e:
@@ -305,8 +354,6 @@ class OllamaClient(LLMClient):
         max_tokens: int = 2000
     ) -> Dict[str, Any]:
         """聊天完成"""
-        import requests
-
         try:
             # 构建提示词
             prompt = ""
@@ -328,7 +375,7 @@ class OllamaClient(LLMClient):
                 }
             }
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=300
@@ -360,8 +407,6 @@ class OllamaClient(LLMClient):
         max_tokens: int = 2000
     ):
         """流式聊天完成"""
-        import requests
-
         try:
             # 构建提示词
             prompt = ""
@@ -383,7 +428,7 @@ class OllamaClient(LLMClient):
                 }
             }
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 stream=True,
@@ -495,6 +540,173 @@ class QwenClient(LLMClient):
             yield f"错误: {str(e)}"
 
 
+
+class ResponseCache:
+    """
+    LLM响应的sqlite缓存
+
+    键为 (提供商, 模型, 消息, 温度, 最大token数) 的哈希。条目超过有效期即失效，
+    超过容量时淘汰最久未命中的条目；deterministic_only 为 True 时只缓存温度为 0 的调用。
+
+    Args:
+        db_path: sqlite数据库路径
+        ttl: 条目有效期（秒）
+        max_entries: 最大条目数
+        deterministic_only: 是否只缓存确定性（温度为 0）的调用
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        deterministic_only: bool = True
+    ):
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.deterministic_only = deterministic_only
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.connection.executescript(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """生成缓存键"""
+        payload = json.dumps(
+            [provider, model, messages, temperature, max_tokens],
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """判断该温度下的调用是否允许缓存"""
+        return not self.deterministic_only or temperature == 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的缓存响应，未命中返回 None"""
+        now = time.time()
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """写入响应，并按有效期和容量清理旧条目"""
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            self.connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            )
+            self.connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class CachedLLMClient(LLMClient):
+    """
+    带响应缓存的客户端包装器
+
+    只缓存成功的非流式响应，流式调用直接转发给被包装的客户端。
+
+    Args:
+        client: 被包装的客户端
+        cache: 响应缓存
+        provider: 提供商名称（参与缓存键）
+    """
+
+    def __init__(self, client: LLMClient, cache: ResponseCache, provider: str):
+        self.client = client
+        self.cache = cache
+        self.provider = provider.lower()
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Dict[str, Any]:
+        """聊天完成（优先读取缓存）"""
+        if not self.cache.is_cacheable(temperature):
+            return self.client.chat_completion(messages, temperature, max_tokens)
+
+        key = ResponseCache.make_key(
+            self.provider, getattr(self.client, "model", None), messages, temperature, max_tokens
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM响应缓存命中: {key[:12]}")
+            return cached
+
+        response = self.client.chat_completion(messages, temperature, max_tokens)
+        if response.get("success"):
+            self.cache.put(key, response)
+        return response
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ):
+        """流式聊天完成（不缓存）"""
+        yield from self.client.stream_chat_completion(messages, temperature, max_tokens)
+
+
 class LLMClientFactory:
     """LLM客户端工厂"""
 
@@ -526,47 +738,237 @@ class LLMClientFactory:
         else:
             raise ValueError(f"不支持的LLM提供商: {provider}")
 
+    @staticmethod
+    def get_client(
+        provider: str = "openai",
+        **kwargs
+    ) -> LLMClient:
+        """
+        获取进程内共享的客户端
+
+        按 (提供商, 模型, 服务地址, API密钥) 复用已创建的客户端及其 HTTP 连接池；
+        值为 None 的参数视为未指定，使用客户端的默认值。同一键只创建一次客户端，
+        创建期间只持有该键的锁，不阻塞其他键的获取。
+
+        Args:
+            provider: 提供商名称 (openai, anthropic, ollama, qwen)
+            **kwargs: 传递给客户端构造函数的参数
+
+        Returns:
+            LLM客户端实例
+        """
+        kwargs = {name: value for name, value in kwargs.items() if value is not None}
+        key = (provider.lower(), kwargs.get("model"), kwargs.get("base_url"), kwargs.get("api_key"))
+
+        with _client_pool_lock:
+            client = _client_pool.get(key)
+            if client is not None:
+                return client
+            build_lock = _client_build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with _client_pool_lock:
+                client = _client_pool.get(key)
+            if client is None:
+                client = LLMClientFactory.create_client(provider, **kwargs)
+                with _client_pool_lock:
+                    _client_pool[key] = client
+        return client
+
+    @staticmethod
+    def clear_client_pool():
+        """清空进程内客户端池"""
+        with _client_pool_lock:
+            _client_pool.clear()
+            _client_build_locks.clear()
+
+    @staticmethod
+    def detect_providers(
+        api_key: Optional[str] = None,
+        base_urls: Optional[Dict[str, str]] = None,
+        timeout: float = PROVIDER_PROBE_TIMEOUT
+    ):
+        """
+        并发探测各提供商的健康检查接口，按优先级依次产出可用的提供商
+
+        所有提供商同时探测；产出某个提供商只需等待优先级更高的探测结束，
+        不必等待优先级更低的提供商。
+
+        Args:
+            api_key: API密钥（可选，缺省时读取各提供商的环境变量）
+            base_urls: 各提供商的服务地址（可选）
+            timeout: 单个健康检查的超时时间（秒）
+
+        Yields:
+            可用的提供商名称
+        """
+        base_urls = base_urls or {}
+        executor = ThreadPoolExecutor(max_workers=len(PROVIDER_PRIORITY))
+        try:
+            futures = [
+                executor.submit(
+                    _probe_provider, provider, api_key, base_urls.get(provider), timeout
+                )
+                for provider in PROVIDER_PRIORITY
+            ]
+            for provider, future in zip(PROVIDER_PRIORITY, futures):
+                if future.result():
+                    yield provider
+        finally:
+            # 不等待优先级更低、仍在进行的探测
+            executor.shutdown(wait=False, cancel_futures=True)
+
     @staticmethod
     def auto_detect_client(
         api_key: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        base_urls: Optional[Dict[str, str]] = None,
+        use_cache: bool = True,
+        cache_ttl: float = DETECTION_CACHE_TTL,
+        timeout: float = PROVIDER_PROBE_TIMEOUT
     ) -> LLMClient:
         """
         自动检测并创建客户端
 
+        有效期内的检测结果直接复用，否则并发探测各提供商并保存结果。
+
         Args:
             api_key: API密钥（可选）
             model: 模型名称（可选）
+            base_urls: 各提供商的服务地址（可选）
+            use_cache: 是否读写检测结果缓存
+            cache_ttl: 检测结果有效期（秒）
+            timeout: 单个健康检查的超时时间（秒）
 
         Returns:
             LLM客户端实例
         """
-        # 按优先级尝试不同的提供商
-        providers = [
-            ("openai", {"api_key": api_key, "model": model or "gpt-4"}),
-            ("anthropic", {"api_key": api_key, "model": model or "claude-3-opus-20240229"}),
-            ("qwen", {"api_key": api_key, "model": model or "qwen-turbo"}),
-            ("ollama", {"model": model or "llama2"})
-        ]
+        base_urls = base_urls or {}
+        fingerprint = _detection_fingerprint(api_key, model, base_urls)
+
+        if use_cache:
+            provider = _load_detected_provider(fingerprint, cache_ttl)
+            if provider:
+                try:
+                    client = LLMClientFactory.get_client(
+                        provider, **_provider_kwargs(provider, api_key, model, base_urls)
+                    )
+                    logger.info(f"使用缓存的LLM提供商检测结果: {provider}")
+                    return client
+                except Exception as e:
+                    logger.debug(f"缓存的提供商 {provider} 不可用: {e}")
 
-        for provider_name, kwargs in providers:
+        for provider in LLMClientFactory.detect_providers(api_key, base_urls, timeout):
             try:
-                client = LLMClientFactory.create_client(provider_name, **kwargs)
-                # 测试客户端是否可用
-                test_response = client.chat_completion(
-                    messages=[{"role": "user", "content": "测试"}],
-                    max_tokens=10
+                client = LLMClientFactory.get_client(
+                    provider, **_provider_kwargs(provider, api_key, model, base_urls)
                 )
-                if test_response.get("success"):
-                    logger.info(f"自动检测到可用的LLM提供商: {provider_name}")
-                    return client
             except Exception as e:
-                logger.debug(f"提供商 {provider_name} 不可用: {e}")
+                logger.debug(f"提供商 {provider} 不可用: {e}")
                 continue
+            logger.info(f"自动检测到可用的LLM提供商: {provider}")
+            if use_cache:
+                _save_detected_provider(fingerprint, provider)
+            return client
 
         raise ValueError("未找到可用的LLM提供商，请检查API密钥或配置")
 
 
+def _provider_kwargs(
+    provider: str,
+    api_key: Optional[str],
+    model: Optional[str],
+    base_urls: Dict[str, str]
+) -> Dict[str, Any]:
+    """构造提供商客户端的参数"""
+    kwargs = {"model": model or PROVIDER_DEFAULT_MODELS[provider], "base_url": base_urls.get(provider)}
+    if provider in PROVIDER_API_KEY_ENV:
+        kwargs["api_key"] = api_key
+    return kwargs
+
+
+def _probe_provider(
+    provider: str,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    timeout: float
+) -> bool:
+    """
+    调用提供商的健康检查接口（模型列表），不产生生成费用
+
+    Returns:
+        接口返回 200 时为 True
+    """
+    headers = {}
+    if provider in PROVIDER_API_KEY_ENV:
+        key = api_key or os.environ.get(PROVIDER_API_KEY_ENV[provider])
+        if not key:
+            return False
+        if provider == "anthropic":
+            headers = {"x-api-key": key, "anthropic-version": "2023-06-01"}
+        else:
+            headers = {"Authorization": f"Bearer {key}"}
+
+    base_url = (base_url or PROVIDER_DEFAULT_BASE_URLS[provider]).rstrip("/")
+    if provider == "ollama":
+        url = f"{base_url}/api/tags"
+    elif provider == "anthropic":
+        url = f"{base_url}/v1/models"
+    else:
+        url = f"{base_url}/models"
+
+    try:
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status == 200
+    except Exception as e:
+        logger.debug(f"提供商 {provider} 健康检查失败: {e}")
+        return False
+
+
+def _detection_cache_path() -> Path:
+    return Path(os.environ.get(DETECTION_CACHE_ENV) or DETECTION_CACHE_PATH)
+
+
+def _detection_fingerprint(
+    api_key: Optional[str],
+    model: Optional[str],
+    base_urls: Dict[str, str]
+) -> str:
+    """检测条件的指纹（不保存明文密钥）"""
+    env_keys = {name: os.environ.get(name) for name in PROVIDER_API_KEY_ENV.values()}
+    payload = json.dumps([api_key, model, base_urls, env_keys], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_detected_provider(fingerprint: str, ttl: float) -> Optional[str]:
+    """读取有效期内、检测条件相同的检测结果"""
+    try:
+        with open(_detection_cache_path(), "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("fingerprint") != fingerprint:
+        return None
+    if time.time() - record.get("detected_at", 0) > ttl:
+        return None
+    return record.get("provider")
+
+
+def _save_detected_provider(fingerprint: str, provider: str):
+    """原子写入检测结果"""
+    path = _detection_cache_path()
+    record = {"provider": provider, "fingerprint": fingerprint, "detected_at": time.time()}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.debug(f"保存提供商检测结果失败: {e}")
+
+
 # 便捷函数
 def chat_with_llm(
     prompt: str,
@@ -574,23 +976,32 @@ def chat_with_llm(
     provider: str = "openai",
     temperature: float = 0.7,
     max_tokens: int = 2000,
+    cache: Optional[ResponseCache] = None,
     **kwargs
 ) -> str:
     """
     便捷的LLM聊天函数
 
+    客户端从进程内客户端池获取；未传入 cache 时，若设置了环境变量
+    LLM_RESPONSE_CACHE 则使用该路径的响应缓存。
+
     Args:
         prompt: 用户提示词
         system_prompt: 系统提示词（可选）
         provider: LLM提供商
         temperature: 温度参数
         max_tokens: 最大生成token数
+        cache: 响应缓存（可选）
         **kwargs: 传递给客户端的其他参数
 
     Returns:
         LLM响应内容
     """
-    client = LLMClientFactory.create_client(provider, **kwargs)
+    client = LLMClientFactory.get_client(provider, **kwargs)
+    if cache is None:
+        cache = _default_response_cache()
+    if cache is not None:
+        client = CachedLLMClient(client, cache, provider)
 
     messages = []
     if system_prompt:
@@ -609,6 +1020,20 @@ def chat_with_llm(
         raise Exception(f"LLM调用失败: {response.get('error')}")
 
 
+_default_caches: Dict[str, ResponseCache] = {}
+
+
+def _default_response_cache() -> Optional[ResponseCache]:
+    """环境变量指定的响应缓存（每个路径只打开一次）"""
+    db_path = os.environ.get(RESPONSE_CACHE_ENV)
+    if not db_path:
+        return None
+    with _client_pool_lock:
+        if db_path not in _default_caches:
+            _default_caches[db_path] = ResponseCache(db_path)
+        return _default_caches[db_path]
+
+
 def main():
     """主函数 - 测试LLM客户端"""
     import sys
@@ -4,10 +4,15 @@
 遵循agentskills.io规范
 """
 
+import hashlib
 import json
-import importlib
+import importlib.util
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 from llm_client import LLMClientFactory
@@ -16,6 +21,11 @@ from llm_client import LLMClientFactory
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 同时执行的最大步骤数（可由 execution_config.max_parallel_steps 覆盖）
+DEFAULT_MAX_PARALLEL_STEPS = 4
+# 步骤检查点目录，每个技能一个子目录，每个步骤一个JSON文件
+CHECKPOINT_DIR = Path.home() / ".cache" / "digital-transformation" / "checkpoints"
+
 
 class SkillExecutor:
     """技能执行器 - 支持渐进式披露"""
@@ -25,7 +35,8 @@ class SkillExecutor:
         skill_config_path: str,
         llm_provider: str = "openai",
         llm_model: Optional[str] = None,
-        llm_api_key: Optional[str] = None
+        llm_api_key: Optional[str] = None,
+        checkpoint_dir: Optional[str] = None
     ):
         """
         初始化技能执行器
@@ -35,11 +46,17 @@ class SkillExecutor:
             llm_provider: LLM提供商
             llm_model: LLM模型名称
             llm_api_key: LLM API密钥
+            checkpoint_dir: 步骤检查点目录（缺省为 CHECKPOINT_DIR）
         """
         self.skill_config_path = skill_config_path
         self.llm_provider = llm_provider
         self.llm_model = llm_model
         self.llm_api_key = llm_api_key
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else CHECKPOINT_DIR
+
+        # 已加载的脚本模块，键为脚本路径，值为 (修改时间, 模块)
+        self._module_cache = {}
+        self._module_lock = threading.Lock()
 
         # 加载技能配置
         self.skill_config = self._load_skill_config()
@@ -52,7 +69,7 @@ class SkillExecutor:
         logger.info(f"技能执行器初始化完成\n"
                    f"  技能配置: {skill_config_path}\n"
                    f"  技能数量: {len(self.skills)}\n"
-                   f"  渐进式披露: {self.skill_config.get('progressive_disclosure', false)}")
+                   f"  渐进式披露: {self.skill_config.get('progressive_disclosure', False)}")
 
     def _load_skill_config(self) -> Dict[str, Any]:
         """加载技能配置"""
@@ -60,8 +77,12 @@ class SkillExecutor:
         if not config_path.exists():
             raise FileNotFoundError(f"技能配置文件不存在: {config_path}")
 
+        # 配置文件开头可以有以 # 开头的注释行
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+            lines = f.read().split("\n")
+        while lines and lines[0].lstrip().startswith("#"):
+            lines.pop(0)
+        config = json.loads("\n".join(lines))
 
         # 验证配置
         if "skills" not in config:
@@ -80,6 +101,8 @@ class SkillExecutor:
         """
         动态加载脚本模块
 
+        模块按脚本路径缓存，脚本修改时间不变时直接复用，不再重复执行模块代码。
+
         Args:
             script_path: 脚本路径（相对于技能目录）
             skill_name: 技能名称
@@ -90,22 +113,29 @@ class SkillExecutor:
         try:
             # 构建完整的模块路径
             skill_dir = Path(self.skill_config_path).parent
-            full_script_path = skill_dir / script_path
+            full_script_path = (skill_dir / script_path).resolve()
 
             if not full_script_path.exists():
                 logger.warning(f"脚本不存在: {full_script_path}")
                 return None
 
-            # 动态导入模块
-            module_name = Path(script_path).stem
-            spec = importlib.util.spec_from_file_location(module_name, full_script_path)
+            with self._module_lock:
+                mtime = full_script_path.stat().st_mtime_ns
+                cached = self._module_cache.get(full_script_path)
+                if cached is not None and cached[0] == mtime:
+                    return cached[1]
 
-            if spec is None or spec.loader is None:
-                logger.error(f"无法加载模块: {full_script_path}")
-                return None
+                # 动态导入模块
+                module_name = Path(script_path).stem
+                spec = importlib.util.spec_from_file_location(module_name, full_script_path)
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+                if spec is None or spec.loader is None:
+                    logger.error(f"无法加载模块: {full_script_path}")
+                    return None
+
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._module_cache[full_script_path] = (mtime, module)
 
             logger.info(f"成功加载脚本: {script_path}")
             return module
@@ -308,19 +338,129 @@ class SkillExecutor:
             logger.error(f"  执行失败: {e}")
             return {"status": "error", "error": str(e)}
 
+    @staticmethod
+    def _step_output_key(step_name: str, step: Dict[str, Any]) -> str:
+        """步骤输出写入上下文时使用的键（由 output 声明，缺省为 <步骤名>_output）"""
+        return step.get("output") or f"{step_name}_output"
+
+    def _build_step_graph(
+        self,
+        steps: List[Tuple[str, Dict[str, Any]]],
+        initial_inputs: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """
+        根据步骤声明的输入和输出构造依赖图
+
+        步骤依赖于产生其 required_inputs 的其他步骤；由初始上下文提供的输入不产生依赖。
+        某个输入既没有步骤产生、也不在初始上下文中时，无法判断其来源，该步骤按配置
+        顺序排在前一个步骤之后执行。
+
+        Args:
+            steps: (步骤名, 步骤配置) 列表
+            initial_inputs: 初始上下文中的字段（缺省视为全部输入都已提供）
+
+        Returns:
+            步骤名到其上游步骤名列表的映射
+
+        Raises:
+            ValueError: 步骤名重复或存在循环依赖
+        """
+        producers = {}
+        for step_name, step in steps:
+            producers[self._step_output_key(step_name, step)] = step_name
+
+        dependencies = {}
+        previous = None
+        for step_name, step in steps:
+            if step_name in dependencies:
+                raise ValueError(f"步骤名重复: {step_name}")
+            upstream = []
+            for key in step.get("required_inputs", []):
+                if key in producers:
+                    upstream.append(producers[key])
+                elif initial_inputs is not None and key not in initial_inputs and previous is not None:
+                    upstream.append(previous)
+            dependencies[step_name] = [name for name in dict.fromkeys(upstream) if name != step_name]
+            previous = step_name
+
+        # 检查循环依赖
+        resolved = set()
+        while len(resolved) < len(dependencies):
+            ready = [name for name, upstream in dependencies.items()
+                     if name not in resolved and all(u in resolved for u in upstream)]
+            if not ready:
+                cycle = [name for name in dependencies if name not in resolved]
+                raise ValueError(f"步骤存在循环依赖: {', '.join(cycle)}")
+            resolved.update(ready)
+        return dependencies
+
+    def _step_input_hash(self, step: Dict[str, Any], context: Dict[str, Any]) -> str:
+        """计算步骤输入的指纹：步骤配置、脚本修改时间和所需的上下文字段"""
+        script_mtime = None
+        if step.get("script"):
+            script_path = Path(self.skill_config_path).parent / step["script"]
+            if script_path.exists():
+                script_mtime = script_path.stat().st_mtime_ns
+        payload = {
+            "step": step,
+            "script_mtime": script_mtime,
+            "inputs": {key: context.get(key) for key in step.get("required_inputs", [])}
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=repr)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _checkpoint_path(self, skill_name: str, step_name: str) -> Path:
+        """步骤检查点文件路径"""
+        return self.checkpoint_dir / skill_name / f"{step_name}.json"
+
+    def _load_checkpoint(self, skill_name: str, step_name: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """读取输入指纹一致的步骤检查点，不存在或已过期时返回 None"""
+        try:
+            with open(self._checkpoint_path(skill_name, step_name), "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("input_hash") != input_hash:
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, skill_name: str, step_name: str, input_hash: str, result: Dict[str, Any]):
+        """原子写入步骤检查点；结果无法序列化为JSON时跳过"""
+        path = self._checkpoint_path(skill_name, step_name)
+        checkpoint = {
+            "step": step_name,
+            "input_hash": input_hash,
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "result": result
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"保存步骤 {step_name} 的检查点失败: {e}")
+
     def execute_skill(
         self,
         skill_name: str,
         context: Dict[str, Any],
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        resume: bool = False
     ) -> Dict[str, Any]:
         """
         执行技能 - 支持渐进式披露
 
+        步骤通过 required_inputs 和 output 声明输入输出，相互独立的步骤并发执行。
+        每个成功步骤的输出都会写入检查点；resume 为 True 时，输入未变化的已完成
+        步骤直接使用检查点结果。
+
         Args:
             skill_name: 技能名称
             context: 初始上下文
             output_file: 输出文件路径（可选）
+            resume: 是否从检查点恢复
 
         Returns:
             执行结果
@@ -361,39 +501,86 @@ class SkillExecutor:
         if not progressive_steps:
             logger.warning("技能没有配置渐进式步骤")
 
+        steps = [(step.get("step", f"step_{i}"), step) for i, step in enumerate(progressive_steps, 1)]
+        dependencies = self._build_step_graph(steps, list(context))
+        step_configs = dict(steps)
+        skill_dir = Path(self.skill_config_path).parent
+        continue_on_failure = self.execution_config.get("retry_on_failure", False)
+        max_parallel = self.execution_config.get("max_parallel_steps", DEFAULT_MAX_PARALLEL_STEPS)
+
         execution_context = context.copy()
         execution_results = {}
+        pending = [step_name for step_name, _ in steps]
+        running = {}
+        # 运行中步骤的 (输入指纹, 开始时间)
+        started = {}
 
-        for i, step in enumerate(progressive_steps, 1):
-            step_name = step.get("step", f"step_{i}")
-
-            try:
-                # 执行步骤
-                result = self._execute_step(step, execution_context, Path(self.skill_config_path).parent)
-
-                # 将结果添加到上下文中
-                if result.get("status") == "success":
-                    step_output_key = f"{step_name}_output"
-                    execution_context[step_output_key] = result.get("result")
-                    execution_results[step_name] = result
-                elif result.get("status") == "skipped":
+        # 依赖已满足的步骤立即提交，相互独立的步骤并发执行
+        executor = ThreadPoolExecutor(max_workers=max_parallel)
+        try:
+            while pending or running:
+                for step_name in list(pending):
+                    upstream = dependencies[step_name]
+                    if any(u in pending or u in running.values() for u in upstream):
+                        continue
+                    pending.remove(step_name)
+                    step = step_configs[step_name]
+
+                    unfinished = [u for u in upstream if execution_results[u].get("status") != "success"]
+                    if unfinished:
+                        execution_results[step_name] = {
+                            "status": "skipped",
+                            "reason": f"upstream_not_completed: {', '.join(unfinished)}"
+                        }
+                        continue
+
+                    input_hash = self._step_input_hash(step, execution_context)
+                    checkpoint = self._load_checkpoint(skill_name, step_name, input_hash) if resume else None
+                    if checkpoint is not None:
+                        logger.info(f"步骤 {step_name} 输入未变化，使用检查点结果")
+                        result = dict(checkpoint["result"], resumed=True)
+                        execution_results[step_name] = result
+                        execution_context[self._step_output_key(step_name, step)] = result.get("result")
+                        continue
+
+                    future = executor.submit(self._execute_step, step, dict(execution_context), skill_dir)
+                    running[future] = step_name
+                    started[step_name] = (input_hash, time.perf_counter())
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_name = running.pop(future)
+                    input_hash, started_at = started.pop(step_name)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"步骤 {step_name} 执行时发生异常: {e}")
+                        result = {"status": "error", "error": str(e)}
+                    result["elapsed_seconds"] = round(time.perf_counter() - started_at, 3)
                     execution_results[step_name] = result
-                else:
-                    # 步骤失败，决定是否继续
-                    logger.error(f"步骤 {step_name} 失败")
-                    if not self.execution_config.get("retry_on_failure", False):
-                        logger.info("根据配置，停止执行")
-                        break
-            except Exception as e:
-                logger.error(f"步骤 {step_name} 执行时发生异常: {e}")
-                execution_results[step_name] = {
-                    "status": "error",
-                    "error": str(e)
-                }
 
-                # 根据配置决定是否继续
-                if not self.execution_config.get("retry_on_failure", False):
-                    break
+                    # 将结果添加到上下文中，并保存检查点
+                    if result.get("status") == "success":
+                        step = step_configs[step_name]
+                        execution_context[self._step_output_key(step_name, step)] = result.get("result")
+                        self._save_checkpoint(skill_name, step_name, input_hash, result)
+                    elif result.get("status") != "skipped":
+                        # 步骤失败，决定是否继续
+                        logger.error(f"步骤 {step_name} 失败")
+                        if not continue_on_failure and pending:
+                            logger.info("根据配置，停止执行")
+                            for remaining in pending:
+                                execution_results[remaining] = {"status": "skipped", "reason": "stopped_after_failure"}
+                            pending.clear()
+        finally:
+            executor.shutdown(wait=True)
+
+        # 按配置顺序排列步骤结果
+        execution_results = {step_name: execution_results[step_name]
+                             for step_name, _ in steps if step_name in execution_results}
 
         # 生成最终结果
         final_result = {
@@ -445,6 +632,8 @@ def main():
     parser.add_argument("--context_file", type=str, help="初始上下文文件路径")
     parser.add_argument("--output_file", type=str, help="输出文件路径")
     parser.add_argument("--list_skills", action="store_true", help="列出所有可用技能")
+    parser.add_argument("--resume", action="store_true", help="跳过输入未变化的已完成步骤")
+    parser.add_argument("--checkpoint_dir", type=str, help="步骤检查点目录")
 
     args = parser.parse_args()
 
@@ -454,7 +643,8 @@ def main():
             skill_config_path=args.config,
             llm_provider=args.llm_provider,
             llm_model=args.llm_model,
-            llm_api_key=args.llm_api_key
+            llm_api_key=args.llm_api_key,
+            checkpoint_dir=args.checkpoint_dir
         )
     except Exception as e:
         print(f"初始化执行器失败: {e}")
@@ -495,7 +685,8 @@ def main():
         result = executor.execute_skill(
             skill_name=args.skill,
             context=context,
-            output_file=args.output_file
+            output_file=args.output_file,
+            resume=args.resume
         )
 
         print("\n执行完成!")
@@ -507,7 +698,8 @@ def main():
         for step_name, step_result in result['execution_results'].items():
             status = step_result.get('status', 'unknown')
             if status == 'success':
-                print(f"  ✓ {step_name}: 成功")
+                resumed = " (检查点)" if step_result.get('resumed') else ""
+                print(f"  ✓ {step_name}: 成功{resumed}")
             elif status == 'skipped':
                 print(f"  - {step_name}: 跳过 ({step_result.get('reason', '')})")
             else:
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+分析阶段依赖图测试套件
+包括并发执行、依赖输入、失败与超时处理，以及固定延迟桩LLM下的耗时对比
+"""
+
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+import digital_transformation_analyzer_llm
+from analysis_pipeline import ANALYSIS_STAGES, AnalysisPipelineMixin, run_analysis_pipeline, select_stages
+from digital_transformation_analyzer import DigitalTransformationAnalyzer
+from digital_transformation_analyzer_llm import DigitalTransformationAnalyzerLLM
+
+# 桩阶段的固定延迟（秒）
+STAGE_LATENCY = 0.2
+
+
+class StubAnalyzer:
+    """每个阶段固定延迟的桩分析器，记录输入和并发度"""
+
+    def __init__(self, latency=STAGE_LATENCY, failing=(), slow=()):
+        self.latency = latency
+        self.failing = set(failing)
+        self.slow = set(slow)
+        self.inputs = {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        for stage, spec in ANALYSIS_STAGES.items():
+            setattr(self, spec['method'], self._make_stage(stage))
+
+    def _make_stage(self, stage):
+        def run(stage_input):
+            with self.lock:
+                self.inputs[stage] = stage_input
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                time.sleep(2 if stage in self.slow else self.latency)
+                if stage in self.failing:
+                    raise RuntimeError(f'{stage} 失败')
+                return {'analysis_type': stage}
+            finally:
+                with self.lock:
+                    self.active -= 1
+        return run
+
+
+class TestPipelineScheduling(unittest.TestCase):
+    """测试依赖图调度"""
+
+    def setUp(self):
+        self.context = {'company_name': '示例公司'}
+
+    def test_independent_stages_run_concurrently(self):
+        """测试四个解构阶段并发，总耗时约为关键路径长度"""
+        analyzer = StubAnalyzer()
+        outcome = run_analysis_pipeline(analyzer, self.context)
+
+        self.assertTrue(outcome['completed'])
+        self.assertEqual(set(outcome['results']), set(ANALYSIS_STAGES))
+        self.assertEqual(analyzer.max_active, 4)
+        # 串行约 7 × 0.2 秒，关键路径为 4 × 0.2 秒
+        self.assertLess(outcome['elapsed_seconds'], 6 * STAGE_LATENCY)
+
+    def test_worker_limit(self):
+        """测试并发阶段数不超过上限"""
+        analyzer = StubAnalyzer()
+        outcome = run_analysis_pipeline(analyzer, self.context, max_workers=2)
+        self.assertTrue(outcome['completed'])
+        self.assertEqual(analyzer.max_active, 2)
+
+    def test_invalid_worker_limit(self):
+        """测试并发上限小于1时报错而不是无限等待"""
+        for max_workers in (0, -1):
+            with self.assertRaises(ValueError):
+                run_analysis_pipeline(StubAnalyzer(latency=0), self.context, max_workers=max_workers)
+
+    def test_stage_inputs(self):
+        """测试下游阶段接收上游结果"""
+        analyzer = StubAnalyzer(latency=0)
+        run_analysis_pipeline(analyzer, self.context)
+
+        self.assertIs(analyzer.inputs['business_scene_deconstruction'], self.context)
+        self.assertEqual(
+            [r['analysis_type'] for r in analyzer.inputs['innovation_niche_identification']],
+            ANALYSIS_STAGES['innovation_niche_identification']['depends_on']
+        )
+        pathway_input = analyzer.inputs['business_innovation_pathway_planning']
+        self.assertEqual(pathway_input['company_name'], '示例公司')
+        self.assertEqual(pathway_input['innovation_niche']['analysis_type'], 'innovation_niche_identification')
+        self.assertEqual(pathway_input['business_model']['analysis_type'], 'business_model_reconstruction')
+        self.assertNotIn('innovation_niche', self.context)
+
+    def test_partial_deconstruction_failure(self):
+        """测试部分解构失败时创新利基基于其余结果继续"""
+        analyzer = StubAnalyzer(latency=0, failing=['digitization_deconstruction'])
+        outcome = run_analysis_pipeline(analyzer, self.context)
+
+        self.assertFalse(outcome['completed'])
+        self.assertIn('digitization_deconstruction', outcome['errors'])
+        self.assertEqual(len(analyzer.inputs['innovation_niche_identification']), 3)
+        self.assertIn('business_innovation_pathway_planning', outcome['results'])
+
+    def test_failure_skips_dependents(self):
+        """测试阶段失败时跳过下游阶段并保留已完成结果"""
+        analyzer = StubAnalyzer(latency=0, failing=['innovation_niche_identification'])
+        outcome = run_analysis_pipeline(analyzer, self.context)
+
+        self.assertEqual(set(outcome['skipped']),
+                         {'business_model_reconstruction', 'business_innovation_pathway_planning'})
+        self.assertEqual(len(outcome['results']), 4)
+
+    def test_stage_timeout(self):
+        """测试超时阶段返回错误且不阻塞流程"""
+        analyzer = StubAnalyzer(latency=0, slow=['online_transformation_deconstruction'])
+        start = time.perf_counter()
+        outcome = run_analysis_pipeline(analyzer, self.context, stage_timeout=0.3)
+
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertIn('超时', outcome['errors']['online_transformation_deconstruction'])
+        self.assertIn('business_innovation_pathway_planning', outcome['results'])
+
+    def test_select_stages(self):
+        """测试目标阶段自动包含上游阶段"""
+        self.assertEqual(select_stages(['business_model_reconstruction'])[-2:],
+                         ['innovation_niche_identification', 'business_model_reconstruction'])
+        self.assertEqual(len(select_stages(['business_model_reconstruction'])), 6)
+        self.assertEqual(select_stages(['digitization_deconstruction']), ['digitization_deconstruction'])
+        with self.assertRaises(ValueError):
+            select_stages(['unknown'])
+
+
+class TestAnalyzerIntegration(unittest.TestCase):
+    """测试分析器的完整分析入口"""
+
+    def test_analyzers_share_pipeline(self):
+        """测试各分析器通过同一个混入类提供完整分析"""
+        from digital_transformation_analyzer_host_cli import DigitalTransformationAnalyzerHostCLI
+        from digital_transformation_analyzer_host_llm import DigitalTransformationAnalyzerHostLLM
+        for analyzer_class in (DigitalTransformationAnalyzer, DigitalTransformationAnalyzerLLM,
+                               DigitalTransformationAnalyzerHostCLI, DigitalTransformationAnalyzerHostLLM):
+            self.assertIs(analyzer_class.run_full_analysis, AnalysisPipelineMixin.run_full_analysis)
+
+    def test_framework_analyzer(self):
+        """测试基于框架的分析器完整流程"""
+        outcome = DigitalTransformationAnalyzer().run_full_analysis({'business_scenario': '示例业务场景'})
+        self.assertTrue(outcome['completed'], outcome['errors'])
+        self.assertEqual(len(outcome['results']), len(ANALYSIS_STAGES))
+        json.dumps(outcome, ensure_ascii=False)
+
+    def test_llm_analyzer_wall_clock(self):
+        """测试固定延迟桩LLM下完整分析快于串行执行"""
+        latency = 0.2
+
+        def stub_llm(prompt, **kwargs):
+            time.sleep(latency)
+            return json.dumps({'summary': '桩响应'}, ensure_ascii=False)
+
+        analyzer = DigitalTransformationAnalyzerLLM()
+        context = {'business_scenario': '示例业务场景'}
+        with mock.patch.object(digital_transformation_analyzer_llm, 'chat_with_llm', stub_llm):
+            start = time.perf_counter()
+            deconstructions = [analyzer.deconstruct_business_scene(context),
+                               analyzer.deconstruct_digitization(context),
+                               analyzer.deconstruct_online_transformation(context),
+                               analyzer.deconstruct_intelligent_transformation(context)]
+            niche = analyzer.identify_innovation_niche(deconstructions)
+            model = analyzer.reconstruct_business_model(dict(context, innovation_niche=niche))
+            analyzer.plan_business_innovation_pathway(dict(context, innovation_niche=niche, business_model=model))
+            sequential = time.perf_counter() - start
+
+            outcome = analyzer.run_full_analysis(context)
+
+        self.assertTrue(outcome['completed'], outcome['errors'])
+        self.assertGreaterEqual(sequential, 7 * latency)
+        self.assertLess(outcome['elapsed_seconds'], 5.5 * latency)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+数据集成器并发采集测试套件
+使用注入延迟和错误的本地桩HTTP服务器，测试并发、按主机限流、重试、截止时间和部分结果
+"""
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+from data_integrator import (
+    STATUS_ERROR, STATUS_OK, STATUS_TIMEOUT,
+    ConcurrentCollector, DataIntegrator, DataSource, backoff_delay
+)
+
+# 桩服务器的默认响应延迟（秒）
+LATENCY = 0.2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按服务器配置注入延迟和错误状态码的JSON接口"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.clients.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            failure = server.failures.pop(0) if server.failures else None
+        try:
+            time.sleep(server.latency)
+            status = failure or server.status
+            query = parse_qs(urlparse(self.path).query)
+            body = json.dumps({'name': query.get('name', [''])[0],
+                               'news_items': [{'title': '合作', 'relationships': [
+                                   {'type': 'cooperation', 'target': '伙伴公司', 'strength': 0.8}]}],
+                               'registration_info': {}, 'results': [],
+                               'market_size': {}, 'market_structure': {}}).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """记录请求数、连接数和最大并发数的桩服务器"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=LATENCY, status=200, failures=()):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.status = status
+        self.failures = list(failures)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.clients = set()
+        self.active = 0
+        self.max_active = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/api'
+
+    def handle_error(self, request, client_address):
+        # 超时的客户端提前断开连接，忽略写入失败
+        pass
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHTTPSource(DataSource):
+    """从桩服务器获取JSON的数据源"""
+
+    def __init__(self, base_url, required_key):
+        self.base_url = base_url
+        self.required_key = required_key
+
+    def fetch_data(self, params):
+        name = params.get('keyword') or params.get('company_name') or params.get('industry_name')
+        return self.request_json(self.base_url, params={'name': name}, timeout=params.get('timeout'))
+
+    def validate_data(self, data):
+        return self.required_key in data
+
+
+class CollectorTestCase(unittest.TestCase):
+    """启动桩服务器的测试基类"""
+
+    def start_server(self, **kwargs):
+        server = StubServer(**kwargs)
+        self.addCleanup(server.stop)
+        return server
+
+    def make_integrator(self, servers, **collector_options):
+        """把企业和行业数据源指向桩服务器"""
+        collector_options.setdefault('backoff_base', 0.01)
+        integrator = DataIntegrator(**collector_options)
+        for name, required_key in [('baidu_search', 'results'), ('news_media', 'news_items'),
+                                   ('government_info', 'registration_info'),
+                                   ('industry_report', 'market_size')]:
+            integrator.data_sources[name] = StubHTTPSource(servers[name].url, required_key)
+        return integrator
+
+    def start_servers(self, **overrides):
+        """每个数据源一个桩服务器（即一个主机）"""
+        return {name: self.start_server(**overrides.get(name, {}))
+                for name in ['baidu_search', 'news_media', 'government_info', 'industry_report']}
+
+
+class TestConcurrentCollection(CollectorTestCase):
+    """测试并发采集"""
+
+    def test_ecosystem_collection_concurrent(self):
+        """测试生态系统采集并发执行，耗时远小于串行"""
+        servers = self.start_servers()
+        integrator = self.make_integrator(servers, max_workers=16)
+        companies = [f'企业{i}' for i in range(10)]
+
+        start = time.perf_counter()
+        data = integrator.collect_ecosystem_data('新能源汽车', companies)
+        elapsed = time.perf_counter() - start
+
+        # 串行需要 31 × 0.2 秒
+        self.assertLess(elapsed, 10 * LATENCY)
+        self.assertTrue(data['collection_report']['completed'])
+        self.assertEqual(data['collection_report']['total_tasks'], 31)
+        self.assertEqual([e['name'] for e in data['entities']], companies)
+        self.assertEqual(data['entities'][0]['type'], 'registered_company')
+        self.assertEqual(len(data['relationships']), 10)
+        self.assertIn('industry_report', data['industry_data']['data_sources'])
+        json.dumps(data, ensure_ascii=False)
+
+    def test_per_host_limit(self):
+        """测试同一主机的并发请求数不超过上限"""
+        server = self.start_server(latency=0.05)
+        source = StubHTTPSource(server.url, 'results')
+        collector = ConcurrentCollector(max_workers=16, per_host_limit=2)
+        outcome = collector.collect([(i, source, {'keyword': str(i)}) for i in range(12)])
+
+        self.assertTrue(outcome['completed'])
+        self.assertEqual(server.max_active, 2)
+
+    def test_session_reused(self):
+        """测试同一数据源的请求复用连接"""
+        server = self.start_server(latency=0.01)
+        source = StubHTTPSource(server.url, 'results')
+        collector = ConcurrentCollector(max_workers=8, per_host_limit=2)
+        collector.collect([(i, source, {'keyword': str(i)}) for i in range(20)])
+
+        self.assertEqual(server.requests, 20)
+        self.assertLessEqual(len(server.clients), 2)
+
+
+class TestRetryAndDeadlines(CollectorTestCase):
+    """测试重试、截止时间和部分结果"""
+
+    def test_retry_transient_errors(self):
+        """测试可重试的错误状态码在退避后重试成功"""
+        server = self.start_server(latency=0, failures=[503, 502])
+        source = StubHTTPSource(server.url, 'results')
+        outcome = ConcurrentCollector(backoff_base=0.01).collect([('a', source, {'keyword': 'a'})])
+
+        self.assertEqual(outcome['report']['a']['status'], STATUS_OK)
+        self.assertEqual(outcome['report']['a']['attempts'], 3)
+
+    def test_no_retry_on_client_error(self):
+        """测试客户端错误不重试"""
+        server = self.start_server(latency=0, status=404)
+        source = StubHTTPSource(server.url, 'results')
+        outcome = ConcurrentCollector(backoff_base=0.01).collect([('a', source, {'keyword': 'a'})])
+
+        self.assertEqual(outcome['report']['a']['status'], STATUS_ERROR)
+        self.assertEqual(outcome['report']['a']['attempts'], 1)
+        self.assertIn('404', outcome['report']['a']['error'])
+        self.assertFalse(outcome['completed'])
+
+    def test_retries_exhausted(self):
+        """测试重试次数用尽后报告错误"""
+        server = self.start_server(latency=0, status=500)
+        source = StubHTTPSource(server.url, 'results')
+        outcome = ConcurrentCollector(retry_attempts=3, backoff_base=0.01).collect(
+            [('a', source, {'keyword': 'a'})])
+
+        self.assertEqual(outcome['report']['a']['attempts'], 3)
+        self.assertEqual(server.requests, 3)
+
+    def test_source_deadline(self):
+        """测试慢数据源超时，其余数据源照常返回"""
+        servers = self.start_servers(government_info={'latency': 3})
+        integrator = self.make_integrator(servers, source_deadline=0.5)
+
+        start = time.perf_counter()
+        data = integrator.collect_company_data('示例公司')
+        self.assertLess(time.perf_counter() - start, 1.5)
+
+        report = data['collection_report']
+        self.assertEqual(report['government_info']['status'], STATUS_TIMEOUT)
+        self.assertEqual(report['baidu_search']['status'], STATUS_OK)
+        self.assertEqual(set(data['data_sources']), {'baidu_search', 'news_media'})
+
+    def test_overall_deadline_partial_results(self):
+        """测试整体截止时间到达时返回已完成的部分结果"""
+        servers = self.start_servers(government_info={'latency': 3}, news_media={'latency': 0, 'status': 500})
+        integrator = self.make_integrator(servers, max_workers=16)
+        companies = ['企业A', '企业B']
+
+        start = time.perf_counter()
+        data = integrator.collect_ecosystem_data('新能源汽车', companies, overall_deadline=0.6)
+        self.assertLess(time.perf_counter() - start, 1.5)
+
+        report = data['collection_report']
+        self.assertFalse(report['completed'])
+        failures = {(f['target'], f['source']): f['status'] for f in report['failures']}
+        self.assertEqual(failures[('企业A', 'government_info')], STATUS_TIMEOUT)
+        self.assertEqual(failures[('企业B', 'news_media')], STATUS_ERROR)
+        self.assertEqual(report['succeeded_tasks'], 3)
+        self.assertEqual([e['data_sources'] for e in data['entities']], [['baidu_search']] * 2)
+
+    def test_backoff_jitter(self):
+        """测试退避时间带抖动且不超过上限"""
+        delays = [backoff_delay(3, base=0.5, maximum=1.0) for _ in range(100)]
+        self.assertTrue(all(0 <= d <= 1.0 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertLessEqual(max(backoff_delay(1, base=0.5) for _ in range(100)), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+宿主CLI接口测试套件
+使用按延迟逐段输出的模拟CLI脚本，测试真实流式输出、首段延迟和取消
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+from host_cli_interface import CLIStreamParser, HostCLIInterface
+
+# 模拟CLI：根据 FAKE_CLI_MODE 环境变量输出纯文本、SSE 事件、JSON 或挂起
+FAKE_CLI = '''#!{python}
+import json, os, sys, time
+
+mode = os.environ.get("FAKE_CLI_MODE", "text")
+delay = float(os.environ.get("FAKE_CLI_DELAY", "0.4"))
+
+def emit(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+    time.sleep(delay)
+
+if mode == "fail":
+    sys.stderr.write("bad request")
+    sys.exit(3)
+elif "--format" in sys.argv:
+    emit('{{"choices": [{{"message": ')
+    emit('{{"role": "assistant", "content": "完整回答"}}}}]}}')
+elif mode == "text":
+    for token in ["数字化", "转型", "很重要"]:
+        emit(token)
+elif mode == "sse":
+    for token in ["数字化", "转型"]:
+        emit("data: " + json.dumps({{"choices": [{{"delta": {{"content": token}}}}]}}) + "\\n\\n")
+    emit("data: [DONE]\\n\\n")
+elif mode == "hang":
+    with open(os.environ["FAKE_CLI_PID_FILE"], "w") as f:
+        f.write(str(os.getpid()))
+    emit("开始")
+    time.sleep(30)
+'''
+
+
+def process_alive(pid):
+    """检查进程是否仍然存在"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@unittest.skipIf(sys.platform == 'win32', '模拟CLI依赖 shebang')
+class HostCLITestCase(unittest.TestCase):
+    """创建模拟CLI并将接口指向它"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        script = Path(self.temp_dir.name) / 'fake_llm_cli'
+        script.write_text(FAKE_CLI.format(python=sys.executable), encoding='utf-8')
+        script.chmod(0o755)
+
+        self.saved_env = dict(os.environ)
+        self.addCleanup(self.restore_env)
+        self.interface = HostCLIInterface()
+        self.interface.host_cli_command = str(script)
+        self.messages = [{'role': 'user', 'content': '请说明数字化转型的重要性'}]
+
+    def restore_env(self):
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+
+    def set_mode(self, mode, delay=0.4):
+        os.environ['FAKE_CLI_MODE'] = mode
+        os.environ['FAKE_CLI_DELAY'] = str(delay)
+
+
+class TestStreaming(HostCLITestCase):
+    """测试真实的增量流式输出"""
+
+    def test_first_chunk_before_completion(self):
+        """测试首段在CLI结束前到达"""
+        self.set_mode('text')
+        start = time.perf_counter()
+        arrivals, chunks = [], []
+        for chunk in self.interface.stream_complete(self.messages):
+            arrivals.append(time.perf_counter() - start)
+            chunks.append(chunk)
+
+        self.assertEqual(''.join(chunks), '数字化转型很重要')
+        self.assertEqual(len(chunks), 3)
+        # CLI 总耗时约 1.2 秒，首段应在第一次延迟之前到达
+        self.assertLess(arrivals[0], 0.4)
+        self.assertGreater(arrivals[-1], 0.7)
+
+    def test_sse_events_parsed(self):
+        """测试解析 SSE 事件流"""
+        self.set_mode('sse', delay=0.05)
+        chunks = list(self.interface.stream_complete(self.messages))
+        self.assertEqual(chunks, ['数字化', '转型'])
+
+    def test_cancellation_kills_child(self):
+        """测试关闭生成器时终止CLI子进程"""
+        pid_file = Path(self.temp_dir.name) / 'pid'
+        os.environ['FAKE_CLI_PID_FILE'] = str(pid_file)
+        self.set_mode('hang', delay=0)
+
+        stream = self.interface.stream_complete(self.messages)
+        start = time.perf_counter()
+        self.assertEqual(next(stream), '开始')
+        stream.close()
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertFalse(process_alive(int(pid_file.read_text())))
+
+    def test_timeout(self):
+        """测试超时终止CLI并报告错误"""
+        pid_file = Path(self.temp_dir.name) / 'pid'
+        os.environ['FAKE_CLI_PID_FILE'] = str(pid_file)
+        self.set_mode('hang', delay=0)
+
+        chunks = list(self.interface.stream_complete(self.messages, timeout=0.5))
+        self.assertEqual(chunks[0], '开始')
+        self.assertTrue(chunks[-1].startswith('错误'))
+        self.assertFalse(process_alive(int(pid_file.read_text())))
+
+    def test_failure_reported(self):
+        """测试CLI返回码非零时报告错误"""
+        self.set_mode('fail')
+        chunks = list(self.interface.stream_complete(self.messages))
+        self.assertIn('bad request', chunks[-1])
+
+
+class TestAsyncStreaming(HostCLITestCase):
+    """测试异步流式输出"""
+
+    def test_async_first_chunk_before_completion(self):
+        """测试异步生成器的首段延迟"""
+        self.set_mode('text')
+
+        async def collect():
+            start = time.perf_counter()
+            arrivals, chunks = [], []
+            async for chunk in self.interface.astream_complete(self.messages):
+                arrivals.append(time.perf_counter() - start)
+                chunks.append(chunk)
+            return arrivals, chunks
+
+        arrivals, chunks = asyncio.run(collect())
+        self.assertEqual(''.join(chunks), '数字化转型很重要')
+        self.assertLess(arrivals[0], 0.4)
+
+    def test_async_cancellation_kills_child(self):
+        """测试取消异步任务时终止CLI子进程"""
+        pid_file = Path(self.temp_dir.name) / 'pid'
+        os.environ['FAKE_CLI_PID_FILE'] = str(pid_file)
+        self.set_mode('hang', delay=0)
+
+        async def consume(first_chunk):
+            async for chunk in self.interface.astream_complete(self.messages):
+                first_chunk.set_result(chunk)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            first_chunk = loop.create_future()
+            task = asyncio.create_task(consume(first_chunk))
+            self.assertEqual(await first_chunk, '开始')
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertFalse(process_alive(int(pid_file.read_text())))
+
+
+class TestCompletion(HostCLITestCase):
+    """测试非流式调用复用子进程读取"""
+
+    def test_complete_parses_json(self):
+        """测试完整JSON输出的解析"""
+        self.set_mode('text', delay=0.05)
+        result = self.interface.complete(self.messages)
+        self.assertEqual(result['choices'][0]['message']['content'], '完整回答')
+
+    def test_complete_failure(self):
+        """测试CLI失败时返回错误信息"""
+        self.set_mode('fail')
+        result = self.interface.complete(self.messages)
+        self.assertEqual(result['error_type'], 'host_cli_call_failed')
+        self.assertIn('bad request', result['error'])
+
+
+class TestCLIStreamParser(unittest.TestCase):
+    """测试流式输出解析器"""
+
+    def test_events_split_across_reads(self):
+        """测试跨读取边界的 JSON 行"""
+        parser = CLIStreamParser()
+        line = json.dumps({'response': '你好'}, ensure_ascii=False) + '\n'
+        chunks = parser.feed(line[:5]) + parser.feed(line[5:]) + parser.feed('{"response": "世界"}')
+        chunks += parser.close()
+        self.assertEqual(chunks, ['你好', '世界'])
+
+    def test_anthropic_delta_and_comments(self):
+        """测试 Anthropic 事件格式和 SSE 注释"""
+        parser = CLIStreamParser()
+        chunks = parser.feed(': ping\nevent: content_block_delta\n'
+                             'data: {"type": "content_block_delta", "delta": {"text": "增量"}}\n')
+        self.assertEqual(chunks, ['增量'])
+
+    def test_plain_text_passthrough(self):
+        """测试纯文本原样输出，且不被误判为事件"""
+        parser = CLIStreamParser()
+        self.assertEqual(parser.feed('da'), [])
+        self.assertEqual(parser.feed('ta 驱动'), ['data 驱动'])
+        self.assertEqual(parser.feed('\n决策'), ['\n决策'])
+
+
+if __name__ == '__main__':
+    unittest.main()
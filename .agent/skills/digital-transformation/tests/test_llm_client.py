@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+LLM客户端测试套件
+包括客户端池、HTTP 连接复用、响应缓存和提供商自动检测测试（使用本地桩服务器）
+"""
+
+import importlib.util
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+import llm_client
+from llm_client import (
+    CachedLLMClient,
+    LLMClientFactory,
+    OllamaClient,
+    ResponseCache,
+    chat_with_llm
+)
+
+HAS_REQUESTS = importlib.util.find_spec('requests') is not None
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """模拟 Ollama 接口并记录请求"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.record(self)
+        self._reply(200, {'models': []})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length))
+        self.server.record(self)
+        if 'fail' in payload['prompt']:
+            self._reply(500, {'error': 'stub failure'})
+        else:
+            self._reply(200, {'response': f"回答{self.server.generate_count}"})
+
+
+class StubServer(ThreadingHTTPServer):
+    """统计请求数和客户端连接数的桩服务器"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubOllamaHandler)
+        self.lock = threading.Lock()
+        self.paths = []
+        self.connections = set()
+        self.generate_count = 0
+
+    def record(self, handler):
+        with self.lock:
+            self.paths.append(handler.path)
+            self.connections.add(handler.client_address)
+            if handler.path == '/api/generate':
+                self.generate_count += 1
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubProbeHandler(BaseHTTPRequestHandler):
+    """模拟云端提供商的模型列表接口：成功、失败或缓慢响应"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.record(self)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        status = 401 if self.server.fail else 200
+        body = b'{"data": []}'
+        try:
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # 客户端已超时断开
+            pass
+
+
+class StubProbeServer(StubServer):
+    """可配置响应行为的健康检查桩服务器"""
+
+    def __init__(self, delay=0.0, fail=False):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', 0), StubProbeHandler)
+        self.lock = threading.Lock()
+        self.paths = []
+        self.connections = set()
+        self.generate_count = 0
+        self.delay = delay
+        self.fail = fail
+
+
+def unused_url():
+    """返回一个没有服务监听的本地地址"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+@unittest.skipUnless(HAS_REQUESTS, '需要 requests')
+class LLMStubTestCase(unittest.TestCase):
+    """启动桩服务器并隔离客户端池"""
+
+    def setUp(self):
+        self.server = StubServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        LLMClientFactory.clear_client_pool()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        LLMClientFactory.clear_client_pool()
+        self.temp_dir.cleanup()
+
+    def chat(self, prompt='你好', **kwargs):
+        kwargs.setdefault('temperature', 0)
+        return chat_with_llm(prompt, provider='ollama', base_url=self.server.base_url, **kwargs)
+
+
+class TestClientPool(LLMStubTestCase):
+    """测试进程内客户端池"""
+
+    def test_same_key_reuses_client(self):
+        """测试相同 (提供商, 模型, 服务地址) 复用同一客户端"""
+        first = LLMClientFactory.get_client('ollama', model='llama2', base_url=self.server.base_url)
+        second = LLMClientFactory.get_client('Ollama', model='llama2', base_url=self.server.base_url,
+                                             api_key=None)
+        other = LLMClientFactory.get_client('ollama', model='qwen2', base_url=self.server.base_url)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(other.model, 'qwen2')
+
+    def test_chat_reuses_connection(self):
+        """测试多次调用只创建一次客户端并复用 keep-alive 连接"""
+        for i in range(5):
+            self.chat(f'问题{i}')
+        self.assertEqual(self.server.paths.count('/api/tags'), 1)
+        self.assertEqual(self.server.generate_count, 5)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_slow_construction_does_not_block_other_keys(self):
+        """测试创建慢速服务的客户端时，其他键的获取不等待，同一键只创建一次"""
+        slow = StubProbeServer(delay=1.0)
+        threading.Thread(target=slow.serve_forever, daemon=True).start()
+        self.addCleanup(slow.server_close)
+        self.addCleanup(slow.shutdown)
+        cached = LLMClientFactory.get_client('ollama', base_url=self.server.base_url)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                LLMClientFactory.get_client('ollama', base_url=slow.base_url)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+
+        start = time.perf_counter()
+        self.assertIs(LLMClientFactory.get_client('ollama', base_url=self.server.base_url), cached)
+        other = LLMClientFactory.get_client('ollama', model='qwen2', base_url=self.server.base_url)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(other.model, 'qwen2')
+
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(client is results[0] for client in results))
+        self.assertEqual(slow.paths.count('/api/tags'), 1)
+
+
+class TestResponseCache(LLMStubTestCase):
+    """测试sqlite响应缓存"""
+
+    def cache(self, **kwargs):
+        cache = ResponseCache(Path(self.temp_dir.name) / 'cache' / 'llm.sqlite', **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_deterministic_calls_cached(self):
+        """测试温度为 0 的相同请求只发送一次"""
+        cache = self.cache()
+        first = self.chat(cache=cache)
+        second = self.chat(cache=cache)
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.generate_count, 1)
+        self.chat('另一个问题', cache=cache)
+        self.chat(cache=cache, max_tokens=100)
+        self.assertEqual(self.server.generate_count, 3)
+
+    def test_non_deterministic_not_cached(self):
+        """测试默认策略不缓存非零温度的调用"""
+        cache = self.cache()
+        self.chat(cache=cache, temperature=0.7)
+        self.chat(cache=cache, temperature=0.7)
+        self.assertEqual(self.server.generate_count, 2)
+        self.assertEqual(len(cache), 0)
+
+        permissive = self.cache(deterministic_only=False)
+        self.chat(cache=permissive, temperature=0.7)
+        self.chat(cache=permissive, temperature=0.7)
+        self.assertEqual(self.server.generate_count, 3)
+
+    def test_failures_not_cached(self):
+        """测试失败的响应不写入缓存"""
+        cache = self.cache()
+        client = CachedLLMClient(
+            LLMClientFactory.get_client('ollama', base_url=self.server.base_url), cache, 'ollama'
+        )
+        messages = [{'role': 'user', 'content': 'fail'}]
+        self.assertFalse(client.chat_completion(messages, temperature=0)['success'])
+        self.assertFalse(client.chat_completion(messages, temperature=0)['success'])
+        self.assertEqual(self.server.generate_count, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_expiry(self):
+        """测试过期条目失效"""
+        cache = self.cache(ttl=0.05)
+        self.chat(cache=cache)
+        time.sleep(0.1)
+        self.chat(cache=cache)
+        self.assertEqual(self.server.generate_count, 2)
+
+    def test_size_cap_evicts_least_recently_used(self):
+        """测试超过容量时淘汰最久未命中的条目"""
+        cache = self.cache(max_entries=2)
+        keys = [ResponseCache.make_key('ollama', 'llama2', [{'role': 'user', 'content': str(i)}], 0, 10)
+                for i in range(3)]
+        cache.put(keys[0], {'success': True, 'content': '0'})
+        cache.put(keys[1], {'success': True, 'content': '1'})
+        self.assertIsNotNone(cache.get(keys[0]))
+        cache.put(keys[2], {'success': True, 'content': '2'})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0])['content'], '0')
+
+    def test_cache_persists_across_instances(self):
+        """测试缓存跨进程（重新打开数据库）仍然有效"""
+        db_path = Path(self.temp_dir.name) / 'llm.sqlite'
+        with ResponseCache(db_path) as cache:
+            first = self.chat(cache=cache)
+        with ResponseCache(db_path) as cache:
+            self.assertEqual(self.chat(cache=cache), first)
+        self.assertEqual(self.server.generate_count, 1)
+
+    def test_environment_variable_enables_cache(self):
+        """测试通过环境变量开启缓存"""
+        db_path = str(Path(self.temp_dir.name) / 'env.sqlite')
+        os.environ[llm_client.RESPONSE_CACHE_ENV] = db_path
+        try:
+            self.chat()
+            self.chat()
+        finally:
+            del os.environ[llm_client.RESPONSE_CACHE_ENV]
+            llm_client._default_caches.pop(db_path).close()
+        self.assertEqual(self.server.generate_count, 1)
+
+
+class TestProviderDetection(LLMStubTestCase):
+    """测试提供商并发探测与检测结果缓存"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_path = Path(self.temp_dir.name) / 'llm_provider.json'
+        os.environ[llm_client.DETECTION_CACHE_ENV] = str(self.cache_path)
+
+    def tearDown(self):
+        del os.environ[llm_client.DETECTION_CACHE_ENV]
+        super().tearDown()
+
+    def probe_server(self, **kwargs):
+        server = StubProbeServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_slow_providers_probed_concurrently(self):
+        """测试缓慢的提供商并发探测，总耗时约为一个超时"""
+        slow_openai = self.probe_server(delay=2)
+        failing_anthropic = self.probe_server(fail=True)
+        slow_qwen = self.probe_server(delay=2)
+        base_urls = {'openai': slow_openai.base_url, 'anthropic': failing_anthropic.base_url,
+                     'qwen': slow_qwen.base_url, 'ollama': self.server.base_url}
+
+        start = time.perf_counter()
+        client = LLMClientFactory.auto_detect_client(api_key='test-key', base_urls=base_urls, timeout=0.5)
+        elapsed = time.perf_counter() - start
+
+        self.assertIsInstance(client, OllamaClient)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(slow_openai.paths, ['/models'])
+        self.assertEqual(failing_anthropic.paths, ['/v1/models'])
+        # 只调用健康检查接口，不发送真实的生成请求
+        self.assertEqual(self.server.generate_count, 0)
+
+    def test_priority_order(self):
+        """测试优先级更高的提供商即使响应稍慢也优先"""
+        openai = self.probe_server(delay=0.3)
+        base_urls = {'openai': openai.base_url, 'anthropic': unused_url(),
+                     'qwen': unused_url(), 'ollama': self.server.base_url}
+        providers = LLMClientFactory.detect_providers('test-key', base_urls, timeout=2)
+        self.assertEqual(list(providers), ['openai', 'ollama'])
+
+    def test_lower_priority_not_awaited(self):
+        """测试产出高优先级提供商时不等待低优先级探测"""
+        ollama = self.probe_server(delay=2)
+        openai = self.probe_server()
+        base_urls = {'openai': openai.base_url, 'ollama': ollama.base_url}
+
+        start = time.perf_counter()
+        providers = LLMClientFactory.detect_providers('test-key', base_urls, timeout=3)
+        self.assertEqual(next(providers), 'openai')
+        self.assertLess(time.perf_counter() - start, 1.0)
+        providers.close()
+
+    def test_missing_api_key_skips_probe(self):
+        """测试没有密钥的云端提供商不发起请求"""
+        openai = self.probe_server()
+        saved = {name: os.environ.pop(name, None) for name in llm_client.PROVIDER_API_KEY_ENV.values()}
+        try:
+            providers = list(LLMClientFactory.detect_providers(
+                None, {'openai': openai.base_url, 'ollama': self.server.base_url}, timeout=1
+            ))
+        finally:
+            os.environ.update({name: value for name, value in saved.items() if value is not None})
+        self.assertEqual(providers, ['ollama'])
+        self.assertEqual(openai.paths, [])
+
+    def test_detection_result_cached(self):
+        """测试检测结果在有效期内复用，条件变化或过期后重新探测"""
+        anthropic = self.probe_server(fail=True)
+        base_urls = {'openai': unused_url(), 'anthropic': anthropic.base_url,
+                     'qwen': unused_url(), 'ollama': self.server.base_url}
+
+        first = LLMClientFactory.auto_detect_client(api_key='test-key', base_urls=base_urls, timeout=1)
+        second = LLMClientFactory.auto_detect_client(api_key='test-key', base_urls=base_urls, timeout=1)
+        self.assertIs(first, second)
+        self.assertEqual(len(anthropic.paths), 1)
+
+        record = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        self.assertEqual(record['provider'], 'ollama')
+        self.assertNotIn('test-key', self.cache_path.read_text(encoding='utf-8'))
+
+        LLMClientFactory.auto_detect_client(api_key='other-key', base_urls=base_urls, timeout=1)
+        self.assertEqual(len(anthropic.paths), 2)
+        LLMClientFactory.auto_detect_client(api_key='other-key', base_urls=base_urls, timeout=1,
+                                            cache_ttl=0)
+        self.assertEqual(len(anthropic.paths), 3)
+
+    def test_no_provider_available(self):
+        """测试没有可用提供商时报错"""
+        base_urls = {provider: unused_url() for provider in llm_client.PROVIDER_PRIORITY}
+        with self.assertRaises(ValueError):
+            LLMClientFactory.auto_detect_client(api_key='test-key', base_urls=base_urls, timeout=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+技能执行器测试套件
+使用包含慢步骤和失败步骤的合成技能配置，测试步骤并发、模块缓存和检查点恢复
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+from skill_executor import SkillExecutor
+
+# 慢步骤的延迟（秒）
+STEP_DELAY = 0.3
+
+# 合成步骤脚本：把模块加载和每次步骤调用记录到日志文件
+STEPS_SCRIPT = '''
+import os, time
+
+def record(name):
+    with open(os.environ["SKILL_STEP_LOG"], "a", encoding="utf-8") as f:
+        f.write(name + "\\n")
+
+record("load")
+
+def fetch_a(business_scenario):
+    record("fetch_a")
+    time.sleep(float(os.environ.get("SKILL_STEP_DELAY", "0")))
+    return {"a": business_scenario}
+
+def fetch_b(business_scenario):
+    record("fetch_b")
+    time.sleep(float(os.environ.get("SKILL_STEP_DELAY", "0")))
+    return {"b": business_scenario}
+
+def combine(a_data, b_data):
+    record("combine")
+    if os.environ.get("SKILL_STEP_FAIL"):
+        raise RuntimeError("合并失败")
+    return {"combined": [a_data, b_data]}
+
+def report(combined):
+    record("report")
+    return {"report": combined}
+'''
+
+
+def make_steps(**overrides):
+    """两个并发的慢步骤、一个合并步骤和一个报告步骤"""
+    steps = [
+        {"step": "fetch_a", "type": "collect_context", "required_inputs": ["business_scenario"],
+         "output": "a_data", "script": "scripts/steps.py", "function": "fetch_a"},
+        {"step": "fetch_b", "type": "collect_context", "required_inputs": ["business_scenario"],
+         "output": "b_data", "script": "scripts/steps.py", "function": "fetch_b"},
+        {"step": "combine", "type": "llm_analysis", "required_inputs": ["a_data", "b_data"],
+         "output": "combined", "script": "scripts/steps.py", "function": "combine"},
+        {"step": "report", "type": "visualization", "required_inputs": ["combined"],
+         "script": "scripts/steps.py", "function": "report"}
+    ]
+    for step in steps:
+        step.update(overrides.get(step["step"], {}))
+    return steps
+
+
+class SkillExecutorTestCase(unittest.TestCase):
+    """在临时目录中创建合成技能"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        (self.root / 'scripts').mkdir()
+        (self.root / 'scripts' / 'steps.py').write_text(STEPS_SCRIPT, encoding='utf-8')
+        self.log_path = self.root / 'steps.log'
+
+        self.saved_env = dict(os.environ)
+        self.addCleanup(self.restore_env)
+        os.environ['SKILL_STEP_LOG'] = str(self.log_path)
+        os.environ['SKILL_STEP_DELAY'] = '0'
+        self.context = {'business_scenario': '示例业务场景'}
+
+    def restore_env(self):
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+
+    def make_executor(self, steps, **execution_config):
+        config = {
+            'skill_name': 'synthetic',
+            'requires_llm': True,
+            'skills': {'synthetic': {'name': '合成技能', 'progressive_steps': steps}},
+            'execution_config': execution_config
+        }
+        config_path = self.root / 'config.json'
+        config_path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+        return SkillExecutor(str(config_path), checkpoint_dir=str(self.root / 'checkpoints'))
+
+    def calls(self):
+        """读取并清空调用日志"""
+        if not self.log_path.exists():
+            return []
+        lines = self.log_path.read_text(encoding='utf-8').split()
+        self.log_path.unlink()
+        return lines
+
+    def statuses(self, result):
+        return {name: step['status'] for name, step in result['execution_results'].items()}
+
+
+class TestStepGraph(SkillExecutorTestCase):
+    """测试步骤依赖图和并发执行"""
+
+    def test_independent_steps_run_concurrently(self):
+        """测试相互独立的慢步骤并发执行"""
+        os.environ['SKILL_STEP_DELAY'] = str(STEP_DELAY)
+        executor = self.make_executor(make_steps())
+
+        start = time.perf_counter()
+        result = executor.execute_skill('synthetic', self.context)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(set(self.statuses(result).values()), {'success'})
+        self.assertLess(elapsed, 2 * STEP_DELAY)
+        self.assertEqual(list(result['execution_results']), ['fetch_a', 'fetch_b', 'combine', 'report'])
+        self.assertEqual(result['final_context']['combined'],
+                         {'combined': [{'a': '示例业务场景'}, {'b': '示例业务场景'}]})
+        self.assertIn('report_output', result['final_context'])
+
+    def test_module_loaded_once(self):
+        """测试同一脚本只加载一次，修改后重新加载"""
+        executor = self.make_executor(make_steps())
+        executor.execute_skill('synthetic', self.context)
+        self.assertEqual(self.calls().count('load'), 1)
+
+        module = executor._load_script('scripts/steps.py', 'synthetic')
+        self.assertIs(executor._load_script('scripts/steps.py', 'synthetic'), module)
+        script = self.root / 'scripts' / 'steps.py'
+        stat = script.stat()
+        os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNot(executor._load_script('scripts/steps.py', 'synthetic'), module)
+
+    def test_failure_stops_execution(self):
+        """测试步骤失败时跳过下游步骤"""
+        os.environ['SKILL_STEP_FAIL'] = '1'
+        executor = self.make_executor(make_steps())
+        result = executor.execute_skill('synthetic', self.context)
+
+        statuses = self.statuses(result)
+        self.assertEqual(statuses['combine'], 'error')
+        self.assertEqual(statuses['report'], 'skipped')
+        self.assertIn('合并失败', result['execution_results']['combine']['error'])
+
+    def test_optional_step_skips_dependents(self):
+        """测试可选步骤跳过时其下游步骤也被跳过"""
+        executor = self.make_executor(make_steps(combine={'optional': True}), retry_on_failure=True)
+        result = executor.execute_skill('synthetic', self.context)
+
+        statuses = self.statuses(result)
+        self.assertEqual(statuses['fetch_a'], 'success')
+        self.assertEqual(statuses['combine'], 'skipped')
+        self.assertIn('combine', result['execution_results']['report']['reason'])
+
+    def test_cycle_detected(self):
+        """测试循环依赖报错"""
+        steps = make_steps(fetch_a={'required_inputs': ['combined']})
+        executor = self.make_executor(steps)
+        with self.assertRaises(ValueError):
+            executor.execute_skill('synthetic', self.context)
+
+
+class TestShippedConfigs(SkillExecutorTestCase):
+    """测试随技能发布的配置文件"""
+
+    def test_steps_run_in_sequence(self):
+        """测试发布配置中每个技能的步骤都依赖前一个步骤，按顺序执行"""
+        for config_name in ['config_llm.json', 'config_host_llm.json']:
+            executor = SkillExecutor(str(skill_dir / config_name), checkpoint_dir=str(self.root / 'checkpoints'))
+            for skill_name, skill in executor.skills.items():
+                steps = [(step['step'], step) for step in skill['progressive_steps']]
+                required = skill.get('context_requirements', {}).get('required', [])
+                with self.subTest(config=config_name, skill=skill_name):
+                    dependencies = executor._build_step_graph(steps, required)
+                    names = [name for name, _ in steps]
+                    self.assertEqual(dependencies[names[0]], [])
+                    for previous, name in zip(names, names[1:]):
+                        self.assertEqual(dependencies[name], [previous])
+
+    def test_undeclared_inputs_keep_config_order(self):
+        """测试输入来源不明的步骤按配置顺序排在前一步之后"""
+        steps = make_steps()
+        for step in steps:
+            step.pop('output', None)
+        executor = self.make_executor(steps)
+        dependencies = executor._build_step_graph([(step['step'], step) for step in steps], list(self.context))
+        self.assertEqual(dependencies, {'fetch_a': [], 'fetch_b': [], 'combine': ['fetch_b'], 'report': ['combine']})
+
+
+class TestCheckpointResume(SkillExecutorTestCase):
+    """测试检查点和恢复执行"""
+
+    def test_resume_after_failure(self):
+        """测试失败后恢复时跳过已完成的步骤"""
+        os.environ['SKILL_STEP_FAIL'] = '1'
+        executor = self.make_executor(make_steps())
+        executor.execute_skill('synthetic', self.context)
+        self.assertEqual(sorted(self.calls()), ['combine', 'fetch_a', 'fetch_b', 'load'])
+
+        del os.environ['SKILL_STEP_FAIL']
+        result = executor.execute_skill('synthetic', self.context, resume=True)
+        self.assertEqual(self.calls(), ['combine', 'report'])
+        self.assertTrue(result['execution_results']['fetch_a']['resumed'])
+        self.assertEqual(set(self.statuses(result).values()), {'success'})
+        self.assertEqual(result['final_context']['a_data'], {'a': '示例业务场景'})
+
+    def test_changed_inputs_rerun(self):
+        """测试输入变化的步骤及其下游重新执行"""
+        executor = self.make_executor(make_steps())
+        executor.execute_skill('synthetic', self.context)
+        self.calls()
+
+        executor.execute_skill('synthetic', self.context, resume=True)
+        self.assertEqual(self.calls(), [])
+
+        executor.execute_skill('synthetic', {'business_scenario': '新的业务场景'}, resume=True)
+        self.assertEqual(sorted(self.calls()), ['combine', 'fetch_a', 'fetch_b', 'report'])
+
+    def test_without_resume_reruns(self):
+        """测试未指定恢复时全部重新执行"""
+        executor = self.make_executor(make_steps())
+        executor.execute_skill('synthetic', self.context)
+        self.calls()
+
+        executor.execute_skill('synthetic', self.context)
+        self.assertEqual(len(self.calls()), 4)
+        checkpoint = self.root / 'checkpoints' / 'synthetic' / 'combine.json'
+        self.assertEqual(json.loads(checkpoint.read_text(encoding='utf-8'))['result']['status'], 'success')
+
+
+if __name__ == '__main__':
+    unittest.main()
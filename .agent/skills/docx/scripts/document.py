@@ -76,7 +76,7 @@ class DocxXMLEditor(XMLEditor):
         """Get the next available change ID by checking all tracked change elements."""
         max_id = -1
         for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
+            elements = self._elements_by_tag(tag)
             for elem in elements:
                 change_id = elem.getAttribute("w:id")
                 if change_id:
@@ -94,6 +94,7 @@ class DocxXMLEditor(XMLEditor):
                 "xmlns:w16du",
                 "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
             )
+            self._node_changed(root, deep=False)
 
     def _ensure_w16cex_namespace(self):
         """Ensure w16cex namespace is declared on the root element."""
@@ -103,6 +104,7 @@ class DocxXMLEditor(XMLEditor):
                 "xmlns:w16cex",
                 "http://schemas.microsoft.com/office/word/2018/wordml/cex",
             )
+            self._node_changed(root, deep=False)
 
     def _ensure_w14_namespace(self):
         """Ensure w14 namespace is declared on the root element."""
@@ -112,6 +114,7 @@ class DocxXMLEditor(XMLEditor):
                 "xmlns:w14",
                 "http://schemas.microsoft.com/office/word/2010/wordml",
             )
+            self._node_changed(root, deep=False)
 
     def _inject_attributes_to_nodes(self, nodes):
         """Inject RSID, author, and date attributes into DOM nodes where applicable.
@@ -237,6 +240,9 @@ class DocxXMLEditor(XMLEditor):
             for elem in node.getElementsByTagName("w16cex:commentExtensible"):
                 add_comment_extensible_date(elem)
 
+            # Re-index the node with its new attributes
+            self._node_changed(node)
+
     def replace_node(self, elem, new_content):
         """Replace node with automatic attribute injection."""
         nodes = super().replace_node(elem, new_content)
@@ -299,6 +305,8 @@ class DocxXMLEditor(XMLEditor):
                 f"The provided element <{elem.tagName}> contains no insertions. "
             )
 
+        self._node_changed(elem)
+
         # Process all insertions - wrap all children in w:del
         for ins_elem in ins_elements:
             runs = list(ins_elem.getElementsByTagName("w:r"))
@@ -500,6 +508,8 @@ class DocxXMLEditor(XMLEditor):
             if elem.getElementsByTagName("w:delText"):
                 raise ValueError("w:r element already contains w:delText")
 
+            self._node_changed(elem)
+
             # Convert w:t → w:delText
             for t_elem in list(elem.getElementsByTagName("w:t")):
                 del_text = self.dom.createElement("w:delText")
@@ -536,6 +546,8 @@ class DocxXMLEditor(XMLEditor):
             if elem.getElementsByTagName("w:ins") or elem.getElementsByTagName("w:del"):
                 raise ValueError("w:p element already contains tracked changes")
 
+            self._node_changed(elem)
+
             # Check if it's a numbered list item
             pPr_list = elem.getElementsByTagName("w:pPr")
             is_numbered = pPr_list and pPr_list[0].getElementsByTagName("w:numPr")
@@ -28,8 +28,14 @@ Example usage:
 
     # Save changes
     editor.save()
+
+Lookups are served from indexes built on first use (tag, attribute value, and
+original line number) and element text is cached for `contains` searches.
+Editor methods keep these current; call editor.invalidate_indexes() after
+modifying editor.dom directly.
 """
 
+import bisect
 import html
 from pathlib import Path
 from typing import Optional, Union
@@ -46,6 +52,16 @@ class XMLEditor:
     of each element. This enables finding nodes by their line number in the original
     file, which is useful when working with Read tool output.
 
+    Lookups use lazily built indexes: tag -> elements, (tag, attribute, value) ->
+    elements, and per-tag line numbers from parse_position. Text extracted for
+    `contains` filters is cached per element and joined per tag so a search is a
+    single substring scan. Matches are re-checked against the live DOM (line,
+    attributes, and text), so stale index entries never produce false matches.
+    A lookup that finds nothing, or whose cached text disagrees with the DOM,
+    rebuilds the indexes and searches again. Elements changed directly on the
+    DOM can still be missed when another element matches, so call
+    invalidate_indexes() after modifying self.dom directly.
+
     Attributes:
         xml_path: Path to the XML file being edited
         encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
@@ -72,6 +88,22 @@ class XMLEditor:
 
         parser = _create_line_tracking_parser()
         self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self.invalidate_indexes()
+
+    def invalidate_indexes(self):
+        """
+        Discard all lookup indexes and cached element text.
+
+        Editor methods keep the indexes up to date. Call this after modifying
+        self.dom directly (e.g. setAttribute or appendChild on nodes returned
+        by get_node) so that later lookups see the changes.
+        """
+        self._tag_index = None  # tag -> {element: None}, in document order
+        self._attr_index = {}  # tag -> attribute -> value -> {element: None}
+        self._line_index = {}  # tag -> (sorted line numbers, elements)
+        self._text_cache = {}  # element -> text from _get_element_text
+        self._text_search = {}  # tag -> (joined element text, start offsets, elements)
+        self._changed_nodes = []  # (node, elements in its subtree when changed)
 
     def get_node(
         self,
@@ -86,6 +118,11 @@ class XMLEditor:
         Finds an element by either its line number in the original file or by
         matching attribute values. Exactly one match must be found.
 
+        Lookups use indexes that editor methods keep up to date. After modifying
+        self.dom directly (setAttribute, appendChild, editing text nodes, ...),
+        call invalidate_indexes() first, otherwise elements whose attributes or
+        text changed may be missed or reported as unique when they are not.
+
         Args:
             tag: The XML tag name (e.g., "w:del", "w:ins", "w:r")
             attrs: Dictionary of attribute name-value pairs to match (e.g., {"w:id": "1"})
@@ -109,40 +146,18 @@ class XMLEditor:
             elem = editor.get_node(tag="w:t", contains="&#8220;Agreement")  # Entity notation
             elem = editor.get_node(tag="w:t", contains="\u201cAgreement")   # Unicode character
         """
-        matches = []
-        for elem in self.dom.getElementsByTagName(tag):
-            # Check line_number filter
-            if line_number is not None:
-                parse_pos = getattr(elem, "parse_position", (None,))
-                elem_line = parse_pos[0]
-
-                # Handle both single line number and range
-                if isinstance(line_number, range):
-                    if elem_line not in line_number:
-                        continue
-                else:
-                    if elem_line != line_number:
-                        continue
-
-            # Check attrs filter
-            if attrs is not None:
-                if not all(
-                    elem.getAttribute(attr_name) == attr_value
-                    for attr_name, attr_value in attrs.items()
-                ):
-                    continue
-
-            # Check contains filter
-            if contains is not None:
-                elem_text = self._get_element_text(elem)
-                # Normalize the search string: convert HTML entities to Unicode characters
-                # This allows searching for both "&#8220;Rowan" and ""Rowan"
-                normalized_contains = html.unescape(contains)
-                if normalized_contains not in elem_text:
-                    continue
-
-            # If all applicable filters passed, this is a match
-            matches.append(elem)
+        # Normalize the search string: convert HTML entities to Unicode characters
+        # This allows searching for both "&#8220;Rowan" and ""Rowan"
+        normalized_contains = html.unescape(contains) if contains is not None else None
+
+        # Indexes built before this call may miss direct DOM edits. If the
+        # lookup finds nothing, or a cached text no longer matches the live DOM,
+        # rebuild the indexes and search again.
+        indexes_built = self._tag_index is not None
+        matches, stale = self._find_matches(tag, attrs, line_number, normalized_contains)
+        if indexes_built and (stale or not matches):
+            self.invalidate_indexes()
+            matches, _ = self._find_matches(tag, attrs, line_number, normalized_contains)
 
         if not matches:
             # Build descriptive error message
@@ -180,6 +195,231 @@ class XMLEditor:
             )
         return matches[0]
 
+    def _find_matches(self, tag, attrs, line_number, contains):
+        """
+        Find up to two elements that pass every get_node filter.
+
+        Line numbers and attributes are checked on the live DOM. Text is matched
+        against the cache and then re-checked on the live DOM for the matches.
+
+        Args:
+            tag: The XML tag name (e.g., "w:p")
+            attrs: Attribute name-value pairs to match, or None
+            line_number: Line number or range in the original file, or None
+            contains: Normalized text to search for, or None
+
+        Returns:
+            tuple: (matches, stale) where stale is True if a cached text
+                   disagreed with the live DOM
+        """
+        elements = self._elements_by_tag(tag)
+        matches = []
+        stale = False
+        for elem in self._lookup_candidates(tag, attrs, line_number, contains):
+            # Skip stale index entries for elements that are no longer in the document
+            if elem not in elements:
+                continue
+
+            # Check line_number filter
+            if line_number is not None:
+                parse_pos = getattr(elem, "parse_position", (None,))
+                elem_line = parse_pos[0]
+
+                # Handle both single line number and range
+                if isinstance(line_number, range):
+                    if elem_line not in line_number:
+                        continue
+                else:
+                    if elem_line != line_number:
+                        continue
+
+            # Check attrs filter
+            if attrs is not None:
+                if not all(
+                    elem.getAttribute(attr_name) == attr_value
+                    for attr_name, attr_value in attrs.items()
+                ):
+                    continue
+
+            # Check contains filter, confirming cached text against the live DOM
+            if contains is not None:
+                if contains not in self._get_cached_text(elem):
+                    continue
+                if contains not in self._get_element_text(elem):
+                    stale = True
+                    continue
+
+            # If all applicable filters passed, this is a match
+            matches.append(elem)
+            if len(matches) > 1:
+                break
+        return matches, stale
+
+    def _elements_by_tag(self, tag):
+        """
+        Get all elements with a tag from the tag index.
+
+        Builds the index with a single walk of the DOM on first use and applies
+        pending changes recorded by _node_changed.
+
+        Args:
+            tag: The XML tag name (e.g., "w:p")
+
+        Returns:
+            dict: Elements with the tag as keys (insertion-ordered set)
+        """
+        if self._tag_index is None:
+            self._tag_index = {}
+            self._changed_nodes = []
+            for elem in _iter_elements(self.dom.documentElement):
+                self._tag_index.setdefault(elem.tagName, {})[elem] = None
+        elif self._changed_nodes:
+            self._apply_changes()
+        return self._tag_index.get(tag, {})
+
+    def _lookup_candidates(self, tag, attrs, line_number, contains):
+        """
+        Narrow get_node candidates using the line, attribute, or text index.
+
+        Candidates may include elements that no longer match; get_node applies
+        every filter to them again.
+        """
+        if line_number is not None:
+            lines, elements = self._get_line_index(tag)
+            if isinstance(line_number, range):
+                if not line_number:
+                    return []
+                first, last = min(line_number), max(line_number)
+            else:
+                first = last = line_number
+            return elements[bisect.bisect_left(lines, first):bisect.bisect_right(lines, last)]
+
+        if attrs:
+            buckets = [
+                self._get_attr_index(tag, attr_name).get(attr_value, {})
+                for attr_name, attr_value in attrs.items()
+            ]
+            return list(min(buckets, key=len))
+
+        if contains is not None:
+            return self._find_text(tag, contains)
+
+        return list(self._elements_by_tag(tag))
+
+    def _get_attr_index(self, tag, attr_name):
+        """Get (building on first use) the value -> elements index for one attribute."""
+        tag_attrs = self._attr_index.setdefault(tag, {})
+        if attr_name not in tag_attrs:
+            values = {}
+            for elem in self._elements_by_tag(tag):
+                values.setdefault(elem.getAttribute(attr_name), {})[elem] = None
+            tag_attrs[attr_name] = values
+        return tag_attrs[attr_name]
+
+    def _get_line_index(self, tag):
+        """Get (building on first use) the sorted original line numbers for a tag."""
+        if tag not in self._line_index:
+            positioned = sorted(
+                (
+                    (elem.parse_position[0], elem)
+                    for elem in self._elements_by_tag(tag)
+                    if hasattr(elem, "parse_position")
+                ),
+                key=lambda item: item[0],
+            )
+            self._line_index[tag] = (
+                [line for line, _ in positioned],
+                [elem for _, elem in positioned],
+            )
+        return self._line_index[tag]
+
+    def _find_text(self, tag, text):
+        """
+        Find elements with a tag whose text contains a string.
+
+        Element texts are joined with NUL separators (NUL cannot occur in XML
+        text) so each search is one str.find pass per match instead of a
+        Python-level loop over every element.
+        """
+        if tag not in self._text_search:
+            elements = list(self._elements_by_tag(tag))
+            texts = [self._get_cached_text(elem) for elem in elements]
+            starts = []
+            offset = 0
+            for elem_text in texts:
+                starts.append(offset)
+                offset += len(elem_text) + 1
+            self._text_search[tag] = ("\0".join(texts), starts, elements)
+        joined, starts, elements = self._text_search[tag]
+
+        found = []
+        pos = joined.find(text)
+        while pos != -1:
+            index = bisect.bisect_right(starts, pos) - 1
+            found.append(elements[index])
+            if index + 1 == len(starts):
+                break
+            pos = joined.find(text, starts[index + 1])
+        return found
+
+    def _get_cached_text(self, elem):
+        """Get _get_element_text(elem), cached until the element changes."""
+        text = self._text_cache.get(elem)
+        if text is None:
+            text = self._text_cache[elem] = self._get_element_text(elem)
+        return text
+
+    def _node_changed(self, node, deep=True):
+        """
+        Record that a node was inserted, modified, or is about to be removed.
+
+        Cached text of the node's ancestors is dropped immediately. The node's
+        subtree is re-indexed before the next lookup: elements that are no longer
+        in the document are removed from the indexes, and new or modified
+        elements are indexed with their current attributes. Call this before
+        removing or restructuring a subtree, and after inserting one.
+
+        Args:
+            node: The DOM node that changed
+            deep: Whether descendants of the node may also have changed
+        """
+        ancestor = node.parentNode
+        while ancestor is not None:
+            self._text_cache.pop(ancestor, None)
+            self._text_search.pop(getattr(ancestor, "tagName", None), None)
+            ancestor = ancestor.parentNode
+        if self._tag_index is not None:
+            before = list(_iter_elements(node)) if deep else [node]
+            self._changed_nodes.append((node, deep, before))
+
+    def _apply_changes(self):
+        """Update the indexes for subtrees recorded by _node_changed."""
+        changed_nodes, self._changed_nodes = self._changed_nodes, []
+        for node, deep, before in changed_nodes:
+            if _is_attached(node):
+                after = list(_iter_elements(node)) if deep else [node]
+            else:
+                after = []
+            after_set = set(after)
+
+            for elem in before:
+                if elem not in after_set and not _is_attached(elem):
+                    self._text_cache.pop(elem, None)
+                    self._text_search.pop(elem.tagName, None)
+                    self._tag_index.get(elem.tagName, {}).pop(elem, None)
+
+            for elem in after:
+                self._text_cache.pop(elem, None)
+                self._text_search.pop(elem.tagName, None)
+                elements = self._tag_index.setdefault(elem.tagName, {})
+                if elem not in elements:
+                    elements[elem] = None
+                    if hasattr(elem, "parse_position"):
+                        self._line_index.pop(elem.tagName, None)
+                # Entries under an old attribute value are left for get_node to reject
+                for attr_name, values in self._attr_index.get(elem.tagName, {}).items():
+                    values.setdefault(elem.getAttribute(attr_name), {})[elem] = None
+
     def _get_element_text(self, elem):
         """
         Recursively extract all text content from an element.
@@ -219,9 +459,11 @@ class XMLEditor:
         """
         parent = elem.parentNode
         nodes = self._parse_fragment(new_content)
+        self._node_changed(elem)
         for node in nodes:
             parent.insertBefore(node, elem)
         parent.removeChild(elem)
+        self._nodes_inserted(nodes)
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -246,6 +488,7 @@ class XMLEditor:
                 parent.insertBefore(node, next_sibling)
             else:
                 parent.appendChild(node)
+        self._nodes_inserted(nodes)
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -266,6 +509,7 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             parent.insertBefore(node, elem)
+        self._nodes_inserted(nodes)
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -285,8 +529,18 @@ class XMLEditor:
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
             elem.appendChild(node)
+        self._nodes_inserted(nodes)
         return nodes
 
+    def _nodes_inserted(self, nodes):
+        """Record inserted element nodes with _node_changed."""
+        for node in nodes:
+            if node.nodeType == node.ELEMENT_NODE:
+                self._node_changed(node)
+            elif node.parentNode is not None:
+                # Inserted text changes the text of the parent element
+                self._node_changed(node.parentNode, deep=False)
+
     def get_next_rid(self):
         """Get the next available rId for relationships files."""
         max_id = 0
@@ -343,6 +597,31 @@ class XMLEditor:
         return nodes
 
 
+def _iter_elements(node):
+    """
+    Iterate over a node and all of its descendant elements in document order.
+
+    Args:
+        node: DOM node to start from
+
+    Yields:
+        defusedxml.minidom.Element: Each element in the subtree
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.nodeType == current.ELEMENT_NODE:
+            yield current
+        stack.extend(reversed(current.childNodes))
+
+
+def _is_attached(node):
+    """Check whether a node is still part of its document tree."""
+    while node.parentNode is not None:
+        node = node.parentNode
+    return node.nodeType == node.DOCUMENT_NODE
+
+
 def _create_line_tracking_parser():
     """
     Create a SAX parser that tracks line and column numbers for each element.
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Tests for XMLEditor node lookup.
+
+Checks that the lazily built tag, attribute, line, and text indexes give the
+same results as a full scan of the DOM, including after edits made through
+XMLEditor and DocxXMLEditor.
+"""
+
+import html
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add the skill directory to the path
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir))
+
+from scripts.utilities import XMLEditor
+
+try:
+    from scripts.document import DocxXMLEditor
+    HAS_DOCUMENT = True
+except ImportError:
+    HAS_DOCUMENT = False
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml"'
+)
+
+
+def make_document(paragraphs=20, runs=3):
+    """One element per line so every run and paragraph has its own line number."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        f"<w:document {NAMESPACES}>",
+        "<w:body>",
+    ]
+    for p in range(paragraphs):
+        lines.append(f'<w:p w14:paraId="{p:08X}" w:rsidR="00A{p % 3}">')
+        for r in range(runs):
+            lines.append(
+                f'<w:r w:rsidR="00B{r}"><w:t>paragraph {p} run {r}</w:t></w:r>'
+            )
+        lines.append("</w:p>")
+    lines += ["</w:body>", "</w:document>"]
+    return "\n".join(lines)
+
+
+def scan(editor, tag, attrs=None, line_number=None, contains=None):
+    """Reference lookup: walk every element of the tag without any index."""
+    matches = []
+    for elem in editor.dom.getElementsByTagName(tag):
+        if line_number is not None:
+            line = getattr(elem, "parse_position", (None,))[0]
+            if isinstance(line_number, range):
+                if line not in line_number:
+                    continue
+            elif line != line_number:
+                continue
+        if attrs is not None and not all(
+            elem.getAttribute(name) == value for name, value in attrs.items()
+        ):
+            continue
+        if contains is not None and html.unescape(
+            contains
+        ) not in editor._get_element_text(elem):
+            continue
+        matches.append(elem)
+    return matches
+
+
+class EditorTestCase(unittest.TestCase):
+    """Writes a document.xml to a temporary directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = Path(self.temp_dir.name) / "document.xml"
+        self.path.write_text(make_document(), encoding="utf-8")
+
+    def assertLookupMatchesScan(self, editor, **query):
+        """get_node must succeed exactly when a full scan finds a single element."""
+        expected = scan(editor, **query)
+        if len(expected) == 1:
+            self.assertIs(editor.get_node(**query), expected[0])
+        else:
+            with self.assertRaises(ValueError):
+                editor.get_node(**query)
+
+    def assertQueriesMatchScan(self, editor, texts=()):
+        for p in range(0, 20, 3):
+            self.assertLookupMatchesScan(editor, tag="w:p", attrs={"w14:paraId": f"{p:08X}"})
+            self.assertLookupMatchesScan(editor, tag="w:r", line_number=5 + p * 5)
+            self.assertLookupMatchesScan(editor, tag="w:p", contains=f"paragraph {p} run 1")
+            self.assertLookupMatchesScan(
+                editor, tag="w:t", line_number=range(3, 200), contains=f"paragraph {p} run 2"
+            )
+        for text in texts:
+            for tag in ("w:t", "w:r", "w:p", "w:delText"):
+                self.assertLookupMatchesScan(editor, tag=tag, contains=text)
+
+
+class TestLookup(EditorTestCase):
+    """Tests lookups on an unmodified document."""
+
+    def test_filters(self):
+        """Line, attribute, and text filters find the expected elements."""
+        editor = XMLEditor(self.path)
+        run = editor.get_node(tag="w:r", line_number=5)
+        self.assertEqual(editor._get_element_text(run), "paragraph 0 run 0")
+        para = editor.get_node(tag="w:p", attrs={"w14:paraId": "00000002"})
+        self.assertEqual(para.parse_position[0], 14)
+        self.assertIs(editor.get_node(tag="w:p", line_number=range(10, 15)), para)
+        self.assertIs(editor.get_node(tag="w:p", contains="paragraph 2 run 0"), para)
+        self.assertIs(
+            editor.get_node(tag="w:r", attrs={"w:rsidR": "00B1"}, line_number=range(13, 18)),
+            editor.get_node(tag="w:r", contains="paragraph 2 run 1"),
+        )
+        self.assertEqual(editor.get_node(tag="w:document").tagName, "w:document")
+        self.assertQueriesMatchScan(editor, texts=["run 2", "paragraph 19 run 0"])
+
+    def test_errors(self):
+        """Missing and ambiguous lookups raise ValueError with the usual messages."""
+        editor = XMLEditor(self.path)
+        with self.assertRaisesRegex(ValueError, "Node not found: <w:r> at line 3"):
+            editor.get_node(tag="w:r", line_number=3)
+        with self.assertRaisesRegex(ValueError, "Multiple nodes found"):
+            editor.get_node(tag="w:p", attrs={"w:rsidR": "00A1"})
+        with self.assertRaisesRegex(ValueError, "Multiple nodes found"):
+            editor.get_node(tag="w:t", contains="run 1")
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:p", line_number=range(0))
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:tbl")
+
+    def test_entity_in_contains(self):
+        """Entity notation in contains is matched against Unicode text."""
+        editor = XMLEditor(self.path)
+        para = editor.get_node(tag="w:p", line_number=4)
+        editor.append_to(para, "<w:r><w:t>“Agreement”</w:t></w:r>")
+        self.assertIs(editor.get_node(tag="w:p", contains="&#8220;Agreement"), para)
+
+
+class TestEditsUpdateIndexes(EditorTestCase):
+    """Tests that lookups see changes made through editor methods."""
+
+    def test_replace_node(self):
+        """Replaced elements disappear from every index and new ones are found."""
+        editor = XMLEditor(self.path)
+        self.assertQueriesMatchScan(editor)
+        old = editor.get_node(tag="w:r", line_number=5)
+        editor.replace_node(old, '<w:r w:rsidR="00C9"><w:t>replacement text</w:t></w:r>')
+
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:r", line_number=5)
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:t", contains="paragraph 0 run 0")
+        new = editor.get_node(tag="w:r", attrs={"w:rsidR": "00C9"})
+        self.assertIs(editor.get_node(tag="w:r", contains="replacement"), new)
+        self.assertEqual(
+            editor.get_node(tag="w:p", contains="replacement text").getAttribute("w14:paraId"),
+            "00000000",
+        )
+        self.assertQueriesMatchScan(editor, texts=["replacement", "paragraph 0"])
+
+    def test_inserts(self):
+        """Inserted paragraphs and runs are indexed and update ancestor text."""
+        editor = XMLEditor(self.path)
+        self.assertQueriesMatchScan(editor, texts=["inserted"])
+        para = editor.get_node(tag="w:p", attrs={"w14:paraId": "00000003"})
+        editor.insert_after(para, '<w:p w14:paraId="7FFFFFFF"><w:r><w:t>inserted after</w:t></w:r></w:p>')
+        editor.insert_before(para, '<w:p w14:paraId="7FFFFFFE"><w:r><w:t>inserted before</w:t></w:r></w:p>')
+        editor.append_to(para, "<w:r><w:t>appended run</w:t></w:r>")
+
+        self.assertIs(
+            editor.get_node(tag="w:p", contains="inserted after"),
+            editor.get_node(tag="w:p", attrs={"w14:paraId": "7FFFFFFF"}),
+        )
+        self.assertIs(editor.get_node(tag="w:p", contains="appended run"), para)
+        self.assertEqual(
+            editor.get_node(tag="w:body", contains="inserted before").tagName, "w:body"
+        )
+        self.assertQueriesMatchScan(editor, texts=["inserted", "appended run", "paragraph 3"])
+
+    def test_invalidate_after_direct_dom_edit(self):
+        """invalidate_indexes picks up changes made directly on the DOM."""
+        editor = XMLEditor(self.path)
+        run = editor.get_node(tag="w:r", line_number=5)
+        run.setAttribute("w:rsidR", "00D0")
+        run.getElementsByTagName("w:t")[0].firstChild.data = "edited directly"
+
+        editor.invalidate_indexes()
+        self.assertIs(editor.get_node(tag="w:r", attrs={"w:rsidR": "00D0"}), run)
+        self.assertIs(editor.get_node(tag="w:p", contains="edited directly"), run.parentNode)
+        self.assertQueriesMatchScan(editor, texts=["edited directly"])
+
+    def test_direct_text_edit_without_invalidate(self):
+        """Cached text is re-checked, so direct text edits never give stale matches."""
+        editor = XMLEditor(self.path)
+        text = editor.get_node(tag="w:t", contains="paragraph 5 run 1")
+        text.firstChild.data = "bar"
+
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:t", contains="paragraph 5 run 1")
+        self.assertIs(editor.get_node(tag="w:t", contains="bar"), text)
+
+        run = editor.get_node(tag="w:r", line_number=5)
+        run.setAttribute("w:rsidR", "00D1")
+        self.assertIs(editor.get_node(tag="w:r", attrs={"w:rsidR": "00D1"}), run)
+
+
+@unittest.skipUnless(HAS_DOCUMENT, "document.py dependencies are not installed")
+class TestDocxEdits(EditorTestCase):
+    """Tests that tracked-change edits keep lookups consistent."""
+
+    def make_editor(self):
+        return DocxXMLEditor(self.path, rsid="00E1E1E1", author="Reviewer", initials="R")
+
+    def test_suggest_deletion(self):
+        """Deleted runs move from w:t to w:delText and their w:del is found by id."""
+        editor = self.make_editor()
+        self.assertQueriesMatchScan(editor)
+        run = editor.get_node(tag="w:r", contains="paragraph 1 run 0")
+        wrapper = editor.suggest_deletion(run)
+
+        self.assertIs(editor.get_node(tag="w:del", attrs={"w:id": wrapper.getAttribute("w:id")}), wrapper)
+        self.assertIs(editor.get_node(tag="w:r", attrs={"w:rsidDel": "00B0"}), run)
+        self.assertIs(editor.get_node(tag="w:delText", contains="paragraph 1 run 0").parentNode, run)
+        with self.assertRaises(ValueError):
+            editor.get_node(tag="w:t", contains="paragraph 1 run 0")
+
+        para = editor.get_node(tag="w:p", attrs={"w14:paraId": "00000004"})
+        editor.suggest_deletion(para)
+        self.assertEqual(len(scan(editor, tag="w:del")), 2)
+        self.assertQueriesMatchScan(editor, texts=["paragraph 1 run", "paragraph 4 run"])
+
+    def test_insert_and_revert(self):
+        """Change ids stay unique across insertions and reverts."""
+        editor = self.make_editor()
+        para = editor.get_node(tag="w:p", attrs={"w14:paraId": "00000006"})
+        editor.append_to(para, "<w:ins><w:r><w:t>first</w:t></w:r></w:ins><w:ins><w:r><w:t>second</w:t></w:r></w:ins>")
+        first = editor.get_node(tag="w:ins", contains="first")
+        second = editor.get_node(tag="w:ins", contains="second")
+        self.assertNotEqual(first.getAttribute("w:id"), second.getAttribute("w:id"))
+
+        editor.revert_insertion(first)
+        deletion = editor.get_node(tag="w:del", contains="first")
+        self.assertIs(deletion.parentNode, first)
+        _, restored = editor.revert_deletion(deletion)
+        self.assertIs(editor.get_node(tag="w:ins", attrs={"w:id": restored.getAttribute("w:id")}), restored)
+
+        ids = [elem.getAttribute("w:id") for tag in ("w:ins", "w:del") for elem in scan(editor, tag=tag)]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertQueriesMatchScan(editor, texts=["first", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
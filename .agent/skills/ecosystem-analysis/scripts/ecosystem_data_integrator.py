@@ -20,6 +20,168 @@ from data_integrator import DataIntegrator, DataSource
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 实体分布统计的字段
+ENTITY_DISTRIBUTION_FIELDS = ("type", "importance", "scale", "location")
+# 社区检测方法：连通分量 / 加权模块度（Louvain）
+COMMUNITY_METHODS = ("connected", "modularity")
+# Louvain 的最大聚合层数与每层最大遍历轮数
+MODULARITY_MAX_LEVELS = 10
+MODULARITY_MAX_SWEEPS = 20
+# 模块度增益低于该值时视为没有改进，避免浮点误差导致的来回移动
+MODULARITY_MIN_GAIN = 1e-9
+
+
+class UnionFind:
+    """
+    并查集（按规模合并 + 路径压缩）
+
+    Args:
+        size: 元素个数，元素编号为 0..size-1
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, x: int) -> int:
+        """查找根节点，并把路径上的节点直接挂到根上"""
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        """合并两个集合，返回合并后的根"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+def _louvain_local_moving(adjacency, degree, total_weight, resolution):
+    """
+    Louvain 局部移动阶段：逐个节点移入模块度增益最大的相邻社区
+
+    Returns:
+        (节点所属社区列表, 是否有节点移动)
+    """
+    community = list(range(len(adjacency)))
+    community_degree = list(degree)
+    moved = False
+
+    for _ in range(MODULARITY_MAX_SWEEPS):
+        moves = 0
+        for node, neighbors in enumerate(adjacency):
+            current = community[node]
+            node_degree = degree[node]
+            links = {}
+            for neighbor, weight in neighbors.items():
+                target = community[neighbor]
+                links[target] = links.get(target, 0.0) + weight
+
+            # 先把节点移出当前社区，再比较放回各相邻社区的增益
+            community_degree[current] -= node_degree
+            scale = resolution * node_degree / total_weight
+            best = current
+            best_gain = links.get(current, 0.0) - scale * community_degree[current]
+            for target, weight in links.items():
+                gain = weight - scale * community_degree[target]
+                if gain > best_gain + MODULARITY_MIN_GAIN:
+                    best, best_gain = target, gain
+            community_degree[best] += node_degree
+
+            if best != current:
+                community[node] = best
+                moves += 1
+        if not moves:
+            break
+        moved = True
+
+    return community, moved
+
+
+def louvain_communities(
+    num_nodes: int,
+    edges,
+    resolution: float = 1.0
+) -> Dict[str, Any]:
+    """
+    加权模块度社区划分（Louvain 算法）
+
+    关系按无向边处理，重复边的权重累加；遍历顺序固定，结果可复现。
+
+    Args:
+        num_nodes: 节点数，节点编号为 0..num_nodes-1
+        edges: (u, v, weight) 三元组的可迭代对象
+        resolution: 分辨率参数，越大社区越小
+
+    Returns:
+        {"membership": 每个节点的社区编号, "modularity": 划分的模块度}
+    """
+    adjacency = [{} for _ in range(num_nodes)]
+    loops = [0.0] * num_nodes
+    degree = [0.0] * num_nodes
+    for u, v, weight in edges:
+        if weight <= 0:
+            continue
+        if u == v:
+            loops[u] += weight
+        else:
+            adjacency[u][v] = adjacency[u].get(v, 0.0) + weight
+            adjacency[v][u] = adjacency[v].get(u, 0.0) + weight
+        degree[u] += weight
+        degree[v] += weight
+
+    total_weight = sum(degree)
+    membership = list(range(num_nodes))
+    if total_weight == 0:
+        return {"membership": membership, "modularity": 0.0}
+
+    for _ in range(MODULARITY_MAX_LEVELS):
+        community, moved = _louvain_local_moving(adjacency, degree, total_weight, resolution)
+        if not moved:
+            break
+
+        # 社区重新编号（按首次出现顺序）并聚合为下一层的超节点
+        renumber = {}
+        for label in community:
+            renumber.setdefault(label, len(renumber))
+        community = [renumber[label] for label in community]
+        membership = [community[node] for node in membership]
+
+        size = len(renumber)
+        next_adjacency = [{} for _ in range(size)]
+        next_loops = [0.0] * size
+        next_degree = [0.0] * size
+        for node, neighbors in enumerate(adjacency):
+            source = community[node]
+            next_loops[source] += loops[node]
+            next_degree[source] += degree[node]
+            targets = next_adjacency[source]
+            for neighbor, weight in neighbors.items():
+                target = community[neighbor]
+                if target == source:
+                    # 社区内部边在邻接表中出现两次
+                    next_loops[source] += weight / 2
+                else:
+                    targets[target] = targets.get(target, 0.0) + weight
+        adjacency, loops, degree = next_adjacency, next_loops, next_degree
+
+    # 最后一层的每个超节点即一个社区，自环权重为社区内部权重
+    half_weight = total_weight / 2
+    modularity = sum(
+        internal / half_weight - resolution * (community_degree / total_weight) ** 2
+        for internal, community_degree in zip(loops, degree)
+    )
+    return {"membership": membership, "modularity": modularity}
+
 
 class EcosystemDataIntegrator(DataIntegrator):
     """生态系统数据集成器 - 扩展基础数据集成器"""
@@ -384,40 +546,19 @@ class EcosystemDataAnalyzer:
         self.data_integrator = data_integrator
 
     def analyze_entity_distribution(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """分析实体分布"""
+        """分析实体分布（一次遍历同时统计类型、重要性、规模和地点）"""
         entities = data.get("entities", [])
 
-        # 按类型统计
-        type_distribution = {}
-        for entity in entities:
-            entity_type = entity.get("type", "unknown")
-            type_distribution[entity_type] = type_distribution.get(entity_type, 0) + 1
-
-        # 按重要性统计
-        importance_distribution = {}
-        for entity in entities:
-            importance = entity.get("importance", "unknown")
-            importance_distribution[importance] = importance_distribution.get(importance, 0) + 1
-
-        # 按规模统计
-        scale_distribution = {}
-        for entity in entities:
-            scale = entity.get("scale", "unknown")
-            scale_distribution[scale] = scale_distribution.get(scale, 0) + 1
-
-        # 按地点统计
-        location_distribution = {}
+        distributions = {field: {} for field in ENTITY_DISTRIBUTION_FIELDS}
         for entity in entities:
-            location = entity.get("location", "unknown")
-            location_distribution[location] = location_distribution.get(location, 0) + 1
+            for field, distribution in distributions.items():
+                value = entity.get(field, "unknown")
+                distribution[value] = distribution.get(value, 0) + 1
 
-        return {
-            "total_entities": len(entities),
-            "type_distribution": type_distribution,
-            "importance_distribution": importance_distribution,
-            "scale_distribution": scale_distribution,
-            "location_distribution": location_distribution
-        }
+        result = {"total_entities": len(entities)}
+        for field, distribution in distributions.items():
+            result[f"{field}_distribution"] = distribution
+        return result
 
     def analyze_relationship_network(
         self,
@@ -506,54 +647,69 @@ class EcosystemDataAnalyzer:
 
     def detect_communities(
         self,
-        data: Dict[str, Any]
+        data: Dict[str, Any],
+        method: str = "connected",
+        resolution: float = 1.0
     ) -> List[Dict[str, Any]]:
-        """检测社区（简单的基于连通性的检测）"""
+        """
+        检测社区
+
+        Args:
+            data: 生态系统数据（entities 与 relationships）
+            method: "connected" 按连通分量划分（并查集）；
+                "modularity" 以关系强度为权重做模块度优化（Louvain）
+            resolution: 模块度分辨率参数，仅 modularity 方法使用
+
+        Returns:
+            社区列表，按规模降序排列
+        """
+        if method not in COMMUNITY_METHODS:
+            raise ValueError(f"Unsupported community method: {method}")
+
         relationships = data.get("relationships", [])
         entities = data.get("entities", [])
 
-        # 构建邻接表
-        adjacency = {entity["id"]: [] for entity in entities}
-        for rel in relationships:
-            source = rel.get("source")
-            target = rel.get("target")
-            if source in adjacency:
-                adjacency[source].append(target)
-            if target in adjacency:
-                adjacency[target].append(source)
-
-        # 使用简单的深度优先搜索检测连通分量
-        visited = set()
-        communities = []
+        # 实体 id 到位置的索引只构建一次；端点不在实体列表中的关系被忽略
+        index = {}
+        uf = UnionFind(len(entities))
+        for position, entity in enumerate(entities):
+            first = index.setdefault(entity["id"], position)
+            if first != position:
+                uf.union(first, position)
+
+        if method == "connected":
+            for rel in relationships:
+                source = index.get(rel.get("source"))
+                target = index.get(rel.get("target"))
+                if source is not None and target is not None:
+                    uf.union(source, target)
+            labels = [uf.find(position) for position in range(len(entities))]
+        else:
+            edges = (
+                (index[rel["source"]], index[rel["target"]], float(rel.get("strength", 1.0)))
+                for rel in relationships
+                if rel.get("source") in index and rel.get("target") in index
+            )
+            partition = louvain_communities(len(entities), edges, resolution)
+            # 重复 id 的实体归入首次出现位置所在的社区
+            membership = partition["membership"]
+            labels = [membership[uf.find(position)] for position in range(len(entities))]
+            logger.info(f"模块度社区划分完成，模块度: {partition['modularity']:.4f}")
 
-        for entity in entities:
-            entity_id = entity["id"]
-            if entity_id not in visited:
-                # 新的社区
-                community = []
-                stack = [entity_id]
-
-                while stack:
-                    current_id = stack.pop()
-                    if current_id not in visited:
-                        visited.add(current_id)
-                        community.append(current_id)
-                        # 添加邻居
-                        for neighbor in adjacency.get(current_id, []):
-                            if neighbor not in visited:
-                                stack.append(neighbor)
-
-                # 获取社区实体的详细信息
-                community_entities = [
-                    e for e in entities if e["id"] in community
-                ]
+        # 按实体顺序分组，社区编号沿用首次出现的顺序
+        groups = {}
+        for position, label in enumerate(labels):
+            groups.setdefault(label, []).append(position)
 
-                communities.append({
-                    "community_id": f"community_{len(communities) + 1}",
-                    "size": len(community),
-                    "entities": community_entities,
-                    "entity_ids": community
-                })
+        communities = []
+        for members in groups.values():
+            community_entities = [entities[position] for position in members]
+            communities.append({
+                "community_id": f"community_{len(communities) + 1}",
+                "size": len(members),
+                "entities": community_entities,
+                "entity_ids": [entity["id"] for entity in community_entities]
+            })
 
         # 按社区大小排序
         communities.sort(key=lambda c: c["size"], reverse=True)
@@ -20,6 +20,17 @@ from scripts.business_ecosystem_analyzer import (
     AnalysisType
 )
 
+# 数据集成模块依赖 digital-transformation 的数据集成器（需要 requests）
+try:
+    from scripts.ecosystem_data_integrator import (
+        EcosystemDataAnalyzer,
+        UnionFind,
+        louvain_communities
+    )
+    HAS_DATA_INTEGRATOR = True
+except ImportError:
+    HAS_DATA_INTEGRATOR = False
+
 
 class TestBusinessEcosystemAnalyzerInit(unittest.TestCase):
     """测试商业生态系统分析器初始化"""
@@ -1138,6 +1149,78 @@ class TestIntegrationScenarios(unittest.TestCase):
         )
 
 
+@unittest.skipUnless(HAS_DATA_INTEGRATOR, '需要 requests')
+class TestEcosystemCommunityDetection(unittest.TestCase):
+    """测试生态系统数据分析器的社区检测与实体分布"""
+
+    def setUp(self):
+        """设置测试环境：两个三角形由一条弱关系相连，另有孤立实体"""
+        self.analyzer = EcosystemDataAnalyzer(None)
+        self.entities = [
+            {"id": f"entity_{i}", "type": "supplier" if i % 2 else "partner", "location": "北京"}
+            for i in range(8)
+        ]
+        pairs = [(0, 1, 0.9), (1, 2, 0.8), (0, 2, 0.9), (3, 4, 0.9), (4, 5, 0.8),
+                 (3, 5, 0.9), (2, 3, 0.1)]
+        self.relationships = [
+            {"source": f"entity_{a}", "target": f"entity_{b}", "strength": w} for a, b, w in pairs
+        ]
+        # 指向未知实体的关系被忽略
+        self.relationships.append({"source": "entity_6", "target": "unknown", "strength": 1.0})
+        self.data = {"entities": self.entities, "relationships": self.relationships}
+
+    def test_union_find(self):
+        """测试并查集合并与路径压缩"""
+        uf = UnionFind(6)
+        for a, b in [(0, 1), (1, 2), (3, 4)]:
+            uf.union(a, b)
+        self.assertEqual(uf.find(0), uf.find(2))
+        self.assertNotEqual(uf.find(0), uf.find(3))
+        self.assertEqual(uf.size[uf.find(2)], 3)
+        self.assertEqual(uf.parent[2], uf.find(0))
+
+    def test_connected_components(self):
+        """测试连通分量社区"""
+        communities = self.analyzer.detect_communities(self.data)
+        self.assertEqual([c["entity_ids"] for c in communities], [
+            [f"entity_{i}" for i in range(6)], ["entity_6"], ["entity_7"]
+        ])
+        self.assertEqual(communities[0]["size"], 6)
+        self.assertEqual(communities[0]["entities"][0], self.entities[0])
+        self.assertEqual(communities[1]["community_id"], "community_2")
+
+    def test_modularity_communities(self):
+        """测试加权模块度社区拆分弱关系连接的两个群体"""
+        communities = self.analyzer.detect_communities(self.data, method="modularity")
+        self.assertEqual(sorted(c["entity_ids"] for c in communities), [
+            ["entity_0", "entity_1", "entity_2"], ["entity_3", "entity_4", "entity_5"],
+            ["entity_6"], ["entity_7"]
+        ])
+
+    def test_louvain_modularity(self):
+        """测试两个完全图加一条桥边的模块度"""
+        edges = [(a, b, 1.0) for a in range(4) for b in range(a + 1, 4)]
+        edges += [(a + 4, b + 4, 1.0) for a, b, _ in edges] + [(0, 4, 1.0)]
+        result = louvain_communities(8, edges)
+        self.assertEqual(len(set(result["membership"][:4])), 1)
+        self.assertNotEqual(result["membership"][0], result["membership"][4])
+        # 13 条边，每个社区内部 6 条、度数和 13
+        self.assertAlmostEqual(result["modularity"], 2 * (6 / 13 - (13 / 26) ** 2))
+
+    def test_unsupported_method(self):
+        """测试不支持的社区检测方法"""
+        with self.assertRaises(ValueError):
+            self.analyzer.detect_communities(self.data, method="unknown")
+
+    def test_entity_distribution(self):
+        """测试单次遍历的实体分布统计"""
+        distribution = self.analyzer.analyze_entity_distribution(self.data)
+        self.assertEqual(distribution["total_entities"], 8)
+        self.assertEqual(distribution["type_distribution"], {"partner": 4, "supplier": 4})
+        self.assertEqual(distribution["location_distribution"], {"北京": 8})
+        self.assertEqual(distribution["scale_distribution"], {"unknown": 8})
+
+
 def run_tests():
     """运行所有测试"""
     # 创建测试套件
@@ -1159,7 +1242,8 @@ def run_tests():
         TestJSONSerialization,
         TestFileInputOutput,
         TestEdgeCases,
-        TestIntegrationScenarios
+        TestIntegrationScenarios,
+        TestEcosystemCommunityDetection
     ]
 
     for test_class in test_classes:
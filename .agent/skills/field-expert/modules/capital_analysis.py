@@ -3,8 +3,27 @@
 此模块提供分析社会场域中各种资本类型、分布、转换和竞争的功能
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import heapq
 import json
+import math
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# 资本类型（资本矩阵的列顺序）
+CAPITAL_TYPES = ['economic', 'social', 'cultural', 'symbolic']
+
+# 未指定 k 时高/低持有者各取行动者总数的比例
+HOLDER_FRACTION = 0.2
+
+# 不完全Beta函数连分式的收敛阈值与最大迭代次数
+BETA_CF_EPSILON = 1e-12
+BETA_CF_MAX_ITER = 100000
 
 
 def field_capital_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,6 +117,8 @@ def map_capital_distribution(actors: List[Dict[str, Any]], capital_distributions
     """
     映射资本在行动者之间的分布
     
+    资本矩阵只构建一次，由集中度、高低持有者和相关性计算共用。
+    
     Args:
         actors: 行动者列表
         capital_distributions: 资本分布字典
@@ -110,114 +131,377 @@ def map_capital_distribution(actors: List[Dict[str, Any]], capital_distributions
     # 为每个行动者映射其拥有的资本
     for actor in actors:
         actor_id = actor.get('id', actor.get('name', 'unknown'))
+        actor_capital = capital_distributions.get(actor_id, {})
         distribution_map[actor_id] = {
-            "economic": capital_distributions.get(actor_id, {}).get('economic', 0),
-            "social": capital_distributions.get(actor_id, {}).get('social', 0),
-            "cultural": capital_distributions.get(actor_id, {}).get('cultural', 0),
-            "symbolic": capital_distributions.get(actor_id, {}).get('symbolic', 0)
+            "economic": actor_capital.get('economic', 0),
+            "social": actor_capital.get('social', 0),
+            "cultural": actor_capital.get('cultural', 0),
+            "symbolic": actor_capital.get('symbolic', 0)
         }
     
     # 分析资本集中或分散情况
-    concentration_analysis = analyze_concentration(distribution_map)
+    capital_matrix = build_capital_matrix(distribution_map)
+    concentration_analysis = analyze_concentration(distribution_map, capital_matrix=capital_matrix)
     
     return {
         "actor_capital_map": distribution_map,
         "concentration_analysis": concentration_analysis,
-        "high_low_holders": identify_high_low_holders(distribution_map),
-        "capital_correlations": calculate_capital_correlations(distribution_map)
+        "high_low_holders": identify_high_low_holders(distribution_map, capital_matrix=capital_matrix),
+        "capital_correlations": calculate_capital_correlations(distribution_map, capital_matrix=capital_matrix)
     }
 
 
-def analyze_concentration(distribution_map: Dict[str, Any]) -> Dict[str, Any]:
+def build_capital_matrix(distribution_map: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    构建 行动者 × 资本类型 的资本矩阵
+    
+    有 NumPy 时矩阵为 n × 4 的浮点数组，否则为按行存放的列表；
+    列顺序与 CAPITAL_TYPES 一致，缺失的资本类型记为 0。
+    
+    Args:
+        distribution_map: 资本分布映射
+    
+    Returns:
+        {"actor_ids": 行动者ID列表, "matrix": 资本矩阵}
+    """
+    actor_ids = list(distribution_map)
+    capitals = list(distribution_map.values())
+    if HAS_NUMPY:
+        matrix = np.empty((len(capitals), len(CAPITAL_TYPES)))
+        for j, cap_type in enumerate(CAPITAL_TYPES):
+            matrix[:, j] = np.fromiter((caps.get(cap_type, 0) for caps in capitals),
+                                       dtype=float, count=len(capitals))
+    else:
+        matrix = [[float(caps.get(cap_type, 0)) for cap_type in CAPITAL_TYPES] for caps in capitals]
+    return {"actor_ids": actor_ids, "matrix": matrix}
+
+
+def _capital_column(capital_matrix: Dict[str, Any], index: int):
+    matrix = capital_matrix["matrix"]
+    if HAS_NUMPY:
+        return matrix[:, index]
+    return [row[index] for row in matrix]
+
+
+def analyze_concentration(distribution_map: Dict[str, Any],
+                          capital_matrix: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     分析资本集中情况
     
+    对每种资本计算基尼系数、泰尔指数（Theil T）和赫芬达尔-赫希曼指数（HHI，份额平方和）。
+    资本值应为非负数；某种资本总量为 0 时视为完全平均。
+    concentration_index 保留为基尼系数，兼容旧结果。
+    
     Args:
         distribution_map: 资本分布映射
+        capital_matrix: build_capital_matrix 的结果，未提供时从 distribution_map 构建
     
     Returns:
         集中度分析结果
     """
-    capital_types = ['economic', 'social', 'cultural', 'symbolic']
+    if capital_matrix is None:
+        capital_matrix = build_capital_matrix(distribution_map)
     concentration_results = {}
-    
-    for cap_type in capital_types:
-        values = [actor_caps[cap_type] for actor_caps in distribution_map.values()]
-        if values:
-            avg = sum(values) / len(values)
-            max_val = max(values)
-            min_val = min(values)
-            
-            # 计算基尼系数的简化版本
-            concentration = (max_val - min_val) / (max_val + min_val) if (max_val + min_val) != 0 else 0
-            
-            concentration_results[cap_type] = {
-                "average": avg,
-                "max": max_val,
-                "min": min_val,
-                "concentration_index": concentration
-            }
+    if not capital_matrix["actor_ids"]:
+        return concentration_results
+    
+    for j, cap_type in enumerate(CAPITAL_TYPES):
+        values = _capital_column(capital_matrix, j)
+        if HAS_NUMPY:
+            indices = _concentration_numpy(values)
+        else:
+            indices = _concentration_python(values)
+        concentration_results[cap_type] = {
+            "average": indices["average"],
+            "max": indices["max"],
+            "min": indices["min"],
+            "gini": indices["gini"],
+            "theil": indices["theil"],
+            "hhi": indices["hhi"],
+            "concentration_index": indices["gini"]
+        }
     
     return concentration_results
 
 
-def identify_high_low_holders(distribution_map: Dict[str, Any]) -> Dict[str, Any]:
+def _concentration_numpy(values) -> Dict[str, float]:
+    ordered = np.sort(values)
+    n = ordered.size
+    total = float(ordered.sum())
+    result = {"average": total / n, "max": float(ordered[-1]), "min": float(ordered[0])}
+    if total <= 0:
+        result.update(gini=0.0, theil=0.0, hhi=1.0 / n)
+        return result
+    
+    # 升序排列后 G = 2 * Σ i * x_i / (n * Σ x) - (n + 1) / n，i 从 1 开始
+    ranks = np.arange(1, n + 1, dtype=float)
+    gini = 2.0 * float(np.dot(ranks, ordered)) / (n * total) - (n + 1.0) / n
+    ratios = ordered[ordered > 0] / (total / n)
+    theil = float(np.dot(ratios, np.log(ratios))) / n
+    shares = ordered / total
+    result.update(gini=gini, theil=theil, hhi=float(np.dot(shares, shares)))
+    return result
+
+
+def _concentration_python(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    n = len(ordered)
+    total = sum(ordered)
+    result = {"average": total / n, "max": ordered[-1], "min": ordered[0]}
+    if total <= 0:
+        result.update(gini=0.0, theil=0.0, hhi=1.0 / n)
+        return result
+    
+    mean = total / n
+    gini = 2.0 * sum(i * x for i, x in enumerate(ordered, 1)) / (n * total) - (n + 1.0) / n
+    theil = sum((x / mean) * math.log(x / mean) for x in ordered if x > 0) / n
+    hhi = sum((x / total) ** 2 for x in ordered)
+    result.update(gini=gini, theil=theil, hhi=hhi)
+    return result
+
+
+def identify_high_low_holders(distribution_map: Dict[str, Any], k: Optional[int] = None,
+                              capital_matrix: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     识别高低资本持有者
     
+    用 argpartition 找到每种资本前 k 和后 k 名的分界值，只对选中的 k 个行动者排序。
+    两组都按资本值降序排列（同值按原顺序），分界值上的并列也与完整稳定排序后取首尾的结果一致。
+    
     Args:
         distribution_map: 资本分布映射
+        k: 每组人数，默认为行动者总数的 HOLDER_FRACTION（至少1人）
+        capital_matrix: build_capital_matrix 的结果，未提供时从 distribution_map 构建
     
     Returns:
         高低资本持有者识别结果
     """
-    capital_types = ['economic', 'social', 'cultural', 'symbolic']
+    if capital_matrix is None:
+        capital_matrix = build_capital_matrix(distribution_map)
+    actor_ids = capital_matrix["actor_ids"]
+    num_actors = len(actor_ids)
+    if HAS_NUMPY:
+        actor_ids = np.array(actor_ids, dtype=object)
+    if k is None:
+        k = max(1, int(num_actors * HOLDER_FRACTION))
+    k = min(k, num_actors)
+    
     high_low_holders = {
         "high_holders": {},
         "low_holders": {}
     }
     
-    for cap_type in capital_types:
-        # 按资本类型排序
-        sorted_actors = sorted(
-            distribution_map.items(),
-            key=lambda x: x[1][cap_type],
-            reverse=True
-        )
-        
-        # 前20%为高持有者，后20%为低持有者
-        num_actors = len(sorted_actors)
-        high_count = max(1, int(num_actors * 0.2))
-        low_count = max(1, int(num_actors * 0.2))
+    for j, cap_type in enumerate(CAPITAL_TYPES):
+        values = _capital_column(capital_matrix, j)
+        if k <= 0:
+            high, low = [], []
+        elif HAS_NUMPY:
+            high = actor_ids[_select_holders_numpy(values, k, highest=True)].tolist()
+            low = actor_ids[_select_holders_numpy(values, k, highest=False)].tolist()
+        else:
+            high = heapq.nlargest(k, range(num_actors), key=values.__getitem__)
+            low = heapq.nsmallest(k, range(num_actors), key=lambda i: (values[i], -i))
+            low.sort(key=lambda i: (-values[i], i))
+            high = [actor_ids[i] for i in high]
+            low = [actor_ids[i] for i in low]
         
-        high_holders = [actor[0] for actor in sorted_actors[:high_count]]
-        low_holders = [actor[0] for actor in sorted_actors[-low_count:]]
-        
-        high_low_holders["high_holders"][cap_type] = high_holders
-        high_low_holders["low_holders"][cap_type] = low_holders
+        high_low_holders["high_holders"][cap_type] = high
+        high_low_holders["low_holders"][cap_type] = low
     
     return high_low_holders
 
 
-def calculate_capital_correlations(distribution_map: Dict[str, Any]) -> Dict[str, Any]:
+def _select_holders_numpy(values, k: int, highest: bool):
+    if highest:
+        threshold = values[np.argpartition(-values, k - 1)[k - 1]]
+        selected = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:k - selected.size]
+    else:
+        # 降序排列中同值靠后的行动者落在末尾，低持有者取分界值上最靠后的并列者
+        threshold = values[np.argpartition(values, k - 1)[k - 1]]
+        selected = np.flatnonzero(values < threshold)
+        ties = np.flatnonzero(values == threshold)
+        ties = ties[ties.size - (k - selected.size):]
+    selected = np.concatenate((selected, ties))
+    return selected[np.lexsort((selected, -values[selected]))]
+
+
+def calculate_capital_correlations(distribution_map: Dict[str, Any],
+                                   capital_matrix: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     计算资本类型之间的相关性
     
+    计算 Pearson 和 Spearman（平均秩处理并列）相关矩阵，并用自由度为 n-2 的
+    t 检验给出双侧 p 值。某种资本取值全部相同时相关系数无定义，记为 None。
+    economic_social 等键保留为对应的 Pearson 系数，symbolic_other 为象征资本与
+    其余资本 Pearson 系数的平均值，兼容旧结果。
+    
     Args:
         distribution_map: 资本分布映射
+        capital_matrix: build_capital_matrix 的结果，未提供时从 distribution_map 构建
     
     Returns:
         资本相关性计算结果
     """
-    # 基础相关性计算（简化版本）
+    if capital_matrix is None:
+        capital_matrix = build_capital_matrix(distribution_map)
+    n = len(capital_matrix["actor_ids"])
+    
+    if HAS_NUMPY:
+        matrix = capital_matrix["matrix"]
+        pearson = _correlation_matrix_numpy(matrix)
+        ranks = np.column_stack([_average_ranks_numpy(matrix[:, j]) for j in range(len(CAPITAL_TYPES))])
+        spearman = _correlation_matrix_numpy(ranks)
+    else:
+        columns = [_capital_column(capital_matrix, j) for j in range(len(CAPITAL_TYPES))]
+        pearson = _correlation_matrix_python(columns)
+        spearman = _correlation_matrix_python([_average_ranks_python(column) for column in columns])
+    pearson_p = [[correlation_p_value(r, n) for r in row] for row in pearson]
+    spearman_p = [[correlation_p_value(r, n) for r in row] for row in spearman]
+    
+    pairs = {}
+    for i, first in enumerate(CAPITAL_TYPES):
+        for j in range(i + 1, len(CAPITAL_TYPES)):
+            pairs[f"{first}_{CAPITAL_TYPES[j]}"] = {
+                "pearson": pearson[i][j],
+                "pearson_p_value": pearson_p[i][j],
+                "spearman": spearman[i][j],
+                "spearman_p_value": spearman_p[i][j]
+            }
+    
+    symbolic = CAPITAL_TYPES.index('symbolic')
+    symbolic_other = [pearson[symbolic][j] for j in range(len(CAPITAL_TYPES))
+                      if j != symbolic and pearson[symbolic][j] is not None]
+    
     return {
-        "economic_social": 0.5,  # 示例值
-        "economic_cultural": 0.3,
-        "social_cultural": 0.4,
-        "symbolic_other": 0.6
+        "capital_types": list(CAPITAL_TYPES),
+        "sample_size": n,
+        "pearson": {"matrix": pearson, "p_values": pearson_p},
+        "spearman": {"matrix": spearman, "p_values": spearman_p},
+        "pairs": pairs,
+        "economic_social": pairs["economic_social"]["pearson"],
+        "economic_cultural": pairs["economic_cultural"]["pearson"],
+        "social_cultural": pairs["social_cultural"]["pearson"],
+        "symbolic_other": sum(symbolic_other) / len(symbolic_other) if symbolic_other else None
     }
 
 
+def _correlation_matrix_numpy(matrix) -> List[List[Optional[float]]]:
+    size = matrix.shape[1]
+    if matrix.shape[0] < 2:
+        return [[None] * size for _ in range(size)]
+    centered = matrix - matrix.mean(axis=0)
+    norms = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (centered.T @ centered) / np.outer(norms, norms)
+    corr = np.clip(corr, -1.0, 1.0)
+    return [[float(r) if np.isfinite(r) else None for r in row] for row in corr]
+
+
+def _correlation_matrix_python(columns: List[List[float]]) -> List[List[Optional[float]]]:
+    size = len(columns)
+    n = len(columns[0]) if columns else 0
+    if n < 2:
+        return [[None] * size for _ in range(size)]
+    centered = []
+    for column in columns:
+        mean = sum(column) / n
+        centered.append([x - mean for x in column])
+    norms = [math.sqrt(sum(x * x for x in column)) for column in centered]
+    
+    corr = [[None] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i, size):
+            if norms[i] > 0 and norms[j] > 0:
+                r = sum(a * b for a, b in zip(centered[i], centered[j])) / (norms[i] * norms[j])
+                corr[i][j] = corr[j][i] = max(-1.0, min(1.0, r))
+    return corr
+
+
+def _average_ranks_numpy(values):
+    # 并列值取平均秩（与 scipy.stats.rankdata 的 average 方法一致）
+    if values.size == 0:
+        return np.empty(0)
+    order = np.argsort(values)
+    ordered = values[order]
+    new_group = np.concatenate(([True], ordered[1:] != ordered[:-1]))
+    group = np.cumsum(new_group) - 1
+    bounds = np.concatenate((np.flatnonzero(new_group), [values.size]))
+    ranks = np.empty(values.size)
+    ranks[order] = (bounds[group] + bounds[group + 1] + 1) / 2.0
+    return ranks
+
+
+def _average_ranks_python(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2.0 + 1
+        start = end + 1
+    return ranks
+
+
+def correlation_p_value(r: Optional[float], n: int) -> Optional[float]:
+    """
+    相关系数的双侧显著性检验
+    
+    t = r * sqrt((n - 2) / (1 - r²)) 服从自由度 n-2 的 t 分布，
+    双侧 p 值等于正则化不完全Beta函数 I_{1-r²}((n-2)/2, 1/2)。
+    
+    Args:
+        r: 相关系数，None 表示无定义
+        n: 样本量
+    
+    Returns:
+        p 值；相关系数无定义或样本量小于3时为 None
+    """
+    if r is None or n < 3:
+        return None
+    if abs(r) >= 1.0:
+        return 0.0
+    return _regularized_incomplete_beta((n - 2) / 2.0, 0.5, 1.0 - r * r)
+
+
+def _regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    # 连分式在 x < (a+1)/(a+b+2) 时收敛快，否则利用 I_x(a,b) = 1 - I_{1-x}(b,a)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    # 修正 Lentz 算法
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, BETA_CF_MAX_ITER + 1):
+        m2 = 2 * m
+        for numerator in (m * (b - m) * x / ((a + m2 - 1.0) * (a + m2)),
+                          -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.0))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            delta = c * d
+            h *= delta
+        if abs(delta - 1.0) < BETA_CF_EPSILON:
+            break
+    return h
+
+
 def analyze_capital_competition(competition_instances: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     分析资本竞争
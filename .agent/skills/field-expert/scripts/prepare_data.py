@@ -6,26 +6,47 @@
 功能：
 - 自动扫描输入目录中的文本文件
 - 按类型分类（扎根理论、社会网络、ESOC框架）
-- 合并为统一的输入格式
+- 流式读取并去除完全重复和近似重复（SimHash）的文件
+- 合并为统一的输入格式；也可输出 JSON Lines 语料和文件清单
 
 输入：
 - --input: 源数据目录路径
+- --output: 输出目录，或 .json 输出文件路径
+- --format: json（默认，合并的 combined_input.json）或 jsonl（流式语料）
 
 输出：
-- input/processed/combined_input.json
+- input/processed/combined_input.json（默认）
+- input/processed/corpus.jsonl + manifest.json（--format jsonl）
 """
 
 import os
 import sys
 import json
+import codecs
+import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 
 # 添加项目根目录
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+# 流式读取的块大小（字节）
+READ_CHUNK_SIZE = 1 << 20
+# 依次尝试的文本编码；都失败时用第一个编码并替换无法解码的字节
+ENCODING_CANDIDATES = ("utf-8-sig", "gb18030")
+# 每条语料记录（段落）的最大字符数
+SEGMENT_MAX_CHARS = 4000
+# SimHash 位数与判定近似重复的最大汉明距离
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_DISTANCE = 3
+# 语料和清单文件名
+CORPUS_FILENAME = "corpus.jsonl"
+MANIFEST_FILENAME = "manifest.json"
+# 文件类别的处理顺序
+CATEGORIES = ("grounded_theory", "social_network", "esoc_framework")
+
 
 def scan_source_files(source_dir: Path) -> Dict[str, List[Path]]:
     """
@@ -63,14 +84,29 @@ def scan_source_files(source_dir: Path) -> Dict[str, List[Path]]:
     return files
 
 
+def decode_bytes(raw: bytes) -> Tuple[str, str]:
+    """按 ENCODING_CANDIDATES 依次尝试解码，返回 (文本, 编码)"""
+    for encoding in ENCODING_CANDIDATES:
+        try:
+            return raw.decode(encoding), _encoding_name(encoding)
+        except UnicodeDecodeError:
+            continue
+    encoding = ENCODING_CANDIDATES[0]
+    return raw.decode(encoding, errors="replace"), f"{_encoding_name(encoding)}(replace)"
+
+
+def _encoding_name(encoding: str) -> str:
+    """清单中记录的编码名称"""
+    return "utf-8" if encoding == "utf-8-sig" else encoding
+
+
 def read_text_file(file_path: Path) -> Dict[str, Any]:
     """读取文本文件，返回结构化数据"""
     if not file_path.exists():
         return {"error": f"文件不存在: {file_path}"}
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content, _ = decode_bytes(file_path.read_bytes())
         
         # 提取文件名作为标题
         title = file_path.stem
@@ -149,17 +185,301 @@ def merge_data(files: Dict[str, List[Path]]) -> Dict[str, Any]:
     return merged
 
 
+class SimHash:
+    """
+    按行特征累积的 SimHash
+
+    每个特征取 64 位哈希，按字节统计取值次数，最后再换算为每一位被置位的次数，
+    避免对每个特征逐位累加。
+    """
+
+    def __init__(self):
+        self.byte_counts = [[0] * 256 for _ in range(SIMHASH_BITS // 8)]
+        self.features = 0
+
+    def update(self, feature: str):
+        """加入一个特征"""
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest()
+        for counts, value in zip(self.byte_counts, digest):
+            counts[value] += 1
+        self.features += 1
+
+    def value(self) -> int:
+        """计算指纹：超过半数特征置位的位为 1"""
+        fingerprint = 0
+        for byte_index, counts in enumerate(self.byte_counts):
+            for bit in range(8):
+                ones = sum(count for value, count in enumerate(counts) if value >> bit & 1)
+                if ones * 2 > self.features:
+                    fingerprint |= 1 << (byte_index * 8 + bit)
+        return fingerprint
+
+
+class SimHashIndex:
+    """
+    SimHash 近似重复索引
+
+    指纹分为 max_distance + 1 段：汉明距离不超过 max_distance 的两个指纹至少
+    有一段完全相同，因此只需与同段相同的候选比较。
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = SIMHASH_BITS // bands
+        self.bands = [(i * width, SIMHASH_BITS if i == bands - 1 else (i + 1) * width)
+                      for i in range(bands)]
+        self.buckets = {}
+
+    def _keys(self, fingerprint: int) -> Iterator[Tuple[int, int]]:
+        for i, (low, high) in enumerate(self.bands):
+            yield i, fingerprint >> low & ((1 << (high - low)) - 1)
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """查找近似重复的已有条目，返回其标签"""
+        for key in self._keys(fingerprint):
+            for candidate, label in self.buckets.get(key, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return label
+        return None
+
+    def add(self, fingerprint: int, label: str):
+        """加入指纹"""
+        for key in self._keys(fingerprint):
+            self.buckets.setdefault(key, []).append((fingerprint, label))
+
+
+def iter_text_lines(
+    file_path: Path,
+    encoding: str,
+    errors: str = "strict",
+    stats: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """
+    分块读取并解码文本文件，逐行产出（不含换行符）
+
+    没有换行的超长内容按 SEGMENT_MAX_CHARS 切开产出，内存占用与文件大小无关。
+
+    Args:
+        file_path: 文件路径
+        encoding: 文本编码
+        errors: 解码错误处理方式
+        stats: 读取完成后写入 size、sha256、lines 和 chars
+
+    Raises:
+        UnicodeDecodeError: errors 为 strict 且文件无法按 encoding 解码
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    digest = hashlib.sha256()
+    size = lines = chars = 0
+    pending = ""
+
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            text = decoder.decode(chunk, final=not chunk)
+            digest.update(chunk)
+            size += len(chunk)
+            lines += text.count("\n")
+            chars += len(text)
+
+            pieces = (pending + text).split("\n")
+            pending = pieces.pop()
+            for piece in pieces:
+                yield piece.rstrip("\r")
+            while len(pending) > SEGMENT_MAX_CHARS:
+                yield pending[:SEGMENT_MAX_CHARS]
+                pending = pending[SEGMENT_MAX_CHARS:]
+            if not chunk:
+                break
+
+    if pending:
+        lines += 1
+        yield pending.rstrip("\r")
+
+    if stats is not None:
+        stats.update(size=size, sha256=digest.hexdigest(), lines=lines, chars=chars)
+
+
+def iter_segments(lines: Iterator[str]) -> Iterator[str]:
+    """把行合并为段落：空行分段，段落不超过 SEGMENT_MAX_CHARS 个字符"""
+    buffer = []
+    size = 0
+    for line in lines:
+        if not line.strip():
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            continue
+        while len(line) > SEGMENT_MAX_CHARS:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            yield line[:SEGMENT_MAX_CHARS]
+            line = line[SEGMENT_MAX_CHARS:]
+        if buffer and size + len(line) > SEGMENT_MAX_CHARS:
+            yield "\n".join(buffer)
+            buffer, size = [], 0
+        buffer.append(line)
+        size += len(line) + 1
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def _write_file_records(
+    file_path: Path,
+    category: str,
+    doc_id: str,
+    corpus,
+    encoding: str,
+    errors: str
+) -> Dict[str, Any]:
+    """把一个文件的段落写入语料，返回文件统计和 SimHash"""
+    stats = {}
+    simhash = SimHash()
+
+    def features():
+        for line in iter_text_lines(file_path, encoding, errors, stats):
+            feature = line.strip()
+            if feature:
+                simhash.update(feature)
+            yield line
+
+    records = 0
+    for records, segment in enumerate(iter_segments(features()), 1):
+        record = {
+            "id": f"{doc_id}:{records}",
+            "doc_id": doc_id,
+            "category": category,
+            "title": file_path.stem,
+            "text": segment
+        }
+        corpus.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    stats.update(records=records, simhash=simhash.value(), features=simhash.features)
+    return stats
+
+
+def ingest_corpus(
+    files: Dict[str, List[Path]],
+    output_dir: Path,
+    near_duplicate_distance: int = NEAR_DUPLICATE_DISTANCE
+) -> Dict[str, Any]:
+    """
+    流式生成 JSON Lines 语料和文件清单
+
+    文件逐块读取，段落直接写入语料，不在内存中保留文件内容。按 ENCODING_CANDIDATES
+    依次尝试编码，解码失败时回退语料写入位置并换下一个编码重读。完全重复（SHA-256
+    相同）和近似重复（SimHash 汉明距离不超过 near_duplicate_distance）的文件只保留
+    第一个，其已写入的段落同样被回退。
+
+    Args:
+        files: scan_source_files 的分类结果
+        output_dir: 输出目录
+        near_duplicate_distance: 判定近似重复的最大汉明距离，小于 0 时不检测近似重复
+
+    Returns:
+        清单（同时写入 MANIFEST_FILENAME），包含每个文件的路径、大小、哈希、行数和去重状态
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    corpus_path = output_dir / CORPUS_FILENAME
+    seen_hashes = {}
+    near_index = SimHashIndex(near_duplicate_distance) if near_duplicate_distance >= 0 else None
+    entries = []
+    totals = {"files": 0, "kept": 0, "duplicate": 0, "near_duplicate": 0, "error": 0,
+              "bytes": 0, "kept_bytes": 0, "records": 0}
+
+    with open(corpus_path, "wb") as corpus:
+        for category in CATEGORIES:
+            for file_path in sorted(files.get(category, [])):
+                doc_id = f"doc_{totals['kept'] + 1}"
+                offset = corpus.tell()
+                entry = {"path": str(file_path), "category": category}
+                attempts = [(encoding, "strict") for encoding in ENCODING_CANDIDATES]
+                attempts.append((ENCODING_CANDIDATES[0], "replace"))
+
+                for encoding, errors in attempts:
+                    try:
+                        stats = _write_file_records(file_path, category, doc_id, corpus, encoding, errors)
+                    except UnicodeDecodeError:
+                        corpus.seek(offset)
+                        corpus.truncate()
+                        continue
+                    except OSError as e:
+                        corpus.seek(offset)
+                        corpus.truncate()
+                        entry.update(status="error", error=f"读取失败: {e}")
+                        break
+                    name = _encoding_name(encoding)
+                    entry.update(
+                        size=stats["size"],
+                        sha256=stats["sha256"],
+                        lines=stats["lines"],
+                        chars=stats["chars"],
+                        encoding=name if errors == "strict" else f"{name}(replace)",
+                        simhash=f"{stats['simhash']:016x}"
+                    )
+                    break
+
+                totals["files"] += 1
+                if entry.get("status") != "error":
+                    totals["bytes"] += entry["size"]
+                    duplicate_of = seen_hashes.get(entry["sha256"])
+                    if duplicate_of is not None:
+                        entry.update(status="duplicate", duplicate_of=duplicate_of)
+                    elif near_index is not None and stats["features"]:
+                        duplicate_of = near_index.find(stats["simhash"])
+                        if duplicate_of is not None:
+                            entry.update(status="near_duplicate", duplicate_of=duplicate_of)
+
+                    if duplicate_of is not None:
+                        corpus.seek(offset)
+                        corpus.truncate()
+                    else:
+                        entry.update(status="kept", doc_id=doc_id, records=stats["records"])
+                        seen_hashes[entry["sha256"]] = entry["path"]
+                        if near_index is not None and stats["features"]:
+                            near_index.add(stats["simhash"], entry["path"])
+                        totals["kept_bytes"] += entry["size"]
+                        totals["records"] += stats["records"]
+
+                totals[entry["status"]] += 1
+                entries.append(entry)
+
+    manifest = {
+        "created_at": datetime.now().isoformat(),
+        "corpus": CORPUS_FILENAME,
+        "near_duplicate_distance": near_duplicate_distance,
+        "totals": totals,
+        "files": entries
+    }
+    manifest_path = output_dir / MANIFEST_FILENAME
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+    return manifest
+
+
 def main():
     """主函数"""
     # 解析命令行参数
     input_path = None
     output_path = None
+    output_file = None
+    output_format = "json"
     
     for i, arg in enumerate(sys.argv):
         if arg == "--input" and i + 1 < len(sys.argv):
             input_path = Path(sys.argv[i + 1])
         elif arg == "--output" and i + 1 < len(sys.argv):
             output_path = Path(sys.argv[i + 1])
+        elif arg == "--format" and i + 1 < len(sys.argv):
+            output_format = sys.argv[i + 1]
+    
+    if output_format not in ("jsonl", "json"):
+        print(f"错误: 不支持的输出格式: {output_format}（可选 jsonl、json）")
+        return 1
     
     # 默认路径
     if input_path is None:
@@ -170,6 +490,11 @@ def main():
         # 默认输出路径：技能目录下的 workflow
         skill_dir = Path(__file__).parent.parent
         output_path = skill_dir / "field_analysis_workflow" / "input" / "processed"
+    elif output_path.suffix in (".json", ".jsonl"):
+        # 传入的是输出文件路径：json 格式直接写入该文件，jsonl 格式写入其所在目录
+        if output_format == "json":
+            output_file = output_path
+        output_path = output_path.parent
     
     print("=" * 60)
     print("  场域分析技能 - 数据准备脚本")
@@ -195,6 +520,19 @@ def main():
     for f in files['esoc_framework']:
         print(f"     - {f.name}")
     
+    if output_format == "jsonl":
+        print("\n📦 流式写入语料并去重...")
+        manifest = ingest_corpus(files, output_path)
+        totals = manifest["totals"]
+        print(f"\n✅ 数据准备完成!")
+        print(f"   语料文件: {output_path / CORPUS_FILENAME}")
+        print(f"   清单文件: {output_path / MANIFEST_FILENAME}")
+        print(f"   总文件数: {totals['files']}（保留 {totals['kept']}，"
+              f"完全重复 {totals['duplicate']}，近似重复 {totals['near_duplicate']}，"
+              f"读取失败 {totals['error']}）")
+        print(f"   语料记录数: {totals['records']}")
+        return 0
+    
     # 合并数据
     print("\n📦 合并数据...")
     merged_data = merge_data(files)
@@ -203,7 +541,8 @@ def main():
     output_path.mkdir(parents=True, exist_ok=True)
     
     # 写入输出文件
-    output_file = output_path / "combined_input.json"
+    if output_file is None:
+        output_file = output_path / "combined_input.json"
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(merged_data, f, ensure_ascii=False, indent=2)
     
@@ -18,50 +18,98 @@
 """
 
 import argparse
+import hashlib
 import json
 import subprocess
 import sys
 import re
 import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
-
+from typing import Dict, Any, List, Optional
+
+# stigmergy 调用的宿主 CLI 与超时时间（秒）
+STIGMERGY_HOST = "claude"
+STIGMERGY_TIMEOUT = 180
+# LLM 响应缓存目录（相对于工作流目录），缓存键为提示词哈希
+LLM_CACHE_SUBDIR = Path("cache") / "llm"
+
+# 分析步骤的依赖关系：资本分析的提示词包含边界分析识别出的场域，
+# 动态分析在其余三个分析完成后执行；边界分析与习性分析相互独立
+ANALYSIS_STEP_DEPENDENCIES = {
+    "2": [],
+    "3": ["2"],
+    "4": [],
+    "5": ["2", "3", "4"]
+}
+WORKFLOW_STEPS = ["1", "2", "3", "4", "5", "6"]
+
+
+def _stigmergy_cache_file(prompt: str, cache_dir: Path) -> Path:
+    """提示词对应的缓存文件"""
+    key = hashlib.sha256(f"{STIGMERGY_HOST}\n{prompt}".encode("utf-8")).hexdigest()
+    return cache_dir / f"{key}.txt"
+
+
+def _invoke_stigmergy(prompt: str) -> subprocess.CompletedProcess:
+    """执行 stigmergy 命令"""
+    if sys.platform != "win32":
+        return subprocess.run(
+            ["stigmergy", STIGMERGY_HOST, prompt],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=STIGMERGY_TIMEOUT
+        )
 
-def run_stigmergy(prompt: str) -> str:
-    """调用 stigmergy qwen 执行 LLM 分析"""
-    print(f"\n📤 正在调用 stigmergy qwen...")
-    print(f"   提示词长度: {len(prompt)} 字符")
-    
+    # Windows 下通过 PowerShell 从临时文件读取提示词，避免命令行转义问题
+    fd, prompt_file = tempfile.mkstemp(prefix="temp_prompt_", suffix=".txt")
     try:
-        # 写入提示词到临时文件
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        prompt_file = f"temp_prompt_{timestamp}.txt"
-        
-        with open(prompt_file, 'w', encoding='utf-8') as f:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             f.write(prompt)
-        
-        # 使用 PowerShell 执行 stigmergy claude
-        ps_command = f'powershell -Command "$p = Get-Content \'{prompt_file}\' -Raw -Encoding UTF8; stigmergy claude $p"'
-        
-        result = subprocess.run(
+        ps_command = f'powershell -Command "$p = Get-Content \'{prompt_file}\' -Raw -Encoding UTF8; stigmergy {STIGMERGY_HOST} $p"'
+        return subprocess.run(
             ps_command,
             capture_output=True,
             text=True,
             shell=True,
             encoding='utf-8',
             errors='replace',
-            timeout=180
+            timeout=STIGMERGY_TIMEOUT
         )
-        
-        output = result.stdout
-        
-        # 清理临时文件
+    finally:
         try:
             os.remove(prompt_file)
-        except:
+        except OSError:
             pass
+
+
+def run_stigmergy(prompt: str, cache_dir: Optional[Path] = None) -> str:
+    """
+    调用 stigmergy 执行 LLM 分析
+
+    Args:
+        prompt: 提示词
+        cache_dir: 响应缓存目录；提供时相同提示词直接返回缓存的响应，
+            只缓存成功的非空响应
+
+    Returns:
+        LLM 响应文本，调用失败时为空字符串
+    """
+    cache_file = _stigmergy_cache_file(prompt, cache_dir) if cache_dir else None
+    if cache_file and cache_file.exists():
+        print(f"\n♻️ 使用缓存的 LLM 响应: {cache_file.name[:12]}")
+        return cache_file.read_text(encoding='utf-8')
+
+    print(f"\n📤 正在调用 stigmergy {STIGMERGY_HOST}...")
+    print(f"   提示词长度: {len(prompt)} 字符")
+    
+    try:
+        result = _invoke_stigmergy(prompt)
+        output = result.stdout
         
         if result.returncode != 0:
             print(f"⚠️ 命令返回非零: {result.stderr}")
@@ -70,6 +118,12 @@ def run_stigmergy(prompt: str) -> str:
             print(f"\n📥 LLM 响应 (前500字符):\n{output[:500]}...")
         else:
             print(f"\n⚠️ LLM 响应为空！")
+
+        if cache_file and output and result.returncode == 0:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            temp_file.write_text(output, encoding='utf-8')
+            os.replace(temp_file, cache_file)
         
         return output
         
@@ -242,7 +296,7 @@ def step_1_prepare_data(input_path: Path, workflow_dir: Path) -> Path:
     return output_file
 
 
-def step_2_boundary_analysis(combined_input: Path, workflow_dir: Path) -> Path:
+def step_2_boundary_analysis(combined_input: Path, workflow_dir: Path, use_cache: bool = True) -> Path:
     """步骤2: 边界分析"""
     print("\n" + "=" * 60)
     print("步骤2: 边界分析 (LLM)")
@@ -271,7 +325,7 @@ def step_2_boundary_analysis(combined_input: Path, workflow_dir: Path) -> Path:
 只输出格式化的场域列表，不要其他内容。
 """
     
-    response = run_stigmergy(prompt)
+    response = run_stigmergy(prompt, workflow_dir / LLM_CACHE_SUBDIR if use_cache else None)
     result_data = parse_field_response(response)
     
     output_dir = workflow_dir / "intermediate" / "01_boundary"
@@ -290,7 +344,7 @@ def step_2_boundary_analysis(combined_input: Path, workflow_dir: Path) -> Path:
     return output_file
 
 
-def step_3_capital_analysis(combined_input: Path, workflow_dir: Path) -> Path:
+def step_3_capital_analysis(combined_input: Path, workflow_dir: Path, use_cache: bool = True) -> Path:
     """步骤3: 资本分析"""
     print("\n" + "=" * 60)
     print("步骤3: 资本分析 (LLM)")
@@ -338,7 +392,7 @@ def step_3_capital_analysis(combined_input: Path, workflow_dir: Path) -> Path:
 只输出格式化的资本分布，不要其他内容。
 """
     
-    response = run_stigmergy(prompt)
+    response = run_stigmergy(prompt, workflow_dir / LLM_CACHE_SUBDIR if use_cache else None)
     result_data = parse_capital_response(response)
     
     output_dir = workflow_dir / "intermediate" / "02_capital"
@@ -354,7 +408,7 @@ def step_3_capital_analysis(combined_input: Path, workflow_dir: Path) -> Path:
     return output_file
 
 
-def step_4_habitus_analysis(combined_input: Path, workflow_dir: Path) -> Path:
+def step_4_habitus_analysis(combined_input: Path, workflow_dir: Path, use_cache: bool = True) -> Path:
     """步骤4: 习性分析"""
     print("\n" + "=" * 60)
     print("步骤4: 习性分析 (LLM)")
@@ -380,7 +434,7 @@ def step_4_habitus_analysis(combined_input: Path, workflow_dir: Path) -> Path:
 只输出格式化的习性列表，不要其他内容。
 """
     
-    response = run_stigmergy(prompt)
+    response = run_stigmergy(prompt, workflow_dir / LLM_CACHE_SUBDIR if use_cache else None)
     result_data = parse_habitus_response(response)
     
     output_dir = workflow_dir / "intermediate" / "03_habitus"
@@ -396,7 +450,7 @@ def step_4_habitus_analysis(combined_input: Path, workflow_dir: Path) -> Path:
     return output_file
 
 
-def step_5_dynamics_analysis(combined_input: Path, workflow_dir: Path) -> Path:
+def step_5_dynamics_analysis(combined_input: Path, workflow_dir: Path, use_cache: bool = True) -> Path:
     """步骤5: 场域动态分析"""
     print("\n" + "=" * 60)
     print("步骤5: 场域动态分析 (LLM)")
@@ -427,7 +481,7 @@ def step_5_dynamics_analysis(combined_input: Path, workflow_dir: Path) -> Path:
 只输出格式化的场域动态，不要其他内容。
 """
     
-    response = run_stigmergy(prompt)
+    response = run_stigmergy(prompt, workflow_dir / LLM_CACHE_SUBDIR if use_cache else None)
     result_data = parse_dynamics_response(response)
     
     output_dir = workflow_dir / "intermediate" / "04_dynamics"
@@ -479,6 +533,10 @@ def step_6_generate_report(workflow_dir: Path) -> Path:
     
     # 生成HTML报告
     fields = boundary.get("fields", [])
+    fields_html = ''.join(
+        f'<div class="field"><strong>{f["name"]}</strong>：{", ".join(f["core_actors"])}</div>'
+        for f in fields
+    )
     html = f"""<!DOCTYPE html>
 <html lang=\"zh-CN\">
 <head>
@@ -496,7 +554,7 @@ def step_6_generate_report(workflow_dir: Path) -> Path:
     <p><strong>分析方法:</strong> LLM实时分析</p>
     
     <h2>识别场域 ({len(fields)}个)</h2>
-    {''.join([f'<div class=\"field\"><strong>{f["name"]}</strong>：{", ".join(f["core_actors"])}</div>' for f in fields])}
+    {fields_html}
     
     <footer><p>由 stigmergy qwen 实时分析生成</p></footer>
 </body>
@@ -514,11 +572,75 @@ def step_6_generate_report(workflow_dir: Path) -> Path:
     return output_html
 
 
+def run_analysis_steps(
+    combined_input: Path,
+    workflow_dir: Path,
+    steps: List[str],
+    use_cache: bool = True
+) -> Dict[str, Path]:
+    """
+    按依赖关系并发执行分析步骤（2-5）
+
+    每个步骤在其依赖的步骤完成后开始；不在 steps 中的依赖视为已完成，
+    直接使用其已有的中间结果。
+
+    Args:
+        combined_input: 合并后的输入数据文件
+        workflow_dir: 工作流目录
+        steps: 要执行的分析步骤编号
+        use_cache: 是否使用 LLM 响应缓存
+
+    Returns:
+        步骤编号到输出文件的映射
+    """
+    step_functions = {
+        "2": step_2_boundary_analysis,
+        "3": step_3_capital_analysis,
+        "4": step_4_habitus_analysis,
+        "5": step_5_dynamics_analysis
+    }
+    steps = [step for step in ANALYSIS_STEP_DEPENDENCIES if step in steps]
+    futures = {}
+
+    def run_step(step: str) -> Path:
+        # 依赖步骤失败时，其异常在这里重新抛出
+        for dependency in ANALYSIS_STEP_DEPENDENCIES[step]:
+            if dependency in futures:
+                futures[dependency].result()
+        return step_functions[step](combined_input, workflow_dir, use_cache)
+
+    # 每个步骤一个线程，等待依赖的步骤不会占满线程池
+    with ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+        for step in steps:
+            futures[step] = executor.submit(run_step, step)
+        return {step: future.result() for step, future in futures.items()}
+
+
+def select_workflow_steps(step: str = "all", from_step: Optional[str] = None) -> List[str]:
+    """
+    确定要执行的步骤
+
+    Args:
+        step: 单个步骤编号或 all
+        from_step: 从该步骤开始执行，之前的步骤复用已有的中间结果
+
+    Returns:
+        要执行的步骤编号列表
+    """
+    if from_step is not None:
+        if from_step not in WORKFLOW_STEPS:
+            raise ValueError(f"不支持的起始步骤: {from_step}")
+        return WORKFLOW_STEPS[WORKFLOW_STEPS.index(from_step):]
+    if step == "all":
+        return list(WORKFLOW_STEPS)
+    return [step] if step in WORKFLOW_STEPS else []
+
+
 # =============================================================================
 # 主函数
 # =============================================================================
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="布迪厄场域分析工作流")
     # 计算项目根目录下的 test_data/xiyouji_analysis 路径
     project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -527,39 +649,36 @@ def main():
                         help="输入数据目录")
     parser.add_argument("--step", type=str, default="all", 
                         help="执行步骤: 1, 2, 3, 4, 5, 6, all")
+    parser.add_argument("--from-step", type=str, choices=WORKFLOW_STEPS,
+                        help="从指定步骤开始执行，之前步骤复用已有的中间结果")
+    parser.add_argument("--workflow-dir", type=str,
+                        help="工作流目录（默认为技能目录下的 field_analysis_workflow）")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="不使用 LLM 响应缓存")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     SKILL_DIR = Path(__file__).parent.parent
-    WORKFLOW_DIR = SKILL_DIR / "field_analysis_workflow"
+    WORKFLOW_DIR = Path(args.workflow_dir) if args.workflow_dir else SKILL_DIR / "field_analysis_workflow"
     
     input_path = Path(args.input)
+    steps = select_workflow_steps(args.step, args.from_step)
     
     print("=" * 60)
     print("  布迪厄场域分析工作流")
     print(f"  输入: {input_path}")
-    print(f"  步骤: {args.step}")
+    print(f"  步骤: {', '.join(steps)}")
     print("=" * 60)
     
     # 执行步骤
-    if args.step in ["1", "all"]:
+    if "1" in steps:
         combined_input = step_1_prepare_data(input_path, WORKFLOW_DIR)
     else:
         combined_input = WORKFLOW_DIR / "input" / "processed" / "combined_input.json"
     
-    if args.step in ["2", "all"]:
-        step_2_boundary_analysis(combined_input, WORKFLOW_DIR)
-    
-    if args.step in ["3", "all"]:
-        step_3_capital_analysis(combined_input, WORKFLOW_DIR)
-    
-    if args.step in ["4", "all"]:
-        step_4_habitus_analysis(combined_input, WORKFLOW_DIR)
-    
-    if args.step in ["5", "all"]:
-        step_5_dynamics_analysis(combined_input, WORKFLOW_DIR)
+    run_analysis_steps(combined_input, WORKFLOW_DIR, steps, use_cache=not args.no_cache)
     
-    if args.step in ["6", "all"]:
+    if "6" in steps:
         step_6_generate_report(WORKFLOW_DIR)
     
     print("\n" + "=" * 60)
@@ -568,4 +687,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+资本分析测试套件
+测试资本矩阵上的基尼、泰尔、HHI 集中度，高低持有者选择，相关矩阵与显著性，以及百万行动者的耗时
+"""
+
+import json
+import math
+import random
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# 添加模块目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'modules'))
+
+import capital_analysis
+from capital_analysis import (
+    CAPITAL_TYPES, analyze_concentration, build_capital_matrix, calculate_capital_correlations,
+    correlation_p_value, field_capital_analysis, identify_high_low_holders, map_capital_distribution
+)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from scipy import stats
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+def make_distribution(num_actors, seed=7):
+    """生成互不相同的资本值，经济与社会资本正相关，文化资本含大量并列值"""
+    rng = random.Random(seed)
+    distribution = {}
+    for i in range(num_actors):
+        economic = rng.lognormvariate(0, 1)
+        distribution[f'行动者{i}'] = {
+            'economic': economic,
+            'social': economic + rng.random(),
+            'cultural': float(rng.randint(0, 5)),
+            'symbolic': rng.random()
+        }
+    return distribution
+
+
+class TestConcentration(unittest.TestCase):
+    """测试集中度指数"""
+
+    def test_known_values(self):
+        """测试完全集中与完全平均的分布"""
+        distribution = {
+            'a': {'economic': 0, 'social': 5, 'cultural': 0, 'symbolic': 0},
+            'b': {'economic': 0, 'social': 5, 'cultural': 0, 'symbolic': 0},
+            'c': {'economic': 0, 'social': 5, 'cultural': 0, 'symbolic': 0},
+            'd': {'economic': 10, 'social': 5, 'cultural': 0, 'symbolic': 0}
+        }
+        result = analyze_concentration(distribution)
+
+        economic = result['economic']
+        self.assertAlmostEqual(economic['gini'], 0.75)
+        self.assertAlmostEqual(economic['theil'], math.log(4))
+        self.assertAlmostEqual(economic['hhi'], 1.0)
+        self.assertEqual(economic['concentration_index'], economic['gini'])
+        self.assertEqual((economic['average'], economic['max'], economic['min']), (2.5, 10, 0))
+
+        self.assertAlmostEqual(result['social']['gini'], 0.0)
+        self.assertAlmostEqual(result['social']['theil'], 0.0)
+        self.assertAlmostEqual(result['social']['hhi'], 0.25)
+        self.assertEqual(result['cultural']['gini'], 0.0)
+
+    def test_gini_matches_pairwise_definition(self):
+        """测试基尼系数与平均绝对差定义一致"""
+        distribution = make_distribution(200)
+        values = [caps['symbolic'] for caps in distribution.values()]
+        n = len(values)
+        expected = sum(abs(x - y) for x in values for y in values) / (2 * n * n * (sum(values) / n))
+        self.assertAlmostEqual(analyze_concentration(distribution)['symbolic']['gini'], expected)
+
+    def test_empty(self):
+        """测试没有行动者时返回空结果"""
+        self.assertEqual(analyze_concentration({}), {})
+        self.assertEqual(identify_high_low_holders({})['high_holders']['economic'], [])
+
+
+class TestHighLowHolders(unittest.TestCase):
+    """测试高低持有者选择"""
+
+    def test_matches_full_sort(self):
+        """测试结果与完整排序后取前后20%一致"""
+        distribution = make_distribution(101)
+        result = identify_high_low_holders(distribution)
+        for cap_type in ['economic', 'symbolic']:
+            ordered = sorted(distribution, key=lambda a: distribution[a][cap_type], reverse=True)
+            self.assertEqual(result['high_holders'][cap_type], ordered[:20])
+            self.assertEqual(result['low_holders'][cap_type], ordered[-20:])
+
+    def test_ties_keep_original_order(self):
+        """测试同值行动者按原顺序排列"""
+        distribution = {name: {'economic': value} for name, value in
+                        [('a', 1), ('b', 3), ('c', 3), ('d', 0), ('e', 3)]}
+        result = identify_high_low_holders(distribution, k=3)
+        self.assertEqual(result['high_holders']['economic'], ['b', 'c', 'e'])
+        # 完整降序排列为 b, c, e, a, d
+        self.assertEqual(result['low_holders']['economic'], ['e', 'a', 'd'])
+        self.assertEqual(identify_high_low_holders(distribution, k=10)['high_holders']['social'],
+                         ['a', 'b', 'c', 'd', 'e'])
+
+
+class TestCorrelations(unittest.TestCase):
+    """测试相关矩阵与显著性"""
+
+    @unittest.skipUnless(HAS_SCIPY, '需要 scipy 作为参照')
+    def test_matches_scipy(self):
+        """测试 Pearson、Spearman 系数和 p 值与 scipy 一致"""
+        distribution = make_distribution(300)
+        result = calculate_capital_correlations(distribution)
+        columns = {t: [caps[t] for caps in distribution.values()] for t in CAPITAL_TYPES}
+
+        for first, second in [('economic', 'social'), ('economic', 'cultural'), ('cultural', 'symbolic')]:
+            pair = result['pairs'][f'{first}_{second}']
+            pearson = stats.pearsonr(columns[first], columns[second])
+            spearman = stats.spearmanr(columns[first], columns[second])
+            self.assertAlmostEqual(pair['pearson'], pearson[0], places=10)
+            self.assertAlmostEqual(pair['pearson_p_value'], pearson[1], places=10)
+            self.assertAlmostEqual(pair['spearman'], spearman[0], places=10)
+            self.assertAlmostEqual(pair['spearman_p_value'], spearman[1], places=10)
+
+    def test_matrix_and_compatibility_keys(self):
+        """测试相关矩阵对称、对角线为1，并保留旧的结果键"""
+        result = calculate_capital_correlations(make_distribution(100))
+        matrix = result['pearson']['matrix']
+        for i in range(len(CAPITAL_TYPES)):
+            self.assertAlmostEqual(matrix[i][i], 1.0)
+            for j in range(len(CAPITAL_TYPES)):
+                self.assertAlmostEqual(matrix[i][j], matrix[j][i])
+        self.assertEqual(result['economic_social'], result['pairs']['economic_social']['pearson'])
+        self.assertGreater(result['economic_social'], 0.5)
+        self.assertLess(result['pairs']['economic_social']['pearson_p_value'], 1e-10)
+        self.assertEqual(result['sample_size'], 100)
+        self.assertIn('symbolic_other', result)
+        json.loads(json.dumps(result))
+
+    def test_constant_capital_undefined(self):
+        """测试取值全部相同的资本相关系数为 None"""
+        distribution = {f'a{i}': {'economic': i, 'social': 2 * i, 'cultural': 1} for i in range(10)}
+        result = calculate_capital_correlations(distribution)
+        self.assertAlmostEqual(result['economic_social'], 1.0)
+        self.assertLess(result['pairs']['economic_social']['pearson_p_value'], 1e-10)
+        self.assertIsNone(result['economic_cultural'])
+        self.assertIsNone(result['pairs']['economic_cultural']['spearman_p_value'])
+        json.loads(json.dumps(result))
+
+    def test_p_value(self):
+        """测试 p 值的边界情况与已知值"""
+        self.assertIsNone(correlation_p_value(0.5, 2))
+        self.assertIsNone(correlation_p_value(None, 100))
+        self.assertAlmostEqual(correlation_p_value(0.0, 100), 1.0)
+        # n = 3 时 t 分布自由度为1，p = 1 - 2 * arctan(|t|) / π
+        r = 0.6
+        t = r * math.sqrt(1 / (1 - r * r))
+        self.assertAlmostEqual(correlation_p_value(r, 3), 1 - 2 * math.atan(t) / math.pi)
+
+
+class TestPurePythonFallback(unittest.TestCase):
+    """测试没有 NumPy 时的纯 Python 实现"""
+
+    @unittest.skipUnless(HAS_NUMPY, '需要 NumPy 实现作为参照')
+    def test_same_results(self):
+        """测试两种实现结果一致"""
+        distribution = make_distribution(150)
+        actors = [{'id': name} for name in distribution]
+        expected = map_capital_distribution(actors, distribution)
+        with mock.patch.object(capital_analysis, 'HAS_NUMPY', False):
+            actual = map_capital_distribution(actors, distribution)
+
+        self.assertEqual(actual['high_low_holders'], expected['high_low_holders'])
+        for cap_type in CAPITAL_TYPES:
+            for key, value in expected['concentration_analysis'][cap_type].items():
+                self.assertAlmostEqual(actual['concentration_analysis'][cap_type][key], value)
+        for pair, values in expected['capital_correlations']['pairs'].items():
+            for key, value in values.items():
+                self.assertAlmostEqual(actual['capital_correlations']['pairs'][pair][key], value)
+
+
+@unittest.skipUnless(HAS_NUMPY, '需要 NumPy')
+class TestScale(unittest.TestCase):
+    """测试百万行动者规模"""
+
+    def test_million_actors(self):
+        """测试百万行动者的集中度、高低持有者和相关性在数秒内完成"""
+        rng = np.random.default_rng(0)
+        num_actors = 1_000_000
+        matrix = rng.lognormal(size=(num_actors, len(CAPITAL_TYPES)))
+        matrix[:, 1] += matrix[:, 0]
+        capital_matrix = {'actor_ids': [f'a{i}' for i in range(num_actors)], 'matrix': matrix}
+
+        start = time.perf_counter()
+        concentration = analyze_concentration({}, capital_matrix=capital_matrix)
+        holders = identify_high_low_holders({}, k=100, capital_matrix=capital_matrix)
+        correlations = calculate_capital_correlations({}, capital_matrix=capital_matrix)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 10)
+        self.assertEqual(holders['high_holders']['economic'][0], f'a{int(np.argmax(matrix[:, 0]))}')
+        self.assertEqual(len(holders['low_holders']['symbolic']), 100)
+        self.assertTrue(0 < concentration['economic']['gini'] < 1)
+        self.assertGreater(correlations['economic_social'], 0.5)
+
+
+class TestFieldCapitalAnalysis(unittest.TestCase):
+    """测试完整资本分析入口"""
+
+    def test_output_keys(self):
+        """测试完整分析的结果结构保持不变"""
+        distribution = make_distribution(20)
+        data = {'actors': [{'name': name} for name in distribution], 'capital_distributions': distribution}
+        result = field_capital_analysis(data)
+        mapping = result['distribution_mapping']
+        self.assertEqual(set(mapping), {'actor_capital_map', 'concentration_analysis',
+                                        'high_low_holders', 'capital_correlations'})
+        self.assertEqual(len(mapping['actor_capital_map']), 20)
+        self.assertEqual(len(build_capital_matrix(mapping['actor_capital_map'])['actor_ids']), 20)
+        json.dumps(result, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+数据准备测试套件
+测试流式语料写入、编码回退、完全重复与近似重复去除，以及内存占用
+"""
+
+import json
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+import prepare_data
+from prepare_data import (
+    CORPUS_FILENAME, MANIFEST_FILENAME, SEGMENT_MAX_CHARS,
+    SimHash, SimHashIndex, ingest_corpus, read_text_file, scan_source_files
+)
+
+
+def make_document(seed, lines=400):
+    """生成互不相同的多行文本"""
+    return "\n".join(f"第{seed}篇 第{i}行：取经路上的第{i * seed % 997}个故事" for i in range(lines)) + "\n"
+
+
+class CorpusTestCase(unittest.TestCase):
+    """在临时目录中准备源文件"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.source_dir = Path(self.temp_dir.name) / 'source'
+        self.source_dir.mkdir()
+        self.output_dir = Path(self.temp_dir.name) / 'processed'
+
+    def write(self, name, text, encoding='utf-8'):
+        path = self.source_dir / name
+        path.write_bytes(text.encode(encoding))
+        return path
+
+    def ingest(self, **kwargs):
+        manifest = ingest_corpus(scan_source_files(self.source_dir), self.output_dir, **kwargs)
+        with open(self.output_dir / CORPUS_FILENAME, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        return manifest, records
+
+    def entries(self, manifest):
+        return {Path(entry['path']).name: entry for entry in manifest['files']}
+
+
+class TestCorpusIngestion(CorpusTestCase):
+    """测试流式语料和清单"""
+
+    def test_manifest_and_records(self):
+        """测试清单字段与语料记录"""
+        text = '唐僧师徒西行。\n孙悟空降妖。\n\n猪八戒化斋。\n'
+        self.write('开放编码.txt', text)
+        self.write('社会网络.txt', make_document(2))
+        manifest, records = self.ingest()
+
+        entry = self.entries(manifest)['开放编码.txt']
+        self.assertEqual(entry['size'], len(text.encode('utf-8')))
+        self.assertEqual(entry['lines'], 4)
+        self.assertEqual(entry['encoding'], 'utf-8')
+        self.assertEqual(len(entry['sha256']), 64)
+        self.assertEqual(entry['records'], 2)
+
+        doc_records = [r for r in records if r['doc_id'] == entry['doc_id']]
+        self.assertEqual([r['text'] for r in doc_records], ['唐僧师徒西行。\n孙悟空降妖。', '猪八戒化斋。'])
+        self.assertEqual(doc_records[0]['category'], 'grounded_theory')
+        self.assertEqual(manifest['totals']['records'], len(records))
+        self.assertEqual(json.loads((self.output_dir / MANIFEST_FILENAME).read_text(encoding='utf-8')), manifest)
+
+    def test_segments_bounded(self):
+        """测试没有换行的超长文本被切分为有限长度的记录"""
+        self.write('长文本.txt', '西' * (SEGMENT_MAX_CHARS * 2 + 10))
+        manifest, records = self.ingest()
+        self.assertEqual([len(r['text']) for r in records], [SEGMENT_MAX_CHARS, SEGMENT_MAX_CHARS, 10])
+        self.assertEqual(manifest['files'][0]['lines'], 1)
+
+    def test_gb18030_fallback(self):
+        """测试 UTF-8 解码失败时回退到 GB18030，且不残留失败尝试写入的记录"""
+        # 非 ASCII 内容出现在第一个读取块之后，UTF-8 已写入部分段落时才失败
+        ascii_part = 'journey to the west\n' * (prepare_data.READ_CHUNK_SIZE // 20 + 100)
+        self.write('gbk.txt', ascii_part + '\n取经团队：唐僧、孙悟空\n', encoding='gb18030')
+        manifest, records = self.ingest()
+
+        self.assertEqual(manifest['files'][0]['encoding'], 'gb18030')
+        self.assertEqual(records[-1]['text'], '取经团队：唐僧、孙悟空')
+        self.assertEqual(len(records), manifest['totals']['records'])
+        self.assertEqual(len({r['id'] for r in records}), len(records))
+
+    def test_undecodable_bytes_replaced(self):
+        """测试所有编码都失败时替换无法解码的字节"""
+        (self.source_dir / 'broken.txt').write_bytes(b'\xff\xfe\xfd\x80 text\n')
+        manifest, records = self.ingest()
+        self.assertEqual(manifest['files'][0]['encoding'], 'utf-8(replace)')
+        self.assertEqual(len(records), 1)
+
+    def test_read_text_file_fallback(self):
+        """测试整文件读取同样支持 GB18030"""
+        path = self.write('gbk.txt', '取经团队\n', encoding='gb18030')
+        self.assertEqual(read_text_file(path)['content'], '取经团队\n')
+
+
+class TestDeduplication(CorpusTestCase):
+    """测试去重"""
+
+    def test_exact_duplicate_dropped(self):
+        """测试完全相同的文件只保留第一个"""
+        text = make_document(1)
+        self.write('a.txt', text)
+        self.write('b.txt', text)
+        manifest, records = self.ingest()
+
+        entries = self.entries(manifest)
+        self.assertEqual(entries['a.txt']['status'], 'kept')
+        self.assertEqual(entries['b.txt']['status'], 'duplicate')
+        self.assertTrue(entries['b.txt']['duplicate_of'].endswith('a.txt'))
+        self.assertEqual({r['doc_id'] for r in records}, {entries['a.txt']['doc_id']})
+
+    def test_near_duplicate_dropped(self):
+        """测试只改动一行的文件被识别为近似重复，不同文件保留"""
+        text = make_document(1)
+        lines = text.splitlines()
+        lines[200] = '这一行被改写了'
+        self.write('a.txt', text)
+        self.write('b.txt', '\n'.join(lines) + '\n')
+        self.write('c.txt', make_document(5))
+        manifest, records = self.ingest()
+
+        entries = self.entries(manifest)
+        self.assertEqual(entries['b.txt']['status'], 'near_duplicate')
+        self.assertEqual(entries['c.txt']['status'], 'kept')
+        self.assertEqual(manifest['totals']['kept'], 2)
+        self.assertNotIn('这一行被改写了', ''.join(r['text'] for r in records))
+
+        manifest, _ = self.ingest(near_duplicate_distance=-1)
+        self.assertEqual(self.entries(manifest)['b.txt']['status'], 'kept')
+
+    def test_simhash_index(self):
+        """测试分段索引找到汉明距离不超过阈值的指纹"""
+        index = SimHashIndex(max_distance=3)
+        index.add(0b1011 << 40, 'a')
+        self.assertEqual(index.find((0b1011 << 40) ^ 0b111), 'a')
+        self.assertIsNone(index.find((0b1011 << 40) ^ 0b1111))
+
+    def test_simhash_stable(self):
+        """测试相同特征得到相同指纹"""
+        first, second = SimHash(), SimHash()
+        for feature in ['天庭', '佛界', '人间']:
+            first.update(feature)
+            second.update(feature)
+        self.assertEqual(first.value(), second.value())
+
+
+class TestMemory(CorpusTestCase):
+    """测试内存占用与文件大小无关"""
+
+    def test_streaming_memory_bounded(self):
+        """测试处理 20MB 文件时的内存峰值远小于文件大小"""
+        line = '唐僧师徒一路向西，历经九九八十一难，终于取得真经。\n'
+        repeat = 20 * 1024 * 1024 // len(line.encode('utf-8'))
+        with open(self.source_dir / 'big.txt', 'w', encoding='utf-8') as f:
+            for _ in range(repeat // 1000):
+                f.write(line * 1000)
+
+        tracemalloc.start()
+        try:
+            manifest = ingest_corpus(scan_source_files(self.source_dir), self.output_dir)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(manifest['files'][0]['size'], 19 * 1024 * 1024)
+        self.assertLess(peak, 8 * 1024 * 1024)
+
+
+class TestCommandLine(CorpusTestCase):
+    """测试命令行输出格式"""
+
+    def run_main(self, *args):
+        argv = ['prepare_data.py', '--input', str(self.source_dir), *args]
+        with mock.patch.object(sys, 'argv', argv), mock.patch('builtins.print'):
+            self.assertEqual(prepare_data.main(), 0)
+
+    def test_default_writes_combined_input(self):
+        """测试默认输出后续步骤读取的 combined_input.json"""
+        self.write('访谈1.txt', make_document(1))
+        output_file = self.output_dir / 'combined_input.json'
+        self.run_main('--output', str(output_file))
+
+        with open(output_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['metadata']['total_files'], 1)
+        self.assertFalse((self.output_dir / CORPUS_FILENAME).exists())
+
+    def test_jsonl_format(self):
+        """测试 --format jsonl 输出语料和清单"""
+        self.write('访谈1.txt', make_document(1))
+        self.run_main('--output', str(self.output_dir), '--format', 'jsonl')
+
+        self.assertTrue((self.output_dir / CORPUS_FILENAME).exists())
+        self.assertTrue((self.output_dir / MANIFEST_FILENAME).exists())
+        self.assertFalse((self.output_dir / 'combined_input.json').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+场域分析工作流测试套件
+使用 PATH 上按延迟返回固定响应的模拟 stigmergy，测试分析步骤并发、响应缓存和 --from-step
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+import run_workflow
+from run_workflow import run_analysis_steps, run_stigmergy, select_workflow_steps
+
+# 模拟 stigmergy 的响应延迟（秒）
+LLM_DELAY = 0.8
+
+# 模拟 stigmergy：根据提示词返回对应分析的固定响应，并记录每次调用的开始和结束时间
+FAKE_STIGMERGY = '''#!{python}
+import os, sys, time
+
+prompt = sys.argv[2]
+if os.environ.get("FAKE_STIGMERGY_FAIL"):
+    sys.stderr.write("host unavailable")
+    sys.exit(1)
+
+if "场域动态分析维度" in prompt:
+    kind, response = "dynamics", "佛界-天庭：统治关系"
+elif "资本分布" in prompt:
+    kind, response = "capital", "天庭：经济资本(高)、文化资本(中)、社会资本(高)、象征资本(3)"
+elif "习性特征" in prompt:
+    kind, response = "habitus", "孙悟空：反抗权威、追求自由"
+else:
+    kind, response = "boundary", "天庭：玉皇大帝、太上老君\\n佛界：如来佛祖"
+
+log = os.environ["FAKE_STIGMERGY_LOG"]
+with open(log, "a", encoding="utf-8") as f:
+    f.write(f"start {{kind}} {{time.time()}}\\n")
+with open(os.path.join(os.path.dirname(log), kind + ".prompt"), "w", encoding="utf-8") as f:
+    f.write(prompt)
+time.sleep(float(os.environ.get("FAKE_STIGMERGY_DELAY", "0")))
+with open(log, "a", encoding="utf-8") as f:
+    f.write(f"end {{kind}} {{time.time()}}\\n")
+print(response)
+'''
+
+COMBINED_INPUT = {
+    "grounded_theory": {
+        "files": [{"content": "唐僧与孙悟空拜见如来佛祖", "stats": {"chars": 12}}]
+    }
+}
+
+
+@unittest.skipIf(sys.platform == 'win32', '模拟 stigmergy 依赖 shebang')
+class WorkflowTestCase(unittest.TestCase):
+    """把模拟 stigmergy 放到 PATH 上，并准备临时工作流目录"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        root = Path(self.temp_dir.name)
+        bin_dir = root / 'bin'
+        bin_dir.mkdir()
+        script = bin_dir / 'stigmergy'
+        script.write_text(FAKE_STIGMERGY.format(python=sys.executable), encoding='utf-8')
+        script.chmod(0o755)
+
+        self.saved_env = dict(os.environ)
+        self.addCleanup(self.restore_env)
+        os.environ['PATH'] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+        os.environ['FAKE_STIGMERGY_DELAY'] = '0'
+        self.log_dir = root / 'log'
+        self.log_dir.mkdir()
+        self.log_path = self.log_dir / 'calls.log'
+        os.environ['FAKE_STIGMERGY_LOG'] = str(self.log_path)
+
+        self.workflow_dir = root / 'workflow'
+        self.combined_input = self.workflow_dir / 'input' / 'processed' / 'combined_input.json'
+        self.combined_input.parent.mkdir(parents=True)
+        self.combined_input.write_text(json.dumps(COMBINED_INPUT, ensure_ascii=False), encoding='utf-8')
+
+    def restore_env(self):
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+
+    def calls(self):
+        """读取并清空调用日志，返回 {分析类型: (开始时间, 结束时间)}"""
+        if not self.log_path.exists():
+            return {}
+        times = {}
+        for line in self.log_path.read_text(encoding='utf-8').splitlines():
+            event, kind, timestamp = line.split()
+            times.setdefault(kind, {})[event] = float(timestamp)
+        self.log_path.unlink()
+        return {kind: (t['start'], t['end']) for kind, t in times.items()}
+
+    def read_result(self, relative_path):
+        return json.loads((self.workflow_dir / 'intermediate' / relative_path).read_text(encoding='utf-8'))
+
+
+class TestParallelSteps(WorkflowTestCase):
+    """测试分析步骤按依赖关系并发执行"""
+
+    def test_step_schedule(self):
+        """测试边界与习性分析并发，资本分析等待边界分析，动态分析最后执行"""
+        os.environ['FAKE_STIGMERGY_DELAY'] = str(LLM_DELAY)
+        start = time.perf_counter()
+        outputs = run_analysis_steps(self.combined_input, self.workflow_dir, ['2', '3', '4', '5'])
+        elapsed = time.perf_counter() - start
+
+        calls = self.calls()
+        self.assertEqual(set(outputs), {'2', '3', '4', '5'})
+        self.assertLess(calls['habitus'][0], calls['boundary'][1])
+        self.assertGreaterEqual(calls['capital'][0], calls['boundary'][1])
+        self.assertGreaterEqual(calls['dynamics'][0], max(calls[k][1] for k in ['boundary', 'capital', 'habitus']))
+        # 关键路径为 3 次调用，串行执行至少需要 4 次调用的时间
+        self.assertLess(elapsed, 4 * LLM_DELAY)
+
+        prompt = (self.log_dir / 'capital.prompt').read_text(encoding='utf-8')
+        self.assertIn('天庭：玉皇大帝, 太上老君', prompt)
+        self.assertEqual(self.read_result('02_capital/capital_results.json')['distribution']['天庭'],
+                         {'经济资本': 3, '文化资本': 2, '社会资本': 3, '象征资本': 3})
+
+    def test_failed_dependency_propagates(self):
+        """测试依赖步骤失败时下游步骤不执行"""
+        self.combined_input.unlink()
+        with self.assertRaises(FileNotFoundError):
+            run_analysis_steps(self.combined_input, self.workflow_dir, ['2', '3', '4', '5'])
+        self.assertEqual(self.calls(), {})
+
+
+class TestResponseCache(WorkflowTestCase):
+    """测试 LLM 响应缓存"""
+
+    def test_rerun_uses_cache(self):
+        """测试数据未变化时重跑不再调用 stigmergy"""
+        run_analysis_steps(self.combined_input, self.workflow_dir, ['2', '3', '4', '5'])
+        self.assertEqual(len(self.calls()), 4)
+        first = self.read_result('01_boundary/boundary_results.json')
+
+        run_analysis_steps(self.combined_input, self.workflow_dir, ['2', '3', '4', '5'])
+        self.assertEqual(self.calls(), {})
+        self.assertEqual(self.read_result('01_boundary/boundary_results.json'), first)
+
+        run_analysis_steps(self.combined_input, self.workflow_dir, ['2'], use_cache=False)
+        self.assertEqual(set(self.calls()), {'boundary'})
+
+    def test_changed_prompt_misses_cache(self):
+        """测试提示词变化时重新调用"""
+        cache_dir = self.workflow_dir / 'cache'
+        self.assertEqual(run_stigmergy('习性特征 A', cache_dir).strip(), '孙悟空：反抗权威、追求自由')
+        run_stigmergy('习性特征 A', cache_dir)
+        run_stigmergy('习性特征 B', cache_dir)
+        self.assertEqual(len(list(cache_dir.iterdir())), 2)
+
+    def test_failure_not_cached(self):
+        """测试失败的调用不写入缓存"""
+        os.environ['FAKE_STIGMERGY_FAIL'] = '1'
+        cache_dir = self.workflow_dir / 'cache'
+        self.assertEqual(run_stigmergy('习性特征', cache_dir), '')
+        self.assertFalse(cache_dir.exists())
+
+
+class TestFromStep(WorkflowTestCase):
+    """测试 --from-step 选项"""
+
+    def test_from_step_reuses_earlier_outputs(self):
+        """测试从步骤4开始时复用边界和资本分析结果"""
+        run_workflow.main(['--workflow-dir', str(self.workflow_dir), '--from-step', '2'])
+        self.calls()
+        boundary_file = self.workflow_dir / 'intermediate' / '01_boundary' / 'boundary_results.json'
+        boundary_mtime = boundary_file.stat().st_mtime_ns
+
+        run_workflow.main(['--workflow-dir', str(self.workflow_dir), '--from-step', '4', '--no-cache'])
+        self.assertEqual(set(self.calls()), {'habitus', 'dynamics'})
+        self.assertEqual(boundary_file.stat().st_mtime_ns, boundary_mtime)
+
+        report = self.workflow_dir / 'output' / 'reports' / 'field_analysis_report.html'
+        self.assertIn('玉皇大帝', report.read_text(encoding='utf-8'))
+
+    def test_select_workflow_steps(self):
+        """测试步骤选择"""
+        self.assertEqual(select_workflow_steps('all'), ['1', '2', '3', '4', '5', '6'])
+        self.assertEqual(select_workflow_steps('3'), ['3'])
+        self.assertEqual(select_workflow_steps('all', from_step='5'), ['5', '6'])
+        with self.assertRaises(ValueError):
+            select_workflow_steps(from_step='9')
+
+
+if __name__ == '__main__':
+    unittest.main()
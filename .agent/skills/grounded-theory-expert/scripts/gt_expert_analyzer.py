@@ -8,11 +8,14 @@ checking-theory-saturation和writing-grounded-theory-memos技能的功能。
 """
 
 import argparse
+import hashlib
 import json
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
 
 # 导入内部模块
 import sys
@@ -25,6 +28,285 @@ from axial_coding import axial_coding
 from selective_coding import selective_coding
 from saturation_checker import saturation_check
 from memo_writer import memo_writing
+from open_coding import calculate_concept_statistics
+
+
+# 阶段检查点默认目录；版本号变化时旧检查点全部失效
+CHECKPOINT_DIR = '.gt_checkpoints'
+CHECKPOINT_VERSION = 4
+# 目录输入时读取的转录文件类型
+TRANSCRIPT_SUFFIXES = ('.txt', '.md', '.json')
+# 计算输入文件摘要时的读取块大小
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> Optional[str]:
+    """
+    分块读取文件，计算其内容的 SHA-256 摘要
+    
+    Args:
+        path: 文件路径
+    
+    Returns:
+        十六进制摘要；文件不可读时返回 None
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def content_hash(stage: str, inputs: Any) -> str:
+    """
+    计算阶段输入的内容哈希，作为检查点键
+    
+    输入中的 text_file 只是路径，哈希时同时计入文件内容的摘要，
+    文件被修改后检查点随之失效。
+    
+    Args:
+        stage: 阶段名称
+        inputs: 阶段输入（可 JSON 序列化）
+    
+    Returns:
+        SHA-256 十六进制摘要
+    """
+    if isinstance(inputs, dict) and inputs.get('text_file'):
+        inputs = dict(inputs, text_file_sha256=file_digest(inputs['text_file']))
+    payload = json.dumps(
+        {'stage': stage, 'version': CHECKPOINT_VERSION, 'inputs': inputs},
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def run_stage(stage: str, inputs: Any, func: Callable[[Any], Dict[str, Any]],
+              cache_dir: Optional[str] = None,
+              stats: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Any]:
+    """
+    执行一个阶段；输入未变化时直接读取检查点
+    
+    检查点保存在 <cache_dir>/<stage>/<内容哈希>.json，先写临时文件再替换，
+    中断的运行不会留下损坏的检查点。
+    
+    Args:
+        stage: 阶段名称
+        inputs: 阶段输入，同时用于计算内容哈希
+        func: 阶段函数，接收 inputs 返回结果字典
+        cache_dir: 检查点目录，为空时不使用检查点
+        stats: 可选的命中统计 {stage: {'hits': n, 'misses': n}}，原地更新
+    
+    Returns:
+        阶段结果
+    """
+    counter = stats.setdefault(stage, {'hits': 0, 'misses': 0}) if stats is not None else None
+    if not cache_dir:
+        if counter is not None:
+            counter['misses'] += 1
+        return func(inputs)
+
+    path = Path(cache_dir) / stage / f"{content_hash(stage, inputs)}.json"
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if counter is not None:
+                counter['hits'] += 1
+            return result
+        except (OSError, ValueError):
+            pass
+
+    result = func(inputs)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    if counter is not None:
+        counter['misses'] += 1
+    return result
+
+
+def load_documents(directory: str) -> Dict[str, Dict[str, Any]]:
+    """
+    读取目录下的转录文件
+    
+    文本文件作为 text_data，JSON 文件按原样作为开放编码输入。
+    
+    Args:
+        directory: 转录文件目录
+    
+    Returns:
+        {文档名: 开放编码输入}，按文档名排序
+    """
+    root = Path(directory)
+    documents = {}
+    for path in sorted(root.rglob('*')):
+        if not path.is_file() or path.suffix.lower() not in TRANSCRIPT_SUFFIXES:
+            continue
+        name = path.relative_to(root).as_posix()
+        if path.suffix.lower() == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                documents[name] = json.load(f)
+        else:
+            documents[name] = {'text_data': path.read_text(encoding='utf-8')}
+    return documents
+
+
+def _open_code_document(job):
+    """进程池任务：对单个文档执行（带检查点的）开放编码"""
+    name, document, cache_dir = job
+    stats = {}
+    result = run_stage('open_coding', document, open_coding, cache_dir, stats)
+    return name, result, stats['open_coding']['hits'] > 0
+
+
+def open_code_documents(documents: Dict[str, Dict[str, Any]], workers: int = 1,
+                        cache_dir: Optional[str] = None,
+                        stats: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    逐文档执行开放编码，workers > 1 时使用进程池
+    
+    Args:
+        documents: {文档名: 开放编码输入}
+        workers: 进程数
+        cache_dir: 检查点目录
+        stats: 可选的命中统计，原地更新
+    
+    Returns:
+        {文档名: 开放编码结果}，顺序与 documents 一致
+    """
+    jobs = [(name, document, cache_dir) for name, document in documents.items()]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            outputs = list(executor.map(_open_code_document, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        outputs = [_open_code_document(job) for job in jobs]
+
+    results = {}
+    for name, result, hit in outputs:
+        if stats is not None:
+            counter = stats.setdefault('open_coding', {'hits': 0, 'misses': 0})
+            counter['hits' if hit else 'misses'] += 1
+        results[name] = result
+    return results
+
+
+def merge_open_results(per_document: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    合并各文档的开放编码结果
+    
+    多文档时概念 ID 加上文档名前缀，segment_id 按文档顺序偏移为全局编号，
+    使轴心编码的共现统计不会跨文档混淆文本段。
+    
+    Args:
+        per_document: {文档名: 开放编码结果}
+    
+    Returns:
+        合并后的开放编码结果
+    """
+    if len(per_document) == 1:
+        name, result = next(iter(per_document.items()))
+        return dict(result, documents=[{'name': name, **_document_summary(result)}])
+
+    concepts = []
+    memo_notes = []
+    merged_concepts = []
+    documents = []
+    segment_offset = 0
+    totals = {'segments_processed': 0, 'initial_concepts': 0, 'refined_concepts': 0}
+
+    for name, result in per_document.items():
+        prefix = f"{name}/"
+        for concept in result.get('concepts', []):
+            merged = dict(concept, id=prefix + concept['id'], document=name)
+            if concept.get('segment_id') is not None:
+                merged['segment_id'] = segment_offset + concept['segment_id']
+            if concept.get('segment_ids'):
+                merged['segment_ids'] = [segment_offset + segment_id for segment_id in concept['segment_ids']]
+            concepts.append(merged)
+        for memo in result.get('memo_notes', []):
+            memo_notes.append(dict(memo, related_concepts=[prefix + c for c in memo.get('related_concepts', [])]))
+        process = result.get('coding_process', {})
+        for pair in process.get('merged_concepts', []):
+            merged_concepts.append(dict(pair, kept=prefix + pair['kept'], merged=prefix + pair['merged']))
+        for key in totals:
+            totals[key] += process.get(key, 0)
+        segment_offset += process.get('segments_processed', 0)
+        documents.append({'name': name, **_document_summary(result)})
+
+    return {
+        "concepts": concepts,
+        "concept_statistics": calculate_concept_statistics(concepts),
+        "coding_process": {
+            "segments_processed": totals['segments_processed'],
+            "initial_concepts": totals['initial_concepts'],
+            "merged_concepts": merged_concepts,
+            "refined_concepts": totals['refined_concepts']
+        },
+        "memo_notes": memo_notes,
+        "documents": documents
+    }
+
+
+def _document_summary(result: Dict[str, Any]) -> Dict[str, int]:
+    process = result.get('coding_process', {})
+    return {
+        'segments': process.get('segments_processed', 0),
+        'concepts': len(result.get('concepts', []))
+    }
+
+
+def run_coding_pipeline(documents: Dict[str, Dict[str, Any]], until: str = 'selective',
+                        workers: int = 1, cache_dir: Optional[str] = None,
+                        clustering_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    多文档编码流水线：逐文档开放编码 → 合并 → 轴心编码 → 选择式编码
+    
+    每个阶段的结果以输入内容哈希为键保存检查点，重新运行时只重算
+    输入发生变化的文档和下游阶段。
+    
+    Args:
+        documents: {文档名: 开放编码输入}
+        until: 执行到哪个阶段（'open'、'axial' 或 'selective'）
+        workers: 开放编码进程数
+        cache_dir: 检查点目录，为空时不使用检查点
+        clustering_config: 传给轴心编码的聚类参数
+    
+    Returns:
+        各阶段结果及 'pipeline' 运行信息（检查点命中统计）
+    """
+    stats = {}
+    per_document = open_code_documents(documents, workers, cache_dir, stats)
+    open_results = merge_open_results(per_document)
+    results = {'open_coding': open_results}
+
+    if until in ('axial', 'selective'):
+        axial_input = {'concepts': open_results['concepts']}
+        if clustering_config:
+            axial_input['clustering_config'] = clustering_config
+        axial_results = run_stage('axial_coding', axial_input, axial_coding, cache_dir, stats)
+        results['axial_coding'] = axial_results
+
+        if until == 'selective':
+            selective_input = {
+                'categories': axial_results['categories'],
+                'relationships': axial_results['relationships']
+            }
+            results['selective_coding'] = run_stage(
+                'selective_coding', selective_input, selective_coding, cache_dir, stats
+            )
+
+    results['pipeline'] = {
+        'documents': len(documents),
+        'workers': workers,
+        'checkpoint_dir': cache_dir,
+        'stages': stats
+    }
+    return results
 
 
 def main():
@@ -40,26 +322,62 @@ def main():
     parser.add_argument('--coding-stage', '-s', 
                        choices=['open', 'axial', 'selective'],
                        help='编码阶段')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='目录输入时开放编码的进程数（默认1）')
+    parser.add_argument('--cache-dir', default=CHECKPOINT_DIR,
+                       help=f'阶段检查点目录（默认{CHECKPOINT_DIR}）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不读写阶段检查点')
+    parser.add_argument('--memo-db',
+                       help='备忘录库（sqlite）路径，生成的备忘录追加写入以便跨运行检索')
 
     args = parser.parse_args()
 
     start_time = datetime.now()
+    cache_dir = None if args.no_cache else args.cache_dir
 
-    # 读取输入数据
+    # 读取输入数据：目录按转录文件逐个读取
     try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if os.path.isdir(args.input):
+            documents = load_documents(args.input)
+            data = {}
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            documents = None
     except Exception as e:
         print(f"错误：无法读取输入文件 - {e}", file=sys.stderr)
         sys.exit(1)
 
+    if documents is not None and args.method in ('saturation', 'memo'):
+        print(f"错误：{args.method} 方法不支持目录输入", file=sys.stderr)
+        sys.exit(1)
+    if documents is not None and not documents:
+        print(f"错误：目录中没有转录文件（{', '.join(TRANSCRIPT_SUFFIXES)}）", file=sys.stderr)
+        sys.exit(1)
+
     results = {}
 
-    if args.method == 'open':
+    if documents is not None and args.method in ('open', 'axial', 'selective'):
+        # 目录输入：逐文档开放编码后合并，按需执行到指定阶段
+        pipeline = run_coding_pipeline(documents, args.method, args.workers, cache_dir)
+        stage_key = f'{args.method}_coding'
+        results = {
+            stage_key: pipeline[stage_key],
+            'memo_notes': memo_writing({
+                'memo_db': args.memo_db,
+                'coding_stage': args.method,
+                'process_info': {},
+                'analysis_results': pipeline[stage_key]
+            })['memos'],
+            'pipeline': pipeline['pipeline']
+        }
+    elif args.method == 'open':
         # 执行开放编码
         results = {
             'open_coding': open_coding(data),
             'memo_notes': memo_writing({
+                'memo_db': args.memo_db,
                 'coding_stage': 'open',
                 'process_info': data.get('process_info', {}),
                 'analysis_results': open_coding(data)
@@ -70,6 +388,7 @@ def main():
         results = {
             'axial_coding': axial_coding(data),
             'memo_notes': memo_writing({
+                'memo_db': args.memo_db,
                 'coding_stage': 'axial',
                 'process_info': data.get('process_info', {}),
                 'analysis_results': axial_coding(data)
@@ -80,6 +399,7 @@ def main():
         results = {
             'selective_coding': selective_coding(data),
             'memo_notes': memo_writing({
+                'memo_db': args.memo_db,
                 'coding_stage': 'selective',
                 'process_info': data.get('process_info', {}),
                 'analysis_results': selective_coding(data)
@@ -93,25 +413,18 @@ def main():
     elif args.method == 'memo':
         # 执行备忘录撰写
         results = {
-            'memo_writing': memo_writing(data)
+            'memo_writing': memo_writing(dict(data, memo_db=args.memo_db) if args.memo_db else data)
         }
     elif args.method == 'comprehensive':
         # 执行综合分析
-        # 1. 开放编码
-        open_results = open_coding(data)
-        
-        # 2. 轴心编码
-        axial_input = {
-            'concepts': open_results['concepts']
-        }
-        axial_results = axial_coding(axial_input)
-        
-        # 3. 选择式编码
-        selective_input = {
-            'categories': axial_results['categories'],
-            'relationships': axial_results['relationships']
-        }
-        selective_results = selective_coding(selective_input)
+        # 1-3. 开放编码、轴心编码、选择式编码（带阶段检查点）
+        if documents is None:
+            documents = {os.path.basename(args.input): data}
+        pipeline = run_coding_pipeline(documents, 'selective', args.workers, cache_dir,
+                                       data.get('clustering_config'))
+        open_results = pipeline['open_coding']
+        axial_results = pipeline['axial_coding']
+        selective_results = pipeline['selective_coding']
         
         # 4. 饱和度检验
         saturation_input = {
@@ -126,6 +439,7 @@ def main():
         
         # 5. 备忘录撰写
         memo_results = memo_writing({
+            'memo_db': args.memo_db,
             'coding_stage': 'selective',
             'process_info': data.get('process_info', {}),
             'analysis_results': selective_results
@@ -138,6 +452,7 @@ def main():
             'selective_coding': selective_results,
             'saturation_analysis': saturation_results,
             'memo_writing': memo_results,
+            'pipeline': pipeline['pipeline'],
             'comprehensive_theory': {
                 'core_category': selective_results.get('core_category', {}),
                 'storyline': selective_results.get('storyline', {}),
@@ -178,6 +493,9 @@ def main():
     print(f"  - 方法: {args.method}")
     print(f"  - 编码阶段: {args.method if args.method in ['open', 'axial', 'selective'] else (args.coding_stage or 'N/A')}")
     print(f"  - 处理时间: {output['summary']['processing_time']} 秒")
+    if 'pipeline' in results:
+        for stage, counter in results['pipeline']['stages'].items():
+            print(f"  - {stage}: 复用检查点 {counter['hits']}，重新计算 {counter['misses']}")
     print(f"  - 输出文件: {args.output}")
 
 
@@ -3,8 +3,29 @@
 此模块提供扎根理论轴心编码阶段的各项功能
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 import json
+import math
+import zlib
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# 范畴聚类参数
+CLUSTER_SEED = 42
+KMEANS_MAX_ITER = 50
+# 编码数不超过该值时做多次初始化取最优（小数据对初始中心更敏感）
+KMEANS_N_INIT = 4
+KMEANS_MULTI_INIT_MAX = 5000
+HASH_FEATURES = 1024
+NGRAM_RANGE = (1, 3)
+SILHOUETTE_SAMPLE = 2000
+# 条件共现概率不低于该值时视为"蕴含"
+STRONG_CONDITIONAL = 0.5
 
 
 def axial_coding(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -21,7 +42,7 @@ def axial_coding(data: Dict[str, Any]) -> Dict[str, Any]:
     concepts = data.get('concepts', [])
     
     # 执行范畴识别
-    categories = identify_categories(concepts)
+    categories = identify_categories(concepts, **data.get('clustering_config', {}))
     
     # 执行属性维度分析
     category_properties = analyze_properties(categories)
@@ -48,21 +69,68 @@ def axial_coding(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def identify_categories(concepts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def identify_categories(concepts: List[Dict[str, Any]], k: Optional[int] = None,
+                        k_candidates: Optional[List[int]] = None,
+                        seed: int = CLUSTER_SEED, max_iter: int = KMEANS_MAX_ITER) -> List[Dict[str, Any]]:
     """
     从概念中识别范畴
     
+    概念编码表示为字符 n-gram 的 TF-IDF 向量（特征哈希到固定维度），
+    用余弦 k-means 聚类为范畴；未指定 k 时按抽样轮廓系数在候选值中选择。
+    相同编码的概念只计算一次向量，随机种子固定时结果确定。
+    未安装 numpy 时退回按编码首字符分组。
+    
     Args:
         concepts: 概念列表
+        k: 范畴数，为空时自动选择
+        k_candidates: 自动选择 k 时的候选值
+        seed: 随机种子
+        max_iter: k-means 最大迭代次数
     
     Returns:
         识别出的范畴列表
     """
-    # 简化的范畴识别逻辑
-    # 在实际应用中，这里会使用更复杂的聚类算法
+    if not HAS_NUMPY:
+        return _identify_categories_by_prefix(concepts)
+
+    code_concepts = {}
+    for concept in concepts:
+        code_concepts.setdefault(concept["code"], []).append(concept)
+    codes = list(code_concepts)
+    if not codes:
+        return []
+
+    labels = cluster_codes(codes, k=k, k_candidates=k_candidates, seed=seed, max_iter=max_iter)
+
+    clusters = {}
+    for code, label in zip(codes, labels):
+        clusters.setdefault(int(label), []).append(code)
+
+    # 按规模降序、首次出现顺序排列，保证编号稳定（簇内编码已按首次出现排序）
+    first_seen = {code: index for index, code in enumerate(codes)}
+    ordered = sorted(
+        clusters.values(),
+        key=lambda members: (-sum(len(code_concepts[c]) for c in members), first_seen[members[0]])
+    )
+
     categories = []
+    for index, members in enumerate(ordered, 1):
+        # 以出现次数最多的编码命名范畴
+        label_code = max(members, key=lambda c: len(code_concepts[c])) or "其他"
+        category_concepts = [concept for code in members for concept in code_concepts[code]]
+        categories.append({
+            "id": f"category_{index}",
+            "name": f"关于{label_code}的范畴",
+            "definition": f"包含与{label_code}相近的概念：{'、'.join(members[:5])}",
+            "concepts": category_concepts,
+            "properties": calculate_category_properties(category_concepts)
+        })
     
-    # 按概念名称的首字母进行简单分组
+    return categories
+
+
+def _identify_categories_by_prefix(concepts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按概念名称的首字符分组（无 numpy 时的退化实现）"""
     category_map = {}
     for concept in concepts:
         first_char = concept["code"][0] if concept["code"] else "其他"
@@ -76,16 +144,189 @@ def identify_categories(concepts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             }
         category_map[first_char]["concepts"].append(concept)
     
-    # 将映射转换为列表
     categories = list(category_map.values())
-    
-    # 为每个范畴计算属性
     for category in categories:
         category["properties"] = calculate_category_properties(category["concepts"])
     
     return categories
 
 
+def _char_ngrams(code: str) -> List[str]:
+    padded = f"^{code}$"
+    low, high = NGRAM_RANGE
+    return [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+
+
+class SparseRows(NamedTuple):
+    """按行压缩（CSR）的稀疏矩阵，行向量已 L2 归一化"""
+    indptr: Any
+    indices: Any
+    data: Any
+    n_features: int
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def column_sums(self, labels, k: int) -> Any:
+        """按标签对行向量求和，得到 (k, n_features)"""
+        row_labels = np.repeat(labels, np.diff(self.indptr))
+        sums = np.bincount(row_labels * self.n_features + self.indices,
+                           weights=self.data, minlength=k * self.n_features)
+        return sums.reshape(k, self.n_features).astype(np.float32)
+
+    def to_dense(self, rows=None) -> Any:
+        rows = range(self.n_rows) if rows is None else rows
+        matrix = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for position, row in enumerate(rows):
+            low, high = self.indptr[row], self.indptr[row + 1]
+            matrix[position, self.indices[low:high]] = self.data[low:high]
+        return matrix
+
+
+def vectorize_codes(codes: List[str], n_features: int = HASH_FEATURES) -> SparseRows:
+    """
+    字符 n-gram TF-IDF 向量（特征哈希），行向量 L2 归一化
+    
+    Args:
+        codes: 概念编码列表
+        n_features: 哈希维度
+    
+    Returns:
+        稀疏矩阵 (len(codes), n_features)
+    """
+    indptr, indices, counts = [0], [], []
+    for code in codes:
+        row = {}
+        for gram in _char_ngrams(code):
+            column = zlib.crc32(gram.encode('utf-8')) % n_features
+            row[column] = row.get(column, 0) + 1
+        indices.extend(row)
+        counts.extend(row.values())
+        indptr.append(len(indices))
+
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    document_frequency = np.bincount(indices, minlength=n_features)
+    idf = np.log((1 + len(codes)) / (1 + document_frequency)) + 1
+    data = np.asarray(counts, dtype=np.float32) * idf[indices].astype(np.float32)
+
+    norms = np.sqrt(np.add.reduceat(data ** 2, indptr[:-1]))
+    norms[norms == 0] = 1
+    data /= np.repeat(norms, np.diff(indptr))
+    return SparseRows(indptr, indices, data, n_features)
+
+
+def _spherical_kmeans(matrix: SparseRows, dense, k: int, seed: int, max_iter: int):
+    """多次初始化的余弦 k-means，返回簇内相似度之和最大的结果"""
+    n_init = KMEANS_N_INIT if matrix.n_rows <= KMEANS_MULTI_INIT_MAX else 1
+    best_labels, best_objective = None, -np.inf
+    for rng in (np.random.default_rng([seed, run]) for run in range(n_init)):
+        labels, objective = _spherical_kmeans_single(matrix, dense, k, rng, max_iter)
+        if objective > best_objective:
+            best_labels, best_objective = labels, objective
+    return best_labels
+
+
+def _spherical_kmeans_single(matrix: SparseRows, dense, k: int, rng, max_iter: int):
+    """余弦 k-means，k-means++ 初始化；相似度用稠密矩阵乘法，簇中心用稀疏计数求和"""
+    n = matrix.n_rows
+    index = int(rng.integers(n))
+    centroids = np.zeros((k, matrix.n_features), dtype=np.float32)
+    centroids[0] = dense[index]
+    best_similarity = dense @ centroids[0]
+    for cluster in range(1, k):
+        distance = np.clip(1 - best_similarity, 0, None).astype(np.float64) ** 2
+        total = distance.sum()
+        index = int(rng.choice(n, p=distance / total)) if total > 0 else int(rng.integers(n))
+        centroids[cluster] = dense[index]
+        best_similarity = np.maximum(best_similarity, dense @ centroids[cluster])
+
+    labels = None
+    for _ in range(max_iter):
+        similarity = dense @ centroids.T
+        new_labels = similarity.argmax(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        sums = matrix.column_sums(labels, k)
+        norms = np.linalg.norm(sums, axis=1)
+        present = norms > 0
+        centroids[present] = sums[present] / norms[present, None]
+        # 空簇重新放到离所属中心最远的点
+        empty = np.flatnonzero(~present)
+        if len(empty):
+            farthest = np.argsort(similarity.max(axis=1), kind='stable')[:len(empty)]
+            centroids[empty] = dense[farthest]
+    return labels, float(similarity.max(axis=1).sum())
+
+
+def _silhouette(dense, labels, sample_index) -> float:
+    """在抽样点上计算余弦距离的平均轮廓系数"""
+    sample = dense[sample_index]
+    sample_labels = labels[sample_index]
+    distance = 1 - sample @ sample.T
+    clusters = np.unique(sample_labels)
+    if len(clusters) < 2:
+        return -1.0
+
+    mean_distance = np.stack([
+        distance[:, sample_labels == cluster].mean(axis=1) for cluster in clusters
+    ], axis=1)
+    own = np.searchsorted(clusters, sample_labels)
+    sizes = np.array([(sample_labels == cluster).sum() for cluster in clusters])
+    # 簇内平均距离排除自身
+    own_size = sizes[own]
+    a = mean_distance[np.arange(len(own)), own] * own_size / np.maximum(own_size - 1, 1)
+    mean_distance[np.arange(len(own)), own] = np.inf
+    b = mean_distance.min(axis=1)
+    score = np.where(own_size > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+    return float(score.mean())
+
+
+def cluster_codes(codes: List[str], k: Optional[int] = None,
+                  k_candidates: Optional[List[int]] = None,
+                  seed: int = CLUSTER_SEED, max_iter: int = KMEANS_MAX_ITER) -> List[int]:
+    """
+    将概念编码聚类
+    
+    Args:
+        codes: 去重后的概念编码
+        k: 簇数，为空时按轮廓系数选择
+        k_candidates: 候选簇数
+        seed: 随机种子
+        max_iter: 最大迭代次数
+    
+    Returns:
+        每个编码的簇标签
+    """
+    n = len(codes)
+    if n < 3:
+        return [0] * n
+
+    matrix = vectorize_codes(codes)
+    dense = matrix.to_dense()
+    if k is not None:
+        return _spherical_kmeans(matrix, dense, min(max(1, k), n), seed, max_iter).tolist()
+
+    if k_candidates is None:
+        base = max(2, round(math.sqrt(n / 2)))
+        k_candidates = [base // 2, base, base * 2]
+    k_candidates = sorted({c for c in k_candidates if 2 <= c < n}) or [min(2, n)]
+
+    sample_rng = np.random.default_rng(seed)
+    sample_index = np.sort(sample_rng.choice(n, size=min(n, SILHOUETTE_SAMPLE), replace=False))
+
+    best_labels, best_score = None, -np.inf
+    for candidate in k_candidates:
+        labels = _spherical_kmeans(matrix, dense, candidate, seed, max_iter)
+        score = _silhouette(dense, labels, sample_index)
+        if score > best_score:
+            best_labels, best_score = labels, score
+    return best_labels.tolist()
+
+
 def calculate_category_properties(concepts: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     计算范畴的属性
@@ -142,69 +383,122 @@ def build_relationships(categories: List[Dict[str, Any]]) -> List[Dict[str, Any]
     """
     建立范畴间的关系
     
+    一次遍历概念构建稀疏的"文本段-范畴"共现计数，只有在同一文本段中
+    共同出现过的范畴之间才建立关系。
+    
     Args:
         categories: 范畴列表
     
     Returns:
         关系列表
     """
+    category_segments = {category["id"]: set() for category in categories}
+    segment_categories = {}
+    first_segment = {}
+    for order, category in enumerate(categories):
+        for concept in category["concepts"]:
+            for segment in _concept_segments(concept):
+                segment_categories.setdefault(segment, set()).add(order)
+                category_segments[category["id"]].add(segment)
+                first_segment.setdefault(category["id"], segment)
+                if _segment_order(segment) < _segment_order(first_segment[category["id"]]):
+                    first_segment[category["id"]] = segment
+
+    # 稀疏共现矩阵：(i, j) -> 共同出现的文本段数，i < j
+    co_occurrence = {}
+    for members in segment_categories.values():
+        ordered = sorted(members)
+        for a, i in enumerate(ordered):
+            for j in ordered[a + 1:]:
+                co_occurrence[(i, j)] = co_occurrence.get((i, j), 0) + 1
+
     relationships = []
-    
-    # 简化的范畴关系建立
-    for i, cat1 in enumerate(categories):
-        for j, cat2 in enumerate(categories[i+1:], i+1):
-            # 计算范畴间的关系强度（简化计算）
-            relationship_strength = calculate_relationship_strength(cat1, cat2)
-            
-            # 确定关系类型（简化判断）
-            relationship_type = determine_relationship_type(cat1, cat2)
-            
-            relationship = {
-                "id": f"rel_{cat1['id']}_to_{cat2['id']}",
-                "source_category": cat1["id"],
-                "target_category": cat2["id"],
-                "type": relationship_type,
-                "strength": relationship_strength,
-                "evidence": f"基于范畴 {cat1['name']} 和 {cat2['name']} 的概念重叠"
-            }
-            
-            relationships.append(relationship)
+    for (i, j), count in sorted(co_occurrence.items()):
+        cat1, cat2 = categories[i], categories[j]
+        segments1 = len(category_segments[cat1["id"]])
+        segments2 = len(category_segments[cat2["id"]])
+        
+        # 关系强度：共现文本段的 Jaccard 系数
+        relationship_strength = calculate_relationship_strength(count, segments1, segments2)
+        
+        # 关系类型与方向：由条件共现概率的对称性和首次出现先后确定
+        relationship_type, forward = determine_relationship_type(
+            count / segments1, count / segments2,
+            _segment_order(first_segment[cat1["id"]]) <= _segment_order(first_segment[cat2["id"]])
+        )
+        source, target = (cat1, cat2) if forward else (cat2, cat1)
+        
+        relationship = {
+            "id": f"rel_{source['id']}_to_{target['id']}",
+            "source_category": source["id"],
+            "target_category": target["id"],
+            "type": relationship_type,
+            "strength": relationship_strength,
+            "co_occurrence": count,
+            "evidence": f"范畴 {source['name']} 和 {target['name']} 在 {count} 个文本段中共同出现"
+        }
+        
+        relationships.append(relationship)
     
     return relationships
 
 
-def calculate_relationship_strength(cat1: Dict[str, Any], cat2: Dict[str, Any]) -> float:
+def _concept_segments(concept: Dict[str, Any]) -> List[Any]:
+    """概念所在文本段的标识：优先使用合并后的 segment_ids，其次 segment_id，否则使用示例文本"""
+    if concept.get("segment_ids"):
+        return list(concept["segment_ids"])
+    if concept.get("segment_id") is not None:
+        return [concept["segment_id"]]
+    return list(concept.get("examples", []))
+
+
+def _segment_order(segment: Any) -> Tuple[int, Any]:
+    return (0, segment, "") if isinstance(segment, int) else (1, 0, str(segment))
+
+
+def calculate_relationship_strength(co_occurrence: int, segments1: int, segments2: int) -> float:
     """
     计算范畴间的关系强度
     
     Args:
-        cat1: 范畴1
-        cat2: 范畴2
+        co_occurrence: 共同出现的文本段数
+        segments1: 范畴1出现的文本段数
+        segments2: 范畴2出现的文本段数
     
     Returns:
         关系强度 (0-1)
     """
-    # 简化的强度计算
-    # 在实际应用中，这里会使用更复杂的语义分析
-    return 0.5  # 简化值
+    union = segments1 + segments2 - co_occurrence
+    return round(co_occurrence / union, 4) if union else 0.0
 
 
-def determine_relationship_type(cat1: Dict[str, Any], cat2: Dict[str, Any]) -> str:
+def determine_relationship_type(p_2_given_1: float, p_1_given_2: float,
+                                first_precedes: bool) -> Tuple[str, bool]:
     """
-    确定范畴间的关系类型
+    确定范畴间的关系类型及方向
+    
+    - 双向条件概率都高：interactive
+    - 单向条件概率高且蕴含方先出现：causal（先出现者指向后出现者）
+    - 单向条件概率高但蕴含方后出现：conditional（蕴含方指向被蕴含方）
+    - 其余按首次出现先后记为 interactive
     
     Args:
-        cat1: 范畴1
-        cat2: 茌畴2
+        p_2_given_1: 范畴1出现时范畴2也出现的比例
+        p_1_given_2: 范畴2出现时范畴1也出现的比例
+        first_precedes: 范畴1是否先于范畴2出现
     
     Returns:
-        关系类型
+        (关系类型, 是否由范畴1指向范畴2)
     """
-    # 简化的关系类型判断
-    # 在实际应用中，这里会使用更复杂的逻辑
-    import random
-    relationship_types = ["causal", "conditional", "strategic", "interactive"]
-    return random.choice(relationship_types)
+    strong1 = p_2_given_1 >= STRONG_CONDITIONAL
+    strong2 = p_1_given_2 >= STRONG_CONDITIONAL
+    if strong1 == strong2:
+        return "interactive", first_precedes
+    # 蕴含方：出现时另一范畴几乎总是伴随出现
+    implies_forward = strong1
+    if implies_forward == first_precedes:
+        return "causal", first_precedes
+    return "conditional", implies_forward
 
 
 def construct_paradigm(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -3,8 +3,58 @@
 此模块提供扎根理论开放编码阶段的各项功能
 """
 
-from typing import Dict, List, Any
+from collections import Counter, defaultdict
+from heapq import nlargest
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Any, Optional, TextIO, Tuple
 import json
+import math
+import random
+import re
+
+
+# 持续比较默认相似度阈值
+SIMILARITY_THRESHOLD = 0.8
+# 概念数超过该值时使用 MinHash/LSH 候选对筛选
+LSH_MIN_CONCEPTS = 500
+# MinHash 置换数、随机种子，以及阈值处的目标候选召回率
+MINHASH_NUM_PERM = 128
+MINHASH_SEED = 42
+LSH_TARGET_RECALL = 0.99
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# 流式读取：每次读取的字符数、无句末标点时强制切分的最大段长
+STREAM_CHUNK_CHARS = 1 << 20
+MAX_SEGMENT_CHARS = 10000
+# 有界词频计数器容量（超过两倍容量时裁剪到容量大小）及每个词保留的示例
+TERM_COUNTER_CAPACITY = 20000
+MAX_TERM_EXAMPLES = 2
+EXAMPLE_MAX_CHARS = 120
+# 流式开放编码输出的最大概念数
+STREAM_MAX_CONCEPTS = 5000
+# 中文二元组成为候选词的最低频次和最低点互信息（log2）
+CJK_MIN_COUNT = 2
+CJK_MIN_PMI = 1.0
+# 西文词最短长度（保持原有"长度大于2"的规则）
+MIN_WORD_LENGTH = 3
+
+_SENTENCE_BOUNDARY = re.compile(r'[.!?。！？\n]+')
+_CJK_RANGE = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RUN = re.compile(f'[{_CJK_RANGE}]+')
+_CJK_CHAR = re.compile(f'[{_CJK_RANGE}]')
+_WORD = re.compile(rf'[^\W\d_{_CJK_RANGE}][^\W{_CJK_RANGE}]*')
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves
+""".split())
+# 中文虚词、代词等高频功能字；含这些字的二元组不作为候选词
+CJK_STOP_CHARS = frozenset('的了是在和与及也都就而之于以其着把被这那个们吗呢吧啊么我你他她它')
 
 
 def open_coding(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -20,16 +70,25 @@ def open_coding(data: Dict[str, Any]) -> Dict[str, Any]:
     # 从数据中提取文本数据
     text_data = data.get('text_data', '')
     segments = data.get('segments', [])
-    
-    # 如果没有分段数据，则从文本数据创建分段
-    if not segments and text_data:
-        segments = split_text_into_segments(text_data)
-    
-    # 执行概念识别
-    concepts = identify_concepts(segments)
+    text_file = data.get('text_file')
+    
+    if text_file and not segments:
+        # 大文件流式读取，按候选词聚合概念
+        stream_config = dict(data.get('stream_config', {}))
+        chunks = iter_file_chunks(text_file, stream_config.pop('chunk_size', STREAM_CHUNK_CHARS))
+        concepts, segment_count = stream_concepts(chunks, **stream_config)
+    else:
+        # 如果没有分段数据，则从文本数据创建分段
+        if not segments and text_data:
+            segments = split_text_into_segments(text_data)
+        
+        # 执行概念识别
+        concepts = identify_concepts(segments)
+        segment_count = len(segments)
     
     # 执行持续比较
-    comparison_results = perform_constant_comparison(concepts)
+    comparison_config = data.get('comparison_config', {})
+    comparison_results = perform_constant_comparison(concepts, **comparison_config)
     
     # 执行编码优化
     optimized_codes = optimize_codes(concepts, comparison_results)
@@ -39,7 +98,7 @@ def open_coding(data: Dict[str, Any]) -> Dict[str, Any]:
         "concepts": optimized_codes,
         "concept_statistics": calculate_concept_statistics(optimized_codes),
         "coding_process": {
-            "segments_processed": len(segments),
+            "segments_processed": segment_count,
             "initial_concepts": len(concepts),
             "merged_concepts": comparison_results.get("merged_pairs", []),
             "refined_concepts": len(optimized_codes)
@@ -58,37 +117,198 @@ def split_text_into_segments(text: str) -> List[str]:
     Returns:
         分段后的文本列表
     """
-    # 简单的分段方法，按句号、问号、感叹号分割
-    import re
-    segments = re.split(r'[.!?。！？\n]+', text)
-    # 过滤掉空段落
-    segments = [seg.strip() for seg in segments if seg.strip()]
-    return segments
+    return list(iter_segments([text]))
+
+
+def iter_file_chunks(source: Any, chunk_size: int = STREAM_CHUNK_CHARS) -> Iterator[str]:
+    """
+    按块读取文本文件
+    
+    Args:
+        source: 文件路径或已打开的文本文件对象
+        chunk_size: 每块字符数
+    
+    Yields:
+        文本块
+    """
+    if hasattr(source, 'read'):
+        handle: TextIO = source
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    with open(source, 'r', encoding='utf-8', errors='replace') as f:
+        yield from iter_file_chunks(f, chunk_size)
+
+
+def iter_segments(chunks: Iterable[str], max_segment_chars: int = MAX_SEGMENT_CHARS) -> Iterator[str]:
+    """
+    按句末标点和换行把文本块流切分成段
+    
+    每块最后一个边界之后的内容留到下一块拼接，保证跨块边界的句子完整；
+    长度超过 max_segment_chars 仍无边界时强制切分，避免缓冲无限增长。
+    
+    Args:
+        chunks: 文本块迭代器
+        max_segment_chars: 单段最大字符数
+    
+    Yields:
+        去除首尾空白后的非空段
+    """
+    carry = ''
+    for chunk in chunks:
+        pieces = _SENTENCE_BOUNDARY.split(carry + chunk)
+        carry = pieces.pop()
+        for piece in pieces:
+            piece = piece.strip()
+            if piece:
+                yield piece
+        while len(carry) > max_segment_chars:
+            piece = carry[:max_segment_chars].strip()
+            carry = carry[max_segment_chars:]
+            if piece:
+                yield piece
+    carry = carry.strip()
+    if carry:
+        yield carry
+
+
+def extract_terms(segment: str) -> List[str]:
+    """
+    从文本段中抽取候选词
+    
+    西文按词切分，转小写并过滤停用词和短词；中文没有空格分词，
+    取连续汉字串中不含虚词字的相邻二元组。
+    
+    Args:
+        segment: 文本段
+    
+    Returns:
+        候选词列表（按出现顺序，可重复）
+    """
+    terms = [
+        word for word in (w.lower() for w in _WORD.findall(segment))
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS
+    ]
+    for run in _CJK_RUN.findall(segment):
+        for i in range(len(run) - 1):
+            if run[i] not in CJK_STOP_CHARS and run[i + 1] not in CJK_STOP_CHARS:
+                terms.append(run[i:i + 2])
+    return terms
+
+
+class BoundedTermCounter:
+    """
+    有界词频计数器
+    
+    词数超过两倍容量时只保留频次最高的 capacity 个词（lossy counting），
+    内存与输入长度无关；被裁剪的低频词之后再出现时重新计数。
+    同时记录每个词首次出现的段号和少量示例段。
+    
+    Args:
+        capacity: 裁剪后保留的词数
+        max_examples: 每个词保留的示例段数
+    """
+
+    def __init__(self, capacity: int = TERM_COUNTER_CAPACITY, max_examples: int = MAX_TERM_EXAMPLES):
+        self.capacity = capacity
+        self.max_examples = max_examples
+        self.counts: Dict[str, int] = {}
+        self.first_segment: Dict[str, int] = {}
+        self.examples: Dict[str, List[str]] = {}
+        self.char_counts: Counter = Counter()
+        self.total_chars = 0
+        self.pruned = 0
+
+    def add_segment(self, segment_id: int, segment: str, terms: Optional[List[str]] = None):
+        """统计一个文本段的候选词和汉字频次"""
+        if terms is None:
+            terms = extract_terms(segment)
+        cjk_chars = ''.join(_CJK_CHAR.findall(segment))
+        self.char_counts.update(cjk_chars)
+        self.total_chars += len(cjk_chars)
+
+        example = segment[:EXAMPLE_MAX_CHARS]
+        counts = self.counts
+        for term in terms:
+            if term in counts:
+                counts[term] += 1
+                examples = self.examples[term]
+                if len(examples) < self.max_examples and examples[-1] != example:
+                    examples.append(example)
+            else:
+                counts[term] = 1
+                self.first_segment[term] = segment_id
+                self.examples[term] = [example]
+
+        if self.capacity and len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        kept = nlargest(self.capacity, self.counts.items(), key=itemgetter(1))
+        self.pruned += len(self.counts) - len(kept)
+        self.counts = dict(kept)
+        self.first_segment = {term: self.first_segment[term] for term in self.counts}
+        self.examples = {term: self.examples[term] for term in self.counts}
+
+    def is_candidate(self, term: str, min_count: int = CJK_MIN_COUNT,
+                     min_pmi: float = CJK_MIN_PMI) -> bool:
+        """
+        判断是否为候选概念词
+        
+        西文词均保留；中文二元组须达到最低频次，且两个字的点互信息
+        log2(P(ab) / (P(a)P(b))) 不低于 min_pmi，以排除偶然相邻的字。
+        """
+        if not _CJK_CHAR.match(term):
+            return True
+        count = self.counts.get(term, 0)
+        if count < min_count:
+            return False
+        first, second = self.char_counts[term[0]], self.char_counts[term[1]]
+        if not first or not second or not self.total_chars:
+            return False
+        return math.log2(count * self.total_chars / (first * second)) >= min_pmi
+
+    def most_common(self, limit: Optional[int] = None, **criteria) -> List[Tuple[str, int]]:
+        """频次降序（同频按首次出现先后）的候选词"""
+        candidates = [(term, count) for term, count in self.counts.items() if self.is_candidate(term, **criteria)]
+        candidates.sort(key=lambda item: (-item[1], self.first_segment[item[0]]))
+        return candidates[:limit] if limit else candidates
 
 
 def identify_concepts(segments: List[str]) -> List[Dict[str, Any]]:
     """
     从文本段落中识别概念
     
+    先统计全部段落的候选词，再为每次出现的候选词生成一个概念，
+    保留 segment_id 供轴心编码统计共现。
+    
     Args:
         segments: 文本段落列表
     
     Returns:
         识别出的概念列表
     """
+    counter = BoundedTermCounter(capacity=0)
+    segment_terms = []
+    for i, segment in enumerate(segments):
+        terms = extract_terms(segment)
+        counter.add_segment(i, segment, terms)
+        segment_terms.append(terms)
+
     concepts = []
     concept_id = 1
-    
-    for i, segment in enumerate(segments):
-        # 简化的概念识别逻辑
-        # 在实际应用中，这里会使用更复杂的NLP技术
-        words = segment.split()
-        for j, word in enumerate(words):
-            if len(word) > 2:  # 只考虑长度大于2的词
+    candidates = {}
+    for i, (segment, terms) in enumerate(zip(segments, segment_terms)):
+        for j, term in enumerate(terms):
+            if term not in candidates:
+                candidates[term] = counter.is_candidate(term)
+            if candidates[term]:
                 concept = {
                     "id": f"concept_{concept_id}",
-                    "code": word,
-                    "definition": f"概念定义：{word}",
+                    "code": term,
+                    "definition": f"概念定义：{term}",
                     "examples": [segment],
                     "segment_id": i,
                     "position_in_segment": j
@@ -99,44 +319,194 @@ def identify_concepts(segments: List[str]) -> List[Dict[str, Any]]:
     return concepts
 
 
-def perform_constant_comparison(concepts: List[Dict[str, Any]]) -> Dict[str, Any]:
+def stream_concepts(chunks: Iterable[str], capacity: int = TERM_COUNTER_CAPACITY,
+                    max_concepts: int = STREAM_MAX_CONCEPTS) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    流式识别概念：逐段抽词并累积到有界计数器，每个候选词生成一个聚合概念
+    
+    内存只取决于计数器容量，与输入长度无关，适合书籍篇幅的转录文本。
+    
+    Args:
+        chunks: 文本块迭代器（如 iter_file_chunks 的输出）
+        capacity: 计数器容量
+        max_concepts: 最多输出的概念数（按频次）
+    
+    Returns:
+        (概念列表, 处理的段数)
+    """
+    counter = BoundedTermCounter(capacity)
+    segment_count = 0
+    for segment_id, segment in enumerate(iter_segments(chunks)):
+        counter.add_segment(segment_id, segment)
+        segment_count += 1
+
+    concepts = []
+    for concept_id, (term, count) in enumerate(counter.most_common(max_concepts), 1):
+        concepts.append({
+            "id": f"concept_{concept_id}",
+            "code": term,
+            "definition": f"概念定义：{term}",
+            "examples": list(counter.examples[term]),
+            "segment_id": counter.first_segment[term],
+            "frequency": count
+        })
+    return concepts, segment_count
+
+
+def perform_constant_comparison(concepts: List[Dict[str, Any]],
+                                similarity_threshold: float = SIMILARITY_THRESHOLD,
+                                method: str = 'auto',
+                                num_perm: int = MINHASH_NUM_PERM,
+                                bands: Optional[int] = None,
+                                seed: int = MINHASH_SEED) -> Dict[str, Any]:
     """
     执行持续比较分析
     
+    概念数较多时先按字符集合计算 MinHash 签名，经分带 LSH 分桶后
+    只对候选对计算精确相似度，避免 O(n²) 的两两比较。
+    
     Args:
         concepts: 概念列表
+        similarity_threshold: 相似度阈值，高于该值的概念对被合并
+        method: 'lsh'、'exhaustive' 或 'auto'（按概念数自动选择）
+        num_perm: MinHash 置换数
+        bands: LSH 分带数，为空时按阈值自动选择
+        seed: 哈希函数随机种子，相同种子输出确定
     
     Returns:
         比较分析结果
     """
-    # 简化的比较逻辑
-    # 在实际应用中，这里会使用语义相似度算法
+    if method == 'auto':
+        method = 'lsh' if len(concepts) > LSH_MIN_CONCEPTS else 'exhaustive'
+
+    if method == 'exhaustive':
+        pairs = _exhaustive_similar_pairs(concepts, similarity_threshold)
+    else:
+        pairs = _lsh_similar_pairs(concepts, similarity_threshold, num_perm, bands, seed)
+
     comparison_results = {
         "similar_pairs": [],
         "merged_pairs": [],
         "relationship_matrix": {}
     }
+    for i, j, similarity in pairs:
+        comparison_results["similar_pairs"].append({
+            "concept1": concepts[i]["id"],
+            "concept2": concepts[j]["id"],
+            "similarity": similarity
+        })
+        
+        # 合并相似概念
+        comparison_results["merged_pairs"].append({
+            "kept": concepts[i]["id"],
+            "merged": concepts[j]["id"],
+            "reason": "High semantic similarity"
+        })
     
-    # 比较概念间的相似性
+    return comparison_results
+
+
+def _exhaustive_similar_pairs(concepts: List[Dict[str, Any]],
+                              similarity_threshold: float) -> List[Tuple[int, int, float]]:
+    """两两比较全部概念，返回 (i, j, 相似度)，i < j"""
+    pairs = []
     for i, concept1 in enumerate(concepts):
         for j, concept2 in enumerate(concepts[i+1:], i+1):
-            # 简化的相似性判断
             similarity = calculate_similarity(concept1["code"], concept2["code"])
-            if similarity > 0.8:  # 相似度阈值
-                comparison_results["similar_pairs"].append({
-                    "concept1": concept1["id"],
-                    "concept2": concept2["id"],
-                    "similarity": similarity
-                })
-                
-                # 合并相似概念
-                comparison_results["merged_pairs"].append({
-                    "kept": concept1["id"],
-                    "merged": concept2["id"],
-                    "reason": "High semantic similarity"
-                })
+            if similarity > similarity_threshold:
+                pairs.append((i, j, similarity))
+    return pairs
+
+
+def choose_lsh_bands(num_perm: int, similarity_threshold: float,
+                     target_recall: float = LSH_TARGET_RECALL) -> Tuple[int, int]:
+    """
+    选择分带参数 (bands, rows)
     
-    return comparison_results
+    在阈值处成为候选对的概率为 1-(1-s^r)^b，取满足目标召回率的最大 r，
+    r 越大候选对越少。
+    
+    Args:
+        num_perm: MinHash 置换数
+        similarity_threshold: 相似度阈值
+        target_recall: 阈值处的最低候选概率
+    
+    Returns:
+        (bands, rows)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - similarity_threshold ** rows) ** bands >= target_recall:
+            best = (bands, rows)
+    return best
+
+
+def _minhash_permutations(num_perm: int, seed: int) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)]
+
+
+def _lsh_similar_pairs(concepts: List[Dict[str, Any]], similarity_threshold: float,
+                       num_perm: int, bands: Optional[int], seed: int) -> List[Tuple[int, int, float]]:
+    """MinHash + LSH 找出相似概念对，输出顺序与两两比较一致"""
+    # 相同编码只计算一次签名
+    code_positions = defaultdict(list)
+    for index, concept in enumerate(concepts):
+        code_positions[concept["code"]].append(index)
+    codes = list(code_positions)
+
+    if bands is None:
+        bands, rows = choose_lsh_bands(num_perm, similarity_threshold)
+    else:
+        rows = max(1, num_perm // bands)
+
+    # 每个字符的哈希向量只计算一次，编码签名为其字符向量的逐位最小值
+    permutations = _minhash_permutations(bands * rows, seed)
+    char_vectors = {}
+    buckets = [defaultdict(list) for _ in range(bands)]
+    for code_index, code in enumerate(codes):
+        vectors = []
+        for char in set(code):
+            vector = char_vectors.get(char)
+            if vector is None:
+                x = ord(char)
+                vector = [(a * x + b) % _MERSENNE_PRIME for a, b in permutations]
+                char_vectors[char] = vector
+            vectors.append(vector)
+        if not vectors:
+            continue
+        signature = list(map(min, *vectors)) if len(vectors) > 1 else vectors[0]
+        for band in range(bands):
+            key = tuple(signature[band * rows:(band + 1) * rows])
+            buckets[band][key].append(code_index)
+
+    candidates = set()
+    for band_buckets in buckets:
+        for members in band_buckets.values():
+            for a_pos, a in enumerate(members):
+                for b in members[a_pos + 1:]:
+                    candidates.add((a, b))
+
+    pairs = []
+    # 相同编码的概念之间相似度为 1
+    if similarity_threshold < 1.0:
+        for positions in code_positions.values():
+            for a_pos, i in enumerate(positions):
+                for j in positions[a_pos + 1:]:
+                    pairs.append((i, j, 1.0))
+
+    for a, b in candidates:
+        similarity = calculate_similarity(codes[a], codes[b])
+        if similarity <= similarity_threshold:
+            continue
+        for i in code_positions[codes[a]]:
+            for j in code_positions[codes[b]]:
+                pairs.append((i, j, similarity) if i < j else (j, i, similarity))
+
+    pairs.sort()
+    return pairs
 
 
 def calculate_similarity(str1: str, str2: str) -> float:
@@ -168,6 +538,9 @@ def optimize_codes(concepts: List[Dict[str, Any]], comparison_results: Dict[str,
     """
     优化编码结果
     
+    被合并的概念并入其保留概念（保留概念本身也被合并时沿链找到最终保留的概念），
+    示例追加到保留概念中，所在文本段记录在 segment_ids，供轴心编码统计全部出现。
+    
     Args:
         concepts: 原始概念列表
         comparison_results: 比较结果
@@ -178,24 +551,34 @@ def optimize_codes(concepts: List[Dict[str, Any]], comparison_results: Dict[str,
     # 创建概念ID到概念的映射
     concept_map = {concept["id"]: concept for concept in concepts}
     
-    # 根据合并结果创建优化的概念列表
-    kept_concept_ids = {pair["kept"] for pair in comparison_results.get("merged_pairs", [])}
-    merged_concept_ids = {pair["merged"] for pair in comparison_results.get("merged_pairs", [])}
+    # 每个被合并概念并入第一个与其配对的保留概念
+    merged_into = {}
+    for pair in comparison_results.get("merged_pairs", []):
+        merged_into.setdefault(pair["merged"], pair["kept"])
     
     # 保留未被合并的概念
     optimized_concepts = [
         concept_map[concept_id] 
         for concept_id in concept_map 
-        if concept_id not in merged_concept_ids
+        if concept_id not in merged_into
     ]
     
-    # 对合并的概念进行处理（简化处理）
-    for pair in comparison_results.get("merged_pairs", []):
-        kept_concept = concept_map[pair["kept"]]
-        merged_concept = concept_map[pair["merged"]]
+    segment_ids = {}
+    for concept_id, concept in concept_map.items():
+        if concept_id not in merged_into:
+            continue
+        kept_id = merged_into[concept_id]
+        while kept_id in merged_into:
+            kept_id = merged_into[kept_id]
+        kept_concept = concept_map[kept_id]
         
-        # 将被合并概念的示例添加到保留概念中
-        kept_concept["examples"].extend(merged_concept["examples"])
+        # 将被合并概念的示例和文本段添加到保留概念中
+        kept_concept["examples"].extend(concept["examples"])
+        if concept.get("segment_id") is not None and kept_concept.get("segment_id") is not None:
+            segment_ids.setdefault(kept_id, {kept_concept["segment_id"]}).add(concept["segment_id"])
+    
+    for kept_id, ids in segment_ids.items():
+        concept_map[kept_id]["segment_ids"] = sorted(ids)
     
     return optimized_concepts
 
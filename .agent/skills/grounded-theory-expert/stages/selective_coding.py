@@ -3,8 +3,35 @@
 此模块提供扎根理论选择式编码阶段的各项功能
 """
 
-from typing import Dict, List, Any
+from collections import Counter
+from typing import Dict, List, Any, Optional
 import json
+import random
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# 核心范畴评分权重（各指标先按最大值归一化到 0-1）
+CORE_SCORE_WEIGHTS = {
+    "degree": 0.3,
+    "pagerank": 0.3,
+    "betweenness": 0.2,
+    "data_support": 0.2
+}
+# 返回的核心范畴候选数
+CORE_SHORTLIST_SIZE = 5
+# PageRank 参数
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOL = 1e-8
+PAGERANK_MAX_ITER = 100
+# 范畴数超过该值时用随机抽样的源节点近似介数中心性
+BETWEENNESS_EXACT_MAX_NODES = 500
+BETWEENNESS_PIVOTS = 64
+BETWEENNESS_SEED = 42
 
 
 def selective_coding(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -21,18 +48,22 @@ def selective_coding(data: Dict[str, Any]) -> Dict[str, Any]:
     categories = data.get('categories', [])
     relationships = data.get('relationships', [])
     
+    # 一次构建范畴关系图，供后续各步骤复用
+    graph = build_category_graph(categories, relationships)
+    
     # 执行核心范畴识别
-    core_category = identify_core_category(categories, relationships)
+    core_category = identify_core_category(categories, relationships, graph)
     
     # 执行故事线构建
-    storyline = construct_storyline(categories, relationships, core_category)
+    storyline = construct_storyline(categories, relationships, core_category, graph)
     
     # 执行理论框架整合
-    theory_framework = integrate_theory(categories, relationships, core_category, storyline)
+    theory_framework = integrate_theory(categories, relationships, core_category, storyline, graph)
     
     # 返回选择式编码结果
     return {
         "core_category": core_category,
+        "core_category_candidates": core_category.get("candidates", []),
         "storyline": storyline,
         "theory_framework": theory_framework,
         "selective_coding_process": {
@@ -45,62 +76,277 @@ def selective_coding(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def identify_core_category(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Dict[str, Any]:
+def build_category_graph(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    识别核心范畴
+    构建范畴关系图（邻接索引）
+    
+    一次遍历关系列表，按无向图建立邻接表，同一对范畴的多条关系强度累加。
+    指向未知范畴的关系被忽略。
     
     Args:
         categories: 范畴列表
         relationships: 关系列表
     
     Returns:
-        核心范畴
+        关系图：
+        - index: 范畴 ID -> 节点编号
+        - categories: 节点编号 -> 范畴
+        - neighbors: 每个节点的 {邻居编号: 累加强度}
+        - incident: 每个节点关联的关系列表
+        - relationship_types: 各关系类型的数量
     """
-    if not categories:
-        return {}
+    index = {}
+    for category in categories:
+        index.setdefault(category["id"], len(index))
+    nodes = [None] * len(index)
+    for category in categories:
+        if nodes[index[category["id"]]] is None:
+            nodes[index[category["id"]]] = category
+
+    neighbors = [{} for _ in nodes]
+    incident = [[] for _ in nodes]
+    relationship_types = Counter()
+    for rel in relationships:
+        relationship_types[rel["type"]] += 1
+        i = index.get(rel["source_category"])
+        j = index.get(rel["target_category"])
+        if i is None or j is None:
+            continue
+        incident[i].append(rel)
+        if i == j:
+            continue
+        incident[j].append(rel)
+        weight = float(rel.get("strength", 1.0) or 0.0)
+        neighbors[i][j] = neighbors[i].get(j, 0.0) + weight
+        neighbors[j][i] = neighbors[j].get(i, 0.0) + weight
+
+    return {
+        "index": index,
+        "categories": nodes,
+        "neighbors": neighbors,
+        "incident": incident,
+        "relationship_types": relationship_types
+    }
+
+
+def calculate_pagerank(graph: Dict[str, Any], damping: float = PAGERANK_DAMPING,
+                       tol: float = PAGERANK_TOL, max_iter: int = PAGERANK_MAX_ITER) -> List[float]:
+    """
+    计算按关系强度加权的 PageRank
     
-    # 计算每个范畴的指标来确定核心范畴
-    category_scores = []
+    Args:
+        graph: build_category_graph 构建的关系图
+        damping: 阻尼系数
+        tol: 收敛阈值（L1 变化量）
+        max_iter: 最大迭代次数
     
-    for category in categories:
-        # 计算解释力（与多少其他范畴有关系）
-        explanation_power = sum(
-            1 for rel in relationships 
-            if rel["source_category"] == category["id"] or rel["target_category"] == category["id"]
-        )
-        
-        # 计算数据支持（包含的概念数量）
-        data_support = len(category.get("concepts", []))
-        
-        # 综合评分
-        score = explanation_power * 0.6 + data_support * 0.4  # 加权评分
-        
-        category_scores.append({
-            "category": category,
-            "explanation_power": explanation_power,
-            "data_support": data_support,
-            "score": score
-        })
+    Returns:
+        各节点的 PageRank 值
+    """
+    neighbors = graph["neighbors"]
+    n = len(neighbors)
+    if n == 0:
+        return []
+    if HAS_NUMPY:
+        return _pagerank_numpy(neighbors, damping, tol, max_iter)
+
+    out_weight = [sum(adj.values()) for adj in neighbors]
+    rank = [1.0 / n] * n
+    for _ in range(max_iter):
+        dangling = sum(rank[i] for i in range(n) if out_weight[i] <= 0)
+        base = (1 - damping) / n + damping * dangling / n
+        new_rank = [base] * n
+        for i, adj in enumerate(neighbors):
+            if out_weight[i] <= 0:
+                continue
+            share = damping * rank[i] / out_weight[i]
+            for j, weight in adj.items():
+                new_rank[j] += share * weight
+        delta = sum(abs(a - b) for a, b in zip(new_rank, rank))
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank
+
+
+def _pagerank_numpy(neighbors: List[Dict[int, float]], damping: float,
+                    tol: float, max_iter: int) -> List[float]:
+    n = len(neighbors)
+    sources = np.fromiter((i for i, adj in enumerate(neighbors) for _ in adj), dtype=np.int64)
+    targets = np.fromiter((j for adj in neighbors for j in adj), dtype=np.int64)
+    weights = np.fromiter((w for adj in neighbors for w in adj.values()), dtype=float)
+    out_weight = np.bincount(sources, weights, minlength=n)
+    dangling = out_weight <= 0
+    edge_share = weights / np.where(dangling, 1.0, out_weight)[sources]
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(targets, rank[sources] * edge_share, minlength=n)
+        new_rank = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank.tolist()
+
+
+def calculate_betweenness(graph: Dict[str, Any], pivots: Optional[int] = None,
+                          seed: int = BETWEENNESS_SEED) -> List[float]:
+    """
+    计算归一化介数中心性（无权最短路径，Brandes 算法）
+    
+    范畴数超过 BETWEENNESS_EXACT_MAX_NODES 时只从随机抽样的源节点出发
+    累积依赖值，再按 n/pivots 放大，得到无偏估计。
+    
+    Args:
+        graph: build_category_graph 构建的关系图
+        pivots: 抽样源节点数，为空时按范畴数自动选择
+        seed: 抽样随机种子
     
-    # 按评分排序，选择最高分的作为核心范畴
-    category_scores.sort(key=lambda x: x["score"], reverse=True)
-    
-    if category_scores:
-        top_category = category_scores[0]["category"]
-        return {
-            "name": top_category["name"],
-            "id": top_category["id"],
-            "definition": top_category["definition"],
-            "explanation_power": category_scores[0]["explanation_power"],
-            "data_support": category_scores[0]["data_support"],
-            "score": category_scores[0]["score"],
-            "rationale": f"该范畴与最多其他范畴相关（{category_scores[0]['explanation_power']}个关系），且有充分数据支持（{category_scores[0]['data_support']}个概念）"
+    Returns:
+        各节点的介数中心性
+    """
+    neighbors = graph["neighbors"]
+    n = len(neighbors)
+    if n < 3:
+        return [0.0] * n
+    if pivots is None:
+        pivots = n if n <= BETWEENNESS_EXACT_MAX_NODES else BETWEENNESS_PIVOTS
+    sources = range(n) if pivots >= n else random.Random(seed).sample(range(n), pivots)
+    adjacency = [list(adj) for adj in neighbors]
+
+    betweenness = [0.0] * n
+    for source in sources:
+        order = [source]
+        predecessors = {source: []}
+        sigma = {source: 1}
+        distance = {source: 0}
+        head = 0
+        while head < len(order):
+            v = order[head]
+            head += 1
+            next_distance = distance[v] + 1
+            for w in adjacency[v]:
+                if w not in distance:
+                    distance[w] = next_distance
+                    sigma[w] = 0
+                    predecessors[w] = []
+                    order.append(w)
+                if distance[w] == next_distance:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coefficient = (1.0 + delta[w]) / sigma[w]
+            for v in predecessors[w]:
+                delta[v] += sigma[v] * coefficient
+            if w != source:
+                betweenness[w] += delta[w]
+
+    # 无向图每对节点计算两次；按 (n-1)(n-2) 归一化，抽样时按比例放大
+    scale = (n / len(sources)) / ((n - 1) * (n - 2))
+    return [value * scale for value in betweenness]
+
+
+def rank_core_categories(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]],
+                         graph: Optional[Dict[str, Any]] = None,
+                         top_n: int = CORE_SHORTLIST_SIZE,
+                         weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    按关系图指标对核心范畴候选排序
+    
+    度数、加权 PageRank、介数中心性和数据支持（概念数）分别按最大值
+    归一化后加权求和。
+    
+    Args:
+        categories: 范畴列表
+        relationships: 关系列表
+        graph: 已构建的关系图，为空时现场构建
+        top_n: 返回的候选数
+        weights: 各指标权重，默认 CORE_SCORE_WEIGHTS
+    
+    Returns:
+        按总分降序排列的候选列表，含各指标原始值与得分明细
+    """
+    if graph is None:
+        graph = build_category_graph(categories, relationships)
+    weights = weights or CORE_SCORE_WEIGHTS
+    nodes = graph["categories"]
+    if not nodes:
+        return []
+
+    metrics = {
+        "degree": [len(adj) for adj in graph["neighbors"]],
+        "pagerank": calculate_pagerank(graph),
+        "betweenness": calculate_betweenness(graph),
+        "data_support": [len(category.get("concepts", [])) for category in nodes]
+    }
+    maxima = {name: max(values) or 1 for name, values in metrics.items()}
+
+    ranked = []
+    for i, category in enumerate(nodes):
+        breakdown = {
+            name: round(weights.get(name, 0.0) * metrics[name][i] / maxima[name], 4)
+            for name in metrics
         }
+        ranked.append({
+            "id": category["id"],
+            "name": category.get("name", category["id"]),
+            "score": round(sum(breakdown.values()), 4),
+            "metrics": {
+                "degree": metrics["degree"][i],
+                "relationships": len(graph["incident"][i]),
+                "pagerank": round(metrics["pagerank"][i], 6),
+                "betweenness": round(metrics["betweenness"][i], 6),
+                "data_support": metrics["data_support"][i]
+            },
+            "score_breakdown": breakdown
+        })
+
+    ranked.sort(key=lambda candidate: (-candidate["score"], graph["index"][candidate["id"]]))
+    return ranked[:top_n]
+
+
+def identify_core_category(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]],
+                           graph: Optional[Dict[str, Any]] = None,
+                           top_n: int = CORE_SHORTLIST_SIZE) -> Dict[str, Any]:
+    """
+    识别核心范畴
+    
+    Args:
+        categories: 范畴列表
+        relationships: 关系列表
+        graph: 已构建的关系图，为空时现场构建
+        top_n: 候选短名单长度
     
-    return {}
+    Returns:
+        得分最高的核心范畴，candidates 字段为带得分明细的候选短名单
+    """
+    if not categories:
+        return {}
+    if graph is None:
+        graph = build_category_graph(categories, relationships)
+
+    candidates = rank_core_categories(categories, relationships, graph, top_n)
+    top = candidates[0]
+    top_category = graph["categories"][graph["index"][top["id"]]]
+    explanation_power = top["metrics"]["relationships"]
+    return {
+        "name": top["name"],
+        "id": top["id"],
+        "definition": top_category.get("definition", ""),
+        "explanation_power": explanation_power,
+        "data_support": top["metrics"]["data_support"],
+        "score": top["score"],
+        "score_breakdown": top["score_breakdown"],
+        "candidates": candidates,
+        "rationale": f"该范畴在关系图中综合得分最高（{top['score']}），与 {top['metrics']['degree']} 个范畴直接相关（{explanation_power}个关系），且有充分数据支持（{top['metrics']['data_support']}个概念）"
+    }
 
 
-def construct_storyline(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]], core_category: Dict[str, Any]) -> Dict[str, Any]:
+def construct_storyline(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]],
+                        core_category: Dict[str, Any],
+                        graph: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     构建故事线
     
@@ -108,26 +354,27 @@ def construct_storyline(categories: List[Dict[str, Any]], relationships: List[Di
         categories: 范畴列表
         relationships: 关系列表
         core_category: 核心范畴
+        graph: 已构建的关系图，为空时现场构建
     
     Returns:
         故事线
     """
     if not core_category:
         return {}
+    if graph is None:
+        graph = build_category_graph(categories, relationships)
     
     # 构建以核心范畴为中心的故事线
     storyline_elements = []
     
-    # 找到与核心范畴直接相关的范畴
-    core_related = [
-        rel for rel in relationships 
-        if rel["source_category"] == core_category["id"] or rel["target_category"] == core_category["id"]
-    ]
+    # 通过邻接索引找到与核心范畴直接相关的关系
+    core_index = graph["index"].get(core_category["id"])
+    core_related = graph["incident"][core_index] if core_index is not None else []
     
     # 构建故事线元素
     for rel in core_related:
-        source_cat = next((cat for cat in categories if cat["id"] == rel["source_category"]), None)
-        target_cat = next((cat for cat in categories if cat["id"] == rel["target_category"]), None)
+        source_cat = _graph_category(graph, rel["source_category"])
+        target_cat = _graph_category(graph, rel["target_category"])
         
         if source_cat and target_cat:
             element = {
@@ -150,6 +397,12 @@ def construct_storyline(categories: List[Dict[str, Any]], relationships: List[Di
     return storyline
 
 
+def _graph_category(graph: Dict[str, Any], category_id: Any) -> Optional[Dict[str, Any]]:
+    """按 ID 从关系图中取范畴"""
+    i = graph["index"].get(category_id)
+    return graph["categories"][i] if i is not None else None
+
+
 def build_narrative_flow(elements: List[Dict[str, Any]], core_category: Dict[str, Any]) -> str:
     """
     构建叙事流程
@@ -191,7 +444,8 @@ def calculate_narrative_coherence(elements: List[Dict[str, Any]]) -> float:
     return min(1.0, len(elements) * 0.3)  # 基于元素数量的简单计算
 
 
-def integrate_theory(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]], core_category: Dict[str, Any], storyline: Dict[str, Any]) -> Dict[str, Any]:
+def integrate_theory(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]], core_category: Dict[str, Any], storyline: Dict[str, Any],
+                     graph: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     整合理论框架
     
@@ -200,18 +454,22 @@ def integrate_theory(categories: List[Dict[str, Any]], relationships: List[Dict[
         relationships: 关系列表
         core_category: 核心范畴
         storyline: 故事线
+        graph: 已构建的关系图，为空时现场构建
     
     Returns:
         理论框架
     """
+    if graph is None:
+        graph = build_category_graph(categories, relationships)
+    
     # 提炼理论命题
-    propositions = generate_theoretical_propositions(categories, relationships, core_category)
+    propositions = generate_theoretical_propositions(categories, relationships, core_category, graph)
     
     # 构建概念框架
     conceptual_framework = build_conceptual_framework(categories, core_category)
     
     # 解释作用机制
-    mechanisms = explain_mechanisms(relationships)
+    mechanisms = explain_mechanisms(relationships, graph)
     
     theory_framework = {
         "core_category": core_category,
@@ -226,7 +484,8 @@ def integrate_theory(categories: List[Dict[str, Any]], relationships: List[Dict[
     return theory_framework
 
 
-def generate_theoretical_propositions(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]], core_category: Dict[str, Any]) -> List[Dict[str, Any]]:
+def generate_theoretical_propositions(categories: List[Dict[str, Any]], relationships: List[Dict[str, Any]], core_category: Dict[str, Any],
+                                      graph: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     生成理论命题
     
@@ -234,16 +493,19 @@ def generate_theoretical_propositions(categories: List[Dict[str, Any]], relation
         categories: 范畴列表
         relationships: 关系列表
         core_category: 核心范畴
+        graph: 已构建的关系图，为空时现场构建
     
     Returns:
         理论命题列表
     """
+    if graph is None:
+        graph = build_category_graph(categories, relationships)
     propositions = []
     
     # 基于关系生成命题
     for rel in relationships[:5]:  # 限制数量以简化
-        source_cat = next((cat for cat in categories if cat["id"] == rel["source_category"]), None)
-        target_cat = next((cat for cat in categories if cat["id"] == rel["target_category"]), None)
+        source_cat = _graph_category(graph, rel["source_category"])
+        target_cat = _graph_category(graph, rel["target_category"])
         
         if source_cat and target_cat:
             proposition = {
@@ -290,34 +552,32 @@ def build_conceptual_framework(categories: List[Dict[str, Any]], core_category:
     return framework
 
 
-def explain_mechanisms(relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def explain_mechanisms(relationships: List[Dict[str, Any]],
+                       graph: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     解释作用机制
     
     Args:
         relationships: 关系列表
+        graph: 已构建的关系图，提供时直接使用其关系类型计数
     
     Returns:
         作用机制列表
     """
-    mechanisms = []
-    
     # 基于关系类型归纳机制
-    mechanism_types = {}
-    for rel in relationships:
-        rel_type = rel["type"]
-        if rel_type not in mechanism_types:
-            mechanism_types[rel_type] = {
-                "type": rel_type,
-                "description": f"{rel_type} 类型的关系机制",
-                "instances": 0,
-                "examples": []
-            }
-        mechanism_types[rel_type]["instances"] += 1
+    if graph is not None:
+        type_counts = graph["relationship_types"]
+    else:
+        type_counts = Counter(rel["type"] for rel in relationships)
     
-    for mech in mechanism_types.values():
-        mech["description"] = f"{mech['type']} 机制在理论中出现 {mech['instances']} 次，是连接不同范畴的重要方式"
-        mechanisms.append(mech)
+    mechanisms = []
+    for rel_type, instances in type_counts.items():
+        mechanisms.append({
+            "type": rel_type,
+            "description": f"{rel_type} 机制在理论中出现 {instances} 次，是连接不同范畴的重要方式",
+            "instances": instances,
+            "examples": []
+        })
     
     return mechanisms
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+轴心编码模块测试套件
+包括聚类范畴识别、共现关系强度、确定性和规模测试
+"""
+
+import random
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加阶段模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'stages'))
+
+import axial_coding as axial
+from open_coding import open_coding
+from axial_coding import (
+    axial_coding,
+    build_relationships,
+    calculate_relationship_strength,
+    identify_categories
+)
+
+
+CJK_CHARS = '的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可她里后小么心多天而能好都然没日于起还发成事只作当想看'
+
+
+def make_concepts(codes, concepts_per_segment=8):
+    return [
+        {'id': f'concept_{i}', 'code': code, 'segment_id': i // concepts_per_segment, 'examples': []}
+        for i, code in enumerate(codes)
+    ]
+
+
+def category_codes(categories):
+    return [sorted({c['code'] for c in category['concepts']}) for category in categories]
+
+
+@unittest.skipUnless(axial.HAS_NUMPY, '需要 numpy')
+class TestCategoryClustering(unittest.TestCase):
+    """测试聚类范畴识别"""
+
+    def test_similar_codes_grouped(self):
+        """测试字形相近的编码归入同一范畴"""
+        words = ['innovation', 'innovate', 'innovative', 'organization', 'organisation',
+                 'organizational', 'leadership', 'leader', 'leaders']
+        categories = identify_categories(make_concepts(words), k=3)
+        self.assertCountEqual(category_codes(categories), [
+            ['innovate', 'innovation', 'innovative'],
+            ['organisation', 'organization', 'organizational'],
+            ['leader', 'leaders', 'leadership']
+        ])
+
+    def test_duplicate_codes_share_category(self):
+        """测试相同编码的概念在同一范畴"""
+        concepts = make_concepts(['数字化', '数字化转型', '组织', '组织变革', '数字化'])
+        categories = identify_categories(concepts)
+        for category in categories:
+            if any(c['code'] == '数字化' for c in category['concepts']):
+                self.assertEqual(sum(c['code'] == '数字化' for c in category['concepts']), 2)
+
+    def test_deterministic_under_seed(self):
+        """测试相同种子结果一致"""
+        rng = random.Random(5)
+        codes = [''.join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 4))) for _ in range(1500)]
+        concepts = make_concepts(codes)
+        first = identify_categories(concepts, seed=3)
+        second = identify_categories(concepts, seed=3)
+        self.assertEqual(category_codes(first), category_codes(second))
+        self.assertEqual([c['id'] for c in first], [c['id'] for c in second])
+
+    def test_scales_to_20k_concepts(self):
+        """测试2万个概念的聚类与关系构建"""
+        rng = random.Random(9)
+        codes = [''.join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 4))) for _ in range(20000)]
+        concepts = make_concepts(codes)
+
+        start = time.perf_counter()
+        categories = identify_categories(concepts)
+        relationships = build_relationships(categories)
+        elapsed = time.perf_counter() - start
+
+        self.assertGreater(len(categories), 1)
+        self.assertEqual(sum(len(c['concepts']) for c in categories), 20000)
+        self.assertGreater(len(relationships), 0)
+        self.assertLess(elapsed, 120)
+
+
+class TestRelationships(unittest.TestCase):
+    """测试共现关系"""
+
+    def setUp(self):
+        def category(category_id, segments):
+            return {
+                'id': category_id,
+                'name': category_id,
+                'concepts': [{'id': f'{category_id}_{s}', 'code': category_id, 'segment_id': s}
+                             for s in segments]
+            }
+
+        self.categories = [
+            category('A', [0, 1, 2, 3]),
+            category('B', [2, 3, 4, 5]),
+            category('C', [10, 11]),
+            category('D', [4, 5, 6, 7, 8, 9, 12, 13]),
+        ]
+
+    def test_only_co_occurring_pairs(self):
+        """测试只为共现范畴建立关系"""
+        relationships = build_relationships(self.categories)
+        pairs = {frozenset((r['source_category'], r['target_category'])) for r in relationships}
+        self.assertEqual(pairs, {frozenset('AB'), frozenset('BD')})
+
+    def test_strength_from_co_occurrence(self):
+        """测试关系强度为共现 Jaccard 系数"""
+        relationships = {frozenset((r['source_category'], r['target_category'])): r
+                         for r in build_relationships(self.categories)}
+        self.assertAlmostEqual(relationships[frozenset('AB')]['strength'], 2 / 6, places=4)
+        self.assertEqual(relationships[frozenset('AB')]['co_occurrence'], 2)
+        self.assertEqual(calculate_relationship_strength(0, 0, 0), 0.0)
+
+    def test_relationship_type_deterministic(self):
+        """测试关系类型确定且有方向"""
+        first = build_relationships(self.categories)
+        second = build_relationships(self.categories)
+        self.assertEqual(first, second)
+
+        bd = next(r for r in first if {r['source_category'], r['target_category']} == {'B', 'D'})
+        # B 出现时 D 一半伴随出现，D 出现时 B 很少出现，且 B 先出现
+        self.assertEqual(bd['type'], 'causal')
+        self.assertEqual((bd['source_category'], bd['target_category']), ('B', 'D'))
+
+    def test_axial_coding_end_to_end(self):
+        """测试轴心编码完整流程"""
+        concepts = make_concepts(['创新', '创新能力', '组织', '组织文化', '领导', '领导力'], 2)
+        result = axial_coding({'concepts': concepts, 'clustering_config': {'k': 3}})
+        self.assertEqual(result['axial_coding_process']['initial_concepts'], 6)
+        self.assertEqual(result['axial_coding_process']['established_relationships'],
+                         len(result['relationships']))
+
+
+
+@unittest.skipUnless(axial.HAS_NUMPY, '需要 numpy')
+class TestOpenToAxialPipeline(unittest.TestCase):
+    """测试从开放编码到轴心编码的完整流程"""
+
+    def test_merged_codes_count_every_segment(self):
+        """测试相同编码合并后，共现统计使用全部出现的文本段而不只是第一次出现"""
+        segments = ['leadership budget'] * 6 + ['leadership'] * 4 + ['budget morale'] * 2 + ['morale'] * 3
+        open_results = open_coding({'segments': segments})
+        segment_ids = {c['code']: c.get('segment_ids') for c in open_results['concepts']}
+        self.assertEqual(segment_ids['leadership'], list(range(10)))
+        self.assertEqual(segment_ids['budget'], [0, 1, 2, 3, 4, 5, 10, 11])
+
+        result = axial_coding({'concepts': open_results['concepts'], 'clustering_config': {'k': 3}})
+        names = {c['id']: c['concepts'][0]['code'] for c in result['categories']}
+        relationships = {frozenset((names[r['source_category']], names[r['target_category']])): r
+                         for r in result['relationships']}
+        leadership_budget = relationships[frozenset(('leadership', 'budget'))]
+        self.assertEqual(leadership_budget['co_occurrence'], 6)
+        self.assertAlmostEqual(leadership_budget['strength'], 6 / (10 + 8 - 6), places=4)
+        self.assertEqual(relationships[frozenset(('budget', 'morale'))]['co_occurrence'], 2)
+        self.assertNotIn(frozenset(('leadership', 'morale')), relationships)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+扎根理论分析流水线测试套件
+包括多文档开放编码合并、阶段检查点复用和并行执行测试
+"""
+
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+from gt_expert_analyzer import (
+    content_hash,
+    load_documents,
+    merge_open_results,
+    open_code_documents,
+    run_coding_pipeline,
+    run_stage
+)
+
+
+WORDS = ['innovation', 'organization', 'leadership', 'culture', 'strategy', 'digital',
+         'platform', 'customer', 'employee', 'process', 'learning', 'capability']
+
+
+def make_documents(count, segments=6, seed=2):
+    rng = random.Random(seed)
+    return {
+        f'interview_{i:03d}.txt': {
+            'text_data': '。'.join(' '.join(rng.choices(WORDS, k=6)) for _ in range(segments))
+        }
+        for i in range(count)
+    }
+
+
+class TestStageCheckpoints(unittest.TestCase):
+    """测试阶段检查点"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_content_hash_stable_and_sensitive(self):
+        """测试内容哈希与键顺序无关、随内容变化"""
+        self.assertEqual(content_hash('open', {'a': 1, 'b': 2}), content_hash('open', {'b': 2, 'a': 1}))
+        self.assertNotEqual(content_hash('open', {'a': 1}), content_hash('open', {'a': 2}))
+        self.assertNotEqual(content_hash('open', {'a': 1}), content_hash('axial', {'a': 1}))
+
+    def test_text_file_hashed_by_contents(self):
+        """测试 text_file 输入按文件内容而不是路径计算哈希"""
+        path = Path(self.tmp.name) / 'interview.txt'
+        path.write_text('innovation culture', encoding='utf-8')
+        inputs = {'text_file': str(path)}
+        first = content_hash('open_coding', inputs)
+        self.assertEqual(content_hash('open_coding', inputs), first)
+
+        path.write_text('leadership strategy', encoding='utf-8')
+        self.assertNotEqual(content_hash('open_coding', inputs), first)
+
+        calls = []
+
+        def stage(stage_inputs):
+            calls.append(stage_inputs)
+            return {'text': Path(stage_inputs['text_file']).read_text(encoding='utf-8')}
+
+        cache_dir = str(Path(self.tmp.name) / 'cache')
+        run_stage('read', inputs, stage, cache_dir)
+        path.write_text('digital platform', encoding='utf-8')
+        result = run_stage('read', inputs, stage, cache_dir)
+        self.assertEqual(result, {'text': 'digital platform'})
+        self.assertEqual(calls, [inputs, inputs])
+
+    def test_run_stage_reuses_checkpoint(self):
+        """测试输入不变时不重新计算"""
+        calls = []
+
+        def stage(inputs):
+            calls.append(inputs)
+            return {'value': inputs['x'] * 2}
+
+        stats = {}
+        first = run_stage('double', {'x': 3}, stage, self.tmp.name, stats)
+        second = run_stage('double', {'x': 3}, stage, self.tmp.name, stats)
+        run_stage('double', {'x': 4}, stage, self.tmp.name, stats)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(stats['double'], {'hits': 1, 'misses': 2})
+
+
+class TestCodingPipeline(unittest.TestCase):
+    """测试多文档编码流水线"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = str(Path(self.tmp.name) / 'checkpoints')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merge_keeps_ids_and_segments_unique(self):
+        """测试合并后概念 ID 和文本段编号唯一"""
+        per_document = open_code_documents(make_documents(3))
+        merged = merge_open_results(per_document)
+
+        ids = [c['id'] for c in merged['concepts']]
+        self.assertEqual(len(ids), len(set(ids)))
+        segments = {(c['document'], c['segment_id']) for c in merged['concepts']}
+        self.assertEqual(len(segments), len({s for _, s in segments}))
+        self.assertEqual(merged['coding_process']['segments_processed'], 18)
+        self.assertEqual(len(merged['documents']), 3)
+
+    def test_load_documents_from_directory(self):
+        """测试从目录读取转录文件"""
+        root = Path(self.tmp.name) / 'transcripts'
+        (root / 'batch').mkdir(parents=True)
+        (root / 'a.txt').write_text('innovation culture', encoding='utf-8')
+        (root / 'batch' / 'b.json').write_text('{"segments": ["leadership strategy"]}', encoding='utf-8')
+        (root / 'notes.csv').write_text('ignored', encoding='utf-8')
+
+        documents = load_documents(str(root))
+        self.assertEqual(list(documents), ['a.txt', 'batch/b.json'])
+        self.assertEqual(documents['batch/b.json'], {'segments': ['leadership strategy']})
+
+    def test_parallel_matches_serial(self):
+        """测试并行开放编码与串行结果一致"""
+        documents = make_documents(8)
+        serial = run_coding_pipeline(documents, workers=1)
+        parallel = run_coding_pipeline(documents, workers=2)
+        for stage in ('open_coding', 'axial_coding', 'selective_coding'):
+            self.assertEqual(serial[stage], parallel[stage])
+
+    def test_rerun_after_editing_one_of_200_documents(self):
+        """测试200个文档中修改一个后只重算该文档和下游阶段"""
+        documents = make_documents(200)
+
+        start = time.perf_counter()
+        first = run_coding_pipeline(documents, cache_dir=self.cache_dir)
+        cold = time.perf_counter() - start
+
+        documents['interview_007.txt'] = {'text_data': 'platform capability learning。digital customer'}
+        start = time.perf_counter()
+        second = run_coding_pipeline(documents, cache_dir=self.cache_dir)
+        warm = time.perf_counter() - start
+
+        self.assertEqual(first['pipeline']['stages']['open_coding'], {'hits': 0, 'misses': 200})
+        self.assertEqual(second['pipeline']['stages']['open_coding'], {'hits': 199, 'misses': 1})
+        self.assertEqual(second['pipeline']['stages']['axial_coding'], {'hits': 0, 'misses': 1})
+        self.assertLess(warm, cold)
+
+        third = run_coding_pipeline(documents, cache_dir=self.cache_dir)
+        self.assertEqual(third['pipeline']['stages']['selective_coding'], {'hits': 1, 'misses': 0})
+        self.assertEqual(third['selective_coding'], second['selective_coding'])
+
+
+if __name__ == '__main__':
+    unittest.main()
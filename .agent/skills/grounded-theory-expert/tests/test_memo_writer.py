@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+备忘录模块测试套件
+包括备忘录库存储、全文检索、按概念查询、跨运行追加和导出测试
+"""
+
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加工具模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'tools'))
+
+from memo_writer import MEMO_FIELDS, MemoRepository, memo_writing
+
+
+# 10万条备忘录上的查询耗时上限（秒）：按概念查询走索引，全文检索含 BM25 排序
+BY_ELEMENT_BUDGET = 0.02
+SEARCH_BUDGET = 0.25
+
+TOPICS = ['数字化转型', '组织文化', '领导力', '创新能力', '员工学习', 'platform strategy', 'customer value']
+
+
+def best_time(func, repeat=3):
+    """多次运行取最短耗时，排除偶发的调度抖动"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def make_memo(i, rng):
+    topic = rng.choice(TOPICS)
+    return {
+        'type': rng.choice(['process_memo', 'theory_memo', 'reflection_memo']),
+        'title': f'备忘录 {i} - {topic}',
+        'date': f'2025-12-{i % 28 + 1:02d}T10:00:00',
+        'content': f'在第{i}次编码中观察到{topic}与{rng.choice(TOPICS)}之间的联系。',
+        'coding_stage': rng.choice(['open', 'axial', 'selective']),
+        'related_elements': [f'concept_{rng.randrange(5000)}', f'category_{rng.randrange(200)}']
+    }
+
+
+class TestMemoRepository(unittest.TestCase):
+    """测试备忘录库"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / 'memos.db'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_full_text_search_chinese_and_english(self):
+        """测试中英文全文检索"""
+        with MemoRepository() as repository:
+            repository.add_memos([
+                {'title': '数字化转型观察', 'content': '企业的数字化转型依赖组织文化', 'coding_stage': 'open'},
+                {'title': '领导力', 'content': 'Leadership shapes platform strategy', 'coding_stage': 'axial'},
+            ])
+            self.assertEqual([m['title'] for m in repository.search('转型')], ['数字化转型观察'])
+            self.assertEqual([m['title'] for m in repository.search('platform')], ['领导力'])
+            self.assertEqual(repository.search('转型 platform'), [])
+            self.assertEqual(repository.search('数字化', coding_stage='axial'), [])
+
+    def test_lookup_by_concept(self):
+        """测试按概念或范畴查询，兼容字典形式的关联元素"""
+        with MemoRepository() as repository:
+            repository.add_memos([
+                {'title': 'a', 'coding_stage': 'open', 'related_elements': [{'id': 'concept_1', 'code': '创新'}]},
+                {'title': 'b', 'coding_stage': 'axial', 'related_elements': ['concept_1', 'category_2']},
+                {'title': 'c', 'coding_stage': 'open', 'related_concepts': ['concept_3']},
+            ])
+            self.assertEqual([m['title'] for m in repository.by_element('concept_1')], ['a', 'b'])
+            self.assertEqual([m['title'] for m in repository.by_element('concept_1', 'axial')], ['b'])
+            self.assertEqual([m['title'] for m in repository.by_element('concept_3')], ['c'])
+
+    def test_appends_across_runs_and_exports(self):
+        """测试跨运行追加并按原格式导出"""
+        first = memo_writing({'coding_stage': 'open', 'memo_db': str(self.db_path),
+                              'analysis_results': {'concepts': [{'id': 'concept_1', 'code': '创新'}]}})
+        second = memo_writing({'coding_stage': 'axial', 'memo_db': str(self.db_path),
+                               'analysis_results': {'categories': [{'id': 'category_1'}]}})
+        self.assertEqual(second['memo_repository']['total'],
+                         first['memo_repository']['stored'] + second['memo_repository']['stored'])
+
+        with MemoRepository(self.db_path) as repository:
+            exported = repository.export()
+            self.assertEqual(exported[:len(first['memos'])], [
+                {field: memo[field] for field in MEMO_FIELDS}
+                for memo in first['memos']
+            ])
+            self.assertEqual(len(repository.export('axial')), second['memo_repository']['stored'])
+            self.assertTrue(repository.by_element('category_1'))
+
+    def test_queries_on_100k_memos(self):
+        """测试10万条备忘录的检索耗时"""
+        rng = random.Random(8)
+        with MemoRepository(self.db_path) as repository:
+            repository.add_memos(make_memo(i, rng) for i in range(100000))
+            self.assertEqual(repository.count(), 100000)
+
+            hits, search_elapsed = best_time(lambda: repository.search('组织文化', limit=20))
+            by_concept, by_element_elapsed = best_time(lambda: repository.by_element('concept_42'))
+
+            self.assertEqual(len(hits), 20)
+            self.assertTrue(all('组织文化' in m['title'] + m['content'] for m in hits))
+            self.assertTrue(by_concept)
+            self.assertTrue(all('concept_42' in m['related_elements'] for m in by_concept))
+            self.assertLess(by_element_elapsed, BY_ELEMENT_BUDGET)
+            self.assertLess(search_elapsed, SEARCH_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+开放编码模块测试套件
+包括持续比较的 MinHash/LSH 召回率、确定性和性能测试，以及流式分段与候选词抽取测试
+"""
+
+import io
+import random
+import tempfile
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+import sys
+
+# 添加阶段模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'stages'))
+
+from open_coding import (
+    BoundedTermCounter,
+    choose_lsh_bands,
+    extract_terms,
+    identify_concepts,
+    iter_file_chunks,
+    iter_segments,
+    open_coding,
+    perform_constant_comparison,
+    split_text_into_segments,
+    stream_concepts
+)
+
+
+CJK_CHARS = '的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可她里后小'
+
+
+def make_concepts(count, alphabet, min_len=2, max_len=6, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f'concept_{i}',
+            'code': ''.join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len)))
+        }
+        for i in range(count)
+    ]
+
+
+def pair_set(results):
+    return {(p['concept1'], p['concept2']) for p in results['similar_pairs']}
+
+
+class TestConstantComparison(unittest.TestCase):
+    """测试持续比较"""
+
+    def test_lsh_recall_against_exhaustive(self):
+        """测试 LSH 相对两两比较的召回率"""
+        concepts = make_concepts(2000, 'abcdefghijklmnop', 3, 9)
+        exhaustive = pair_set(perform_constant_comparison(concepts, method='exhaustive'))
+        lsh = pair_set(perform_constant_comparison(concepts, method='lsh'))
+
+        self.assertGreater(len(exhaustive), 0)
+        self.assertTrue(lsh <= exhaustive)
+        self.assertGreaterEqual(len(lsh & exhaustive) / len(exhaustive), 0.95)
+
+    def test_configurable_threshold(self):
+        """测试相似度阈值可配置"""
+        concepts = make_concepts(1000, CJK_CHARS)
+        strict = perform_constant_comparison(concepts, similarity_threshold=0.9, method='lsh')
+        loose = perform_constant_comparison(concepts, similarity_threshold=0.5, method='lsh')
+        self.assertTrue(all(p['similarity'] > 0.9 for p in strict['similar_pairs']))
+        self.assertGreater(len(loose['similar_pairs']), len(strict['similar_pairs']))
+
+    def test_deterministic_with_seed(self):
+        """测试相同种子输出一致"""
+        concepts = make_concepts(1500, CJK_CHARS)
+        first = perform_constant_comparison(concepts, method='lsh', seed=7)
+        second = perform_constant_comparison(concepts, method='lsh', seed=7)
+        self.assertEqual(first, second)
+
+    def test_identical_codes_merged(self):
+        """测试相同编码的概念被合并"""
+        concepts = [{'id': f'c{i}', 'code': code} for i, code in enumerate(['创新', '组织', '创新'])]
+        results = perform_constant_comparison(concepts, method='lsh')
+        self.assertEqual(results['merged_pairs'][0]['kept'], 'c0')
+        self.assertEqual(results['merged_pairs'][0]['merged'], 'c2')
+
+    def test_band_selection_meets_recall(self):
+        """测试分带参数在阈值处满足目标召回率"""
+        bands, rows = choose_lsh_bands(128, 0.8)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertGreaterEqual(1 - (1 - 0.8 ** rows) ** bands, 0.99)
+
+    def test_comparison_config_passed_through(self):
+        """测试 open_coding 读取 comparison_config"""
+        data = {
+            'segments': ['organization innovation', 'organisation innovate'],
+            'comparison_config': {'similarity_threshold': 0.99, 'method': 'lsh'}
+        }
+        results = open_coding(data)
+        self.assertEqual(results['coding_process']['merged_concepts'], [])
+
+    def test_lsh_runtime_on_50k_concepts(self):
+        """测试 5 万概念的运行时间"""
+        concepts = make_concepts(50000, CJK_CHARS)
+        start = time.perf_counter()
+        perform_constant_comparison(concepts)
+        self.assertLess(time.perf_counter() - start, 60)
+
+
+
+SAMPLE_FILE = skill_dir / 'tests' / 'sample-cases' / 'xiyouji_excerpts.txt'
+
+
+class TestStreamingSegmentation(unittest.TestCase):
+    """测试流式分段与候选词抽取"""
+
+    def test_segments_identical_across_chunk_sizes(self):
+        """测试任意分块大小下分段结果一致"""
+        text = SAMPLE_FILE.read_text(encoding='utf-8')
+        expected = split_text_into_segments(text)
+        for chunk_size in (1, 7, 4096):
+            segments = list(iter_segments(iter_file_chunks(io.StringIO(text), chunk_size)))
+            self.assertEqual(segments, expected)
+
+    def test_long_segment_forced_split(self):
+        """测试无句末标点的超长文本被强制切分"""
+        segments = list(iter_segments(['字' * 25], max_segment_chars=10))
+        self.assertEqual([len(s) for s in segments], [10, 10, 5])
+
+    def test_extract_terms_filters_stopwords(self):
+        """测试西文停用词过滤和中文二元组抽取"""
+        terms = extract_terms("The organization's 数字化转型的关键。and 2024")
+        self.assertEqual(terms, ['organization', '数字', '字化', '化转', '转型', '关键'])
+
+    def test_cjk_candidates_require_association(self):
+        """测试中文二元组需达到频次和点互信息要求"""
+        segments = ['组织变革推动创新', '组织变革需要领导', '创新需要组织变革', '领导推动创新']
+        codes = {c['code'] for c in identify_concepts(segments)}
+        self.assertIn('组织', codes)
+        self.assertIn('创新', codes)
+        self.assertNotIn('织变革', codes)
+        self.assertNotIn('革推', codes)
+
+    def test_bounded_counter_keeps_heavy_hitters(self):
+        """测试有界计数器容量受限且保留高频词"""
+        rng = random.Random(2)
+        counter = BoundedTermCounter(capacity=50)
+        for i in range(5000):
+            words = ['innovation', 'culture'] + [f'rare{rng.randrange(100000)}' for _ in range(5)]
+            counter.add_segment(i, ' '.join(words))
+            self.assertLessEqual(len(counter.counts), 100)
+        self.assertEqual(counter.counts['innovation'], 5000)
+        self.assertEqual([term for term, _ in counter.most_common(2)], ['innovation', 'culture'])
+        self.assertGreater(counter.pruned, 0)
+
+    def test_stream_memory_independent_of_length(self):
+        """测试流式概念识别的峰值内存不随输入长度增长"""
+        text = SAMPLE_FILE.read_text(encoding='utf-8')
+
+        def peak(repeats):
+            tracemalloc.start()
+            stream_concepts((text for _ in range(repeats)), capacity=2000)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak_bytes
+
+        small, large = peak(2), peak(20)
+        self.assertLess(large, small * 1.5)
+
+    def test_open_coding_from_text_file(self):
+        """测试 open_coding 流式读取文本文件"""
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+            f.write(SAMPLE_FILE.read_text(encoding='utf-8'))
+        try:
+            results = open_coding({'text_file': f.name, 'stream_config': {'chunk_size': 1000, 'max_concepts': 100}})
+        finally:
+            Path(f.name).unlink()
+        self.assertEqual(results['coding_process']['segments_processed'],
+                         len(split_text_into_segments(SAMPLE_FILE.read_text(encoding='utf-8'))))
+        self.assertLessEqual(len(results['concepts']), 100)
+        frequencies = [c['frequency'] for c in results['concepts']]
+        self.assertTrue(all(f >= 2 for f in frequencies))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+饱和度检验模块测试套件
+包括增量饱和度跟踪、持久化和停止收集判断测试
+"""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# 添加工具模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'tools'))
+
+from saturation_checker import (
+    SaturationTracker,
+    assess_concept_saturation,
+    saturation_check
+)
+
+
+def synthetic_batches(batch_count=100, segments_per_batch=20, vocabulary_size=400, seed=3):
+    """按 Zipf 分布抽词的合成访谈语料，新概念随批次递减"""
+    rng = random.Random(seed)
+    vocabulary = [f'term{i:04d}' for i in range(vocabulary_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary_size)]
+    return [
+        [' '.join(rng.choices(vocabulary, weights, k=12)) for _ in range(segments_per_batch)]
+        for _ in range(batch_count)
+    ]
+
+
+def chinese_batches(batch_count=60, segments_per_batch=20, seed=5):
+    """没有空格分词的中文访谈语料，短语按 Zipf 分布抽取"""
+    rng = random.Random(seed)
+    phrases = ['数字化转型', '组织文化', '领导支持', '员工培训', '客户需求', '流程再造',
+               '数据治理', '技术投入', '绩效考核', '部门协作', '市场竞争', '创新激励',
+               '资源约束', '战略规划', '信息系统', '管理层', '风险控制', '供应链']
+    weights = [1.0 / (rank + 1) for rank in range(len(phrases))]
+    return [
+        ['，'.join(rng.choices(phrases, weights, k=8)) + '。' for _ in range(segments_per_batch)]
+        for _ in range(batch_count)
+    ]
+
+
+class TestSaturationTracker(unittest.TestCase):
+    """测试增量饱和度跟踪器"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.batches = synthetic_batches()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_novelty_curve_declines(self):
+        """测试100个批次的新概念率曲线递减"""
+        tracker = SaturationTracker()
+        for batch in self.batches:
+            tracker.ingest_batch(batch)
+
+        curve = tracker.novelty_curve()
+        self.assertEqual(len(curve), 100)
+        self.assertGreater(curve[0]['new_concept_rate'], curve[-1]['new_concept_rate'])
+        self.assertGreater(curve[4]['rolling_rate'], curve[-1]['rolling_rate'])
+
+    def test_should_stop_after_saturation(self):
+        """测试新概念率降低后建议停止收集"""
+        tracker = SaturationTracker()
+        decisions = []
+        for batch in self.batches:
+            tracker.ingest_batch(batch)
+            decisions.append(tracker.should_stop())
+
+        self.assertFalse(decisions[0])
+        self.assertTrue(decisions[-1])
+        first_stop = decisions.index(True)
+        self.assertTrue(all(decisions[first_stop:]))
+
+    def test_chinese_transcripts_saturate(self):
+        """测试中文转录文本按开放编码的规则抽词，可以达到饱和"""
+        tracker = SaturationTracker()
+        for batch in chinese_batches():
+            tracker.ingest_batch(batch)
+
+        self.assertTrue(tracker.should_stop())
+        self.assertIn('组织', tracker.vocabulary)
+        self.assertLess(len(tracker.vocabulary), 100)
+        self.assertTrue(all(len(term) == 2 for term in tracker.vocabulary))
+
+    def test_persistence_matches_single_run(self):
+        """测试跨运行持久化与一次性运行结果一致"""
+        single = SaturationTracker()
+        for batch in self.batches:
+            single.ingest_batch(batch)
+
+        for start in range(0, 100, 25):
+            tracker = SaturationTracker(self.tmp.name)
+            for batch in self.batches[start:start + 25]:
+                tracker.ingest_batch(batch)
+
+        resumed = SaturationTracker(self.tmp.name)
+        self.assertEqual(resumed.vocabulary, single.vocabulary)
+        self.assertEqual(resumed.batches, single.batches)
+        self.assertEqual(resumed.rolling_rate(), single.rolling_rate())
+        self.assertEqual(resumed.should_stop(), single.should_stop())
+
+    def test_empty_batches_not_committed(self):
+        """测试空批次不计入批次记录和滚动窗口，不会误判饱和"""
+        tracker = SaturationTracker(self.tmp.name)
+        tracker.ingest_batch(self.batches[0])
+        for _ in range(5):
+            record = tracker.ingest_batch([])
+            self.assertIsNone(record['batch'])
+        self.assertFalse(tracker.should_stop())
+        self.assertEqual(len(tracker.batches), 1)
+
+        existing_theory = {'open_coding': {'concepts': [{'code': 'known'}]}}
+        for _ in range(5):
+            result = assess_concept_saturation(existing_theory, [], tracker)
+        self.assertFalse(result['stop_collecting'])
+        self.assertEqual(len(result['novelty_curve']), 1)
+
+        resumed = SaturationTracker(self.tmp.name)
+        self.assertEqual(resumed.batches, tracker.batches)
+        self.assertIn('known', resumed.vocabulary)
+
+    def test_vocabulary_appended_not_rewritten(self):
+        """测试词表按批次追加写入"""
+        tracker = SaturationTracker(self.tmp.name)
+        tracker.ingest_batch(['alpha beta gamma'])
+        tracker.ingest_batch(['alpha delta'])
+
+        lines = (Path(self.tmp.name) / SaturationTracker.VOCABULARY_FILE).read_text(encoding='utf-8').split()
+        self.assertEqual(lines, ['alpha', 'beta', 'gamma', 'delta'])
+
+    def test_known_concepts_not_counted(self):
+        """测试已有理论概念不计为新概念"""
+        existing_theory = {'open_coding': {'concepts': [{'code': 'Innovation'}, {'code': 'culture'}]}}
+        result = assess_concept_saturation(
+            existing_theory, [{'text': 'innovation culture leadership'}]
+        )
+        self.assertEqual(result['new_concepts_found'], 1)
+        self.assertEqual(result['total_new_segments'], 1)
+
+    def test_saturation_check_uses_state_dir(self):
+        """测试 saturation_check 通过状态目录累积批次"""
+        for batch in self.batches[:3]:
+            result = saturation_check({
+                'new_data': batch,
+                'saturation_state_dir': self.tmp.name
+            })
+        self.assertEqual(len(result['concept_saturation']['novelty_curve']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
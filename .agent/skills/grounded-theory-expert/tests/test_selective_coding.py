@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+选择式编码模块测试套件
+包括范畴关系图、核心范畴排序、邻接索引复用和规模测试
+"""
+
+import random
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# 添加阶段模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'stages'))
+
+from selective_coding import (
+    build_category_graph,
+    calculate_betweenness,
+    calculate_pagerank,
+    explain_mechanisms,
+    identify_core_category,
+    rank_core_categories,
+    selective_coding
+)
+
+
+def make_category(category_id, concepts=1):
+    return {'id': category_id, 'name': f'范畴{category_id}', 'definition': '',
+            'concepts': [{'id': f'{category_id}_{i}'} for i in range(concepts)]}
+
+
+def make_relationship(source, target, rel_type='causal', strength=0.5):
+    return {'id': f'rel_{source}_to_{target}', 'source_category': source,
+            'target_category': target, 'type': rel_type, 'strength': strength}
+
+
+class TestCategoryGraph(unittest.TestCase):
+    """测试范畴关系图与中心性指标"""
+
+    def test_path_betweenness(self):
+        """测试路径图中间节点的介数中心性"""
+        graph = build_category_graph(
+            [make_category(c) for c in 'ABC'],
+            [make_relationship('A', 'B'), make_relationship('B', 'C')]
+        )
+        self.assertEqual(calculate_betweenness(graph), [0.0, 1.0, 0.0])
+
+    def test_pagerank_sums_to_one(self):
+        """测试 PageRank 归一且偏向高强度连接"""
+        graph = build_category_graph(
+            [make_category(c) for c in 'ABCD'],
+            [make_relationship('A', 'B', strength=0.9), make_relationship('B', 'C', strength=0.1),
+             make_relationship('A', 'C', strength=0.9)]
+        )
+        rank = calculate_pagerank(graph)
+        self.assertAlmostEqual(sum(rank), 1.0, places=6)
+        self.assertGreater(rank[0], rank[1])
+
+    def test_unknown_categories_ignored(self):
+        """测试指向未知范畴的关系被忽略但计入类型统计"""
+        graph = build_category_graph([make_category('A')], [make_relationship('A', 'Z', 'conditional')])
+        self.assertEqual(graph['neighbors'], [{}])
+        self.assertEqual(graph['relationship_types']['conditional'], 1)
+
+
+class TestCoreCategory(unittest.TestCase):
+    """测试核心范畴识别"""
+
+    def setUp(self):
+        # H 连接两个子群，是结构上的核心；D 概念最多但位于边缘
+        self.categories = [make_category('H', 3)] + [make_category(c, 2) for c in 'ABCEFG'] + [make_category('D', 9)]
+        self.relationships = [make_relationship('H', c, 'interactive' if c in 'AB' else 'causal')
+                              for c in 'ABCEFG'] + [make_relationship('C', 'D', 'conditional')]
+
+    def test_shortlist_ranked_with_breakdown(self):
+        """测试返回带得分明细的候选短名单"""
+        shortlist = rank_core_categories(self.categories, self.relationships, top_n=3)
+        self.assertEqual(len(shortlist), 3)
+        self.assertEqual(shortlist[0]['id'], 'H')
+        self.assertEqual([c['score'] for c in shortlist], sorted((c['score'] for c in shortlist), reverse=True))
+        for candidate in shortlist:
+            self.assertEqual(set(candidate['score_breakdown']), {'degree', 'pagerank', 'betweenness', 'data_support'})
+            self.assertAlmostEqual(sum(candidate['score_breakdown'].values()), candidate['score'], places=3)
+
+    def test_identify_core_category_keeps_fields(self):
+        """测试核心范畴保留原有字段并附带候选"""
+        core = identify_core_category(self.categories, self.relationships)
+        self.assertEqual(core['id'], 'H')
+        self.assertEqual(core['explanation_power'], 6)
+        self.assertEqual(core['data_support'], 3)
+        self.assertEqual(core['candidates'][0]['id'], 'H')
+        self.assertEqual(identify_core_category([], []), {})
+
+    def test_storyline_and_mechanisms_use_graph(self):
+        """测试故事线和机制与关系列表一致"""
+        result = selective_coding({'categories': self.categories, 'relationships': self.relationships})
+        self.assertEqual(len(result['storyline']['elements']), 6)
+        mechanisms = {m['type']: m['instances'] for m in explain_mechanisms(self.relationships)}
+        self.assertEqual(mechanisms, {'interactive': 2, 'causal': 4, 'conditional': 1})
+        self.assertEqual(result['core_category_candidates'][0]['id'], 'H')
+
+    def test_scales_to_5k_categories_200k_relationships(self):
+        """测试5千范畴、20万关系的选择式编码"""
+        rng = random.Random(4)
+        categories = [make_category(f'c{i}', rng.randint(1, 20)) for i in range(5000)]
+        relationships = []
+        for _ in range(200000):
+            source, target = rng.sample(range(5000), 2)
+            relationships.append(make_relationship(f'c{source}', f'c{target}', strength=rng.random()))
+
+        start = time.perf_counter()
+        result = selective_coding({'categories': categories, 'relationships': relationships})
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(result['core_category_candidates']), 5)
+        self.assertLess(elapsed, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,21 @@
 此模块提供扎根理论备忘录撰写功能
 """
 
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional
 import json
+import re
+import sqlite3
 from datetime import datetime
 
 
+# 备忘录导出格式中的字段
+MEMO_FIELDS = ("type", "title", "date", "content", "coding_stage", "related_elements")
+# 全文检索默认返回条数
+SEARCH_LIMIT = 20
+# CJK 字符逐字切分后再建全文索引，使中文可按任意子串检索
+_CJK_PATTERN = re.compile(r'([\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff])')
+
+
 def memo_writing(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     执行扎根理论的备忘录撰写
@@ -34,7 +44,7 @@ def memo_writing(data: Dict[str, Any]) -> Dict[str, Any]:
         memos = generate_general_memos(process_info, analysis_results)
     
     # 返回备忘录撰写结果
-    return {
+    results = {
         "memos": memos,
         "memo_count": len(memos),
         "memo_types": list(set(memo.get('type', 'general') for memo in memos)),
@@ -44,6 +54,220 @@ def memo_writing(data: Dict[str, Any]) -> Dict[str, Any]:
             "date": datetime.now().isoformat()
         }
     }
+    
+    # 追加写入备忘录库，跨运行累积
+    if data.get('memo_db'):
+        with MemoRepository(data['memo_db']) as repository:
+            stored = repository.add_memos(memos, run_id=data.get('run_id'))
+            results["memo_repository"] = {
+                "path": str(data['memo_db']),
+                "stored": len(stored),
+                "total": repository.count()
+            }
+    
+    return results
+
+
+class MemoRepository:
+    """
+    基于 sqlite3 + FTS5 的备忘录库
+    
+    备忘录按阶段、关联的概念/范畴 ID 和时间戳存储，支持全文检索、
+    按概念查询和跨运行追加，并可导出回 memo_writing 的备忘录格式。
+    
+    Args:
+        db_path: 数据库文件路径，':memory:' 表示内存库
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS memos (
+            id INTEGER PRIMARY KEY,
+            type TEXT,
+            title TEXT,
+            date TEXT,
+            content TEXT,
+            coding_stage TEXT,
+            related_elements TEXT,
+            run_id TEXT,
+            stored_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_memos_stage ON memos (coding_stage);
+        CREATE TABLE IF NOT EXISTS memo_elements (
+            memo_id INTEGER NOT NULL REFERENCES memos (id),
+            element_id TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_memo_elements ON memo_elements (element_id, memo_id);
+    """
+
+    def __init__(self, db_path: str = ':memory:'):
+        self.db_path = str(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.executescript(self.SCHEMA)
+        try:
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memo_fts USING fts5(title, content)"
+            )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # sqlite 未编译 FTS5 时退化为 LIKE 检索
+            self.has_fts = False
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def add_memos(self, memos: Iterable[Dict[str, Any]], run_id: Optional[str] = None) -> List[int]:
+        """
+        追加备忘录（单个事务）
+        
+        Args:
+            memos: 备忘录列表
+            run_id: 可选的运行标识
+        
+        Returns:
+            新备忘录的 ID 列表
+        """
+        stored_at = datetime.now().isoformat()
+        ids = []
+        with self.connection:
+            cursor = self.connection.cursor()
+            for memo in memos:
+                elements = memo.get("related_elements", memo.get("related_concepts", []))
+                cursor.execute(
+                    "INSERT INTO memos (type, title, date, content, coding_stage, related_elements, run_id, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (memo.get("type", "general_memo"), memo.get("title", ""), memo.get("date", stored_at),
+                     memo.get("content", ""), memo.get("coding_stage", "general"),
+                     json.dumps(elements, ensure_ascii=False, default=str), run_id, stored_at)
+                )
+                memo_id = cursor.lastrowid
+                ids.append(memo_id)
+                element_ids = {_element_id(element) for element in elements} - {""}
+                cursor.executemany(
+                    "INSERT INTO memo_elements (memo_id, element_id) VALUES (?, ?)",
+                    [(memo_id, element_id) for element_id in sorted(element_ids)]
+                )
+                if self.has_fts:
+                    cursor.execute(
+                        "INSERT INTO memo_fts (rowid, title, content) VALUES (?, ?, ?)",
+                        (memo_id, _fts_text(memo.get("title", "")), _fts_text(memo.get("content", "")))
+                    )
+        return ids
+
+    def count(self, coding_stage: Optional[str] = None) -> int:
+        """备忘录总数，可按阶段过滤"""
+        if coding_stage is None:
+            return self.connection.execute("SELECT COUNT(*) FROM memos").fetchone()[0]
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM memos WHERE coding_stage = ?", (coding_stage,)
+        ).fetchone()[0]
+
+    def search(self, query: str, coding_stage: Optional[str] = None,
+               limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        全文检索标题和正文
+        
+        多个以空格分隔的词须同时出现；中文按子串匹配。结果按 BM25 相关度排序。
+        
+        Args:
+            query: 检索词
+            coding_stage: 可选的阶段过滤
+            limit: 最多返回条数
+        
+        Returns:
+            备忘录列表（导出格式，含 id）
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        stage_clause = " AND m.coding_stage = ?" if coding_stage else ""
+        stage_params = [coding_stage] if coding_stage else []
+
+        if self.has_fts:
+            match = " ".join('"{}"'.format(_fts_text(term).replace('"', '""')) for term in terms)
+            rows = self.connection.execute(
+                "SELECT m.* FROM memo_fts JOIN memos m ON m.id = memo_fts.rowid "
+                f"WHERE memo_fts MATCH ?{stage_clause} ORDER BY bm25(memo_fts), m.id LIMIT ?",
+                [match, *stage_params, limit]
+            )
+        else:
+            like_clause = " AND ".join("(m.title LIKE ? OR m.content LIKE ?)" for _ in terms)
+            like_params = [pattern for term in terms for pattern in (f"%{term}%", f"%{term}%")]
+            rows = self.connection.execute(
+                f"SELECT m.* FROM memos m WHERE {like_clause}{stage_clause} ORDER BY m.id LIMIT ?",
+                [*like_params, *stage_params, limit]
+            )
+        return [self._row_to_memo(row) for row in rows]
+
+    def by_element(self, element_id: str, coding_stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        查询关联某个概念或范畴的备忘录
+        
+        Args:
+            element_id: 概念或范畴 ID
+            coding_stage: 可选的阶段过滤
+        
+        Returns:
+            按写入顺序排列的备忘录列表
+        """
+        stage_clause = " AND m.coding_stage = ?" if coding_stage else ""
+        rows = self.connection.execute(
+            "SELECT m.* FROM memo_elements e JOIN memos m ON m.id = e.memo_id "
+            f"WHERE e.element_id = ?{stage_clause} ORDER BY m.id",
+            [element_id] + ([coding_stage] if coding_stage else [])
+        )
+        return [self._row_to_memo(row) for row in rows]
+
+    def export(self, coding_stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        导出为 memo_writing 的备忘录格式
+        
+        Args:
+            coding_stage: 可选的阶段过滤
+        
+        Returns:
+            按写入顺序排列的备忘录列表
+        """
+        if coding_stage is None:
+            rows = self.connection.execute("SELECT * FROM memos ORDER BY id")
+        else:
+            rows = self.connection.execute(
+                "SELECT * FROM memos WHERE coding_stage = ? ORDER BY id", (coding_stage,)
+            )
+        return [{field: memo[field] for field in MEMO_FIELDS} for memo in map(self._row_to_memo, rows)]
+
+    @staticmethod
+    def _row_to_memo(row) -> Dict[str, Any]:
+        memo_id, memo_type, title, date, content, coding_stage, related, run_id, stored_at = row
+        return {
+            "id": memo_id,
+            "type": memo_type,
+            "title": title,
+            "date": date,
+            "content": content,
+            "coding_stage": coding_stage,
+            "related_elements": json.loads(related) if related else [],
+            "run_id": run_id,
+            "stored_at": stored_at
+        }
+
+
+def _element_id(element: Any) -> str:
+    """关联元素可能是 ID 字符串，也可能是完整的概念/范畴字典"""
+    if isinstance(element, dict):
+        return str(element.get("id", ""))
+    return str(element)
+
+
+def _fts_text(text: str) -> str:
+    """CJK 字符前后加空格，使 unicode61 分词器逐字建索引"""
+    return _CJK_PATTERN.sub(r' \1 ', text or "")
 
 
 def generate_open_coding_memos(process_info: Dict[str, Any], analysis_results: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -3,8 +3,178 @@
 此模块提供扎根理论饱和度检验的各项功能
 """
 
-from typing import Dict, List, Any
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
 import json
+import os
+import sys
+
+# 概念词与开放编码使用同一套抽取规则
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'stages'))
+from open_coding import extract_terms
+
+
+# 概念饱和判定：每段新概念数低于 HIGH 为饱和，低于 MEDIUM 为接近饱和
+NEW_CONCEPT_RATE_HIGH = 0.05
+NEW_CONCEPT_RATE_MEDIUM = 0.15
+# 滚动新概念率的批次窗口
+ROLLING_WINDOW = 5
+
+
+class SaturationTracker:
+    """
+    持久化的增量概念饱和度跟踪器
+    
+    概念词表追加写入 vocabulary.txt，每批次的新概念计数追加写入 batches.jsonl。
+    每个新文本段只做词表成员判断，停止收集数据的判断基于滚动窗口的累计值，
+    均为常数时间，无需重新运行整个分析。
+    """
+
+    VOCABULARY_FILE = 'vocabulary.txt'
+    BATCHES_FILE = 'batches.jsonl'
+
+    def __init__(self, state_dir: Optional[str] = None, window: int = ROLLING_WINDOW,
+                 threshold: float = NEW_CONCEPT_RATE_HIGH):
+        """
+        Args:
+            state_dir: 状态目录，为空时仅在内存中跟踪
+            window: 滚动新概念率的批次窗口
+            threshold: 滚动新概念率低于该值时建议停止收集数据
+        """
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.threshold = threshold
+        self.vocabulary = set()
+        self.batches = []
+        self._pending_terms = []
+        self._batch_segments = 0
+        self._batch_new = 0
+        self._window = deque(maxlen=window)
+        self._window_segments = 0
+        self._window_new = 0
+
+        if self.state_dir:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _load(self) -> None:
+        vocabulary_path = self.state_dir / self.VOCABULARY_FILE
+        if vocabulary_path.exists():
+            with open(vocabulary_path, 'r', encoding='utf-8') as f:
+                self.vocabulary.update(line.rstrip('\n') for line in f if line.strip())
+
+        batches_path = self.state_dir / self.BATCHES_FILE
+        if batches_path.exists():
+            with open(batches_path, 'r', encoding='utf-8') as f:
+                self.batches = [json.loads(line) for line in f if line.strip()]
+        for batch in self.batches[-self._window.maxlen:]:
+            self._push_window(batch['segments'], batch['new_concepts'])
+
+    def _push_window(self, segments: int, new_concepts: int) -> None:
+        if len(self._window) == self._window.maxlen:
+            old_segments, old_new = self._window[0]
+            self._window_segments -= old_segments
+            self._window_new -= old_new
+        self._window.append((segments, new_concepts))
+        self._window_segments += segments
+        self._window_new += new_concepts
+
+    def _add_term(self, term: str) -> bool:
+        if term in self.vocabulary:
+            return False
+        self.vocabulary.add(term)
+        self._pending_terms.append(term)
+        return True
+
+    def add_known_concepts(self, codes: Iterable[str]) -> None:
+        """将已有理论中的概念加入词表（不计为新概念）"""
+        for code in codes:
+            if code:
+                self._add_term(code.lower())
+
+    def add_segment(self, text: str) -> int:
+        """
+        接收一个新文本段
+        
+        Args:
+            text: 文本段
+        
+        Returns:
+            该段带来的新概念数
+        """
+        new_concepts = sum(1 for term in extract_terms(text) if self._add_term(term))
+        self._batch_segments += 1
+        self._batch_new += new_concepts
+        return new_concepts
+
+    def commit_batch(self) -> Dict[str, Any]:
+        """
+        结束当前批次，追加持久化新增词表和批次记录
+        
+        不含文本段的批次不计入批次记录和滚动窗口，否则空批次会把滚动新概念率
+        拉低到零并误判饱和；其 batch 字段为 None。
+        
+        Returns:
+            批次记录
+        """
+        committed = self._batch_segments > 0
+        if committed:
+            self._push_window(self._batch_segments, self._batch_new)
+        record = {
+            "batch": len(self.batches) + 1 if committed else None,
+            "segments": self._batch_segments,
+            "new_concepts": self._batch_new,
+            "new_concept_rate": self._batch_new / max(1, self._batch_segments),
+            "rolling_rate": self.rolling_rate(),
+            "vocabulary_size": len(self.vocabulary)
+        }
+
+        if self.state_dir:
+            with open(self.state_dir / self.VOCABULARY_FILE, 'a', encoding='utf-8') as f:
+                f.writelines(term + '\n' for term in self._pending_terms)
+        if committed:
+            self.batches.append(record)
+            if self.state_dir:
+                with open(self.state_dir / self.BATCHES_FILE, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        self._pending_terms = []
+        self._batch_segments = 0
+        self._batch_new = 0
+        return record
+
+    def ingest_batch(self, segments: Iterable[Any]) -> Dict[str, Any]:
+        """
+        接收一批新数据（字符串或含 text 字段的字典）并提交
+        
+        Args:
+            segments: 新数据
+        
+        Returns:
+            批次记录
+        """
+        for item in segments:
+            self.add_segment(item.get('text', '') if isinstance(item, dict) else str(item))
+        return self.commit_batch()
+
+    def rolling_rate(self) -> float:
+        """最近 window 个批次的每段新概念数"""
+        return self._window_new / max(1, self._window_segments)
+
+    def should_stop(self) -> bool:
+        """窗口已满且滚动新概念率低于阈值时建议停止收集数据"""
+        return len(self._window) == self._window.maxlen and self.rolling_rate() < self.threshold
+
+    def novelty_curve(self) -> List[Dict[str, Any]]:
+        """各批次的新概念率曲线"""
+        return [
+            {
+                "batch": batch["batch"],
+                "new_concept_rate": batch["new_concept_rate"],
+                "rolling_rate": batch["rolling_rate"]
+            }
+            for batch in self.batches
+        ]
 
 
 def saturation_check(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -21,8 +191,12 @@ def saturation_check(data: Dict[str, Any]) -> Dict[str, Any]:
     existing_theory = data.get('existing_theory', {})
     new_data = data.get('new_data', [])
     
+    # 指定状态目录时跨运行持久化词表和批次记录
+    state_dir = data.get('saturation_state_dir')
+    tracker = SaturationTracker(state_dir) if state_dir else None
+    
     # 执行概念饱和评估
-    concept_saturation = assess_concept_saturation(existing_theory, new_data)
+    concept_saturation = assess_concept_saturation(existing_theory, new_data, tracker)
     
     # 执行范畴饱和评估
     category_saturation = assess_category_saturation(existing_theory)
@@ -58,45 +232,41 @@ def saturation_check(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def assess_concept_saturation(existing_theory: Dict[str, Any], new_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def assess_concept_saturation(existing_theory: Dict[str, Any], new_data: List[Dict[str, Any]],
+                              tracker: Optional[SaturationTracker] = None) -> Dict[str, Any]:
     """
     评估概念饱和度
     
     Args:
         existing_theory: 现有理论
-        new_data: 新数据
+        new_data: 新数据，作为一个批次增量接收
+        tracker: 饱和度跟踪器，为空时使用仅内存的跟踪器
     
     Returns:
         概念饱和度评估结果
     """
-    # 分析新数据中是否出现新概念
-    existing_concepts = set()
+    if tracker is None:
+        tracker = SaturationTracker()
+
+    # 将现有理论中的概念并入词表
     if 'open_coding' in existing_theory and 'concepts' in existing_theory['open_coding']:
-        for concept in existing_theory['open_coding']['concepts']:
-            existing_concepts.add(concept.get('code', '').lower())
-    
-    # 在新数据中识别概念（简化处理）
-    new_concepts_found = 0
-    total_new_segments = len(new_data) if new_data else 1  # 避免除零错误
-    
-    # 简化的概念识别
-    for item in new_data:
-        text = item.get('text', '') if isinstance(item, dict) else str(item)
-        # 模拟概念提取
-        words = text.split()
-        for word in words[:3]:  # 只检查前3个词
-            if word.lower() not in existing_concepts:
-                new_concepts_found += 1
-                existing_concepts.add(word.lower())
+        tracker.add_known_concepts(
+            concept.get('code', '') for concept in existing_theory['open_coding']['concepts']
+        )
+    
+    # 新数据作为一个批次增量处理
+    batch = tracker.ingest_batch(new_data or [])
+    new_concepts_found = batch["new_concepts"]
+    total_new_segments = max(1, batch["segments"])  # 避免除零错误
     
     # 计算新概念出现率
-    new_concepts_rate = new_concepts_found / max(1, total_new_segments)
+    new_concepts_rate = batch["new_concept_rate"]
     
     # 评估概念饱和度
-    if new_concepts_rate < 0.05:
+    if new_concepts_rate < NEW_CONCEPT_RATE_HIGH:
         level = "high"
         judgment = "新概念出现率低，概念层面已达到饱和"
-    elif new_concepts_rate < 0.15:
+    elif new_concepts_rate < NEW_CONCEPT_RATE_MEDIUM:
         level = "medium"
         judgment = "新概念出现率中等，概念层面接近饱和"
     else:
@@ -107,6 +277,9 @@ def assess_concept_saturation(existing_theory: Dict[str, Any], new_data: List[Di
         "new_concepts_found": new_concepts_found,
         "total_new_segments": total_new_segments,
         "new_concepts_rate": new_concepts_rate,
+        "rolling_rate": tracker.rolling_rate(),
+        "novelty_curve": tracker.novelty_curve(),
+        "stop_collecting": tracker.should_stop(),
         "saturation_level": level,
         "judgment": judgment,
         "significance_assessment": "根据新概念出现率评估概念饱和度"
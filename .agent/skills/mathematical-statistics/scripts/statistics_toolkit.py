@@ -1,25 +1,30 @@
 """
 Social Science Statistics Analysis Toolkit
 完整的数理统计分析工具包
+
+numpy、pandas、scipy 等在用到的方法内才导入，matplotlib（绘图）和
+pingouin（t 检验的贝叶斯因子与检验力）为可选依赖，缺失时对应功能降级。
 """
 
-import numpy as np
-import pandas as pd
-import scipy.stats as stats
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import FactorAnalysis
-from sklearn.model_selection import train_test_split
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-import pingouin as pg
-from scipy.stats import shapiro, normaltest, anderson
+import argparse
+import importlib.util
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# 同目录的流式统计模块，不依赖当前工作目录
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 可选依赖只检测是否安装，不在模块加载时导入
+HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
+HAS_PINGOUIN = importlib.util.find_spec('pingouin') is not None
+
+# 分块模式每块读取的行数、正态性检验蓄水池样本量和随机种子
+CSV_CHUNK_SIZE = 100000
+NORMALITY_SAMPLE_SIZE = 5000
+SAMPLE_SEED = 42
+
 class SocialScienceStatistics:
     """社会科学统计分析工具包"""
     
@@ -29,6 +34,8 @@ class SocialScienceStatistics:
         
     def load_data(self, data_path=None, data_frame=None):
         """加载数据"""
+        import pandas as pd
+        
         if data_path:
             self.data = pd.read_csv(data_path)
         elif data_frame is not None:
@@ -41,6 +48,10 @@ class SocialScienceStatistics:
     
     def descriptive_statistics(self, columns=None, include_plots=True):
         """描述性统计分析"""
+        import numpy as np
+        import pandas as pd
+        import scipy.stats as stats
+        
         if columns is None:
             columns = self.data.select_dtypes(include=[np.number]).columns.tolist()
         
@@ -77,12 +88,109 @@ class SocialScienceStatistics:
         self.results['descriptive'] = results
         
         if include_plots:
-            self._create_descriptive_plots(columns)
+            if HAS_MATPLOTLIB:
+                self._create_descriptive_plots(columns)
+            else:
+                print("未安装 matplotlib，跳过描述性统计图表")
+        
+        return pd.DataFrame(results).T
+    
+    def streaming_descriptive_statistics(self, data_path, columns=None, chunksize=CSV_CHUNK_SIZE,
+                                         sample_size=NORMALITY_SAMPLE_SIZE, seed=SAMPLE_SEED):
+        """
+        分块描述性统计（不把整个 CSV 载入内存）
+        
+        通过 pandas.read_csv(chunksize=...) 逐块读取：矩统计按 Welford/Pébay
+        公式合并，分位数来自可合并草图，缺失值逐块计数，正态性检验在可复现的
+        蓄水池样本上进行（样本量不超过 Shapiro-Wilk 的 5000 上限）。
+        
+        Args:
+            data_path: CSV 文件路径
+            columns: 分析的列，默认第一块中的全部数值列
+            chunksize: 每块行数
+            sample_size: 正态性检验样本量
+            seed: 蓄水池抽样和草图压缩的随机种子
+        
+        Returns:
+            与 descriptive_statistics 相同列的结果表，另含 missing 和 normality_sample_size
+        """
+        import numpy as np
+        import pandas as pd
+        from streaming_statistics import QuantileSketch, ReservoirSample, RunningMoments, ValueCounter
+        
+        reader = pd.read_csv(data_path, chunksize=chunksize, usecols=columns)
+        moments = sketches = samples = counters = None
+        missing = None
+        rows = 0
+        
+        for chunk in reader:
+            if moments is None:
+                if columns is None:
+                    columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+                moments = RunningMoments(len(columns))
+                sketches = [QuantileSketch(seed=seed + i) for i in range(len(columns))]
+                samples = [ReservoirSample(sample_size, seed=seed + i) for i in range(len(columns))]
+                counters = [ValueCounter() for _ in columns]
+                missing = np.zeros(len(columns), dtype=np.int64)
+            
+            block = chunk[columns].apply(pd.to_numeric, errors='coerce')
+            values = block.to_numpy(dtype=float)
+            rows += len(values)
+            missing += np.isnan(values).sum(axis=0)
+            moments.update(values)
+            for i, col in enumerate(columns):
+                sketches[i].update(values[:, i])
+                samples[i].update(values[:, i])
+                counters[i].update(block[col])
+        
+        if moments is None:
+            raise ValueError(f"文件中没有数据: {data_path}")
+        
+        variance = moments.variance()
+        std = np.sqrt(variance)
+        skewness = moments.skewness()
+        kurtosis = moments.kurtosis()
+        results = {}
+        
+        for i, col in enumerate(columns):
+            q1, median, q3 = sketches[i].quantile([0.25, 0.5, 0.75])
+            mean = moments.mean[i]
+            sample = pd.Series(samples[i].sample())
+            desc_stats = {
+                'count': int(moments.n[i]),
+                'mean': mean,
+                'median': median,
+                'mode': counters[i].mode(),
+                'std': std[i],
+                'var': variance[i],
+                'min': moments.min[i],
+                'max': moments.max[i],
+                'range': moments.max[i] - moments.min[i],
+                'q1': q1,
+                'q3': q3,
+                'iqr': q3 - q1,
+                'skewness': skewness[i],
+                'kurtosis': kurtosis[i],
+                'cv': std[i] / mean if mean != 0 else np.nan,
+                'missing': int(missing[i]),
+                'normality_sample_size': len(sample)
+            }
+            
+            # 正态性检验（蓄水池样本）
+            if len(sample) >= 8:
+                desc_stats.update(self._test_normality(sample))
+            
+            results[col] = desc_stats
+        
+        print(f"分块读取完成: {rows} 行, {len(columns)} 个数值列")
+        self.results['descriptive'] = results
         
         return pd.DataFrame(results).T
     
     def _test_normality(self, data):
         """正态性检验"""
+        from scipy.stats import shapiro, normaltest, anderson
+        
         tests = {}
         
         # Shapiro-Wilk检验 (适用于小样本)
@@ -99,13 +207,18 @@ class SocialScienceStatistics:
         tests['anderson_darling'] = {
             'statistic': anderson_result.statistic,
             'critical_values': anderson_result.critical_values,
-            'significance_levels': anderson_result.significance_levels
+            # scipy 1.17 起该属性更名为 significance_level
+            'significance_levels': getattr(anderson_result, 'significance_levels',
+                                           getattr(anderson_result, 'significance_level', None))
         }
         
         return tests
     
     def _create_descriptive_plots(self, columns):
         """创建描述性统计图表"""
+        import matplotlib.pyplot as plt
+        import scipy.stats as stats
+        
         fig, axes = plt.subplots(len(columns), 3, figsize=(15, 5*len(columns)))
         if len(columns) == 1:
             axes = axes.reshape(1, -1)
@@ -149,10 +262,39 @@ class SocialScienceStatistics:
         else:
             raise ValueError(f"不支持的检验类型: {test_type}")
     
+    def _t_test(self, x, y=None, mu=0, equal_var=True):
+        """
+        t 检验：安装了 pingouin 时使用 pingouin（附带贝叶斯因子和检验力），
+        否则使用 scipy
+        """
+        if HAS_PINGOUIN:
+            import pingouin as pg
+            
+            table = pg.ttest(x, y if y is not None else mu, correction=not equal_var)
+            row = table.iloc[0]
+            return {
+                't_statistic': float(row['T']),
+                'p_value': float(row['p-val']),
+                'bayes_factor': float(row['BF10']),
+                'power': float(row['power']),
+                'engine': 'pingouin'
+            }
+        
+        import scipy.stats as stats
+        
+        if y is None:
+            t_stat, p_value = stats.ttest_1samp(x, mu)
+        else:
+            t_stat, p_value = stats.ttest_ind(x, y, equal_var=equal_var)
+        return {'t_statistic': t_stat, 'p_value': p_value, 'engine': 'scipy'}
+    
     def _one_sample_t_test(self, column, population_mean, alpha=0.05):
         """单样本t检验"""
+        import scipy.stats as stats
+        
         data = self.data[column].dropna()
-        t_stat, p_value = stats.ttest_1samp(data, population_mean)
+        test = self._t_test(data, mu=population_mean)
+        t_stat, p_value = test['t_statistic'], test['p_value']
         
         # 计算置信区间
         mean = data.mean()
@@ -175,15 +317,20 @@ class SocialScienceStatistics:
             'cohens_d': cohens_d,
             'effect_size_interpretation': self._interpret_cohens_d(cohens_d)
         }
+        result.update({key: test[key] for key in ('bayes_factor', 'power', 'engine') if key in test})
         
         return result
     
     def _two_sample_t_test(self, column1, column2, equal_var=True, alpha=0.05):
         """两独立样本t检验"""
+        import numpy as np
+        import scipy.stats as stats
+        
         data1 = self.data[column1].dropna()
         data2 = self.data[column2].dropna()
         
-        t_stat, p_value = stats.ttest_ind(data1, data2, equal_var=equal_var)
+        test = self._t_test(data1, data2, equal_var=equal_var)
+        t_stat, p_value = test['t_statistic'], test['p_value']
         
         # 计算效应量 (Cohen's d)
         pooled_std = np.sqrt(((len(data1)-1)*data1.var() + (len(data2)-1)*data2.var()) / 
@@ -212,6 +359,7 @@ class SocialScienceStatistics:
             'effect_size_interpretation': self._interpret_cohens_d(cohens_d),
             'equal_variance_assumed': equal_var
         }
+        result.update({key: test[key] for key in ('bayes_factor', 'power', 'engine') if key in test})
         
         return result
     
@@ -228,8 +376,11 @@ class SocialScienceStatistics:
             return "大效应"
 
 # 使用示例
-def main():
-    """主函数示例"""
+def run_example():
+    """模拟数据示例"""
+    import numpy as np
+    import pandas as pd
+    
     # 创建模拟数据
     np.random.seed(42)
     n = 200
@@ -266,5 +417,28 @@ def main():
     for key, value in t_test_result.items():
         print(f"  {key}: {value}")
 
+
+def main():
+    """主函数：指定 --input 时对 CSV 做描述性统计，否则运行模拟数据示例"""
+    parser = argparse.ArgumentParser(description='社会科学统计分析工具包')
+    parser.add_argument('--input', '-i', help='输入 CSV 文件')
+    parser.add_argument('--columns', '-c', nargs='+', help='分析的列（默认全部数值列）')
+    parser.add_argument('--plots', action='store_true', help='生成描述性统计图表（需要 matplotlib）')
+    parser.add_argument('--chunksize', type=int,
+                       help='分块读取的行数；指定后不把整个文件载入内存（不生成图表）')
+    args = parser.parse_args()
+    
+    if not args.input:
+        run_example()
+        return
+    
+    analyzer = SocialScienceStatistics()
+    if args.chunksize:
+        print(analyzer.streaming_descriptive_statistics(args.input, args.columns, args.chunksize))
+        return
+    analyzer.load_data(data_path=args.input)
+    print(analyzer.descriptive_statistics(args.columns, include_plots=args.plots))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,239 @@
+"""
+Streaming Descriptive Statistics
+分块（out-of-core）描述性统计的累加器
+
+各累加器都可以逐块更新、相互合并，内存与数据行数无关：
+- RunningMoments: 均值、方差、偏度、峰度（Welford/Pébay 合并公式）
+- QuantileSketch: 可合并的分位数草图（KLL 式逐层压缩）
+- ReservoirSample: 可复现的蓄水池样本（随机键最小的 k 个）
+- ValueCounter: 有界的取值计数（众数）
+"""
+
+import numpy as np
+
+
+# 分位数草图每层容量，秩误差约为 O(1/容量)
+QUANTILE_SKETCH_CAPACITY = 4096
+# 蓄水池样本量（Shapiro-Wilk 检验的适用上限）
+RESERVOIR_SIZE = 5000
+# 众数统计的最大不同取值数，超过后放弃众数
+MODE_MAX_DISTINCT = 10000
+
+
+class RunningMoments:
+    """
+    按列累积的一至四阶中心矩
+
+    每块先用 numpy 计算块内矩，再按 Pébay (2008) 的公式与已有结果合并，
+    数值上等价于逐个样本的 Welford 更新。
+
+    Args:
+        n_columns: 列数
+    """
+
+    def __init__(self, n_columns):
+        self.n = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, values):
+        """累积一块数据（二维数组，缺失值为 NaN）"""
+        values = np.asarray(values, dtype=float)
+        mask = ~np.isnan(values)
+        n = mask.sum(axis=0).astype(float)
+        if not n.any():
+            return
+        safe_n = np.where(n > 0, n, 1)
+        filled = np.where(mask, values, 0.0)
+        mean = filled.sum(axis=0) / safe_n
+        centered = np.where(mask, values - mean, 0.0)
+        squared = centered ** 2
+        other = RunningMoments(values.shape[1])
+        other.n = n
+        other.mean = mean
+        other.m2 = squared.sum(axis=0)
+        other.m3 = (squared * centered).sum(axis=0)
+        other.m4 = (squared ** 2).sum(axis=0)
+        other.min = np.where(mask, values, np.inf).min(axis=0)
+        other.max = np.where(mask, values, -np.inf).max(axis=0)
+        self.merge(other)
+
+    def merge(self, other):
+        """合并另一组矩（Pébay 合并公式）"""
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        safe_n = np.where(n > 0, n, 1)
+        delta = other.mean - self.mean
+        delta_n = delta / safe_n
+
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2)
+              + 6 * delta_n ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2)
+              + 4 * delta_n * (n_a * other.m3 - n_b * self.m3))
+        m3 = (self.m3 + other.m3
+              + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+              + 3 * delta_n * (n_a * other.m2 - n_b * self.m2))
+        m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+
+        self.mean = self.mean + delta_n * n_b
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.n = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def variance(self):
+        """样本方差（ddof=1）"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    def skewness(self):
+        """偏度（与 scipy.stats.skew 默认的有偏估计一致）"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self):
+        """超额峰度（与 scipy.stats.kurtosis 默认的有偏估计一致）"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.n * self.m4 / self.m2 ** 2 - 3
+
+
+class QuantileSketch:
+    """
+    可合并的分位数草图
+
+    第 h 层的每个元素代表 2^h 个原始样本。某层达到容量时排序并随机保留
+    奇数位或偶数位元素升入上一层，内存约为 容量 × log2(n / 容量)。
+
+    Args:
+        capacity: 每层容量
+        seed: 压缩时随机偏移的种子
+    """
+
+    def __init__(self, capacity=QUANTILE_SKETCH_CAPACITY, seed=0):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.levels = [np.empty(0)]
+
+    def update(self, values):
+        """加入一批样本（忽略 NaN）"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def merge(self, other):
+        """合并另一个草图"""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size >= self.capacity:
+                items = np.sort(items)
+                # 奇数个元素时留下一个，保持总权重不变
+                keep = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:items.size - keep.size]
+                promoted = paired[self.rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        """
+        估计分位数
+
+        Args:
+            q: 分位点（标量或序列，0-1）
+
+        Returns:
+            与 q 形状相同的估计值
+        """
+        items = np.concatenate(self.levels)
+        if not items.size:
+            return np.full(np.shape(q), np.nan)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # 按累积权重插值；尚未压缩（权重全为 1）时与 pandas 默认的线性插值一致
+        total = weights.sum()
+        if total <= 1:
+            return np.full(np.shape(q), items[0])
+        positions = (np.cumsum(weights) - weights) / (total - 1)
+        return np.interp(q, positions, items)
+
+
+class ReservoirSample:
+    """
+    可复现的均匀样本（bottom-k 抽样）
+
+    每个非缺失值分配一个由种子决定的随机键，保留键最小的 k 个值；
+    结果只取决于种子和数据顺序，与分块大小无关。
+
+    Args:
+        size: 样本量
+        seed: 随机种子
+    """
+
+    def __init__(self, size=RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+
+    def update(self, values):
+        """加入一批样本（NaN 也消耗随机键，保证与分块无关）"""
+        values = np.asarray(values, dtype=float)
+        keys = self.rng.random(values.size)
+        mask = ~np.isnan(values)
+        keys = np.concatenate([self.keys, keys[mask]])
+        values = np.concatenate([self.values, values[mask]])
+        if keys.size > self.size:
+            chosen = np.argpartition(keys, self.size)[:self.size]
+            keys, values = keys[chosen], values[chosen]
+        self.keys, self.values = keys, values
+
+    def sample(self):
+        """按随机键排序的样本"""
+        return self.values[np.argsort(self.keys)]
+
+
+class ValueCounter:
+    """
+    有界的取值计数（用于众数）
+
+    不同取值超过 max_distinct 时停止计数，此时众数视为不可用。
+    """
+
+    def __init__(self, max_distinct=MODE_MAX_DISTINCT):
+        self.max_distinct = max_distinct
+        self.counts = {}
+        self.overflow = False
+
+    def update(self, series):
+        """加入一块 pandas Series"""
+        if self.overflow:
+            return
+        for value, count in series.value_counts(dropna=True).items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.max_distinct:
+            self.overflow = True
+            self.counts = {}
+
+    def mode(self):
+        """出现次数最多的取值（并列时取最小值，与 pandas 一致）"""
+        if self.overflow or not self.counts:
+            return np.nan
+        top = max(self.counts.values())
+        return min(value for value, count in self.counts.items() if count == top)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+统计分析工具包测试套件
+包括延迟导入的启动预算、可选依赖降级和分块描述性统计测试
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+import statistics_toolkit
+from statistics_toolkit import SocialScienceStatistics
+from streaming_statistics import QuantileSketch, ReservoirSample, RunningMoments
+
+
+# 只做描述性统计时的预算
+IMPORT_TIME_BUDGET = 0.5
+DESCRIPTIVE_RSS_BUDGET_MB = 300
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'sklearn', 'statsmodels', 'pingouin']
+
+BUDGET_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {scripts!r})
+start = time.perf_counter()
+import statistics_toolkit
+import_time = time.perf_counter() - start
+modules_after_import = sorted(m for m in ('numpy', 'pandas', 'scipy') if m in sys.modules)
+
+import numpy as np
+import pandas as pd
+rng = np.random.default_rng(0)
+analyzer = statistics_toolkit.SocialScienceStatistics()
+analyzer.load_data(data_frame=pd.DataFrame({{'x': rng.normal(size=2000), 'y': rng.normal(size=2000)}}))
+analyzer.descriptive_statistics(include_plots=False)
+print(json.dumps({{
+    'import_time': import_time,
+    'modules_after_import': modules_after_import,
+    'heavy_loaded': sorted(m for m in {heavy!r} if m in sys.modules),
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+class TestStartupBudget(unittest.TestCase):
+    """测试延迟导入的启动预算"""
+
+    def probe(self):
+        code = BUDGET_PROBE.format(scripts=str(skill_dir / 'scripts'), heavy=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        return json.loads(output.stdout.strip().splitlines()[-1])
+
+    def test_descriptive_only_stays_within_budget(self):
+        """测试只做描述性统计时不加载重型库且导入时间、内存在预算内"""
+        report = self.probe()
+        self.assertEqual(report['modules_after_import'], [])
+        self.assertEqual(report['heavy_loaded'], [])
+        self.assertLess(report['import_time'], IMPORT_TIME_BUDGET)
+        self.assertLess(report['max_rss_mb'], DESCRIPTIVE_RSS_BUDGET_MB)
+
+    def test_help_does_not_import_numerics(self):
+        """测试 --help 不导入数值计算库"""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', str(skill_dir / 'scripts' / 'statistics_toolkit.py'), '--help'],
+            capture_output=True, text=True, check=True
+        )
+        self.assertIn('--input', result.stdout)
+        self.assertNotIn('numpy', result.stderr)
+
+
+class TestOptionalDependencies(unittest.TestCase):
+    """测试可选依赖降级"""
+
+    def setUp(self):
+        import numpy as np
+        import pandas as pd
+
+        rng = np.random.default_rng(1)
+        self.analyzer = SocialScienceStatistics()
+        self.analyzer.load_data(data_frame=pd.DataFrame({
+            'a': rng.normal(0, 1, 300), 'b': rng.normal(0.5, 1, 300)
+        }))
+
+    def test_scipy_t_test_fallback(self):
+        """测试无 pingouin 时使用 scipy 的 t 检验"""
+        import scipy.stats as stats
+
+        original = statistics_toolkit.HAS_PINGOUIN
+        statistics_toolkit.HAS_PINGOUIN = False
+        try:
+            result = self.analyzer._two_sample_t_test('a', 'b')
+        finally:
+            statistics_toolkit.HAS_PINGOUIN = original
+
+        expected = stats.ttest_ind(self.analyzer.data['a'], self.analyzer.data['b'])
+        self.assertEqual(result['engine'], 'scipy')
+        self.assertAlmostEqual(result['t_statistic'], expected.statistic)
+        self.assertAlmostEqual(result['p_value'], expected.pvalue)
+
+    def test_plots_skipped_without_matplotlib(self):
+        """测试无 matplotlib 时跳过绘图"""
+        original = statistics_toolkit.HAS_MATPLOTLIB
+        statistics_toolkit.HAS_MATPLOTLIB = False
+        try:
+            table = self.analyzer.descriptive_statistics(include_plots=True)
+        finally:
+            statistics_toolkit.HAS_MATPLOTLIB = original
+        self.assertEqual(list(table.index), ['a', 'b'])
+
+
+
+class TestStreamingDescriptive(unittest.TestCase):
+    """测试分块描述性统计"""
+
+    @classmethod
+    def setUpClass(cls):
+        import numpy as np
+        import pandas as pd
+
+        rng = np.random.default_rng(7)
+        n = 60000
+        cls.frame = pd.DataFrame({
+            'score': rng.normal(50, 10, n),
+            'income': rng.lognormal(10, 0.5, n),
+            'likert': rng.integers(1, 6, n),
+            'group': rng.choice(['A', 'B'], n)
+        })
+        cls.frame.loc[rng.random(n) < 0.1, 'score'] = np.nan
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = str(Path(cls.tmp.name) / 'survey.csv')
+        cls.frame.to_csv(cls.path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_in_memory_results(self):
+        """测试分块结果与内存计算一致（分位数为近似）"""
+        streamed = SocialScienceStatistics().streaming_descriptive_statistics(self.path, chunksize=7000)
+        analyzer = SocialScienceStatistics()
+        analyzer.load_data(data_frame=self.frame)
+        expected = analyzer.descriptive_statistics(include_plots=False)
+
+        self.assertEqual(list(streamed.index), ['score', 'income', 'likert'])
+        for col in streamed.index:
+            for stat in ('count', 'mean', 'std', 'var', 'min', 'max', 'skewness', 'kurtosis'):
+                self.assertAlmostEqual(streamed.loc[col, stat], expected.loc[col, stat],
+                                       delta=1e-9 * max(1.0, abs(expected.loc[col, stat])))
+            spread = expected.loc[col, 'max'] - expected.loc[col, 'min']
+            for stat in ('median', 'q1', 'q3'):
+                self.assertAlmostEqual(streamed.loc[col, stat], expected.loc[col, stat], delta=0.01 * spread)
+        self.assertEqual(streamed.loc['score', 'missing'], self.frame['score'].isna().sum())
+        self.assertEqual(streamed.loc['likert', 'mode'], expected.loc['likert', 'mode'])
+
+    def test_normality_on_reproducible_sample(self):
+        """测试正态性检验使用可复现的样本且包含 Shapiro-Wilk"""
+        first = SocialScienceStatistics().streaming_descriptive_statistics(self.path, chunksize=10000)
+        second = SocialScienceStatistics().streaming_descriptive_statistics(self.path, chunksize=10000)
+        self.assertEqual(first.loc['score', 'normality_sample_size'], 5000)
+        self.assertIn('statistic', first.loc['score', 'shapiro_wilk'])
+        self.assertEqual(first.loc['income', 'shapiro_wilk'], second.loc['income', 'shapiro_wilk'])
+
+    def test_loaded_by_path_from_other_directory(self):
+        """测试按文件路径加载工具包时，不依赖 sys.path 和工作目录也能找到流式统计模块"""
+        code = (
+            'import importlib.util, sys\n'
+            'spec = importlib.util.spec_from_file_location("toolkit", sys.argv[1])\n'
+            'toolkit = importlib.util.module_from_spec(spec)\n'
+            'spec.loader.exec_module(toolkit)\n'
+            'print(toolkit.SocialScienceStatistics().streaming_descriptive_statistics(sys.argv[2]).loc["likert", "max"])\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code, str(skill_dir / 'scripts' / 'statistics_toolkit.py'), self.path],
+            capture_output=True, text=True, cwd=self.tmp.name
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(float(result.stdout.strip().splitlines()[-1]), 5.0)
+
+    def test_accumulators_independent_of_chunking(self):
+        """测试矩、蓄水池样本与分块方式无关，草图可合并"""
+        import numpy as np
+
+        values = np.random.default_rng(3).normal(size=(20000, 2))
+        whole, parts = RunningMoments(2), RunningMoments(2)
+        whole.update(values)
+        for block in np.array_split(values, 13):
+            parts.update(block)
+        np.testing.assert_allclose(parts.m4, whole.m4, rtol=1e-9)
+
+        one, many = ReservoirSample(100, seed=1), ReservoirSample(100, seed=1)
+        one.update(values[:, 0])
+        for block in np.array_split(values[:, 0], 7):
+            many.update(block)
+        np.testing.assert_array_equal(one.sample(), many.sample())
+
+        left, right = QuantileSketch(capacity=256), QuantileSketch(capacity=256)
+        left.update(values[:10000, 0])
+        right.update(values[10000:, 0])
+        left.merge(right)
+        self.assertAlmostEqual(float(left.quantile(0.5)), float(np.median(values[:, 0])), delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,70 +7,495 @@
 2. 计算接近中心性（Closeness Centrality）
 3. 计算中介中心性（Betweenness Centrality）
 4. 计算特征向量中心性（Eigenvector Centrality）
-5. 综合排序和分析
+5. 计算 PageRank
+6. 综合排序和分析
+
+各指标在独立进程中并行计算，接近中心性和中介中心性按源节点分块。
 
 标准化接口：argparse + 三层JSON输出
 """
 
 import argparse
+import csv
 import json
+import math
+import os
+import random
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import networkx as nx
+from scipy.sparse.linalg import ArpackNoConvergence
+
+
+# 中介中心性算法选择：节点数×边数不超过该值时使用精确算法（Brandes, O(VE)）
+EXACT_BETWEENNESS_MAX_WORK = 5 * 10 ** 7
+# 抽样中介中心性的目标误差及置信度（Hoeffding 界 + 节点并集界）
+BETWEENNESS_TARGET_ERROR = 0.05
+BETWEENNESS_CONFIDENCE = 0.95
+# 节点数低于该值时不启用进程池（进程启动与图序列化开销大于收益）
+PARALLEL_MIN_NODES = 2000
+# 每个进程分配的源节点块数，块越多负载越均衡
+CHUNKS_PER_WORKER = 4
+# 特征向量中心性 / PageRank 求解参数
+EIGEN_MAX_ITER = 1000
+EIGEN_TOL = 1e-6
+# 边文件流式读取
+JSON_CHUNK_SIZE = 1 << 20
+EDGE_FORMATS = {
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.tab': 'tsv',
+}
+EDGE_AGGREGATORS = {
+    'sum': lambda old, new: old + new,
+    'max': max,
+    'min': min,
+    'first': lambda old, new: old,
+    'last': lambda old, new: new,
+}
+BOTH_DIRECTIONS = {'both', 'undirected', 'bidirectional', '<->'}
+REVERSE_DIRECTIONS = {'reverse', 'backward', '<-'}
+_WS_RE = re.compile(r'\s*')
+# 视为"计算未收敛/无解"的异常，记录到元数据而不是中断整个分析
+CONVERGENCE_ERRORS = (
+    ArpackNoConvergence,
+    nx.PowerIterationFailedConvergence,
+    nx.NetworkXException,
+    ZeroDivisionError,
+)
+
+
+def _first_present(record: Dict, keys: Tuple) -> Optional[object]:
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _iter_json_array(f, buffer: str, pos: int, decoder: json.JSONDecoder,
+                     chunk_size: int) -> Iterator:
+    """从 pos 处的 '[' 开始逐个解码数组元素，按需从文件补充缓冲区"""
+    state = {'buffer': buffer, 'pos': pos + 1, 'eof': False}
+
+    def skip_ws():
+        while True:
+            match = _WS_RE.match(state['buffer'], state['pos'])
+            state['pos'] = match.end()
+            if state['pos'] < len(state['buffer']) or state['eof']:
+                return
+            refill()
+
+    def refill():
+        data = f.read(chunk_size)
+        if not data:
+            state['eof'] = True
+        state['buffer'] = state['buffer'][state['pos']:] + data
+        state['pos'] = 0
+
+    while True:
+        skip_ws()
+        if state['pos'] >= len(state['buffer']):
+            raise ValueError('JSON数组未结束')
+        char = state['buffer'][state['pos']]
+        if char == ']':
+            return
+        if char == ',':
+            state['pos'] += 1
+            continue
+        try:
+            value, end = decoder.raw_decode(state['buffer'], state['pos'])
+            # 数字等标量可能被缓冲区截断，末尾恰好对齐时补充后重解
+            if end == len(state['buffer']) and not state['eof']:
+                raise json.JSONDecodeError('truncated', state['buffer'], end)
+        except json.JSONDecodeError:
+            if state['eof']:
+                raise
+            refill()
+            continue
+        state['pos'] = end
+        yield value
+
+
+def _iter_json_edges(file_path: str, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict]:
+    """增量解析 JSON 边文件，支持顶层数组或含 edges/links 数组的对象
+
+    其余字段（如 nodes）会被完整解码后丢弃。
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = _WS_RE.match(buffer).end()
+        if buffer.startswith('[', pos):
+            yield from _iter_json_array(f, buffer, pos, decoder, chunk_size)
+            return
+        if not buffer.startswith('{', pos):
+            raise ValueError('不支持的JSON结构')
+
+        pos += 1
+        eof = False
+        while True:
+            pos = _WS_RE.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] in ',:':
+                pos += 1
+                continue
+            if pos < len(buffer) and buffer[pos] == '}':
+                return
+            try:
+                key, key_end = decoder.raw_decode(buffer, pos)
+                value_pos = _WS_RE.match(buffer, key_end).end()
+                if value_pos >= len(buffer) or buffer[value_pos] != ':':
+                    raise json.JSONDecodeError('truncated', buffer, value_pos)
+                value_pos = _WS_RE.match(buffer, value_pos + 1).end()
+                if value_pos >= len(buffer):
+                    raise json.JSONDecodeError('truncated', buffer, value_pos)
+                if key in ('edges', 'links') and buffer[value_pos] == '[':
+                    yield from _iter_json_array(f, buffer, value_pos, decoder, chunk_size)
+                    return
+                _, value_end = decoder.raw_decode(buffer, value_pos)
+                if value_end == len(buffer) and not eof:
+                    raise json.JSONDecodeError('truncated', buffer, value_end)
+                pos = value_end
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                data = f.read(chunk_size)
+                eof = not data
+                buffer = buffer[pos:] + data
+                pos = 0
+
+
+def _iter_jsonl_edges(file_path: str) -> Iterator[Dict]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_delimited_edges(file_path: str, delimiter: str) -> Iterator[Dict]:
+    """CSV/TSV 边列表；首行包含 source/target（或 from/to）列名时按表头读取，否则按 源,目标,权重 位置读取"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        names = [name.strip() for name in header]
+        if not {'source', 'from'} & set(names) or not {'target', 'to'} & set(names):
+            names = ['source', 'target', 'weight']
+            yield dict(zip(names, header))
+        for row in reader:
+            if row:
+                yield dict(zip(names, row))
+
+
+def iter_edges(file_path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """按文件格式流式读取边记录；fmt 为空时按扩展名判断"""
+    fmt = fmt or EDGE_FORMATS.get(Path(file_path).suffix.lower(), 'json')
+    if fmt == 'jsonl':
+        return _iter_jsonl_edges(file_path)
+    if fmt == 'csv':
+        return _iter_delimited_edges(file_path, ',')
+    if fmt == 'tsv':
+        return _iter_delimited_edges(file_path, '\t')
+    return _iter_json_edges(file_path)
+
+
+def build_graph(edges: Iterable[Dict], directed: bool = False,
+                weight_column: str = 'weight', direction_column: Optional[str] = None,
+                aggregate: str = 'last') -> nx.Graph:
+    """由边记录逐条构建网络
+
+    - 节点ID驻留（相同ID共享同一对象），减少大网络的字符串内存
+    - direction_column 的取值为 both/undirected 时添加双向边，reverse 时反转方向
+    - 重复边按 aggregate（sum/max/min/first/last）合并权重
+    """
+    G = nx.DiGraph() if directed else nx.Graph()
+    interned = {}
+    intern = interned.setdefault
+    combine = EDGE_AGGREGATORS[aggregate]
+    overwrite = aggregate == 'last'
+
+    for edge in edges:
+        source = _first_present(edge, ('source', 'from'))
+        target = _first_present(edge, ('target', 'to'))
+        if source is None or target is None:
+            continue
+        source = intern(source, source)
+        target = intern(target, target)
+        weight = edge.get(weight_column)
+        weight = 1.0 if weight is None or weight == '' else float(weight)
+
+        pairs = ((source, target),)
+        if directed and direction_column:
+            direction = str(edge.get(direction_column) or '').strip().lower()
+            if direction in BOTH_DIRECTIONS:
+                pairs = ((source, target), (target, source))
+            elif direction in REVERSE_DIRECTIONS:
+                pairs = ((target, source),)
 
+        for u, v in pairs:
+            # add_edge 对已有边直接覆盖属性，即 last 语义，无需查询
+            existing = None if overwrite else G.get_edge_data(u, v)
+            if existing is None:
+                G.add_edge(u, v, weight=weight)
+            else:
+                existing['weight'] = combine(existing['weight'], weight)
 
-def load_network(file_path: str) -> nx.Graph:
-    """加载网络数据"""
+    return G
+
+
+def load_network(file_path: str, fmt: Optional[str] = None, directed: bool = False,
+                 weight_column: str = 'weight', direction_column: Optional[str] = None,
+                 aggregate: str = 'last') -> nx.Graph:
+    """加载网络数据
+
+    支持 JSON（增量解析）、JSON Lines、CSV、TSV 边列表，边记录逐条读取，
+    不在内存中保留完整的边列表。
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 支持多种格式
-        if 'edges' in data:
-            edges = data['edges']
-        elif 'links' in data:
-            edges = data['links']
-        else:
-            edges = data
-        
-        G = nx.Graph()
-        for edge in edges:
-            source = edge.get('source') or edge.get('from')
-            target = edge.get('target') or edge.get('to')
-            weight = edge.get('weight', 1.0)
-            G.add_edge(source, target, weight=weight)
-        
-        return G
+        return build_graph(
+            iter_edges(file_path, fmt),
+            directed=directed,
+            weight_column=weight_column,
+            direction_column=direction_column,
+            aggregate=aggregate
+        )
     
     except Exception as e:
         print(f"错误：无法加载网络文件 - {e}", file=sys.stderr)
         sys.exit(1)
 
 
-def calculate_all_centralities(G: nx.Graph) -> Dict:
-    """计算所有中心性指标"""
-    
+def estimate_betweenness_error(n_nodes: int, k: int,
+                               confidence: float = BETWEENNESS_CONFIDENCE) -> float:
+    """k 个枢轴抽样时标准化中介中心性的最大绝对误差估计
+
+    每个枢轴对节点的贡献落在 [0, 1]，由 Hoeffding 不等式并对全部节点取并集界：
+    eps = sqrt(ln(2n / (1 - confidence)) / (2k))
+    """
+    if k >= n_nodes or n_nodes <= 2:
+        return 0.0
+    return math.sqrt(math.log(2 * n_nodes / (1 - confidence)) / (2 * k))
+
+
+def choose_betweenness_k(n_nodes: int,
+                         target_error: float = BETWEENNESS_TARGET_ERROR,
+                         confidence: float = BETWEENNESS_CONFIDENCE) -> int:
+    """按目标误差反推枢轴数 k，不超过节点数"""
+    if n_nodes <= 2:
+        return n_nodes
+    k = math.ceil(math.log(2 * n_nodes / (1 - confidence)) / (2 * target_error ** 2))
+    return min(n_nodes, k)
+
+
+def _plan_betweenness(G: nx.Graph, exact: bool, k: Optional[int], seed: int,
+                      max_exact_work: int) -> Tuple[List, Dict]:
+    """确定中介中心性的源节点集合及算法信息"""
+    if k is not None and k < 1:
+        raise ValueError(f"中介中心性抽样枢轴数必须至少为1: {k}")
+    n_nodes = G.number_of_nodes()
+    work = n_nodes * G.number_of_edges()
+
+    if k is None and not exact and work > max_exact_work:
+        k = choose_betweenness_k(n_nodes)
+    if exact or k is None or k >= n_nodes:
+        return list(G.nodes()), {
+            'method': 'exact',
+            'k': None,
+            'estimated_error': 0.0
+        }
+
+    pivots = random.Random(seed).sample(list(G.nodes()), k)
+    return pivots, {
+        'method': 'sampled',
+        'k': k,
+        'seed': seed,
+        'estimated_error': round(estimate_betweenness_error(n_nodes, k), 4),
+        'confidence': BETWEENNESS_CONFIDENCE
+    }
+
+
+def _betweenness_chunk(G: nx.Graph, sources: List) -> Dict:
+    """以 sources 为源节点的未标准化中介中心性贡献（无向图已折半）"""
+    return nx.betweenness_centrality_subset(G, sources, list(G.nodes()), normalized=False)
+
+
+def _closeness_chunk(G: nx.Graph, nodes: List) -> Dict:
+    """与 nx.closeness_centrality 相同的 Wasserman-Faust 改进公式，按节点分块计算"""
+    H = G.reverse(copy=False) if G.is_directed() else G
+    n_nodes = G.number_of_nodes()
+    result = {}
+    for node in nodes:
+        lengths = nx.single_source_shortest_path_length(H, node)
+        total = sum(lengths.values())
+        reachable = len(lengths) - 1
+        if total > 0 and n_nodes > 1:
+            result[node] = (reachable / total) * (reachable / (n_nodes - 1))
+        else:
+            result[node] = 0.0
+    return result
+
+
+def _has_unique_eigenvector(G: nx.Graph) -> bool:
+    """连通的无向图或强连通的有向图才有唯一的正主特征向量"""
+    if G.number_of_nodes() == 0:
+        return False
+    return nx.is_strongly_connected(G) if G.is_directed() else nx.is_connected(G)
+
+
+def _eigenvector_task(G: nx.Graph) -> Dict:
+    """scipy 稀疏 ARPACK 求解主特征向量
+
+    不连通的无向图和非强连通的有向图 ARPACK 无法给出唯一解，
+    退回幂迭代，与 nx.eigenvector_centrality 的结果一致。
+    """
+    if not _has_unique_eigenvector(G):
+        return nx.eigenvector_centrality(G, max_iter=EIGEN_MAX_ITER, tol=EIGEN_TOL)
+    return nx.eigenvector_centrality_numpy(G, max_iter=EIGEN_MAX_ITER, tol=EIGEN_TOL)
+
+
+def _pagerank_task(G: nx.Graph) -> Dict:
+    """scipy 稀疏矩阵 PageRank"""
+    return nx.pagerank(G, max_iter=EIGEN_MAX_ITER)
+
+
+def _run_task(func, G: nx.Graph, args: Tuple) -> Tuple[Optional[Dict], Optional[str]]:
+    """执行单个任务，收敛失败等异常作为结果返回而不是吞掉"""
+    try:
+        return func(G, *args), None
+    except CONVERGENCE_ERRORS as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+_WORKER_GRAPH = None
+
+
+def _init_worker(G: nx.Graph) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = G
+
+
+def _run_worker_task(func, args: Tuple) -> Tuple[Optional[Dict], Optional[str]]:
+    return _run_task(func, _WORKER_GRAPH, args)
+
+
+def _split(items: List, n_chunks: int) -> List[List]:
+    size = max(1, math.ceil(len(items) / max(1, n_chunks)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _execute_tasks(G: nx.Graph, tasks: List[Tuple], workers: int) -> List[Tuple]:
+    """tasks 为 (指标名, 函数, 参数)；workers>1 时在进程池中执行，图只在进程初始化时传递一次"""
+    if workers <= 1 or len(tasks) <= 1:
+        return [(measure,) + _run_task(func, G, args) for measure, func, args in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(G,)) as executor:
+        futures = [(measure, executor.submit(_run_worker_task, func, args))
+                   for measure, func, args in tasks]
+        return [(measure,) + future.result() for measure, future in futures]
+
+
+def _resolve_workers(G: nx.Graph, workers: Optional[int]) -> int:
+    if workers is None:
+        if G.number_of_nodes() < PARALLEL_MIN_NODES:
+            return 1
+        workers = os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _rescale_betweenness(G: nx.Graph, raw: Dict, info: Dict) -> Dict:
+    """汇总分块结果后按 nx.betweenness_centrality(normalized=True) 的口径标准化"""
+    n_nodes = G.number_of_nodes()
+    if n_nodes <= 2:
+        return {node: 0.0 for node in G.nodes()}
+    scale = 1.0 / ((n_nodes - 1) * (n_nodes - 2))
+    if not G.is_directed():
+        scale *= 2
+    if info['method'] == 'sampled':
+        scale *= n_nodes / info['k']
+    return {node: raw.get(node, 0.0) * scale for node in G.nodes()}
+
+
+def _merge_results(G: nx.Graph, results: List[Tuple], measure: str) -> Tuple[Dict, Dict]:
+    """合并同一指标的分块结果；任一分块失败则整体记为失败并以 0 填充"""
+    merged = {}
+    errors = []
+    for name, values, error in results:
+        if name != measure:
+            continue
+        if error:
+            errors.append(error)
+            continue
+        for node, value in values.items():
+            merged[node] = merged.get(node, 0.0) + value
+
+    if errors:
+        return {node: 0.0 for node in G.nodes()}, {'status': 'failed', 'error': errors[0]}
+    return merged, {'status': 'ok'}
+
+
+def calculate_betweenness(G: nx.Graph, exact: bool = False, k: Optional[int] = None,
+                          seed: int = 42,
+                          max_exact_work: int = EXACT_BETWEENNESS_MAX_WORK,
+                          workers: Optional[int] = 1) -> Tuple[Dict, Dict]:
+    """按网络规模选择精确或 k 枢轴抽样的中介中心性
+
+    返回 (中心性字典, 算法信息)，算法信息记录 method / k / estimated_error。
+    """
+    workers = _resolve_workers(G, workers)
+    sources, info = _plan_betweenness(G, exact, k, seed, max_exact_work)
+    tasks = [('betweenness', _betweenness_chunk, (chunk,))
+             for chunk in _split(sources, workers * CHUNKS_PER_WORKER)]
+    raw, status = _merge_results(G, _execute_tasks(G, tasks, workers), 'betweenness')
+    info.update(status)
+    return _rescale_betweenness(G, raw, info), info
+
+
+def calculate_all_centralities(G: nx.Graph, exact_betweenness: bool = False,
+                               betweenness_k: Optional[int] = None,
+                               seed: int = 42,
+                               workers: Optional[int] = None) -> Tuple[Dict, Dict]:
+    """计算所有中心性指标
+
+    每个指标在独立进程中计算，接近中心性与中介中心性再按源节点分块；
+    特征向量中心性与 PageRank 使用 scipy 稀疏求解器。
+    返回 (各节点中心性, 计算元数据)，不收敛等失败记录在元数据中。
+    """
+    workers = _resolve_workers(G, workers)
+    n_chunks = workers * CHUNKS_PER_WORKER
+
     # 度中心性
     degree_cent = nx.degree_centrality(G)
-    
-    # 接近中心性
-    try:
-        closeness_cent = nx.closeness_centrality(G)
-    except:
-        closeness_cent = {node: 0.0 for node in G.nodes()}
-    
-    # 中介中心性
-    betweenness_cent = nx.betweenness_centrality(G)
-    
-    # 特征向量中心性
-    try:
-        eigenvector_cent = nx.eigenvector_centrality(G, max_iter=1000)
-    except:
-        eigenvector_cent = {node: 0.0 for node in G.nodes()}
-    
+
+    sources, betweenness_info = _plan_betweenness(
+        G, exact_betweenness, betweenness_k, seed, EXACT_BETWEENNESS_MAX_WORK
+    )
+    tasks = [('eigenvector', _eigenvector_task, ()), ('pagerank', _pagerank_task, ())]
+    tasks += [('closeness', _closeness_chunk, (chunk,))
+              for chunk in _split(list(G.nodes()), n_chunks)]
+    tasks += [('betweenness', _betweenness_chunk, (chunk,))
+              for chunk in _split(sources, n_chunks)]
+    results = _execute_tasks(G, tasks, workers)
+
+    closeness_cent, closeness_info = _merge_results(G, results, 'closeness')
+    raw_betweenness, status = _merge_results(G, results, 'betweenness')
+    betweenness_info.update(status)
+    betweenness_cent = _rescale_betweenness(G, raw_betweenness, betweenness_info)
+    eigenvector_cent, eigenvector_info = _merge_results(G, results, 'eigenvector')
+    eigenvector_info['solver'] = 'scipy.sparse.linalg.eigs' if _has_unique_eigenvector(G) else 'power_iteration'
+    pagerank_cent, pagerank_info = _merge_results(G, results, 'pagerank')
+    pagerank_info['solver'] = 'scipy.sparse'
+
     # 整合结果
     centralities = {}
     for node in G.nodes():
@@ -79,10 +504,17 @@ def calculate_all_centralities(G: nx.Graph) -> Dict:
             'degree': round(degree_cent.get(node, 0), 4),
             'closeness': round(closeness_cent.get(node, 0), 4),
             'betweenness': round(betweenness_cent.get(node, 0), 4),
-            'eigenvector': round(eigenvector_cent.get(node, 0), 4)
+            'eigenvector': round(eigenvector_cent.get(node, 0), 4),
+            'pagerank': round(pagerank_cent.get(node, 0), 4)
         }
-    
-    return centralities
+
+    return centralities, {
+        'workers': workers,
+        'closeness': closeness_info,
+        'betweenness': betweenness_info,
+        'eigenvector': eigenvector_info,
+        'pagerank': pagerank_info
+    }
 
 
 def rank_nodes(centralities: Dict, metric: str = 'degree', top_n: int = 10) -> list:
@@ -123,6 +555,14 @@ def identify_key_nodes(centralities: Dict, thresholds: Dict = None) -> Dict:
     }
 
 
+def _positive_int(value: str) -> int:
+    """argparse 类型：正整数"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须为正整数: {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='中心性计算工具',
@@ -136,24 +576,57 @@ def main():
     )
     
     parser.add_argument('--input', '-i', required=True,
-                       help='输入的网络文件（JSON格式）')
+                       help='输入的网络文件（JSON / JSONL / CSV / TSV 边列表）')
+    parser.add_argument('--format', default=None,
+                       choices=['json', 'jsonl', 'csv', 'tsv'],
+                       help='输入格式（默认按扩展名判断）')
+    parser.add_argument('--directed', action='store_true',
+                       help='构建有向网络')
+    parser.add_argument('--weight-column', default='weight',
+                       help='权重列名（默认：weight）')
+    parser.add_argument('--direction-column', default=None,
+                       help='方向列名（取值 both/reverse，仅有向网络生效）')
+    parser.add_argument('--aggregate', default='last',
+                       choices=sorted(EDGE_AGGREGATORS),
+                       help='重复边权重合并方式（默认：last）')
     parser.add_argument('--output', '-o', default='centrality.json',
                        help='输出文件名（默认：centrality.json）')
     parser.add_argument('--metric', '-m', default='degree',
-                       choices=['degree', 'closeness', 'betweenness', 'eigenvector'],
+                       choices=['degree', 'closeness', 'betweenness', 'eigenvector', 'pagerank'],
                        help='排序指标（默认：degree）')
     parser.add_argument('--top', '-t', type=int, default=10,
                        help='输出前N个节点（默认：10）')
+    parser.add_argument('--exact', action='store_true',
+                       help='强制使用精确中介中心性（大网络可能耗时数小时）')
+    parser.add_argument('--betweenness-k', type=_positive_int, default=None,
+                       help='中介中心性抽样枢轴数（默认按网络规模自动选择）')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='抽样随机种子（默认：42）')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                       help='并行进程数（默认：大网络使用全部CPU核心）')
     
     args = parser.parse_args()
     
     start_time = datetime.now()
     
     # 加载网络
-    G = load_network(args.input)
+    G = load_network(
+        args.input,
+        fmt=args.format,
+        directed=args.directed,
+        weight_column=args.weight_column,
+        direction_column=args.direction_column,
+        aggregate=args.aggregate
+    )
     
     # 计算中心性
-    centralities = calculate_all_centralities(G)
+    centralities, computation = calculate_all_centralities(
+        G,
+        exact_betweenness=args.exact,
+        betweenness_k=args.betweenness_k,
+        seed=args.seed,
+        workers=args.workers
+    )
     
     # 排序节点
     top_nodes = rank_nodes(centralities, args.metric, args.top)
@@ -186,6 +659,7 @@ def main():
             'input_file': args.input,
             'output_file': args.output,
             'metric_used': args.metric,
+            'centrality_computation': computation,
             'timestamp': datetime.now().isoformat(),
             'version': '1.0.0',
             'skill': 'performing-centrality-analysis'
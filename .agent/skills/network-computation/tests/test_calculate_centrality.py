@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+中心性计算工具测试套件
+包括算法选择、抽样精度和性能测试
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+import networkx as nx
+
+# 添加技能模块到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir))
+
+from scripts import calculate_centrality
+from scripts.calculate_centrality import (
+    calculate_all_centralities,
+    calculate_betweenness,
+    choose_betweenness_k,
+    estimate_betweenness_error,
+    iter_edges,
+    load_network,
+    _iter_json_edges
+)
+
+# 设置该环境变量后运行完整规模的基准测试
+RUN_BENCHMARKS_ENV = 'RUN_SLOW_BENCHMARKS'
+BENCHMARK_NODES = 50000
+
+
+def spearman(a, b):
+    """两组得分的 Spearman 等级相关（平均秩处理并列）"""
+    def ranks(values):
+        order = sorted(range(len(values)), key=lambda i: values[i])
+        result = [0.0] * len(values)
+        i = 0
+        while i < len(order):
+            j = i
+            while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+                j += 1
+            for m in range(i, j + 1):
+                result[order[m]] = (i + j) / 2
+            i = j + 1
+        return result
+
+    ra, rb = ranks(a), ranks(b)
+    mean_a, mean_b = sum(ra) / len(ra), sum(rb) / len(rb)
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(ra, rb))
+    var_a = sum((x - mean_a) ** 2 for x in ra)
+    var_b = sum((y - mean_b) ** 2 for y in rb)
+    return cov / (var_a * var_b) ** 0.5
+
+
+def top_k_overlap(a, b, k):
+    top_a = set(sorted(a, key=a.get, reverse=True)[:k])
+    top_b = set(sorted(b, key=b.get, reverse=True)[:k])
+    return len(top_a & top_b) / k
+
+
+class TestBetweennessSelection(unittest.TestCase):
+    """测试中介中心性算法选择"""
+
+    def test_small_graph_uses_exact(self):
+        """测试小网络使用精确算法"""
+        G = nx.karate_club_graph()
+        _, info = calculate_betweenness(G)
+        self.assertEqual(info['method'], 'exact')
+        self.assertIsNone(info['k'])
+        self.assertEqual(info['estimated_error'], 0.0)
+
+    def test_large_graph_uses_sampling(self):
+        """测试超过阈值时使用抽样算法"""
+        G = nx.barabasi_albert_graph(3000, 1, seed=1)
+        _, info = calculate_betweenness(G, max_exact_work=1000)
+        self.assertEqual(info['method'], 'sampled')
+        self.assertEqual(info['k'], choose_betweenness_k(3000))
+        self.assertLess(info['k'], 3000)
+        self.assertGreater(info['estimated_error'], 0)
+
+    def test_exact_flag_overrides_threshold(self):
+        """测试强制精确模式"""
+        G = nx.barabasi_albert_graph(500, 3, seed=1)
+        _, info = calculate_betweenness(G, exact=True, max_exact_work=1000)
+        self.assertEqual(info['method'], 'exact')
+
+    def test_sampling_is_deterministic(self):
+        """测试相同种子结果一致"""
+        G = nx.barabasi_albert_graph(300, 3, seed=2)
+        first, _ = calculate_betweenness(G, k=50, seed=7)
+        second, _ = calculate_betweenness(G, k=50, seed=7)
+        self.assertEqual(first, second)
+
+    def test_invalid_k_rejected(self):
+        """测试枢轴数小于1时报错，命令行同样拒绝"""
+        G = nx.karate_club_graph()
+        for k in (0, -3):
+            with self.assertRaises(ValueError):
+                calculate_betweenness(G, k=k)
+        argv = ['calculate_centrality.py', '--input', 'network.json', '--betweenness-k', '0']
+        with mock.patch.object(sys, 'argv', argv), mock.patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                calculate_centrality.main()
+
+    def test_error_estimate_shrinks_with_k(self):
+        """测试误差估计随 k 增大而减小"""
+        self.assertGreater(estimate_betweenness_error(10000, 100),
+                           estimate_betweenness_error(10000, 1000))
+        self.assertEqual(estimate_betweenness_error(100, 100), 0.0)
+
+    def test_metadata_returned(self):
+        """测试 calculate_all_centralities 返回计算元数据"""
+        G = nx.karate_club_graph()
+        centralities, computation = calculate_all_centralities(G)
+        self.assertEqual(len(centralities), G.number_of_nodes())
+        self.assertEqual(computation['betweenness']['method'], 'exact')
+
+
+class TestBetweennessAccuracy(unittest.TestCase):
+    """测试抽样结果与精确结果的排序一致性"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = nx.barabasi_albert_graph(1500, 3, seed=42)
+        start = time.perf_counter()
+        cls.exact, _ = calculate_betweenness(cls.graph, exact=True)
+        cls.exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cls.sampled, cls.info = calculate_betweenness(cls.graph, k=300, seed=42)
+        cls.sampled_time = time.perf_counter() - start
+
+    def test_rank_agreement(self):
+        """测试 Spearman 等级相关"""
+        nodes = list(self.graph.nodes())
+        rho = spearman([self.exact[n] for n in nodes], [self.sampled[n] for n in nodes])
+        self.assertGreater(rho, 0.9)
+
+    def test_top_k_overlap(self):
+        """测试前20节点重合度"""
+        self.assertGreaterEqual(top_k_overlap(self.exact, self.sampled, 20), 0.8)
+
+    def test_absolute_error_within_estimate(self):
+        """测试最大绝对误差不超过估计值"""
+        max_error = max(abs(self.exact[n] - self.sampled[n]) for n in self.graph.nodes())
+        self.assertLessEqual(max_error, self.info['estimated_error'])
+
+    def test_runtime_reduction(self):
+        """测试抽样算法耗时显著降低"""
+        self.assertLess(self.sampled_time, self.exact_time * 0.5)
+
+
+class TestParallelCentralities(unittest.TestCase):
+    """测试进程并行计算与稀疏求解"""
+
+    def setUp(self):
+        self.graph = nx.barabasi_albert_graph(400, 3, seed=3)
+
+    def test_chunked_betweenness_matches_networkx(self):
+        """测试分块中介中心性与 networkx 精确结果一致"""
+        for G in (self.graph, nx.gnp_random_graph(150, 0.05, seed=1, directed=True)):
+            expected = nx.betweenness_centrality(G)
+            actual, _ = calculate_betweenness(G, exact=True, workers=2)
+            for node in G.nodes():
+                self.assertAlmostEqual(actual[node], expected[node], places=12)
+
+    def test_chunked_closeness_matches_networkx(self):
+        """测试分块接近中心性与 networkx 结果一致"""
+        G = nx.gnp_random_graph(200, 0.01, seed=5)
+        expected = nx.closeness_centrality(G)
+        centralities, _ = calculate_all_centralities(G, workers=1)
+        for node in G.nodes():
+            self.assertAlmostEqual(centralities[node]['closeness'], round(expected[node], 4))
+
+    def test_parallel_matches_serial(self):
+        """测试多进程结果与单进程一致"""
+        serial, _ = calculate_all_centralities(self.graph, workers=1)
+        parallel, computation = calculate_all_centralities(self.graph, workers=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(computation['workers'], 2)
+
+    def test_sparse_eigenvector_and_pagerank(self):
+        """测试稀疏求解的特征向量中心性与 PageRank"""
+        centralities, computation = calculate_all_centralities(self.graph, workers=1)
+        expected = nx.eigenvector_centrality(self.graph, max_iter=1000)
+        for node in self.graph.nodes():
+            self.assertAlmostEqual(centralities[node]['eigenvector'], expected[node], places=3)
+        self.assertEqual(computation['eigenvector']['status'], 'ok')
+        self.assertEqual(computation['pagerank']['status'], 'ok')
+        self.assertAlmostEqual(sum(c['pagerank'] for c in centralities.values()), 1.0, places=2)
+
+    def test_eigenvector_disconnected_and_directed(self):
+        """测试不连通图和有向图的特征向量中心性退回幂迭代，与 networkx 一致"""
+        for G in (nx.Graph([(1, 2), (2, 3), (4, 5)]), nx.DiGraph([(1, 2), (2, 3)])):
+            centralities, computation = calculate_all_centralities(G, workers=1)
+            expected = nx.eigenvector_centrality(G, max_iter=1000)
+            self.assertEqual(computation['eigenvector']['status'], 'ok')
+            self.assertEqual(computation['eigenvector']['solver'], 'power_iteration')
+            for node in G.nodes():
+                self.assertAlmostEqual(centralities[node]['eigenvector'], expected[node], places=3)
+            self.assertGreater(max(c['eigenvector'] for c in centralities.values()), 0.5)
+
+    def test_convergence_failure_reported(self):
+        """测试不收敛被记录到元数据而不是静默吞掉"""
+        def fail(G):
+            raise nx.PowerIterationFailedConvergence(10)
+
+        with mock.patch.object(calculate_centrality, '_eigenvector_task', fail):
+            centralities, computation = calculate_all_centralities(self.graph, workers=1)
+
+        self.assertEqual(computation['eigenvector']['status'], 'failed')
+        self.assertIn('PowerIterationFailedConvergence', computation['eigenvector']['error'])
+        self.assertTrue(all(c['eigenvector'] == 0.0 for c in centralities.values()))
+        self.assertEqual(computation['closeness']['status'], 'ok')
+
+    @unittest.skipUnless((os.cpu_count() or 1) >= 4, '需要至少4个CPU核心')
+    def test_parallel_speedup(self):
+        """测试4进程计算相对单进程的加速（4000节点的快速版本，完整规模见 TestSpeedupBenchmark）"""
+        G = nx.barabasi_albert_graph(4000, 2, seed=11)
+
+        start = time.perf_counter()
+        calculate_all_centralities(G, exact_betweenness=True, workers=1)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        calculate_all_centralities(G, exact_betweenness=True, workers=4)
+        parallel_time = time.perf_counter() - start
+
+        self.assertLess(parallel_time, serial_time * 0.6)
+
+
+@unittest.skipUnless(os.environ.get(RUN_BENCHMARKS_ENV), f'设置 {RUN_BENCHMARKS_ENV}=1 运行耗时基准测试')
+@unittest.skipUnless((os.cpu_count() or 1) >= 4, '需要至少4个CPU核心')
+class TestSpeedupBenchmark(unittest.TestCase):
+    """50000节点合成图上的4进程加速基准（单进程约需一小时）"""
+
+    def test_speedup_50k_nodes(self):
+        """测试50000节点图上4进程计算全部中心性快于单进程"""
+        G = nx.barabasi_albert_graph(BENCHMARK_NODES, 2, seed=11)
+
+        start = time.perf_counter()
+        serial, _ = calculate_all_centralities(G, workers=1)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel, computation = calculate_all_centralities(G, workers=4)
+        parallel_time = time.perf_counter() - start
+
+        print(f'\n{BENCHMARK_NODES} 节点: 单进程 {serial_time:.1f} 秒, 4进程 {parallel_time:.1f} 秒, '
+              f'加速 {serial_time / parallel_time:.2f} 倍')
+        self.assertEqual(serial, parallel)
+        self.assertEqual(computation['workers'], 4)
+        self.assertLess(parallel_time, serial_time * 0.5)
+
+
+class TestStreamingLoaders(unittest.TestCase):
+    """测试流式边文件读取"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = random.Random(0)
+        self.edges = [
+            {'source': f'n{rng.randint(0, 200)}', 'target': f'n{rng.randint(0, 200)}',
+             'weight': rng.randint(1, 5)}
+            for _ in range(2000)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def _legacy_graph(self):
+        G = nx.Graph()
+        for edge in self.edges:
+            G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
+        return G
+
+    def assertSameGraph(self, actual, expected):
+        self.assertEqual(set(actual.nodes()), set(expected.nodes()))
+        self.assertEqual(
+            {frozenset((u, v)): float(d['weight']) for u, v, d in actual.edges(data=True)},
+            {frozenset((u, v)): float(d['weight']) for u, v, d in expected.edges(data=True)}
+        )
+
+    def test_incremental_json_matches_json_load(self):
+        """测试分块 raw_decode 解析与 json.load 一致"""
+        payloads = [
+            self.edges,
+            {'nodes': [{'id': 'n1', 'tags': ['}', ']']}], 'count': 12345, 'edges': self.edges},
+            {'links': self.edges}
+        ]
+        for index, payload in enumerate(payloads):
+            path = self._path(f'network_{index}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=index)
+            for chunk_size in (5, 97, 1 << 16):
+                self.assertEqual(list(_iter_json_edges(path, chunk_size)), self.edges)
+
+    def test_formats_produce_same_graph(self):
+        """测试 JSON / JSONL / CSV / TSV 构建相同网络"""
+        with open(self._path('network.json'), 'w', encoding='utf-8') as f:
+            json.dump({'edges': self.edges}, f)
+        with open(self._path('network.jsonl'), 'w', encoding='utf-8') as f:
+            for edge in self.edges:
+                f.write(json.dumps(edge) + '\n')
+        for name, sep in (('network.csv', ','), ('network.tsv', '\t')):
+            with open(self._path(name), 'w', encoding='utf-8') as f:
+                f.write(sep.join(['source', 'target', 'weight']) + '\n')
+                for edge in self.edges:
+                    f.write(sep.join(str(edge[k]) for k in ('source', 'target', 'weight')) + '\n')
+
+        expected = self._legacy_graph()
+        for name in ('network.json', 'network.jsonl', 'network.csv', 'network.tsv'):
+            self.assertSameGraph(load_network(self._path(name)), expected)
+
+    def test_headerless_csv(self):
+        """测试无表头 CSV 按位置读取"""
+        path = self._path('edges.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('a,b,2\nb,c,3\n')
+        self.assertEqual(list(iter_edges(path)), [
+            {'source': 'a', 'target': 'b', 'weight': '2'},
+            {'source': 'b', 'target': 'c', 'weight': '3'}
+        ])
+
+    def test_duplicate_aggregation(self):
+        """测试重复边权重合并"""
+        path = self._path('dup.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for weight in (1, 4, 2):
+                f.write(json.dumps({'from': 'a', 'to': 'b', 'w': weight}) + '\n')
+
+        expected = {'sum': 7.0, 'max': 4.0, 'min': 1.0, 'first': 1.0, 'last': 2.0}
+        for aggregate, weight in expected.items():
+            G = load_network(path, weight_column='w', aggregate=aggregate)
+            self.assertEqual(G['a']['b']['weight'], weight)
+
+    def test_direction_column(self):
+        """测试方向列"""
+        path = self._path('directed.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('source,target,dir\na,b,forward\nb,c,both\nd,c,reverse\n')
+        G = load_network(path, directed=True, direction_column='dir')
+        self.assertTrue(G.is_directed())
+        self.assertEqual(set(G.edges()), {('a', 'b'), ('b', 'c'), ('c', 'b'), ('c', 'd')})
+
+    def test_node_ids_interned(self):
+        """测试相同节点ID共享同一对象"""
+        path = self._path('edges.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('source,target\nalpha,beta\nbeta,alpha\ngamma,alpha\n')
+        G = load_network(path)
+        ids = [v for u in G for v in G[u] if v == 'alpha']
+        self.assertTrue(all(node is ids[0] for node in ids))
+
+    def test_peak_memory_below_json_load(self):
+        """测试流式读取的内存峰值低于 json.load + 构建"""
+        path = self._path('large.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'edges': self.edges * 25}, f)
+
+        def legacy():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            G = nx.Graph()
+            for edge in data['edges']:
+                G.add_edge(edge['source'], edge['target'], weight=edge['weight'])
+            return G
+
+        peaks = []
+        for loader in (legacy, lambda: load_network(path)):
+            tracemalloc.start()
+            loader()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,17 +6,14 @@ Validity and Reliability Analysis Toolkit
 import numpy as np
 import pandas as pd
 import scipy.stats as stats
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.decomposition import FactorAnalysis
-from sklearn.preprocessing import StandardScaler
-from factor_analyzer import FactorAnalyzer
-from factor_analyzer.factor_analyzer import calculate_bartlett_sphericity, calculate_kmo
-import pingouin as pg
-from scipy.stats import pearsonr
 import warnings
 warnings.filterwarnings('ignore')
 
+# Bootstrap 默认重抽样次数、随机种子和每批重抽样数（控制权重矩阵内存）
+N_BOOTSTRAP = 1000
+BOOTSTRAP_SEED = 42
+BOOTSTRAP_BATCH = 50
+
 class ValidityReliabilityAnalyzer:
     """信度效度分析器"""
     
@@ -36,22 +33,28 @@ class ValidityReliabilityAnalyzer:
         print(f"数据加载成功: {self.data.shape[0]} 行, {self.data.shape[1]} 列")
         return self.data.head()
     
-    def reliability_analysis(self, items, alpha=0.05):
-        """信度分析"""
+    def reliability_analysis(self, items, alpha=0.05, n_bootstrap=N_BOOTSTRAP, seed=BOOTSTRAP_SEED):
+        """信度分析
+        
+        项目协方差矩阵只计算一次，Alpha、删除项后的 Alpha、校正的项目-总分相关
+        和分半信度都由它推导；Alpha 的置信区间（置信水平 1-alpha）由向量化
+        Bootstrap 得到，n_bootstrap=0 时不计算。
+        """
         # 移除缺失值
         data_clean = self.data[items].dropna()
+        cov = self._item_covariance(data_clean)
         
         # Cronbach's Alpha
-        cronbach_alpha = self._calculate_cronbach_alpha(data_clean)
+        cronbach_alpha = self._calculate_cronbach_alpha(data_clean, cov)
         
         # 分半信度
-        split_half = self._calculate_split_half_reliability(data_clean)
+        split_half = self._calculate_split_half_reliability(data_clean, cov)
         
         # 项目统计
-        item_stats = self._calculate_item_statistics(data_clean)
+        item_stats = self._calculate_item_statistics(data_clean, cov)
         
         # 删除项后的Alpha
-        alpha_if_deleted = self._calculate_alpha_if_deleted(data_clean)
+        alpha_if_deleted = self._calculate_alpha_if_deleted(data_clean, cov)
         
         # McDonald's Omega
         omega = self._calculate_omega(data_clean)
@@ -65,16 +68,28 @@ class ValidityReliabilityAnalyzer:
             'interpretation': self._interpret_reliability(cronbach_alpha)
         }
         
+        if n_bootstrap:
+            result['alpha_confidence_interval'] = self._bootstrap_alpha_ci(
+                data_clean, n_bootstrap, 1 - alpha, seed
+            )
+        
         return result
     
-    def _calculate_cronbach_alpha(self, data):
-        """计算Cronbach's Alpha"""
-        from pingouin import cronbach_alpha
-        alpha, _ = cronbach_alpha(data)
-        return alpha
+    def _item_covariance(self, data):
+        """项目协方差矩阵（样本协方差，ddof=1）"""
+        return np.cov(np.asarray(data, dtype=float), rowvar=False)
+    
+    def _calculate_cronbach_alpha(self, data, cov=None):
+        """计算Cronbach's Alpha: k/(k-1) * (1 - Σ项目方差 / 总分方差)"""
+        if cov is None:
+            cov = self._item_covariance(data)
+        k = cov.shape[0]
+        return k / (k - 1) * (1 - np.trace(cov) / cov.sum())
     
     def _calculate_omega(self, data):
         """计算McDonald's Omega"""
+        from factor_analyzer import FactorAnalyzer
+        
         # 使用因子分析计算Omega
         fa = FactorAnalyzer(n_factors=1, rotation=None)
         fa.fit(data)
@@ -86,62 +101,107 @@ class ValidityReliabilityAnalyzer:
         omega = np.sum(loadings_sq) / (np.sum(loadings_sq) + np.sum(error_variances))
         return omega
     
-    def _calculate_split_half_reliability(self, data):
-        """计算分半信度"""
-        n_items = data.shape[1]
+    def _calculate_split_half_reliability(self, data, cov=None):
+        """计算分半信度（前半与后半项目，Spearman-Brown校正）"""
+        if cov is None:
+            cov = self._item_covariance(data)
+        n_items = cov.shape[0]
         half = n_items // 2
         
-        first_half = data.iloc[:, :half]
-        second_half = data.iloc[:, half:]
-        
-        # 计算两半的总分
-        first_half_score = first_half.sum(axis=1)
-        second_half_score = second_half.sum(axis=1)
-        
-        # 计算相关系数
-        correlation, _ = stats.pearsonr(first_half_score, second_half_score)
+        # 两半总分的方差与协方差都是协方差矩阵对应分块之和
+        var_first = cov[:half, :half].sum()
+        var_second = cov[half:, half:].sum()
+        correlation = cov[:half, half:].sum() / np.sqrt(var_first * var_second)
         
         # Spearman-Brown校正
         spearman_brown = (2 * correlation) / (1 + correlation)
         
         return spearman_brown
     
-    def _calculate_item_statistics(self, data):
+    def _calculate_item_statistics(self, data, cov=None):
         """计算项目统计"""
-        item_stats = {}
-        
-        for item in data.columns:
-            item_data = data[item]
-            
-            stats_dict = {
-                'mean': item_data.mean(),
-                'std': item_data.std(),
-                'item_total_correlation': self._item_total_correlation(data, item),
-                'skewness': stats.skew(item_data),
-                'kurtosis': stats.kurtosis(item_data),
-                'difficulty': item_data.mean() / item_data.max() if item_data.max() > 0 else 0
-            }
-            
-            item_stats[item] = stats_dict
+        values = np.asarray(data, dtype=float)
+        maxima = values.max(axis=0)
+        means = values.mean(axis=0)
+        
+        item_stats = pd.DataFrame({
+            'mean': means,
+            'std': values.std(axis=0, ddof=1),
+            'item_total_correlation': self._corrected_item_total_correlations(data, cov),
+            'skewness': stats.skew(values, axis=0),
+            'kurtosis': stats.kurtosis(values, axis=0),
+            'difficulty': np.where(maxima > 0, means / np.where(maxima > 0, maxima, 1), 0)
+        }, index=data.columns)
+        
+        return item_stats
+    
+    def _corrected_item_total_correlations(self, data, cov=None):
+        """
+        全部项目的校正项目-总分相关（项目与其余项目总分的相关）
         
-        return pd.DataFrame(item_stats).T
+        cov(x_j, T - x_j) = 第 j 行之和 - C_jj，var(T - x_j) = ΣC - 2·第 j 行之和 + C_jj
+        """
+        if cov is None:
+            cov = self._item_covariance(data)
+        row_sums = cov.sum(axis=1)
+        item_var = np.diag(cov)
+        rest_var = cov.sum() - 2 * row_sums + item_var
+        return (row_sums - item_var) / np.sqrt(item_var * rest_var)
     
     def _item_total_correlation(self, data, item):
         """计算项目-总分相关"""
-        total_scores = data.drop(columns=[item]).sum(axis=1)
-        correlation, _ = stats.pearsonr(data[item], total_scores)
-        return correlation
-    
-    def _calculate_alpha_if_deleted(self, data):
-        """计算删除某项后的Alpha"""
-        alpha_if_deleted = {}
-        
-        for item in data.columns:
-            data_without_item = data.drop(columns=[item])
-            alpha = self._calculate_cronbach_alpha(data_without_item)
-            alpha_if_deleted[item] = alpha
+        position = list(data.columns).index(item)
+        return self._corrected_item_total_correlations(data)[position]
+    
+    def _calculate_alpha_if_deleted(self, data, cov=None):
+        """计算删除某项后的Alpha（由协方差矩阵一次推导全部项目）"""
+        if cov is None:
+            cov = self._item_covariance(data)
+        k = cov.shape[0]
+        item_var = np.diag(cov)
+        trace_without = np.trace(cov) - item_var
+        total_without = cov.sum() - 2 * cov.sum(axis=1) + item_var
+        alphas = (k - 1) / (k - 2) * (1 - trace_without / total_without)
+        
+        return dict(zip(data.columns, alphas.tolist()))
+    
+    def _bootstrap_alpha_ci(self, data, n_bootstrap=N_BOOTSTRAP, confidence=0.95,
+                            seed=BOOTSTRAP_SEED, batch_size=BOOTSTRAP_BATCH):
+        """
+        Cronbach's Alpha 的百分位 Bootstrap 置信区间
         
-        return alpha_if_deleted
+        每批重抽样表示为 (批大小 × n) 的抽中次数矩阵，项目均值、平方均值和
+        总分矩都由矩阵乘法一次得到，不复制数据。
+        """
+        values = np.asarray(data, dtype=float)
+        values = values - values.mean(axis=0)
+        n, k = values.shape
+        totals = values.sum(axis=1)
+        row_squares = (values ** 2).sum(axis=1)
+        rng = np.random.default_rng(seed)
+        
+        alphas = np.empty(n_bootstrap)
+        for start in range(0, n_bootstrap, batch_size):
+            size = min(batch_size, n_bootstrap - start)
+            draws = rng.integers(0, n, size=(size, n))
+            offsets = (draws + np.arange(size)[:, None] * n).ravel()
+            counts = np.bincount(offsets, minlength=size * n).reshape(size, n).astype(float)
+            
+            item_means = counts @ values / n
+            item_var_sum = (counts @ row_squares / n - (item_means ** 2).sum(axis=1)) * n / (n - 1)
+            total_mean = counts @ totals / n
+            total_var = (counts @ totals ** 2 / n - total_mean ** 2) * n / (n - 1)
+            alphas[start:start + size] = k / (k - 1) * (1 - item_var_sum / total_var)
+        
+        tail = (1 - confidence) / 2 * 100
+        lower, upper = np.percentile(alphas, [tail, 100 - tail])
+        return {
+            'lower': float(lower),
+            'upper': float(upper),
+            'confidence': confidence,
+            'n_bootstrap': n_bootstrap,
+            'seed': seed
+        }
     
     def _interpret_reliability(self, alpha):
         """解释信度系数"""
@@ -158,6 +218,9 @@ class ValidityReliabilityAnalyzer:
     
     def construct_validity_analysis(self, items, n_factors=None, rotation='varimax'):
         """构念效度分析"""
+        from sklearn.decomposition import FactorAnalysis
+        from sklearn.preprocessing import StandardScaler
+        
         # 数据准备
         data_subset = self.data[items].dropna()
         
@@ -252,6 +315,7 @@ class ValidityReliabilityAnalyzer:
         n_factors_eigen = sum(ev > 1)
         
         # 碎石图
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(8, 6))
         plt.plot(range(1, len(ev) + 1), ev, 'bo-')
         plt.axhline(y=1, color='r', linestyle='--')
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+信度效度分析工具包测试套件
+包括基于协方差矩阵的信度指标与逐项重算结果的一致性、Bootstrap 置信区间测试
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+# 添加脚本目录到路径
+skill_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(skill_dir / 'scripts'))
+
+from validity_reliability_toolkit import ValidityReliabilityAnalyzer
+
+
+def make_scale(n_respondents, n_items, seed=0):
+    """单因子模型生成的量表数据"""
+    rng = np.random.default_rng(seed)
+    trait = rng.normal(size=(n_respondents, 1))
+    loadings = rng.uniform(0.3, 0.9, size=n_items)
+    values = trait * loadings + rng.normal(scale=0.8, size=(n_respondents, n_items))
+    return pd.DataFrame(values, columns=[f'item{i + 1}' for i in range(n_items)])
+
+
+def reference_alpha(data):
+    """逐列方差计算的 Cronbach's Alpha"""
+    k = data.shape[1]
+    return k / (k - 1) * (1 - data.var().sum() / data.sum(axis=1).var())
+
+
+class TestVectorizedReliability(unittest.TestCase):
+    """测试向量化信度指标与逐项重算一致"""
+
+    def setUp(self):
+        self.data = make_scale(2000, 40)
+        self.analyzer = ValidityReliabilityAnalyzer()
+
+    def test_alpha(self):
+        """测试 Cronbach's Alpha"""
+        self.assertAlmostEqual(self.analyzer._calculate_cronbach_alpha(self.data),
+                               reference_alpha(self.data), delta=1e-9)
+
+    def test_alpha_if_deleted(self):
+        """测试删除项后的 Alpha"""
+        result = self.analyzer._calculate_alpha_if_deleted(self.data)
+        self.assertEqual(list(result), list(self.data.columns))
+        for item in self.data.columns:
+            self.assertAlmostEqual(result[item], reference_alpha(self.data.drop(columns=[item])), delta=1e-9)
+
+    def test_corrected_item_total_correlation(self):
+        """测试校正的项目-总分相关"""
+        item_stats = self.analyzer._calculate_item_statistics(self.data)
+        for item in self.data.columns:
+            expected, _ = stats.pearsonr(self.data[item], self.data.drop(columns=[item]).sum(axis=1))
+            self.assertAlmostEqual(item_stats.loc[item, 'item_total_correlation'], expected, delta=1e-9)
+            self.assertAlmostEqual(item_stats.loc[item, 'skewness'], stats.skew(self.data[item]), delta=1e-9)
+            self.assertAlmostEqual(item_stats.loc[item, 'std'], self.data[item].std(), delta=1e-9)
+
+    def test_split_half(self):
+        """测试分半信度"""
+        half = self.data.shape[1] // 2
+        r, _ = stats.pearsonr(self.data.iloc[:, :half].sum(axis=1), self.data.iloc[:, half:].sum(axis=1))
+        self.assertAlmostEqual(self.analyzer._calculate_split_half_reliability(self.data),
+                               2 * r / (1 + r), delta=1e-9)
+
+
+class TestBootstrapInterval(unittest.TestCase):
+    """测试 Bootstrap 置信区间"""
+
+    def setUp(self):
+        self.data = make_scale(500, 12, seed=3)
+        self.analyzer = ValidityReliabilityAnalyzer()
+
+    def test_matches_explicit_resampling(self):
+        """测试向量化重抽样与逐次重抽样结果一致"""
+        interval = self.analyzer._bootstrap_alpha_ci(self.data, n_bootstrap=200, seed=5, batch_size=64)
+
+        rng = np.random.default_rng(5)
+        values = self.data.to_numpy()
+        alphas = []
+        for start in range(0, 200, 64):
+            size = min(64, 200 - start)
+            draws = rng.integers(0, len(values), size=(size, len(values)))
+            alphas.extend(reference_alpha(pd.DataFrame(values[rows])) for rows in draws)
+        lower, upper = np.percentile(alphas, [2.5, 97.5])
+
+        self.assertAlmostEqual(interval['lower'], lower, delta=1e-9)
+        self.assertAlmostEqual(interval['upper'], upper, delta=1e-9)
+
+    def test_seeded_and_covers_alpha(self):
+        """测试相同种子结果一致且区间包含点估计"""
+        first = self.analyzer._bootstrap_alpha_ci(self.data, n_bootstrap=300, seed=9)
+        second = self.analyzer._bootstrap_alpha_ci(self.data, n_bootstrap=300, seed=9)
+        self.assertEqual(first, second)
+        alpha = self.analyzer._calculate_cronbach_alpha(self.data)
+        self.assertLess(first['lower'], alpha)
+        self.assertGreater(first['upper'], alpha)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
+"""
+PDF表格提取：逐页并行提取、页面缓存与流式导出
+
+依赖: pandas、tabula-py
+可选: pypdf（获取总页数以分页并行提取，未安装时一次性提取全部页面）、openpyxl（Excel导出）
+"""
 import os
 import sys
+import csv
+import hashlib
 import pandas as pd
 import json
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 try:
     import tabula
@@ -12,65 +21,244 @@ except ImportError:
     HAS_TABULA = False
     print('需要安装 tabula-py: pip install tabula-py')
 
+try:
+    from pypdf import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+DEFAULT_CACHE_DIR = '.pdf_table_cache'
+
+
+def _read_page(pdf_path, page):
+    return tabula.read_pdf(
+        pdf_path,
+        pages=page,
+        multiple_tables=True,
+        pandas_options={'header': 0}
+    )
+
+
+def _extract_page(pdf_path, page, cache_dir):
+    """进程池任务：提取一页的表格并写入页面缓存"""
+    tables = _read_page(pdf_path, page)
+    if cache_dir:
+        pd.to_pickle(tables, os.path.join(cache_dir, f'page_{page}.pkl'))
+    return tables
+
+
 class PDFTableExtractor:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, cache_dir=DEFAULT_CACHE_DIR):
         self.pdf_path = pdf_path
         self.tables = []
-        
+        self.cache_dir = cache_dir
+        self._file_hash = None
+
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f'PDF文件不存在: {pdf_path}')
-    
-    def extract_tables(self, pages='all'):
+
+    @property
+    def file_hash(self):
+        if self._file_hash is None:
+            digest = hashlib.sha256()
+            with open(self.pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            self._file_hash = digest.hexdigest()
+        return self._file_hash
+
+    def _page_cache_dir(self):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, self.file_hash)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _load_cached_page(self, cache_dir, page):
+        path = os.path.join(cache_dir, f'page_{page}.pkl')
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception:
+            return None
+
+    def count_pages(self):
+        if not HAS_PYPDF:
+            print('未安装 pypdf（pip install pypdf），无法分页并行提取，将一次性提取全部页面')
+            return None
+        return len(PdfReader(self.pdf_path).pages)
+
+    def _resolve_pages(self, pages):
+        """把 'all' / 3 / '1-3,5' / [1, 2] 解析为页码列表，无法确定总页数时返回 None"""
+        if pages == 'all':
+            total = self.count_pages()
+            return list(range(1, total + 1)) if total else None
+        if isinstance(pages, int):
+            return [pages]
+        if isinstance(pages, (list, tuple, range)):
+            return [int(p) for p in pages]
+
+        resolved = []
+        for part in str(pages).split(','):
+            part = part.strip()
+            if '-' in part:
+                start, end = part.split('-', 1)
+                resolved.extend(range(int(start), int(end) + 1))
+            elif part:
+                resolved.append(int(part))
+        return resolved
+
+    def iter_tables(self, pages='all', workers=None, use_cache=True):
+        """每页一个任务并行提取，每完成一页就产出该页的 (page, table)，页码顺序不保证"""
         if not HAS_TABULA:
             print('Tabula不可用，请先安装相关依赖')
-            return []
-            
+            return
+
+        page_list = self._resolve_pages(pages)
+        if page_list is None:
+            # 无法获取总页数时退回一次性提取
+            for table in _read_page(self.pdf_path, pages):
+                yield None, table
+            return
+
+        cache_dir = self._page_cache_dir() if use_cache else None
+        pending = []
+        for page in page_list:
+            cached = self._load_cached_page(cache_dir, page) if cache_dir else None
+            if cached is None:
+                pending.append(page)
+                continue
+            for table in cached:
+                yield page, table
+
+        if not pending:
+            return
+
+        if workers == 1 or len(pending) == 1:
+            for page in pending:
+                for table in _extract_page(self.pdf_path, page, cache_dir):
+                    yield page, table
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_extract_page, self.pdf_path, page, cache_dir): page
+                for page in pending
+            }
+            for future in as_completed(futures):
+                for table in future.result():
+                    yield futures[future], table
+
+    def extract_tables(self, pages='all', workers=None, use_cache=True):
         print(f'正在提取页面 {pages} 的表格...')
         try:
-            tables = tabula.read_pdf(
-                self.pdf_path,
-                pages=pages,
-                multiple_tables=True,
-                pandas_options={'header': 0}
-            )
+            results = list(self.iter_tables(pages, workers, use_cache))
+            results.sort(key=lambda item: item[0] or 0)
+            tables = [table for _, table in results]
             self.tables = tables
             print(f'成功提取到 {len(tables)} 个表格')
             return tables
         except Exception as e:
             print(f'提取失败: {e}')
             return []
-    
-    def export_to_excel(self, output_path):
-        if not self.tables:
+
+    def _table_source(self, tables, pages, **kwargs):
+        if tables is not None:
+            return ((None, table) for table in tables)
+        if self.tables:
+            return ((None, table) for table in self.tables)
+        return self.iter_tables(pages, **kwargs)
+
+    def export_to_excel(self, output_path, tables=None, pages='all', **kwargs):
+        """write-only 模式逐表追加工作表；未提取过表格时边提取边写入"""
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        count = 0
+        for page, table in self._table_source(tables, pages, **kwargs):
+            count += 1
+            sheet = workbook.create_sheet(title=f'Table_{count}')
+            sheet.append([str(col) for col in table.columns])
+            for row in table.itertuples(index=False):
+                sheet.append([None if pd.isna(v) else v for v in row])
+
+        if not count:
+            print('没有表格数据可导出')
+            return
+        workbook.save(output_path)
+        print(f'表格已导出到: {output_path}')
+
+    def export_to_csv(self, output_path, tables=None, pages='all', **kwargs):
+        """所有表格写入同一个CSV，每个表格以 table,page 加表头开始，表格间空行分隔；没有表格时不创建文件"""
+        count = 0
+        f = None
+        try:
+            for page, table in self._table_source(tables, pages, **kwargs):
+                if f is None:
+                    f = open(output_path, 'w', newline='', encoding='utf-8-sig')
+                    writer = csv.writer(f)
+                if count:
+                    writer.writerow([])
+                count += 1
+                writer.writerow(['table', 'page'] + [str(col) for col in table.columns])
+                for row in table.itertuples(index=False):
+                    writer.writerow([count, page] + ['' if pd.isna(v) else v for v in row])
+        finally:
+            if f is not None:
+                f.close()
+
+        if not count:
             print('没有表格数据可导出')
             return
-            
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            for i, table in enumerate(self.tables):
-                table.to_excel(writer, sheet_name=f'Table_{i+1}', index=False)
         print(f'表格已导出到: {output_path}')
-    
+
+    def export_to_jsonl(self, output_path, tables=None, pages='all', **kwargs):
+        """每行一条记录: {"table": n, "page": p, "row": {...}}；没有表格时不创建文件"""
+        count = 0
+        f = None
+        try:
+            for page, table in self._table_source(tables, pages, **kwargs):
+                if f is None:
+                    f = open(output_path, 'w', encoding='utf-8')
+                count += 1
+                for record in json.loads(table.to_json(orient='records', force_ascii=False)):
+                    f.write(json.dumps({'table': count, 'page': page, 'row': record}, ensure_ascii=False) + '\n')
+        finally:
+            if f is not None:
+                f.close()
+
+        if not count:
+            print('没有表格数据可导出')
+            return
+        print(f'表格已导出到: {output_path}')
+
     def print_summary(self):
         if not self.tables:
             print('未找到表格数据')
             return
-            
-        print(f'
-找到 {len(self.tables)} 个表格:')
+
+        print(f'\n找到 {len(self.tables)} 个表格:')
         for i, table in enumerate(self.tables):
             print(f'表格 {i+1}: {table.shape[0]}行 x {table.shape[1]}列')
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
-        print('用法: python pdf_table_extractor.py <PDF文件路径>')
+        print('用法: python pdf_table_extractor.py <PDF文件路径> [xlsx|csv|jsonl]')
         sys.exit(1)
-        
+
     pdf_path = sys.argv[1]
+    fmt = sys.argv[2] if len(sys.argv) > 2 else 'xlsx'
     extractor = PDFTableExtractor(pdf_path)
-    extractor.extract_tables()
-    extractor.print_summary()
-    
-    # 自动导出到Excel
-    if extractor.tables:
-        output_name = Path(pdf_path).stem + '_tables.xlsx'
-        extractor.export_to_excel(output_name)
+
+    # 边提取边导出，避免一次性持有全部表格
+    output_name = Path(pdf_path).stem + f'_tables.{fmt}'
+    exporters = {
+        'xlsx': extractor.export_to_excel,
+        'csv': extractor.export_to_csv,
+        'jsonl': extractor.export_to_jsonl,
+    }
+    if fmt not in exporters:
+        print(f'不支持的导出格式: {fmt}')
+        sys.exit(1)
+    exporters[fmt](output_name)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+PDFTableExtractor 分页提取、缓存与流式导出测试
+tabula.read_pdf 通过 mock 替代
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import pandas as pd
+    import pdf_table_extractor
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+try:
+    import openpyxl  # noqa: F401
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+
+# 进程池测试依赖 fork：子进程继承 mock 的 tabula
+HAS_FORK = multiprocessing.get_start_method() == 'fork'
+# 进程池测试中第1页的提取耗时（秒）
+SLOW_PAGE_DELAY = 1.0
+
+
+def fake_read_pdf(path, pages, **kwargs):
+    """每页返回一个两行表格，内容带页码"""
+    return [pd.DataFrame({'page': [pages, pages], 'value': [pages * 10, pages * 10 + 1]})]
+
+
+def slow_first_page_read_pdf(path, pages, **kwargs):
+    """第1页很慢，其余页面立即返回"""
+    if pages == 1:
+        time.sleep(SLOW_PAGE_DELAY)
+    return fake_read_pdf(path, pages, **kwargs)
+
+
+def empty_read_pdf(path, pages, **kwargs):
+    """页面中没有表格"""
+    return []
+
+
+@unittest.skipUnless(HAS_PANDAS, '需要 pandas')
+class TestPDFTableExtractor(unittest.TestCase):
+    """测试分页提取"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, 'sample.pdf')
+        with open(self.pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 fake')
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+
+        self.tabula = mock.Mock()
+        self.tabula.read_pdf.side_effect = fake_read_pdf
+        patches = [
+            mock.patch.object(pdf_table_extractor, 'tabula', self.tabula, create=True),
+            mock.patch.object(pdf_table_extractor, 'HAS_TABULA', True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _extractor(self):
+        return pdf_table_extractor.PDFTableExtractor(self.pdf_path, cache_dir=self.cache_dir)
+
+    def test_extract_tables_in_page_order(self):
+        """测试逐页提取并按页码排序"""
+        tables = self._extractor().extract_tables(pages='1-5', workers=1)
+        self.assertEqual(len(tables), 5)
+        self.assertEqual([int(t['page'][0]) for t in tables], [1, 2, 3, 4, 5])
+        self.assertEqual(self.tabula.read_pdf.call_count, 5)
+
+    def test_iter_tables_yields_page_numbers(self):
+        """测试生成器产出页码"""
+        pages = [page for page, _ in self._extractor().iter_tables(pages=[2, 4], workers=1)]
+        self.assertEqual(sorted(pages), [2, 4])
+
+    def test_cache_skips_completed_pages(self):
+        """测试重复运行时跳过已缓存页面"""
+        self._extractor().extract_tables(pages='1-3', workers=1)
+        self.tabula.read_pdf.reset_mock()
+
+        tables = self._extractor().extract_tables(pages='1-4', workers=1)
+        self.assertEqual(len(tables), 4)
+        self.tabula.read_pdf.assert_called_once()
+        self.assertEqual(self.tabula.read_pdf.call_args[1]['pages'], 4)
+
+    def test_cache_keyed_by_file_hash(self):
+        """测试文件内容变化后缓存失效"""
+        self._extractor().extract_tables(pages='1', workers=1)
+        with open(self.pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 changed')
+        self.tabula.read_pdf.reset_mock()
+
+        self._extractor().extract_tables(pages='1', workers=1)
+        self.tabula.read_pdf.assert_called_once()
+
+    def test_export_to_jsonl_streams_rows(self):
+        """测试 JSONL 流式导出"""
+        output = os.path.join(self.tmp.name, 'out.jsonl')
+        self._extractor().export_to_jsonl(output, pages='1-2', workers=1)
+
+        with open(output, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 4)
+        self.assertEqual({r['page'] for r in records}, {1, 2})
+        self.assertIn('value', records[0]['row'])
+
+    def test_export_to_csv_blocks(self):
+        """测试 CSV 导出为按表分块"""
+        output = os.path.join(self.tmp.name, 'out.csv')
+        self._extractor().export_to_csv(output, pages='1-2', workers=1)
+
+        with open(output, encoding='utf-8-sig') as f:
+            content = f.read()
+        self.assertEqual(content.count('table,page,page,value'), 2)
+
+    def test_no_tables_writes_no_file(self):
+        """测试没有表格时不创建导出文件"""
+        self.tabula.read_pdf.side_effect = empty_read_pdf
+        for exporter, name in [('export_to_csv', 'out.csv'), ('export_to_jsonl', 'out.jsonl')]:
+            output = os.path.join(self.tmp.name, name)
+            getattr(self._extractor(), exporter)(output, pages='1-2', workers=1, use_cache=False)
+            self.assertFalse(os.path.exists(output))
+
+    def test_all_pages_without_pypdf(self):
+        """测试未安装 pypdf 时一次性提取全部页面"""
+        self.tabula.read_pdf.side_effect = lambda path, pages, **kwargs: fake_read_pdf(path, 1)
+        with mock.patch.object(pdf_table_extractor, 'HAS_PYPDF', False):
+            results = list(self._extractor().iter_tables(pages='all'))
+        self.assertEqual([page for page, _ in results], [None])
+        self.assertEqual(self.tabula.read_pdf.call_args[1]['pages'], 'all')
+
+    @unittest.skipUnless(HAS_FORK, '需要 fork 启动方式')
+    def test_process_pool_yields_pages_as_completed(self):
+        """测试进程池逐页产出：慢的第1页最后产出，其余页面不必等待它"""
+        self.tabula.read_pdf.side_effect = slow_first_page_read_pdf
+        start = time.perf_counter()
+        arrivals = []
+        for page, table in self._extractor().iter_tables(pages='1-6', workers=2):
+            arrivals.append((page, time.perf_counter() - start))
+            self.assertEqual(int(table['page'][0]), page)
+
+        self.assertEqual(sorted(page for page, _ in arrivals), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(arrivals[-1][0], 1)
+        self.assertLess(max(elapsed for page, elapsed in arrivals if page != 1), SLOW_PAGE_DELAY)
+
+        # 子进程写入的页面缓存在下次运行时直接使用
+        self.tabula.read_pdf.reset_mock()
+        tables = self._extractor().extract_tables(pages='1-6', workers=2)
+        self.assertEqual([int(t['page'][0]) for t in tables], [1, 2, 3, 4, 5, 6])
+        self.tabula.read_pdf.assert_not_called()
+
+    @unittest.skipUnless(HAS_OPENPYXL, '需要 openpyxl')
+    def test_export_to_excel_write_only(self):
+        """测试 write-only 工作簿导出"""
+        from openpyxl import load_workbook
+
+        output = os.path.join(self.tmp.name, 'out.xlsx')
+        self._extractor().export_to_excel(output, pages='1-3', workers=1)
+
+        workbook = load_workbook(output)
+        self.assertEqual(workbook.sheetnames, ['Table_1', 'Table_2', 'Table_3'])
+
+
+if __name__ == '__main__':
+    unittest.main()